@@ -0,0 +1,29 @@
+"""Benchmarks of EPTR2.call dispatch, transport and postprocessing."""
+
+import json
+
+import pytest
+
+from eptr2.mapping.processing import get_postprocess_function
+
+
+@pytest.mark.parametrize("key", ["mcp", "rt-gen", "mcp-smp-imb"])
+def test_call_postprocessed(benchmark, eptr, dates, key):
+    df = benchmark(eptr.call, key, **dates)
+    assert len(df) == 7 * 24
+
+
+def test_call_raw_response(benchmark, eptr, dates):
+    res = benchmark(eptr.call, "mcp", get_raw_response=True, **dates)
+    assert res.status == 200
+
+
+def test_call_large_payload(benchmark, large_eptr, dates):
+    df = benchmark(large_eptr.call, "rt-gen", **dates)
+    assert len(df) == 10000
+
+
+def test_postprocess_large_payload(benchmark, large_standin):
+    res = json.loads(json.dumps(large_standin.build_payload("rt-gen", {})))
+    df = benchmark(get_postprocess_function("rt-gen"), res, key="rt-gen")
+    assert len(df) == 10000
@@ -0,0 +1,57 @@
+"""Benchmarks of composite functions against the stand-in server."""
+
+import pandas as pd
+
+from eptr2.composite import (
+    calculate_portfolio_costs,
+    clear_market_price_cache,
+    get_hourly_consumption_and_forecast_data,
+    get_hourly_price_and_cost_data,
+    wrapper_hourly_production_plan_and_realized,
+)
+
+
+def test_consumption_and_forecast(benchmark, eptr, dates):
+    df = benchmark(get_hourly_consumption_and_forecast_data, eptr=eptr, **dates)
+    assert len(df) == 7 * 24
+
+
+def test_price_and_cost(benchmark, eptr, dates):
+    df = benchmark(get_hourly_price_and_cost_data, eptr=eptr, **dates)
+    assert len(df) == 7 * 24
+
+
+def test_production_plan_and_realized(benchmark, eptr, dates):
+    df = benchmark(
+        wrapper_hourly_production_plan_and_realized,
+        eptr=eptr,
+        org_id=1,
+        uevcb_id=2,
+        rt_pp_id=3,
+        uevm_pp_id=4,
+        **dates,
+    )
+    assert len(df) == 7 * 24
+
+
+def test_portfolio_costs(benchmark, eptr, dates):
+    id_df = pd.DataFrame(
+        {
+            "plant_name": [f"Plant {i}" for i in range(5)],
+            "org_id": range(5),
+            "uevcb_id": range(10, 15),
+            "rt_id": range(20, 25),
+            "uevm_id": range(30, 35),
+            "source": ["wind", "solar", "other", "wind", "solar"],
+        }
+    )
+
+    def run():
+        ## Measure the full calculation, including the market price fetch
+        clear_market_price_cache()
+        return calculate_portfolio_costs(
+            id_df=id_df, eptr=eptr, verbose=False, **dates
+        )
+
+    res = benchmark(run)
+    assert len(res["contract_summary"]) == 7 * 24
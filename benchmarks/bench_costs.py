@@ -0,0 +1,69 @@
+"""Benchmarks of cost and contract helper functions (no network)."""
+
+import pytest
+
+from eptr2.util.costs import (
+    calculate_diff_costs,
+    calculate_unit_price_and_costs_by_contract,
+    get_regime_by_contract,
+    get_regime_by_contracts,
+)
+from eptr2.util.time import (
+    contract_to_floor_ceil_prices,
+    get_hourly_contract_range_list,
+    time_to_contract_close,
+)
+
+CONTRACTS = get_hourly_contract_range_list("2024-01-01", "2026-06-30")
+
+
+def test_unit_price_and_costs_by_contract(benchmark):
+    def run():
+        return [
+            calculate_unit_price_and_costs_by_contract(
+                mcp=2500.0, smp=2800.0, contract=c
+            )
+            for c in CONTRACTS[:1000]
+        ]
+
+    assert len(benchmark(run)) == 1000
+
+
+def test_diff_costs(benchmark):
+    def run():
+        return [
+            calculate_diff_costs(
+                forecast=100.0,
+                actual=90.0 + i % 20,
+                is_producer=True,
+                production_source="wind",
+                mcp=2500.0,
+                smp=2800.0,
+            )
+            for i in range(1000)
+        ]
+
+    assert len(benchmark(run)) == 1000
+
+
+def test_floor_ceil_prices(benchmark):
+    res = benchmark(lambda: [contract_to_floor_ceil_prices(c) for c in CONTRACTS])
+    assert len(res) == len(CONTRACTS)
+
+
+def test_regime_scalar(benchmark):
+    res = benchmark(lambda: [get_regime_by_contract(c) for c in CONTRACTS])
+    assert len(res) == len(CONTRACTS)
+
+
+def test_regime_vectorized(benchmark):
+    pytest.importorskip("numpy")
+    res = benchmark(get_regime_by_contracts, CONTRACTS)
+    assert len(res["max"]) == len(CONTRACTS)
+
+
+def test_time_to_contract_close(benchmark):
+    res = benchmark(
+        lambda: [time_to_contract_close(c, ts_then=0.0) for c in CONTRACTS[:40]]
+    )
+    assert len(res) == 40
@@ -0,0 +1,41 @@
+"""
+Fixtures for offline benchmarks. All calls go to a local EPIAS stand-in server.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from eptr2.testing import StandInServer  # noqa: E402
+
+
+START_DATE = "2024-07-01"
+END_DATE = "2024-07-07"
+
+
+@pytest.fixture(scope="session")
+def standin():
+    with StandInServer(seed=2024) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def large_standin():
+    ## 10000 items with 20 extra fields per response (~3 MB JSON)
+    with StandInServer(seed=2024, n_items=10000, extra_fields=20) as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def eptr(standin):
+    return standin.client()
+
+
+@pytest.fixture(scope="session")
+def large_eptr(large_standin):
+    return large_standin.client()
+
+
+@pytest.fixture(scope="session")
+def dates():
+    return {"start_date": START_DATE, "end_date": END_DATE}
@@ -52,7 +52,7 @@ def get_dam_list(basin_name: str | None = None, eptr: EPTR2 | None = None, **kwa
     return eptr.call("dam-list", basin_name=basin_name, **kwargs)
 
 
-def get_dams_active_fullness(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
+def get_dams_active_fullness(basin_name: str | None = None, dam_name: str | None = None, start_date: str | None = None, end_date: str | None = None, eptr: EPTR2 | None = None, **kwargs):
     """Active Fullness / Aktif Doluluk
 
     Category: Barajlar
@@ -67,10 +67,10 @@ def get_dams_active_fullness(basin_name: str | None = None, dam_name: str | None
     """
     if eptr is None:
         eptr = EPTR2()
-    return eptr.call("dams-active-fullness", basin_name=basin_name, dam_name=dam_name, **kwargs)
+    return eptr.call("dams-active-fullness", basin_name=basin_name, dam_name=dam_name, start_date=start_date, end_date=end_date, **kwargs)
 
 
-def get_dams_active_volume(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
+def get_dams_active_volume(basin_name: str | None = None, dam_name: str | None = None, start_date: str | None = None, end_date: str | None = None, eptr: EPTR2 | None = None, **kwargs):
     """Active Volume / Aktif Hacim
 
     Category: Barajlar
@@ -85,10 +85,10 @@ def get_dams_active_volume(basin_name: str | None = None, dam_name: str | None =
     """
     if eptr is None:
         eptr = EPTR2()
-    return eptr.call("dams-active-volume", basin_name=basin_name, dam_name=dam_name, **kwargs)
+    return eptr.call("dams-active-volume", basin_name=basin_name, dam_name=dam_name, start_date=start_date, end_date=end_date, **kwargs)
 
 
-def get_dams_daily_level(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
+def get_dams_daily_level(basin_name: str | None = None, dam_name: str | None = None, start_date: str | None = None, end_date: str | None = None, eptr: EPTR2 | None = None, **kwargs):
     """Daily Kot / Günlük Kot
 
     Category: Barajlar
@@ -103,10 +103,10 @@ def get_dams_daily_level(basin_name: str | None = None, dam_name: str | None = N
     """
     if eptr is None:
         eptr = EPTR2()
-    return eptr.call("dams-daily-level", basin_name=basin_name, dam_name=dam_name, **kwargs)
+    return eptr.call("dams-daily-level", basin_name=basin_name, dam_name=dam_name, start_date=start_date, end_date=end_date, **kwargs)
 
 
-def get_dams_daily_volume(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
+def get_dams_daily_volume(basin_name: str | None = None, dam_name: str | None = None, start_date: str | None = None, end_date: str | None = None, eptr: EPTR2 | None = None, **kwargs):
     """Daily Volume / Günlük Hacim
 
     Category: Barajlar
@@ -121,10 +121,10 @@ def get_dams_daily_volume(basin_name: str | None = None, dam_name: str | None =
     """
     if eptr is None:
         eptr = EPTR2()
-    return eptr.call("dams-daily-volume", basin_name=basin_name, dam_name=dam_name, **kwargs)
+    return eptr.call("dams-daily-volume", basin_name=basin_name, dam_name=dam_name, start_date=start_date, end_date=end_date, **kwargs)
 
 
-def get_dams_info(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
+def get_dams_info(basin_name: str | None = None, dam_name: str | None = None, start_date: str | None = None, end_date: str | None = None, eptr: EPTR2 | None = None, **kwargs):
     """Flow Rate and Installed Power / Debi ve Kurulu Güç
 
     Category: Barajlar
@@ -139,7 +139,7 @@ def get_dams_info(basin_name: str | None = None, dam_name: str | None = None, ep
     """
     if eptr is None:
         eptr = EPTR2()
-    return eptr.call("dams-info", basin_name=basin_name, dam_name=dam_name, **kwargs)
+    return eptr.call("dams-info", basin_name=basin_name, dam_name=dam_name, start_date=start_date, end_date=end_date, **kwargs)
 
 
 def get_dams_level_minmax(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
@@ -178,7 +178,7 @@ def get_dams_volume_minmax(basin_name: str | None = None, dam_name: str | None =
     return eptr.call("dams-volume-minmax", basin_name=basin_name, dam_name=dam_name, **kwargs)
 
 
-def get_dams_water_energy_provision(basin_name: str | None = None, dam_name: str | None = None, eptr: EPTR2 | None = None, **kwargs):
+def get_dams_water_energy_provision(basin_name: str | None = None, dam_name: str | None = None, start_date: str | None = None, end_date: str | None = None, eptr: EPTR2 | None = None, **kwargs):
     """Water Energy Provision / Suyun Enerji Karşılığı
 
     Category: Barajlar
@@ -193,5 +193,5 @@ def get_dams_water_energy_provision(basin_name: str | None = None, dam_name: str
     """
     if eptr is None:
         eptr = EPTR2()
-    return eptr.call("dams-water-energy-provision", basin_name=basin_name, dam_name=dam_name, **kwargs)
+    return eptr.call("dams-water-energy-provision", basin_name=basin_name, dam_name=dam_name, start_date=start_date, end_date=end_date, **kwargs)
 
@@ -9,3 +9,10 @@ from eptr2.composite.plant_costs import *  # noqa: F403
 from eptr2.composite.periodic_orgs import *  # noqa: F403
 from eptr2.composite.ids import *  # noqa: F403
 from eptr2.composite.ancillary import *  # noqa: F403
+from eptr2.composite.master_data import *
+from eptr2.composite.supply_demand import *
+from eptr2.composite.idm_order_book import *
+from eptr2.composite.natural_gas import *
+from eptr2.composite.hydrology import *
+from eptr2.composite.outage_timeline import *
+from eptr2.composite.renewables import *
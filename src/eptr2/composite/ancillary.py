@@ -1,5 +1,6 @@
 import logging
 from eptr2 import EPTR2
+from eptr2.policy import get_request_timeout_kwargs
 from eptr2.util.time import datetime_to_contract
 import pandas as pd
 
@@ -29,7 +30,7 @@ def get_ancillary_reserve_data(
             k,
             start_date=start_date,
             end_date=end_date,
-            request_kwargs={"timeout": 5},
+            **get_request_timeout_kwargs(eptr, 5),
         )
 
         try:
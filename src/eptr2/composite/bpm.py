@@ -1,5 +1,6 @@
 import logging
 from eptr2 import EPTR2
+from eptr2.policy import get_request_timeout_kwargs
 import pandas as pd
 from eptr2.util.time import iso_to_contract, get_utc3_now
 from datetime import datetime, timedelta
@@ -62,7 +63,7 @@ def get_bpm_range(
             df = eptr.call(
                 "bpm-orders-w-avg",
                 date=date_str,
-                request_kwargs={"timeout": 5},
+                **get_request_timeout_kwargs(eptr, 5),
                 retry_attempts=max_lives,
                 retry_backoff=1,
                 retry_backoff_max=5,
@@ -1,5 +1,6 @@
 import logging
 from eptr2 import EPTR2
+from eptr2.policy import get_request_timeout_kwargs
 import pandas as pd
 from eptr2.util.time import iso_to_contract
 
@@ -29,7 +30,7 @@ def get_hourly_consumption_and_forecast_data(
         "load-plan",
         start_date=start_date,
         end_date=end_date,
-        request_kwargs={"timeout": 5},
+        **get_request_timeout_kwargs(eptr, 5),
     )
 
     df = lp_df[["date", "lep"]].rename(columns={"lep": "load_plan", "date": "dt"})
@@ -38,7 +39,10 @@ def get_hourly_consumption_and_forecast_data(
         logger.info("Loading UECM...")
 
     uecm_df: pd.DataFrame = eptr.call(
-        "uecm", start_date=start_date, end_date=end_date, request_kwargs={"timeout": 5}
+        "uecm",
+        start_date=start_date,
+        end_date=end_date,
+        **get_request_timeout_kwargs(eptr, 5),
     )
 
     if not uecm_df.empty:
@@ -59,7 +63,7 @@ def get_hourly_consumption_and_forecast_data(
         "rt-cons",
         start_date=start_date,
         end_date=end_date,
-        request_kwargs={"timeout": 5},
+        **get_request_timeout_kwargs(eptr, 5),
     )
 
     df = df.merge(
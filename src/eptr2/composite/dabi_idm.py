@@ -1,5 +1,6 @@
 import logging
 from eptr2 import EPTR2
+from eptr2.policy import get_request_timeout_kwargs
 import pandas as pd
 from eptr2.util.time import (
     iso_to_contract,
@@ -31,7 +32,7 @@ def process_idm_data(
         start_date=get_previous_day(start_date),
         end_date=end_date,
         org_id=org_id,
-        request_kwargs={"timeout": 5},
+        **get_request_timeout_kwargs(eptr, 5),
         **retry_kwargs,
     )
 
@@ -91,7 +92,7 @@ def get_day_ahead_and_bilateral_matches(
         start_date=start_date,
         end_date=end_date,
         org_id=org_id,
-        request_kwargs={"timeout": 5},
+        **get_request_timeout_kwargs(eptr, 5),
         **retry_kwargs,
     )
 
@@ -110,7 +111,7 @@ def get_day_ahead_and_bilateral_matches(
             start_date=start_date,
             end_date=end_date,
             org_id=org_id,
-            request_kwargs={"timeout": 5},
+            **get_request_timeout_kwargs(eptr, 5),
             **retry_kwargs,
         )
 
@@ -266,7 +267,7 @@ def get_day_ahead_detail_info(
                     item,
                     start_date=start_date,
                     end_date=end_date,
-                    request_kwargs={"timeout": kwargs.get("timeout", 5)},
+                    **get_request_timeout_kwargs(eptr, 5, kwargs.get("timeout")),
                     retry_attempts=kwargs.get("lives", lives),
                     retry_backoff=kwargs.get("retry_backoff", 0),
                     retry_backoff_max=kwargs.get("retry_backoff_max", 0),
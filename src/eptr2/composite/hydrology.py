@@ -0,0 +1,351 @@
+"""
+Dam and reservoir time series of all basins.
+
+get_dam_catalog lists basins (basin-list) and their dams (dam-list) once and keeps the
+result in a HydrologyStore. get_hydrology_data fetches the daily series of each dam
+(levels, volumes, active fullness, water energy provision, flow rate) concurrently with
+EPTR2.call_many and returns them in one long DataFrame. With a store, only days before the
+first and after the last stored observation of each dam and series are fetched.
+"""
+
+import logging
+import os
+import time
+
+import pandas as pd
+
+from eptr2 import EPTR2
+from eptr2.util.store import read_json_gz, write_json_gz
+from eptr2.util.time import offset_date_by_n_days, split_date_range
+
+logger = logging.getLogger(__name__)
+
+HYDROLOGY_STORE_VERSION = 1
+
+### Daily dam series of get_hydrology_data and their call keys
+HYDROLOGY_SERIES = {
+    "daily_level": "dams-daily-level",
+    "daily_volume": "dams-daily-volume",
+    "active_fullness": "dams-active-fullness",
+    "active_volume": "dams-active-volume",
+    "water_energy_provision": "dams-water-energy-provision",
+    "flow_rate_and_power": "dams-info",
+}
+
+HYDROLOGY_COLUMNS = ["date", "basin_name", "dam_name", "series", "field", "value"]
+
+### Response columns that are not values
+_NON_VALUE_COLUMNS = ["date", "day", "hour", "basinName", "damName", "name", "id"]
+
+
+def _to_names(res, keys: list[str]) -> list[str]:
+    """Names in a basin-list or dam-list response (list, dict or DataFrame)."""
+    if isinstance(res, pd.DataFrame):
+        res = res.to_dict("records")
+    if isinstance(res, dict):
+        res = next((v for v in res.values() if isinstance(v, list)), [])
+    names = []
+    for x in res or []:
+        if isinstance(x, dict):
+            x = next((x[k] for k in keys if x.get(k) is not None), None)
+        if x is not None:
+            names.append(str(x))
+    return names
+
+
+def _empty_frame() -> pd.DataFrame:
+    return _typed(pd.DataFrame(columns=HYDROLOGY_COLUMNS))
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Long format hydrology frame with datetime dates, categorical names and float values."""
+    df = df[HYDROLOGY_COLUMNS].copy()
+    df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+    for col in ["basin_name", "dam_name", "series", "field"]:
+        df[col] = df[col].astype(str).astype("category")
+    df["value"] = df["value"].astype("float64")
+    return df.reset_index(drop=True)
+
+
+def _to_long(res, series: str, basin_name: str, dam_name: str) -> pd.DataFrame:
+    """Melts a dam series response to date, basin_name, dam_name, series, field, value."""
+    if res is None or len(res) == 0 or "date" not in res.columns:
+        return pd.DataFrame(columns=HYDROLOGY_COLUMNS)
+    values = res.drop(columns=[x for x in _NON_VALUE_COLUMNS if x in res.columns])
+    values = values.apply(pd.to_numeric, errors="coerce").dropna(axis=1, how="all")
+    values["date"] = res["date"].astype(str).str[:10]
+    ## One observation per day, the last one if the response has several
+    values = values.drop_duplicates("date", keep="last")
+    df = values.melt(id_vars="date", var_name="field", value_name="_value")
+    df = df.rename(columns={"_value": "value"})
+    df["basin_name"] = basin_name
+    df["dam_name"] = dam_name
+    df["series"] = series
+    return df[HYDROLOGY_COLUMNS]
+
+
+class HydrologyStore:
+    """
+    Local store of the dam catalog and dam series.
+
+    Parameters:
+        directory: Directory of the gzip compressed catalog (catalog.json.gz) and series
+            (<series>.json.gz) files. None keeps them in memory only.
+
+    Example:
+        >>> store = HydrologyStore("data/hydrology")
+        >>> df = get_hydrology_data("2020-01-01", "2024-12-31", store=store, eptr=eptr)
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._files: dict[str, dict] = {}
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _load(self, name: str) -> dict | None:
+        if name not in self._files and self.directory is not None:
+            path = os.path.join(self.directory, f"{name}.json.gz")
+            if os.path.exists(path):
+                self._files[name] = read_json_gz(
+                    path, HYDROLOGY_STORE_VERSION, "hydrology store"
+                )
+        return self._files.get(name)
+
+    def _save(self, name: str, d: dict) -> None:
+        d = {"version": HYDROLOGY_STORE_VERSION, "updated_at": time.time(), **d}
+        self._files[name] = d
+        if self.directory is not None:
+            write_json_gz(os.path.join(self.directory, f"{name}.json.gz"), d)
+
+    def get_catalog(self) -> pd.DataFrame | None:
+        """Stored basin and dam names or None."""
+        d = self._load("catalog")
+        if d is None:
+            return None
+        return pd.DataFrame(d["records"], columns=["basin_name", "dam_name"])
+
+    def put_catalog(self, df: pd.DataFrame) -> None:
+        self._save("catalog", {"records": df.to_dict("records")})
+
+    def get_series(self, series: str) -> pd.DataFrame:
+        """Stored observations of a series in long format."""
+        d = self._load(series)
+        if d is None or not d["records"]:
+            return _empty_frame()
+        return _typed(pd.DataFrame(d["records"], columns=HYDROLOGY_COLUMNS))
+
+    def date_ranges(self, series: str) -> dict:
+        """
+        First and last stored observation dates (YYYY-MM-DD) of each (basin_name, dam_name).
+        """
+        d = self._load(series)
+        if d is None:
+            return {}
+        ranges = {}
+        for r in d["records"]:
+            k = (r[1], r[2])
+            if k not in ranges:
+                ranges[k] = (r[0], r[0])
+            else:
+                first, last = ranges[k]
+                ranges[k] = (min(first, r[0]), max(last, r[0]))
+        return ranges
+
+    def append_series(self, series: str, df: pd.DataFrame) -> None:
+        """Adds observations of a series, replacing stored ones of the same day and field."""
+        d = self._load(series)
+        records = {
+            (r[0], r[1], r[2], r[4]): r for r in (d["records"] if d is not None else [])
+        }
+        df = df.astype({"date": str, "basin_name": str, "dam_name": str, "field": str})
+        df["date"] = df["date"].str[:10]
+        for r in df[HYDROLOGY_COLUMNS].itertuples(index=False):
+            records[(r[0], r[1], r[2], r[4])] = [
+                r[0],
+                r[1],
+                r[2],
+                r[3],
+                r[4],
+                None if pd.isna(r[5]) else float(r[5]),
+            ]
+        self._save(series, {"records": sorted(records.values())})
+
+
+def get_dam_catalog(
+    eptr: EPTR2 | None = None,
+    store: HydrologyStore | None = None,
+    refresh: bool = False,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Basin and dam names (basin_name, dam_name) of all basins. dam-list calls of the basins
+    run concurrently (max_workers, see EPTR2.call_many). If a store is given, the stored
+    catalog is returned unless refresh is True.
+    """
+    if store is not None and not refresh:
+        catalog = store.get_catalog()
+        if catalog is not None:
+            return catalog
+
+    if eptr is None:
+        eptr = EPTR2()
+
+    basins = _to_names(eptr.call("basin-list"), ["basinName", "name"])
+    results = eptr.call_many(
+        [{"key": "dam-list", "basin_name": b} for b in basins],
+        max_workers=kwargs.get("max_workers", None),
+    )
+    catalog = pd.DataFrame(
+        [
+            (b, dam)
+            for b, res in zip(basins, results)
+            for dam in _to_names(res, ["damName", "name"])
+        ],
+        columns=["basin_name", "dam_name"],
+    )
+    if store is not None:
+        store.put_catalog(catalog)
+    return catalog
+
+
+def get_hydrology_data(
+    start_date: str,
+    end_date: str,
+    series: list[str] | None = None,
+    eptr: EPTR2 | None = None,
+    store: HydrologyStore | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Fetches daily dam series of all dams (or the given basins and dams) concurrently and
+    returns them in long format.
+
+    Args:
+        start_date, end_date: Dates in YYYY-MM-DD format.
+        series: Series names of HYDROLOGY_SERIES (default: all).
+        eptr: EPTR2 client. Created if not given.
+        store: HydrologyStore. If given, the dam catalog is read from it and only days before
+            the first and after the last stored observation of each dam and series are
+            fetched. The fetched ranges are extended to the stored ones, so the stored days
+            of a dam stay contiguous.
+        basins, dams: Basin and dam names to include (default: all in the catalog).
+        max_workers: Number of concurrent calls (see EPTR2.call_many).
+        max_days: Maximum days of a single call (default 366).
+        skip_errors: If True (default False), failed calls are skipped with a warning.
+
+    Returns a DataFrame of date, basin_name, dam_name, series, field (value column of the
+    response, e.g. "volume") and value, with categorical names and float64 values.
+
+    Example:
+        >>> store = HydrologyStore("data/hydrology")
+        >>> df = get_hydrology_data("2020-01-01", "2024-12-31", store=store, eptr=eptr)
+        >>> df[df["series"] == "active_fullness"].pivot_table(
+        ...     index="date", columns="dam_name", values="value"
+        ... )
+    """
+    series = list(HYDROLOGY_SERIES) if series is None else series
+    unknown = [x for x in series if x not in HYDROLOGY_SERIES]
+    if unknown:
+        raise ValueError(
+            f"Unknown hydrology series: {unknown}. Available: {list(HYDROLOGY_SERIES)}"
+        )
+    if eptr is None:
+        eptr = EPTR2()
+
+    catalog = get_dam_catalog(eptr=eptr, store=store, **kwargs)
+    if kwargs.get("basins") is not None:
+        catalog = catalog[catalog["basin_name"].isin(kwargs["basins"])]
+    if kwargs.get("dams") is not None:
+        catalog = catalog[catalog["dam_name"].isin(kwargs["dams"])]
+    dams = list(catalog.itertuples(index=False, name=None))
+
+    max_days = kwargs.get("max_days", 366)
+    plans = []
+    for s in series:
+        date_ranges = store.date_ranges(s) if store is not None else {}
+        for basin_name, dam_name in dams:
+            stored = date_ranges.get((basin_name, dam_name))
+            if stored is None:
+                ranges = [(start_date, end_date)]
+            else:
+                first, last = stored
+                ranges = []
+                if start_date < first:
+                    ranges.append((start_date, offset_date_by_n_days(first, n=-1)))
+                if end_date > last:
+                    ranges.append((offset_date_by_n_days(last, n=1), end_date))
+            for sd, ed in ranges:
+                for c_start, c_end in split_date_range(sd, ed, max_days):
+                    plans.append((s, basin_name, dam_name, c_start, c_end))
+
+    skip_errors = kwargs.get("skip_errors", False)
+    results = eptr.call_many(
+        [
+            {
+                "key": HYDROLOGY_SERIES[s],
+                "basin_name": b,
+                "dam_name": d,
+                "start_date": c_start,
+                "end_date": c_end,
+            }
+            for s, b, d, c_start, c_end in plans
+        ],
+        max_workers=kwargs.get("max_workers", None),
+        return_exceptions=skip_errors,
+    )
+
+    fetched = {s: [] for s in series}
+    for (s, b, d, c_start, c_end), res in zip(plans, results):
+        if isinstance(res, Exception):
+            logger.warning(
+                "%s of %s (%s, %s - %s) could not be fetched: %s",
+                s,
+                d,
+                b,
+                c_start,
+                c_end,
+                res,
+            )
+            continue
+        fetched[s].append(_to_long(res, s, b, d))
+
+    frames = []
+    for s in series:
+        new = (
+            pd.concat(fetched[s], ignore_index=True)
+            if fetched[s]
+            else pd.DataFrame(columns=HYDROLOGY_COLUMNS)
+        )
+        if store is not None:
+            if len(new):
+                store.append_series(s, new)
+            df = store.get_series(s)
+        else:
+            df = _typed(new)
+        in_range = (df["date"] >= start_date) & (df["date"] <= end_date)
+        ## Dam names are unique only within a basin
+        in_dams = pd.MultiIndex.from_arrays(
+            [df["basin_name"].astype(str), df["dam_name"].astype(str)]
+        ).isin(pd.MultiIndex.from_frame(catalog[["basin_name", "dam_name"]]))
+        frames.append(df[in_range & in_dams])
+
+    frames = [x for x in frames if len(x)]
+    if not frames:
+        return _empty_frame()
+    return _typed(pd.concat(frames, ignore_index=True))
+
+
+def save_hydrology_parquet(df: pd.DataFrame, path: str) -> None:
+    """
+    Saves a get_hydrology_data result as a Parquet dataset partitioned by series and
+    basin_name. Requires pyarrow.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "pyarrow is not installed. Install it with: pip install pyarrow"
+        )
+    df.to_parquet(path, partition_cols=["series", "basin_name"], index=False)
@@ -0,0 +1,529 @@
+"""
+IDM order book reconstruction from order history (idm-order-history) and transactions
+(idm-log).
+
+Order history rows are order states: each row sets the side, price and remaining quantity
+of an order at a time, and rows with zero quantity or an inactive status remove the order.
+Events of each contract are replayed in time order into price-level books held in numpy
+arrays (one quantity array per side, indexed by the contract's distinct prices), and book
+snapshots are emitted at a fixed interval or after every event. Contracts are replayed in
+parallel processes.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from eptr2 import EPTR2
+from eptr2.composite.idm_log import idm_log_longer
+
+logger = logging.getLogger(__name__)
+
+## Candidate column names of order history fields. The first existing one is used.
+## quantity is the remaining quantity of the order after the event, so remainingQuantity
+## comes before the original order size.
+IDM_ORDER_COLUMNS = {
+    "contract": ["contractName", "contract", "contractId"],
+    "order_id": ["orderId", "id", "orderNo"],
+    "time": ["date", "orderDate", "updateDate", "time"],
+    "side": ["direction", "side", "orderType", "type"],
+    "price": ["price"],
+    "quantity": ["remainingQuantity", "quantity", "amount"],
+    "status": ["status", "orderStatus"],
+}
+
+## Side values of buy orders. Because of EPIAS naming, ask is a buy order (see dabi_idm).
+IDM_BUY_SIDES = ["ALIS", "ALIŞ", "BUY", "ASK", "A"]
+
+## Status values of orders that are no longer in the book
+IDM_INACTIVE_STATUSES = [
+    "CANCELLED",
+    "CANCELED",
+    "DELETED",
+    "INACTIVE",
+    "MATCHED",
+    "IPTAL",
+    "İPTAL",
+    "PASIF",
+    "PASİF",
+    "ESLESTI",
+    "EŞLEŞTİ",
+]
+
+BOOK_COLUMNS = [
+    "contract",
+    "time",
+    "best_bid",
+    "best_bid_qty",
+    "best_ask",
+    "best_ask_qty",
+    "mid",
+    "spread",
+    "bid_depth",
+    "ask_depth",
+    "n_events",
+]
+
+
+def _resolve_columns(df: pd.DataFrame, columns: dict | None) -> dict:
+    d = {}
+    for field, candidates in IDM_ORDER_COLUMNS.items():
+        if columns and field in columns:
+            d[field] = columns[field]
+            continue
+        d[field] = next((x for x in candidates if x in df.columns), None)
+    missing = [
+        k
+        for k in ["contract", "order_id", "time", "side", "price", "quantity"]
+        if d[k] is None
+    ]
+    if missing:
+        raise ValueError(
+            f"Order history columns of {missing} are not found. Pass them with columns={{field: column}}."
+        )
+    return d
+
+
+def _to_ns(x: pd.Series) -> tuple[np.ndarray, object]:
+    """Times as int64 UTC nanoseconds and the time zone to restore them."""
+    t = pd.to_datetime(x)
+    tz = t.dt.tz
+    if tz is not None:
+        t = t.dt.tz_convert("UTC").dt.tz_localize(None)
+    return t.to_numpy(dtype="datetime64[ns]").astype(np.int64), tz
+
+
+def _from_ns(ns: np.ndarray, tz) -> pd.DatetimeIndex:
+    t = pd.to_datetime(ns)
+    if tz is not None:
+        t = t.tz_localize("UTC").tz_convert(tz)
+    return t
+
+
+def _top_levels(book: np.ndarray, best: int, depth: int, step: int) -> np.ndarray:
+    """Indices of the first depth non-empty levels from best in direction step."""
+    if step < 0:
+        if best < 0:
+            return np.empty(0, dtype=np.int64)
+        ## Look at a window near the best level first, the whole side if it is not enough
+        lo = max(0, best + 1 - 4 * depth)
+        top = np.flatnonzero(book[lo : best + 1])[::-1][:depth] + lo
+        if len(top) < depth and lo > 0:
+            top = np.flatnonzero(book[: best + 1])[::-1][:depth]
+        return top
+    if best >= len(book):
+        return np.empty(0, dtype=np.int64)
+    hi = min(len(book), best + 4 * depth)
+    top = np.flatnonzero(book[best:hi])[:depth] + best
+    if len(top) < depth and hi < len(book):
+        top = np.flatnonzero(book[best:])[:depth] + best
+    return top
+
+
+def replay_contract_book(
+    times: np.ndarray,
+    order_codes: np.ndarray,
+    is_buy: np.ndarray,
+    levels: np.ndarray,
+    level_idx: np.ndarray,
+    quantity: np.ndarray,
+    snapshot_times: np.ndarray | None = None,
+    depth: int = 0,
+) -> dict:
+    """
+    Replays the order events of a single contract into price-level books.
+
+    Args:
+        times: Event times (int64, ascending).
+        order_codes: Dense order codes (0..n_orders - 1) of the events.
+        is_buy: Whether the order of the event is a buy order.
+        levels: Distinct prices of the contract in ascending order.
+        level_idx: Index of the event price in levels.
+        quantity: Remaining quantity of the order after the event (0 removes it).
+        snapshot_times: Times of the snapshots (int64, ascending). A snapshot shows the book
+            after all events at or before its time. None emits a snapshot after every event.
+        depth: Number of price levels per side to include in snapshots.
+
+    Returns a dictionary of snapshot arrays (time, best_bid, best_bid_qty, best_ask,
+    best_ask_qty, bid_depth, ask_depth, n_events and, with depth, bid/ask price and
+    quantity matrices).
+    """
+    n_events = len(times)
+    n_levels = len(levels)
+    n_orders = int(order_codes.max()) + 1 if n_events else 0
+
+    if snapshot_times is None:
+        snapshot_times = times
+        ends = np.arange(1, n_events + 1)
+    else:
+        ends = np.searchsorted(times, snapshot_times, side="right")
+
+    ## Books are computed once per distinct event count; snapshots without new events
+    ## repeat the previous one
+    is_new = np.ones(len(ends), dtype=bool)
+    is_new[1:] = ends[1:] != ends[:-1]
+    unique_ends = ends[is_new].tolist()
+    n_books = len(unique_ends)
+
+    bid = np.zeros(n_levels)
+    ask = np.zeros(n_levels)
+    o_level = [-1] * n_orders
+    o_buy = [False] * n_orders
+    o_qty = [0.0] * n_orders
+    best_bid = -1
+    best_ask = n_levels
+    bid_total = 0.0
+    ask_total = 0.0
+
+    best_bid_idx = np.empty(n_books, dtype=np.int64)
+    best_ask_idx = np.empty(n_books, dtype=np.int64)
+    best_bid_qty = np.full(n_books, np.nan)
+    best_ask_qty = np.full(n_books, np.nan)
+    bid_depth = np.empty(n_books)
+    ask_depth = np.empty(n_books)
+    if depth > 0:
+        level_books = {
+            x: np.full((n_books, depth), np.nan)
+            for x in ["bid_prices", "bid_qtys", "ask_prices", "ask_qtys"]
+        }
+
+    ## Plain Python scalars are faster than numpy scalars in the event loop
+    codes_l = order_codes.tolist()
+    buy_l = is_buy.tolist()
+    level_l = level_idx.tolist()
+    qty_l = quantity.tolist()
+
+    i = 0
+    for k, end in enumerate(unique_ends):
+        while i < end:
+            o = codes_l[i]
+            old_level = o_level[o]
+            if old_level >= 0:
+                old_qty = o_qty[o]
+                if o_buy[o]:
+                    bid[old_level] -= old_qty
+                    bid_total -= old_qty
+                    if bid[old_level] <= 1e-9:
+                        bid[old_level] = 0.0
+                        while best_bid >= 0 and bid[best_bid] == 0.0:
+                            best_bid -= 1
+                else:
+                    ask[old_level] -= old_qty
+                    ask_total -= old_qty
+                    if ask[old_level] <= 1e-9:
+                        ask[old_level] = 0.0
+                        while best_ask < n_levels and ask[best_ask] == 0.0:
+                            best_ask += 1
+
+            q = qty_l[i]
+            if q > 0:
+                lv = level_l[i]
+                if buy_l[i]:
+                    bid[lv] += q
+                    bid_total += q
+                    ## Comparisons are cheaper than max/min calls in this loop
+                    if lv > best_bid:  # noqa: PLR1730
+                        best_bid = lv
+                else:
+                    ask[lv] += q
+                    ask_total += q
+                    if lv < best_ask:  # noqa: PLR1730
+                        best_ask = lv
+                o_level[o] = lv
+                o_buy[o] = buy_l[i]
+                o_qty[o] = q
+            else:
+                o_level[o] = -1
+            i += 1
+
+        best_bid_idx[k] = best_bid
+        best_ask_idx[k] = best_ask
+        bid_depth[k] = bid_total
+        ask_depth[k] = ask_total
+        if best_bid >= 0:
+            best_bid_qty[k] = bid[best_bid]
+        if best_ask < n_levels:
+            best_ask_qty[k] = ask[best_ask]
+
+        if depth > 0:
+            top = _top_levels(bid, best_bid, depth, -1)
+            level_books["bid_prices"][k, : len(top)] = levels[top]
+            level_books["bid_qtys"][k, : len(top)] = bid[top]
+            top = _top_levels(ask, best_ask, depth, 1)
+            level_books["ask_prices"][k, : len(top)] = levels[top]
+            level_books["ask_qtys"][k, : len(top)] = ask[top]
+
+    book_idx = np.cumsum(is_new) - 1
+    has_bid = best_bid_idx >= 0
+    has_ask = best_ask_idx < n_levels
+    out = {
+        "time": np.asarray(snapshot_times, dtype=np.int64),
+        "best_bid": np.where(
+            has_bid, levels[np.clip(best_bid_idx, 0, None)] if n_levels else 0, np.nan
+        )[book_idx],
+        "best_bid_qty": best_bid_qty[book_idx],
+        "best_ask": np.where(
+            has_ask,
+            levels[np.clip(best_ask_idx, None, n_levels - 1)] if n_levels else 0,
+            np.nan,
+        )[book_idx],
+        "best_ask_qty": best_ask_qty[book_idx],
+        "bid_depth": bid_depth[book_idx],
+        "ask_depth": ask_depth[book_idx],
+        "n_events": np.asarray(ends, dtype=np.int64),
+    }
+    if depth > 0:
+        for x, v in level_books.items():
+            out[x] = v[book_idx]
+
+    return out
+
+
+def _replay_job(job: tuple) -> dict:
+    contract, arrays, interval_ns, depth = job
+    times = arrays["times"]
+    snapshot_times = None
+    if interval_ns is not None and len(times):
+        first = times[0] - times[0] % interval_ns + interval_ns
+        snapshot_times = np.arange(first, times[-1] + interval_ns, interval_ns)
+    d = replay_contract_book(
+        times=times,
+        order_codes=arrays["order_codes"],
+        is_buy=arrays["is_buy"],
+        levels=arrays["levels"],
+        level_idx=arrays["level_idx"],
+        quantity=arrays["quantity"],
+        snapshot_times=snapshot_times,
+        depth=depth,
+    )
+    d["contract"] = contract
+    return d
+
+
+def replay_idm_order_books(
+    orders: pd.DataFrame,
+    trades: pd.DataFrame | None = None,
+    interval: str | None = "1min",
+    depth: int = 0,
+    max_workers: int | None = None,
+    columns: dict | None = None,
+    buy_sides: list[str] | None = None,
+    inactive_statuses: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Reconstructs IDM order books of each contract from order history.
+
+    Args:
+        orders: Order history (idm-order-history rows) of one or more contracts.
+        trades: Transactions (idm-log rows with contractName, date, price and quantity). If
+            given, snapshots include the last trade price and cumulative traded quantity.
+        interval: Snapshot interval as a pandas frequency (e.g. "1min", "15min"). Snapshots
+            are on interval boundaries from the first to the last event of each contract.
+            None emits a snapshot after every event.
+        depth: Number of price levels per side to include (bid_price_1, bid_qty_1, ...).
+        max_workers: Number of processes (default cpu count). 1 replays in process.
+        columns: Order history column names by field (contract, order_id, time, side,
+            price, quantity, status) if they differ from IDM_ORDER_COLUMNS.
+        buy_sides: Side values of buy orders (default IDM_BUY_SIDES).
+        inactive_statuses: Status values of orders no longer in the book (default
+            IDM_INACTIVE_STATUSES).
+
+    Returns a DataFrame of snapshots with BOOK_COLUMNS (and level and trade columns).
+    """
+    cols = _resolve_columns(orders, columns)
+    buy_sides = {str(x).upper() for x in (buy_sides or IDM_BUY_SIDES)}
+    inactive = {str(x).upper() for x in (inactive_statuses or IDM_INACTIVE_STATUSES)}
+
+    times, tz = _to_ns(orders[cols["time"]])
+    contract = orders[cols["contract"]].astype(str).to_numpy()
+    order_id = orders[cols["order_id"]].astype(str).to_numpy()
+    is_buy = orders[cols["side"]].astype(str).str.upper().isin(buy_sides).to_numpy()
+    price = orders[cols["price"]].to_numpy(dtype=np.float64)
+    quantity = orders[cols["quantity"]].to_numpy(dtype=np.float64)
+    if cols["status"] is not None:
+        is_inactive = orders[cols["status"]].astype(str).str.upper().isin(inactive)
+        quantity = np.where(is_inactive.to_numpy(), 0.0, quantity)
+    quantity = np.nan_to_num(quantity)
+
+    order = np.lexsort((times, contract))
+    contract_sorted = contract[order]
+    names, starts = np.unique(contract_sorted, return_index=True)
+    bounds = list(starts) + [len(order)]
+
+    interval_ns = None if interval is None else pd.Timedelta(interval).value
+    jobs = []
+    for j, name in enumerate(names):
+        idx = order[bounds[j] : bounds[j + 1]]
+        levels, level_idx = np.unique(price[idx], return_inverse=True)
+        _, order_codes = np.unique(order_id[idx], return_inverse=True)
+        arrays = {
+            "times": times[idx],
+            "order_codes": order_codes,
+            "is_buy": is_buy[idx],
+            "levels": levels,
+            "level_idx": level_idx,
+            "quantity": quantity[idx],
+        }
+        jobs.append((name, arrays, interval_ns, depth))
+
+    n_workers = max_workers or os.cpu_count() or 1
+    n_workers = min(n_workers, len(jobs))
+    if n_workers <= 1:
+        results = [_replay_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(
+                executor.map(
+                    _replay_job, jobs, chunksize=max(1, len(jobs) // (4 * n_workers))
+                )
+            )
+
+    return _books_to_frame(results, tz, depth, trades)
+
+
+def _books_to_frame(results: list[dict], tz, depth: int, trades) -> pd.DataFrame:
+    if not results:
+        return pd.DataFrame(columns=BOOK_COLUMNS)
+
+    n = [len(r["time"]) for r in results]
+    cat = {
+        k: np.concatenate([r[k] for r in results])
+        for k in results[0]
+        if k != "contract"
+    }
+    df = pd.DataFrame(
+        {
+            "contract": np.repeat([r["contract"] for r in results], n),
+            "time": _from_ns(cat["time"], tz),
+            "best_bid": cat["best_bid"],
+            "best_bid_qty": cat["best_bid_qty"],
+            "best_ask": cat["best_ask"],
+            "best_ask_qty": cat["best_ask_qty"],
+            "mid": (cat["best_bid"] + cat["best_ask"]) / 2,
+            "spread": cat["best_ask"] - cat["best_bid"],
+            "bid_depth": cat["bid_depth"],
+            "ask_depth": cat["ask_depth"],
+            "n_events": cat["n_events"],
+        }
+    )
+    for i in range(depth):
+        for side in ["bid", "ask"]:
+            df[f"{side}_price_{i + 1}"] = cat[f"{side}_prices"][:, i]
+            df[f"{side}_qty_{i + 1}"] = cat[f"{side}_qtys"][:, i]
+
+    if trades is not None:
+        df = _add_trades(df, cat["time"], trades)
+
+    return df
+
+
+def _add_trades(df: pd.DataFrame, snapshot_ns: np.ndarray, trades: pd.DataFrame):
+    """Adds last trade price and cumulative traded quantity of each contract."""
+    last_price = np.full(len(df), np.nan)
+    traded = np.zeros(len(df))
+    if len(trades):
+        t_ns, _ = _to_ns(trades["date"])
+        t_contract = trades["contractName"].astype(str).to_numpy()
+        t_price = trades["price"].to_numpy(dtype=np.float64)
+        t_qty = trades["quantity"].to_numpy(dtype=np.float64)
+        order = np.lexsort((t_ns, t_contract))
+        t_contract, t_ns, t_price, t_qty = (
+            t_contract[order],
+            t_ns[order],
+            t_price[order],
+            t_qty[order],
+        )
+        names, starts = np.unique(t_contract, return_index=True)
+        bounds = dict(zip(names, zip(starts, list(starts[1:]) + [len(order)])))
+
+        snap_contract = df["contract"].to_numpy()
+        for name in np.unique(snap_contract):
+            if name not in bounds:
+                continue
+            a, b = bounds[name]
+            rows = np.flatnonzero(snap_contract == name)
+            idx = np.searchsorted(t_ns[a:b], snapshot_ns[rows], side="right")
+            has = idx > 0
+            last_price[rows[has]] = t_price[a:b][idx[has] - 1]
+            traded[rows[has]] = np.cumsum(t_qty[a:b])[idx[has] - 1]
+
+    df["last_price"] = last_price
+    df["traded_qty"] = traded
+    return df
+
+
+def get_idm_order_books(
+    start_date: str,
+    end_date: str,
+    eptr: EPTR2 | None = None,
+    interval: str | None = "1min",
+    depth: int = 0,
+    include_trades: bool = True,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Fetches IDM contracts and their order histories for delivery days between start_date
+    and end_date concurrently and reconstructs their order books (see
+    replay_idm_order_books). With include_trades, transactions are fetched with
+    idm_log_longer and added to the snapshots.
+
+    Args:
+        max_workers: Number of concurrent calls (call_many) and replay processes.
+        Other keyword arguments are passed to replay_idm_order_books.
+    """
+    if eptr is None:
+        eptr = EPTR2()
+    max_workers = kwargs.pop("max_workers", None)
+
+    days = pd.date_range(start_date, end_date, freq="D").strftime("%Y-%m-%d").tolist()
+
+    contract_lists = eptr.call_many(
+        [{"key": "idm-contract-list", "se_date": d} for d in days],
+        max_workers=max_workers,
+    )
+    requests = []
+    names = []
+    for d, c_df in zip(days, contract_lists):
+        if c_df is None or c_df.empty:
+            continue
+        id_col = next(x for x in ["contractId", "id"] if x in c_df.columns)
+        name_col = next(
+            (x for x in ["contractName", "name", "contract"] if x in c_df.columns),
+            id_col,
+        )
+        for cid, name in zip(c_df[id_col], c_df[name_col]):
+            requests.append(
+                {"key": "idm-order-history", "se_date": d, "idm_contract_id": cid}
+            )
+            names.append(name)
+
+    histories = eptr.call_many(requests, max_workers=max_workers)
+    dfs = []
+    for name, df in zip(names, histories):
+        if df is None or df.empty:
+            continue
+        df = df.copy()
+        df["contractName"] = name
+        dfs.append(df)
+    if not dfs:
+        return pd.DataFrame(columns=BOOK_COLUMNS)
+    orders = pd.concat(dfs, ignore_index=True)
+
+    trades = None
+    if include_trades:
+        trades = idm_log_longer(start_date=start_date, end_date=end_date, eptr=eptr)
+
+    columns = dict(kwargs.pop("columns", None) or {})
+    columns.setdefault("contract", "contractName")
+    return replay_idm_order_books(
+        orders,
+        trades=trades,
+        interval=interval,
+        depth=depth,
+        max_workers=max_workers,
+        columns=columns,
+        **kwargs,
+    )
@@ -1,4 +1,5 @@
 from eptr2 import EPTR2
+from eptr2.policy import get_request_timeout_kwargs
 from eptr2.composite.periodic_orgs import get_generation_org_and_uevcb_wrapper
 import os
 import logging
@@ -22,8 +23,6 @@ def get_all_important_ids(
     if eptr is None:
         eptr = EPTR2()
 
-    d = {}
-
     max_lives = kwargs.get("max_lives", 3)
     retry_kwargs = {
         "retry_attempts": max_lives,
@@ -35,25 +34,30 @@ def get_all_important_ids(
     if verbose:
         logger.info("Fetching all important IDs for date: %s", the_date)
 
-    if verbose:
-        logger.info("Fetching day ahead market participants organization list")
-    d["dam_clearing_org_list"] = eptr.call(
-        "dam-clearing-org-list",
-        period=the_date,
-        request_kwargs={"timeout": kwargs.get("timeout", 10)},
-        **retry_kwargs,
-    )
+    ## Independent list calls are made concurrently
+    timeout_kwargs = get_request_timeout_kwargs(eptr, 10, kwargs.get("timeout"))
+
+    list_calls = {
+        "dam_clearing_org_list": {"key": "dam-clearing-org-list", "period": the_date},
+        "imb_org_list": {
+            "key": "imb-org-list",
+            "start_date": the_date,
+            "end_date": the_date,
+        },
+        "pp_list": {"key": "pp-list"},
+        "uevm_pp_list": {"key": "uevm-pp-list"},
+    }
 
     if verbose:
-        logger.info("Fetching balancing responsible parties list")
-
-    d["imb_org_list"] = eptr.call(
-        "imb-org-list",
-        start_date=the_date,
-        end_date=the_date,
-        request_kwargs={"timeout": kwargs.get("timeout", 10)},
-        **retry_kwargs,
+        logger.info(
+            "Fetching day ahead market participants organization list, balancing responsible parties list, power plant list and UEVM power plant list"
+        )
+
+    results = eptr.call_many(
+        [{**x, **timeout_kwargs, **retry_kwargs} for x in list_calls.values()],
+        max_workers=kwargs.get("max_workers", None),
     )
+    d = dict(zip(list_calls.keys(), results))
 
     if verbose:
         logger.info("Fetching generation organization and UEVCB data")
@@ -62,18 +66,6 @@ def get_all_important_ids(
         period=the_date, eptr=eptr, **retry_kwargs
     )
 
-    if verbose:
-        logger.info("Fetching power plant list")
-
-    d["pp_list"] = eptr.call(
-        "pp-list", request_kwargs={"timeout": kwargs.get("timeout", 10)}, **retry_kwargs
-    )
-
-    if verbose:
-        logger.info("Fetching UEVM power plant list")
-
-    d["uevm_pp_list"] = eptr.call("uevm-pp-list", **retry_kwargs)
-
     if export_to_excel:
         import pandas as pd
 
@@ -0,0 +1,621 @@
+"""
+Local master data index of power plants, organizations and UEVCBs.
+
+MasterDataIndex keeps the plant, organization and UEVCB lists of the transparency platform
+in a local file, so that ID lookups, name search and mapping between the real-time
+(pp-list), UEVM (uevm-pp-list), UEVCB (uevcb-list-bulk) and MMS (mms-pp-list) IDs of a
+plant work offline after a sync.
+"""
+
+import bisect
+import difflib
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from eptr2 import EPTR2
+from eptr2.util.store import read_json_gz, write_json_gz
+from eptr2.util.time import get_utc3_now, transform_date
+
+logger = logging.getLogger(__name__)
+
+MASTER_DATA_VERSION = 1
+
+## Source call key, table name and column renames of each table
+MASTER_DATA_SOURCES = {
+    "pp-list": {
+        "table": "rt_plants",
+        "columns": {
+            "id": "rt_id",
+            "name": "pp_name",
+            "eic": "eic",
+            "shortName": "pp_short_name",
+        },
+    },
+    "uevm-pp-list": {
+        "table": "uevm_plants",
+        "columns": {
+            "id": "uevm_id",
+            "name": "pp_name",
+            "eic": "eic",
+            "shortName": "pp_short_name",
+        },
+    },
+    "gen-org": {
+        "table": "orgs",
+        "columns": {
+            "organizationId": "org_id",
+            "organizationName": "org_name",
+            "organizationShortName": "org_short_name",
+            "organizationEtsoCode": "org_eic",
+            "organizationStatus": "org_status",
+        },
+    },
+    "uevcb-list-bulk": {
+        "table": "uevcbs",
+        "columns": {
+            "id": "uevcb_id",
+            "orgId": "org_id",
+            "name": "uevcb_name",
+            "eic": "uevcb_eic",
+        },
+    },
+    "lic-pp-list": {
+        "table": "lic_plants",
+        "columns": {
+            "name": "pp_name",
+            "powerPlantName": "pp_name",
+            "powerplantName": "pp_name",
+        },
+    },
+    "mms-pp-list": {
+        "table": "mms_plants",
+        "columns": {
+            "id": "mms_pp_id",
+            "name": "pp_name",
+            "eic": "eic",
+            "organizationId": "org_id",
+            "orgId": "org_id",
+        },
+    },
+}
+
+## ID column and name columns of each table. lic_plants rows have no ID, row numbers are used.
+MASTER_DATA_TABLES = {
+    "rt_plants": {"id": "rt_id", "names": ["pp_name", "pp_short_name"]},
+    "uevm_plants": {"id": "uevm_id", "names": ["pp_name", "pp_short_name"]},
+    "orgs": {"id": "org_id", "names": ["org_name", "org_short_name"]},
+    "uevcbs": {"id": "uevcb_id", "names": ["uevcb_name"]},
+    "lic_plants": {"id": None, "names": ["pp_name"]},
+    "mms_plants": {"id": "mms_pp_id", "names": ["pp_name"]},
+}
+
+## Columns of the cross ID mapping table
+ID_MAP_COLUMNS = [
+    "plant_name",
+    "eic",
+    "org_id",
+    "uevcb_id",
+    "rt_id",
+    "uevm_id",
+    "mms_pp_id",
+    "match",
+]
+
+## Turkish casefolding (İ -> i, I -> ı) followed by folding of Turkish letters to ASCII,
+## so that "IZMIR", "İzmir" and "izmir" normalize alike
+TURKISH_CASEFOLD_MAP = str.maketrans({"İ": "i", "I": "ı"})
+TURKISH_ASCII_MAP = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+
+def normalize_name(name) -> str:
+    """
+    Normalizes a plant, organization or UEVCB name for search: Turkish casefolding,
+    Turkish letters folded to ASCII, punctuation removed and whitespace collapsed.
+
+    Example:
+        >>> normalize_name("İÇDAŞ Elektrik Enerji Üretim ve Yatırım A.Ş.")
+        'icdas elektrik enerji uretim ve yatirim a s'
+    """
+    if name is None or (isinstance(name, float) and math.isnan(name)):
+        return ""
+    x = str(name).translate(TURKISH_CASEFOLD_MAP).lower().translate(TURKISH_ASCII_MAP)
+    x = re.sub(r"[^0-9a-z]+", " ", x)
+    return " ".join(x.split())
+
+
+def _id_key(x):
+    """IDs are compared as integers when possible, so "123" and 123 find the same row."""
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return x
+
+
+def _table_hash(records: list[dict]) -> str:
+    return hashlib.sha1(
+        json.dumps(records, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _to_records(df: pd.DataFrame, columns: dict) -> list[dict]:
+    df = df.rename(columns={k: v for k, v in columns.items() if k in df.columns})
+    df = df.loc[:, ~df.columns.duplicated()].drop_duplicates()
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+class MasterDataIndex:
+    """
+    Persisted and versioned index of plants, organizations and UEVCBs.
+
+    Parameters:
+        path: Gzip compressed JSON file of the index. If it exists it is loaded, sync saves
+            to it.
+
+    Tables (see get_table) are rt_plants (pp-list), uevm_plants (uevm-pp-list), orgs
+    (gen-org), uevcbs (uevcb-list-bulk), lic_plants (lic-pp-list) and mms_plants
+    (mms-pp-list). revision is increased by every sync that changes a table.
+
+    Example:
+        >>> index = MasterDataIndex.load_or_sync("data/master_data.json.gz", eptr=eptr)
+        >>> index.search("karaburun res", kind="rt_plants")
+        >>> index.map_id(1234, from_kind="rt_id", to_kind="uevm_id")
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.revision = 0
+        self.synced_at: float | None = None
+        self.sources: dict[str, dict] = {}
+        self.tables: dict[str, list[dict]] = {k: [] for k in MASTER_DATA_TABLES}
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+        else:
+            self._build_index()
+
+    ### Persistence
+
+    @classmethod
+    def load_or_sync(
+        cls,
+        path: str,
+        eptr: EPTR2 | None = None,
+        max_age: float | None = 24 * 3600,
+        **kwargs,
+    ) -> "MasterDataIndex":
+        """
+        Loads the index at path and syncs it if it is missing or older than max_age
+        seconds (None never refreshes an existing index). kwargs are passed to sync.
+        """
+        index = cls(path)
+        if index.synced_at is None or (max_age is not None and index.is_stale(max_age)):
+            index.sync(eptr=eptr, **kwargs)
+        return index
+
+    def is_stale(self, max_age: float) -> bool:
+        """Whether the last sync is older than max_age seconds."""
+        return self.synced_at is None or time.time() - self.synced_at > max_age
+
+    def save(self, path: str | None = None) -> None:
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path is given to save the master data index.")
+        d = {
+            "version": MASTER_DATA_VERSION,
+            "revision": self.revision,
+            "synced_at": self.synced_at,
+            "sources": self.sources,
+            "tables": self.tables,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_json_gz(path, d)
+
+    def load(self, path: str | None = None) -> None:
+        path = path or self.path
+        d = read_json_gz(path, MASTER_DATA_VERSION, "master data")
+        self.revision = d["revision"]
+        self.synced_at = d["synced_at"]
+        self.sources = d["sources"]
+        self.tables = {k: d["tables"].get(k, []) for k in MASTER_DATA_TABLES}
+        self._build_index()
+
+    ### Sync
+
+    def sync(
+        self,
+        eptr: EPTR2 | None = None,
+        date: str | None = None,
+        sources: list[str] | None = None,
+        save: bool = True,
+        **kwargs,
+    ) -> dict:
+        """
+        Refreshes the tables from the transparency platform.
+
+        Args:
+            eptr: EPTR2 client. Created if not given.
+            date: Reference date (YYYY-MM-DD, default today). Organizations active in its
+                year, UEVCBs at its month start and licensed plants of its year up to its
+                month are fetched.
+            sources: Call keys to refresh (default all of MASTER_DATA_SOURCES).
+            save: Whether to save the index to its path after the sync.
+            max_workers: Number of concurrent calls.
+            chunk_size: Number of organizations per uevcb-list-bulk call (default 950).
+
+        Tables of failed calls keep their previous contents. Returns the new revision, the
+        changed tables and the failed sources with their errors.
+        """
+        if eptr is None:
+            eptr = EPTR2(recycle_tgt=True)
+        if date is None:
+            date = get_utc3_now().strftime("%Y-%m-%d")
+        sources = list(MASTER_DATA_SOURCES) if sources is None else sources
+        max_workers = kwargs.get("max_workers", None)
+        chunk_size = kwargs.get("chunk_size", 950)
+
+        month_start = transform_date(date, key="start_of_month", to_str=True)
+        year_start = transform_date(date, key="start_of_year", to_str=True)
+        source_calls = {
+            "pp-list": [{"key": "pp-list"}],
+            "uevm-pp-list": [{"key": "uevm-pp-list"}],
+            "gen-org": [
+                {
+                    "key": "gen-org",
+                    "start_date": year_start,
+                    "end_date": transform_date(date, key="end_of_year", to_str=True),
+                }
+            ],
+            "lic-pp-list": [
+                {
+                    "key": "lic-pp-list",
+                    "start_date": year_start,
+                    "end_date": transform_date(date, key="end_of_month", to_str=True),
+                }
+            ],
+            "mms-pp-list": [{"key": "mms-pp-list", "start_date": month_start}],
+        }
+
+        fetched = {}
+        failed = {}
+
+        def fetch(keys):
+            requests = [x for k in keys for x in source_calls[k]]
+            results = eptr.call_many(
+                requests, max_workers=max_workers, return_exceptions=True
+            )
+            i = 0
+            for k in keys:
+                n = len(source_calls[k])
+                res = results[i : i + n]
+                i += n
+                errors = [x for x in res if isinstance(x, Exception)]
+                if errors:
+                    failed[k] = str(errors[0])
+                    logger.warning("Master data source %s failed: %s", k, errors[0])
+                else:
+                    fetched[k] = pd.concat(res, ignore_index=True)
+
+        fetch([k for k in sources if k in source_calls])
+
+        if "uevcb-list-bulk" in sources:
+            if "gen-org" in fetched:
+                org_ids = (
+                    fetched["gen-org"]["organizationId"].drop_duplicates().tolist()
+                )
+            else:
+                org_ids = [x["org_id"] for x in self.tables["orgs"]]
+            source_calls["uevcb-list-bulk"] = [
+                {
+                    "key": "uevcb-list-bulk",
+                    "start_date": month_start,
+                    "org_ids": org_ids[i : i + chunk_size],
+                }
+                for i in range(0, len(org_ids), chunk_size)
+            ]
+            fetch(["uevcb-list-bulk"])
+
+        changed = []
+        now = time.time()
+        for k, df in fetched.items():
+            source = MASTER_DATA_SOURCES[k]
+            records = _to_records(df, source["columns"])
+            h = _table_hash(records)
+            if self.sources.get(k, {}).get("hash") != h:
+                self.tables[source["table"]] = records
+                changed.append(source["table"])
+            self.sources[k] = {"fetched_at": now, "rows": len(records), "hash": h}
+
+        if changed:
+            self.revision += 1
+        self.synced_at = now
+        self._build_index()
+
+        if save and self.path is not None:
+            self.save()
+
+        return {"revision": self.revision, "changed": changed, "failed": failed}
+
+    ### Index
+
+    def _build_index(self) -> None:
+        self._by_id: dict[str, dict] = {}
+        self._by_eic: dict[str, list[tuple[str, object]]] = {}
+        self._by_name: dict[str, list[tuple[str, object]]] = {}
+        tokens = set()
+
+        for table, info in MASTER_DATA_TABLES.items():
+            rows = {}
+            for i, row in enumerate(self.tables[table]):
+                row_id = i if info["id"] is None else _id_key(row.get(info["id"]))
+                rows[row_id] = row
+                for eic_col in ["eic", "uevcb_eic", "org_eic"]:
+                    if row.get(eic_col):
+                        self._by_eic.setdefault(row[eic_col], []).append(
+                            (table, row_id)
+                        )
+                for name_col in info["names"]:
+                    name = normalize_name(row.get(name_col))
+                    if name:
+                        entries = self._by_name.setdefault(name, [])
+                        if (table, row_id) not in entries:
+                            entries.append((table, row_id))
+                        tokens.update((t, name) for t in name.split())
+            self._by_id[table] = rows
+
+        ## Sorted names and (token, name) pairs for prefix search by bisection
+        self._sorted_names = sorted(self._by_name)
+        self._sorted_tokens = sorted(tokens)
+        self._build_id_map()
+
+    def _build_id_map(self) -> None:
+        """
+        Matches real-time, UEVM and MMS plants and UEVCBs by EIC and, failing that, by
+        normalized plant name.
+        """
+
+        def by_eic_and_name(table, id_col):
+            eic_d, name_d = {}, {}
+            for row in self.tables[table]:
+                if row.get("eic"):
+                    eic_d.setdefault(row["eic"], row[id_col])
+                name = normalize_name(row.get("pp_name"))
+                if name:
+                    name_d.setdefault(name, row[id_col])
+            return eic_d, name_d
+
+        uevcb_by_eic = {}
+        for row in self.tables["uevcbs"]:
+            if row.get("uevcb_eic"):
+                uevcb_by_eic.setdefault(row["uevcb_eic"], row)
+        uevm_eic, uevm_name = by_eic_and_name("uevm_plants", "uevm_id")
+        mms_eic, mms_name = by_eic_and_name("mms_plants", "mms_pp_id")
+
+        rows = []
+        matched_uevm = set()
+        for pp in self.tables["rt_plants"]:
+            eic = pp.get("eic")
+            name = normalize_name(pp.get("pp_name"))
+            uevcb = uevcb_by_eic.get(eic, {}) if eic else {}
+            uevm_id = uevm_eic.get(eic) if eic else None
+            match = "eic" if uevcb or uevm_id is not None else None
+            if uevm_id is None and name in uevm_name:
+                uevm_id = uevm_name[name]
+                match = match or "name"
+            mms_pp_id = mms_eic.get(eic) if eic else None
+            if mms_pp_id is None:
+                mms_pp_id = mms_name.get(name)
+            if uevm_id is not None:
+                matched_uevm.add(_id_key(uevm_id))
+            rows.append(
+                [
+                    pp.get("pp_name"),
+                    eic,
+                    uevcb.get("org_id"),
+                    uevcb.get("uevcb_id"),
+                    pp.get("rt_id"),
+                    uevm_id,
+                    mms_pp_id,
+                    match,
+                ]
+            )
+
+        ## UEVM plants without a real-time plant
+        for pp in self.tables["uevm_plants"]:
+            if _id_key(pp.get("uevm_id")) in matched_uevm:
+                continue
+            eic = pp.get("eic")
+            uevcb = uevcb_by_eic.get(eic, {}) if eic else {}
+            rows.append(
+                [
+                    pp.get("pp_name"),
+                    eic,
+                    uevcb.get("org_id"),
+                    uevcb.get("uevcb_id"),
+                    None,
+                    pp.get("uevm_id"),
+                    mms_eic.get(eic) if eic else None,
+                    "eic" if uevcb else None,
+                ]
+            )
+
+        self._id_map_rows = rows
+        self._id_map_index = {
+            col: {} for col in ["eic", "uevcb_id", "rt_id", "uevm_id", "mms_pp_id"]
+        }
+        for row in rows:
+            d = dict(zip(ID_MAP_COLUMNS, row))
+            for col, index in self._id_map_index.items():
+                if d[col] is not None:
+                    index.setdefault(_id_key(d[col]), d)
+
+    ### Lookups
+
+    def get_table(self, table: str) -> pd.DataFrame:
+        """Table as a DataFrame (rt_plants, uevm_plants, orgs, uevcbs, lic_plants or mms_plants)."""
+        if table not in MASTER_DATA_TABLES:
+            raise ValueError(
+                f"Unknown table {table}. Use one of {list(MASTER_DATA_TABLES)}."
+            )
+        return pd.DataFrame(self.tables[table])
+
+    def get(self, table: str, id) -> dict | None:
+        """Row of a table by its ID."""
+        return self._by_id[table].get(_id_key(id))
+
+    def get_rt_plant(self, rt_id) -> dict | None:
+        return self.get("rt_plants", rt_id)
+
+    def get_uevm_plant(self, uevm_id) -> dict | None:
+        return self.get("uevm_plants", uevm_id)
+
+    def get_org(self, org_id) -> dict | None:
+        return self.get("orgs", org_id)
+
+    def get_uevcb(self, uevcb_id) -> dict | None:
+        return self.get("uevcbs", uevcb_id)
+
+    def get_mms_plant(self, mms_pp_id) -> dict | None:
+        return self.get("mms_plants", mms_pp_id)
+
+    def get_by_eic(self, eic: str) -> list[tuple[str, object]]:
+        """(table, ID) pairs of the rows with the given EIC code."""
+        return list(self._by_eic.get(eic, []))
+
+    def get_org_uevcbs(self, org_id) -> pd.DataFrame:
+        """UEVCBs of an organization."""
+        org_id = _id_key(org_id)
+        return pd.DataFrame(
+            [x for x in self.tables["uevcbs"] if _id_key(x.get("org_id")) == org_id]
+        )
+
+    ### Cross ID mapping
+
+    def get_id_map(self) -> pd.DataFrame:
+        """
+        Cross ID mapping table with columns plant_name, eic, org_id, uevcb_id, rt_id,
+        uevm_id, mms_pp_id and match ("eic", "name" or None when nothing was matched).
+        The column names follow create_template_id_df.
+        """
+        return pd.DataFrame(self._id_map_rows, columns=ID_MAP_COLUMNS)
+
+    def map_id(self, value, from_kind: str = "rt_id", to_kind: str = "uevm_id"):
+        """
+        Maps an ID of a plant to its other IDs, e.g. a real-time pp_id to its UEVM pp_id.
+        Kinds are eic, uevcb_id, rt_id, uevm_id and mms_pp_id (from_kind) and also
+        org_id and plant_name (to_kind). Returns None if there is no match.
+        """
+        if from_kind not in self._id_map_index:
+            raise ValueError(
+                f"Unknown from_kind {from_kind}. Use one of {list(self._id_map_index)}."
+            )
+        if to_kind not in ID_MAP_COLUMNS:
+            raise ValueError(f"Unknown to_kind {to_kind}. Use one of {ID_MAP_COLUMNS}.")
+        row = self._id_map_index[from_kind].get(_id_key(value))
+        return None if row is None else row[to_kind]
+
+    ### Name search
+
+    def search(
+        self,
+        query: str,
+        kind: str | list[str] | None = None,
+        limit: int = 10,
+        fuzzy: bool = True,
+        cutoff: float = 0.6,
+    ) -> pd.DataFrame:
+        """
+        Searches names of the tables. Exact matches of the normalized name come first,
+        then names starting with the query, then names with words starting with the words
+        of the query and finally (fuzzy=True) close matches with a similarity of at least cutoff.
+
+        Args:
+            query: Name or part of it. Case and Turkish letters are ignored.
+            kind: Table or tables to search (default all).
+            limit: Maximum number of results.
+
+        Returns a DataFrame of table, id, name and match ("exact", "prefix", "word" or
+        "fuzzy").
+        """
+        q = normalize_name(query)
+        tables = (
+            list(MASTER_DATA_TABLES)
+            if kind is None
+            else ([kind] if isinstance(kind, str) else kind)
+        )
+        results = []
+        seen = set()
+
+        def add(names, match):
+            for name in names:
+                for table, row_id in self._by_name.get(name, []):
+                    if len(results) >= limit:
+                        return
+                    if table in tables and (table, row_id) not in seen:
+                        seen.add((table, row_id))
+                        results.append([table, row_id, name, match])
+
+        if q:
+            add([q], "exact")
+            add(self._prefix_names(q), "prefix")
+            add(self._word_prefix_names(q), "word")
+            if fuzzy and len(results) < limit:
+                add(
+                    difflib.get_close_matches(
+                        q, self._sorted_names, n=limit, cutoff=cutoff
+                    ),
+                    "fuzzy",
+                )
+
+        df = pd.DataFrame(results, columns=["table", "id", "name", "match"])
+        df["name"] = [
+            self._display_name(table, row_id)
+            for table, row_id in zip(df["table"], df["id"])
+        ]
+        return df
+
+    def _prefix_names(self, q: str) -> list[str]:
+        names = []
+        i = bisect.bisect_left(self._sorted_names, q)
+        while i < len(self._sorted_names) and self._sorted_names[i].startswith(q):
+            names.append(self._sorted_names[i])
+            i += 1
+        return names
+
+    def _word_prefix_names(self, q: str) -> list[str]:
+        """Names with a word starting with each word of the query."""
+        words = q.split()
+        names = []
+        i = bisect.bisect_left(self._sorted_tokens, (words[0], ""))
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i][0].startswith(
+            words[0]
+        ):
+            name = self._sorted_tokens[i][1]
+            name_words = name.split()
+            if all(any(x.startswith(w) for x in name_words) for w in words[1:]):
+                names.append(name)
+            i += 1
+        return names
+
+    def _display_name(self, table: str, row_id) -> str | None:
+        row = self._by_id[table].get(row_id, {})
+        return row.get(MASTER_DATA_TABLES[table]["names"][0])
+
+    def stats(self) -> dict:
+        """Revision, sync time and number of rows of each table."""
+        return {
+            "revision": self.revision,
+            "synced_at": (
+                datetime.fromtimestamp(self.synced_at).isoformat(timespec="seconds")
+                if self.synced_at is not None
+                else None
+            ),
+            "rows": {k: len(v) for k, v in self.tables.items()},
+        }
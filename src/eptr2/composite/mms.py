@@ -1,11 +1,138 @@
 import logging
-from eptr2 import EPTR2
-from eptr2.util.time import iso_to_contract
+from datetime import datetime, timedelta
+
+import numpy as np
 import pandas as pd
 
+from eptr2 import EPTR2
+from eptr2.util.contract_calendar import hours_to_contracts
+
 
 logger = logging.getLogger(__name__)
 
+MMS_LOSS_COLUMNS = ["faultCausedPowerLoss", "faultCausedEnergyLoss"]
+
+## Summary group names and the MMS columns they refer to
+MMS_GROUP_COLUMNS = {
+    "contract": "contract_hour",
+    "plant": "powerPlantName",
+    "fuel": "fuelType",
+    "uevcb": "uevcbName",
+    "organization": "organizationName",
+}
+
+
+def _typed_column(name: str, values: list):
+    """
+    Typed array of a parsed MMS column: date strings to datetimes, numbers to int64 or
+    float64 and other strings to categoricals.
+    """
+    sample = next((x for x in values if x is not None), None)
+    if sample is None:
+        return pd.Series(values, dtype="float64").values
+    if isinstance(sample, str):
+        if name == "hour" or name.endswith("Date"):
+            ## Hours repeat across messages, each distinct string is parsed once
+            codes, uniques = pd.factorize(pd.Series(values, dtype="object"))
+            parsed = pd.to_datetime(pd.Series(uniques), format="ISO8601").array
+            return parsed.take(codes, allow_fill=True)
+        return pd.Categorical(values)
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        if name == "id" or (
+            isinstance(sample, int) and all(type(x) is int for x in values)
+        ):
+            try:
+                return np.asarray(values, dtype="int64")
+            except (TypeError, ValueError):
+                pass
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy("float64")
+    return pd.Series(values, dtype="object").values
+
+
+def parse_mms_items(res) -> pd.DataFrame:
+    """
+    Flattens MMS messages and their nested faultDetails into a DataFrame of one row per
+    message hour, in one pass over the response.
+
+    Args:
+        res: Raw "mms" response (dict with "items"), a list of messages or a DataFrame of
+            messages (e.g. from eptr.call("mms", ...)).
+
+    Returns a DataFrame of the message fields and the fault detail fields (hour,
+    faultCausedPowerLoss, faultCausedEnergyLoss), plus contract_hour, the int64 hour index
+    of the delivery start (see eptr2.util.contract_calendar). Dates are parsed to
+    datetimes, numbers to int64 or float64 and other strings to categoricals. Messages
+    without fault details and details without an hour are dropped.
+
+    Message fields are stored once per message and repeated to the hours by index, so the
+    nested details are never exploded into Python objects.
+    """
+    if isinstance(res, pd.DataFrame):
+        res = res.to_dict("records")
+    elif isinstance(res, dict):
+        res = res.get("items", [])
+
+    msg_cols: dict[str, list] = {}
+    detail_cols: dict[str, list] = {}
+    msg_idx = []
+    n_msg = 0
+    for msg in res or []:
+        details = msg.get("faultDetails")
+        if not isinstance(details, list) or len(details) == 0:
+            continue
+        for k, v in msg.items():
+            if k == "faultDetails":
+                continue
+            if k not in msg_cols:
+                msg_cols[k] = [None] * n_msg
+            msg_cols[k].append(v)
+        n_msg += 1
+        for col in msg_cols.values():
+            if len(col) < n_msg:
+                col.append(None)
+        for d in details:
+            for k, v in d.items():
+                if k not in detail_cols:
+                    detail_cols[k] = [None] * len(msg_idx)
+                detail_cols[k].append(v)
+            msg_idx.append(n_msg - 1)
+            for col in detail_cols.values():
+                if len(col) < len(msg_idx):
+                    col.append(None)
+
+    if len(msg_idx) == 0:
+        return pd.DataFrame(columns=["hour", *MMS_LOSS_COLUMNS, "contract_hour"])
+
+    msg_idx = np.asarray(msg_idx, dtype="int64")
+    data = {}
+    for k, v in msg_cols.items():
+        col = _typed_column(k, v)
+        data[k] = col.take(msg_idx)
+    for k, v in detail_cols.items():
+        data[k] = _typed_column(k, v)
+    for k in MMS_LOSS_COLUMNS:
+        data.setdefault(k, np.full(len(msg_idx), np.nan))
+
+    df = pd.DataFrame(data)
+    if df["hour"].isna().any():
+        df = df[df["hour"].notna()].reset_index(drop=True)
+    hour_ns = pd.to_datetime(df["hour"], utc=True).astype("datetime64[ns, UTC]")
+    df["contract_hour"] = hour_ns.astype("int64").to_numpy() // 3_600_000_000_000
+    return df
+
+
+def add_contract_symbols(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the contract column ('PHyyMMDDHH') of contract_hour, formatting each distinct
+    hour once.
+    """
+    codes, uniques = pd.factorize(df["contract_hour"])
+    symbols = hours_to_contracts(np.asarray(uniques, dtype="int64"))
+    df["contract"] = pd.Categorical.from_codes(
+        codes, categories=pd.Index(np.asarray(symbols, dtype=str))
+    )
+    return df
+
 
 def get_mms_detail(
     start_date: str,
@@ -22,12 +149,13 @@ def get_mms_detail(
 ):
     """
     This composite function gets market message system (MMS) data, expands it and adds the contract symbols (optional).
+    Fault details are flattened with parse_mms_items.
     """
 
     if eptr is None:
         eptr = EPTR2(dotenv_path=kwargs.get("dotenv_path", ".env"))
 
-    df: pd.DataFrame = eptr.call(
+    res = eptr.call(
         "mms",
         start_date=start_date,
         end_date=end_date,
@@ -35,13 +163,10 @@ def get_mms_detail(
         uevcb_id=uevcb_id,
         pp_id=pp_id,
         message_type_id=message_type_id,
+        postprocess=False,
     )
 
-    df_wip = df.explode("faultDetails", ignore_index=True)
-
-    df_res = df_wip.drop(columns=["faultDetails"]).join(
-        pd.json_normalize(df_wip["faultDetails"], sep="_")
-    )
+    df_res = parse_mms_items(res)
 
     if include_summary and not include_contract_symbol:
         if verbose:
@@ -51,7 +176,7 @@ def get_mms_detail(
         include_contract_symbol = True
 
     if include_contract_symbol:
-        df_res["contract"] = df_res["hour"].apply(iso_to_contract)
+        df_res = add_contract_symbols(df_res)
 
     if include_summary:
         if verbose:
@@ -62,16 +187,152 @@ def get_mms_detail(
     return df_res
 
 
+def get_mms_loss_summary(
+    df: pd.DataFrame, by: list[str] | str = "contract"
+) -> pd.DataFrame:
+    """
+    Sums fault caused power and energy losses of parsed MMS data (see parse_mms_items).
+
+    Args:
+        df: Parsed MMS data.
+        by: Group names of MMS_GROUP_COLUMNS ("contract", "plant", "fuel", "uevcb",
+            "organization") or column names. Contracts are grouped by their int64 hour
+            index and formatted after the group-by.
+
+    Returns a DataFrame of the groups and loss sums, sorted by the groups.
+
+    Example:
+        >>> get_mms_loss_summary(df, by=["contract", "fuel"])
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    cols = [MMS_GROUP_COLUMNS.get(x, x) for x in by]
+    missing = [x for x in cols if x not in df.columns]
+    if missing:
+        raise ValueError(f"MMS data has no columns {missing} to group by.")
+
+    summary_df = (
+        df.groupby(cols, observed=True, sort=True)[MMS_LOSS_COLUMNS].sum().reset_index()
+    )
+    summary_df.columns = [*by, *MMS_LOSS_COLUMNS]
+    if "contract" in by:
+        summary_df["contract"] = hours_to_contracts(
+            summary_df["contract"].to_numpy("int64")
+        )
+    for x in by:
+        if isinstance(summary_df[x].dtype, pd.CategoricalDtype):
+            summary_df[x] = summary_df[x].astype(str)
+
+    return summary_df
+
+
 def get_mms_loss_summary_by_contract(df: pd.DataFrame):
     """
     This function gets the loss summary of the MMS data.
     """
 
+    if "contract_hour" in df.columns:
+        return get_mms_loss_summary(df, by="contract")
+
     summary_df = (
-        df.groupby("contract")[["faultCausedPowerLoss", "faultCausedEnergyLoss"]]
+        df.groupby("contract")[MMS_LOSS_COLUMNS]
         .sum()
         .reset_index()
         .sort_values("contract", ignore_index=True)
     )
 
     return summary_df
+
+
+def iter_mms_detail(
+    start_date: str,
+    end_date: str,
+    eptr: EPTR2 | None = None,
+    chunk_days: int = 7,
+    **kwargs,
+):
+    """
+    Fetches MMS data in chunks of chunk_days and yields the parsed data of each chunk
+    (see parse_mms_items), so long date ranges are processed with bounded memory.
+
+    Args:
+        start_date, end_date: Dates in YYYY-MM-DD format.
+        eptr: EPTR2 client. Created if not given.
+        chunk_days: Days of a single call (default 7).
+        org_id, uevcb_id, pp_id, message_type_id: Filters of the "mms" call.
+
+    A message returned in more than one chunk is yielded once, with all of its hours, the
+    first time it is returned. Only the ids of the yielded messages are kept between chunks.
+
+    Example:
+        >>> for df in iter_mms_detail("2024-01-01", "2024-12-31", eptr=eptr):
+        ...     print(df["contract_hour"].min(), len(df))
+    """
+    if eptr is None:
+        eptr = EPTR2(dotenv_path=kwargs.get("dotenv_path", ".env"))
+
+    filters = {
+        k: kwargs[k]
+        for k in ["org_id", "uevcb_id", "pp_id", "message_type_id"]
+        if kwargs.get(k) is not None
+    }
+
+    seen = set()  ## ids of the yielded messages
+    sd = datetime.strptime(start_date, "%Y-%m-%d")
+    ed = datetime.strptime(end_date, "%Y-%m-%d")
+    while sd <= ed:
+        chunk_end = min(ed, sd + timedelta(days=chunk_days - 1))
+        res = eptr.call(
+            "mms",
+            start_date=sd.strftime("%Y-%m-%d"),
+            end_date=chunk_end.strftime("%Y-%m-%d"),
+            postprocess=False,
+            **filters,
+        )
+        df = parse_mms_items(res)
+
+        if len(df) and "id" in df.columns:
+            df = df[~df["id"].isin(seen)]
+            seen.update(df["id"].unique().tolist())
+
+        if len(df):
+            yield df.reset_index(drop=True)
+        sd = chunk_end + timedelta(days=1)
+
+
+def get_mms_loss_summary_range(
+    start_date: str,
+    end_date: str,
+    by: list[str] | str = "contract",
+    eptr: EPTR2 | None = None,
+    chunk_days: int = 7,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Loss summary (see get_mms_loss_summary) of a long date range, computed chunk by chunk
+    with iter_mms_detail. Only the partial sums of the chunks are kept in memory.
+
+    Example:
+        >>> df = get_mms_loss_summary_range(
+        ...     "2024-01-01", "2024-12-31", by=["contract", "plant", "fuel"], eptr=eptr
+        ... )
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    cols = [MMS_GROUP_COLUMNS.get(x, x) for x in by]
+
+    partials = []
+    for df in iter_mms_detail(
+        start_date, end_date, eptr=eptr, chunk_days=chunk_days, **kwargs
+    ):
+        missing = [x for x in cols if x not in df.columns]
+        if missing:
+            raise ValueError(f"MMS data has no columns {missing} to group by.")
+        part = df[cols + MMS_LOSS_COLUMNS].copy()
+        for x in cols:
+            if isinstance(part[x].dtype, pd.CategoricalDtype):
+                part[x] = part[x].astype(str)
+        partials.append(part.groupby(cols, sort=False).sum().reset_index())
+
+    if not partials:
+        return pd.DataFrame(columns=[*by, *MMS_LOSS_COLUMNS])
+
+    return get_mms_loss_summary(pd.concat(partials, ignore_index=True), by=by)
@@ -0,0 +1,481 @@
+"""
+Natural gas (SGP and VGP) bulk fetching on a gas day index.
+
+Natural gas endpoints take either a date range (start_date/end_date, VGP "-se" variants with
+transaction dates) or a monthly period. plan_ng_requests splits a multi-month range into
+month-aligned requests within each endpoint's maximum span, get_ng_gas_day_table runs them
+concurrently and joins the results into one table with a row per gas day. With a
+NaturalGasStore, gas days already fetched are reused; days after the latest settlement date
+(ng-latest-settlement-date) are fetched again on every refresh since they can still be revised.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from eptr2 import EPTR2
+from eptr2.util.store import (
+    read_json_gz,
+    select_sources,
+    split_months,
+    to_date,
+    write_json_gz,
+)
+from eptr2.util.time import get_utc3_now
+
+logger = logging.getLogger(__name__)
+
+NG_STORE_VERSION = 1
+
+### Natural gas sources of get_ng_gas_day_table. kind is "se" (start_date/end_date calls)
+### or "period" (one call per month). max_days is the maximum span of a single "se" call.
+### settled sources can be revised until settlement, the others only on their last days.
+### agg aggregates multiple rows of a gas day (e.g. one row per VGP contract).
+NG_SOURCES = {
+    "sgp_price": {"key": "ng-spot-prices", "kind": "se", "max_days": 92},
+    "sgp_match_quantity": {"key": "ng-match-quantity", "kind": "se", "max_days": 92},
+    "sgp_daily_match_qty": {"key": "ng-daily-match-qty", "kind": "se", "max_days": 92},
+    "sgp_daily_trade_volume": {
+        "key": "ng-daily-trade-volume",
+        "kind": "se",
+        "max_days": 92,
+    },
+    "sgp_total_trade_volume": {
+        "key": "ng-total-trade-volume",
+        "kind": "se",
+        "max_days": 92,
+    },
+    "grp_match_qty": {"key": "ng-grp-match-qty", "kind": "se", "max_days": 92},
+    "grp_trade_volume": {"key": "ng-grp-trade-volume", "kind": "se", "max_days": 92},
+    "drp": {"key": "ng-drp", "kind": "se", "max_days": 92},
+    "balancing_price": {"key": "ng-balancing-price", "kind": "se", "max_days": 92},
+    "system_direction": {"key": "ng-system-direction", "kind": "se", "max_days": 92},
+    "imbalance_system": {"key": "ng-imbalance-system", "kind": "se", "max_days": 92},
+    "physical_realization": {
+        "key": "ng-physical-realization",
+        "kind": "se",
+        "max_days": 31,
+        "settled": True,
+    },
+    "virtual_realization": {
+        "key": "ng-virtual-realization",
+        "kind": "se",
+        "max_days": 31,
+        "settled": True,
+    },
+    "imbalance_amount": {
+        "key": "ng-imbalance-amount",
+        "kind": "period",
+        "settled": True,
+    },
+    "shippers_imbalance_quantity": {
+        "key": "ng-shippers-imbalance-quantity",
+        "kind": "period",
+        "settled": True,
+    },
+    "vgp_ggf": {"key": "ng-vgp-ggf-se", "kind": "se", "max_days": 31, "agg": "mean"},
+    "vgp_matched_quantity": {
+        "key": "ng-vgp-matched-quantity-se",
+        "kind": "se",
+        "max_days": 31,
+        "agg": "sum",
+    },
+    "vgp_transaction_volumes": {
+        "key": "ng-vgp-transaction-volumes-se",
+        "kind": "se",
+        "max_days": 31,
+        "agg": "sum",
+    },
+}
+
+### Candidate gas day columns of natural gas responses, in order of preference
+NG_GAS_DAY_COLUMNS = ["gasDay", "gasDate", "date", "day", "period", "transactionDate"]
+
+
+def plan_ng_requests(
+    start_date: str, end_date: str, sources: list[str] | dict | None = None
+) -> list[dict]:
+    """
+    Plans the calls of natural gas sources between start_date and end_date (both included).
+
+    Date range ("se") calls are split at month boundaries and consecutive whole months are
+    merged as long as a call spans at most max_days days. Period sources get one call per
+    month.
+
+    Args:
+        start_date, end_date: Gas days in YYYY-MM-DD format.
+        sources: Source names of NG_SOURCES or a dictionary of source names and specs in
+            the same format. Default: all NG_SOURCES.
+
+    Returns a list of plans with source, start_date and end_date (gas days covered by the
+    call) and request (a request dictionary for EPTR2.call_many).
+
+    Example:
+        >>> [x["request"] for x in plan_ng_requests("2024-01-15", "2024-03-10", ["sgp_price"])]
+        [{'key': 'ng-spot-prices', 'start_date': '2024-01-15', 'end_date': '2024-03-10'}]
+    """
+    specs = _get_specs(sources)
+    months = split_months(start_date, end_date)
+
+    plans = []
+    for source, spec in specs.items():
+        if spec.get("kind", "se") == "period":
+            for m_start, m_end in months:
+                plans.append(
+                    {
+                        "source": source,
+                        "start_date": m_start.isoformat(),
+                        "end_date": m_end.isoformat(),
+                        "request": {
+                            "key": spec["key"],
+                            "period": m_start.replace(day=1).isoformat(),
+                        },
+                    }
+                )
+            continue
+
+        max_days = spec.get("max_days", 31)
+        chunks = []
+        for m_start, m_end in months:
+            ## Months longer than the maximum span are split into max_days pieces
+            while (m_end - m_start).days + 1 > max_days:
+                piece_end = m_start + timedelta(days=max_days - 1)
+                chunks.append([m_start, piece_end])
+                m_start = piece_end + timedelta(days=1)
+            if chunks and (m_end - chunks[-1][0]).days + 1 <= max_days:
+                chunks[-1][1] = m_end
+            else:
+                chunks.append([m_start, m_end])
+
+        for c_start, c_end in chunks:
+            plans.append(
+                {
+                    "source": source,
+                    "start_date": c_start.isoformat(),
+                    "end_date": c_end.isoformat(),
+                    "request": {
+                        "key": spec["key"],
+                        "start_date": c_start.isoformat(),
+                        "end_date": c_end.isoformat(),
+                    },
+                }
+            )
+
+    return plans
+
+
+def _get_specs(sources: list[str] | dict | None) -> dict:
+    return select_sources(sources, NG_SOURCES, "natural gas")
+
+
+def _add_gas_day(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Adds a gas_day (YYYY-MM-DD) column from the first gas day column of the response."""
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=["gas_day"])
+    col = next((x for x in NG_GAS_DAY_COLUMNS if x in df.columns), None)
+    if col is None:
+        raise ValueError(
+            f"No gas day column ({', '.join(NG_GAS_DAY_COLUMNS)}) in the response."
+        )
+    df = df.copy()
+    ## Gas days are local dates, the date part of the (UTC+3) ISO strings
+    df["gas_day"] = df[col].astype(str).str[:10]
+    return df
+
+
+def get_ng_latest_settlement_day(eptr: EPTR2 | None = None) -> str | None:
+    """
+    Latest settled gas day (YYYY-MM-DD) from ng-latest-settlement-date, or None if the
+    response has no date.
+    """
+    if eptr is None:
+        eptr = EPTR2()
+    res = eptr.call("ng-latest-settlement-date")
+    values = list(res.values()) if isinstance(res, dict) else [res]
+    for v in values:
+        try:
+            return to_date(str(v)).isoformat()
+        except ValueError:
+            continue
+    logger.warning("Latest settlement date could not be read from %s", res)
+    return None
+
+
+class NaturalGasStore:
+    """
+    Local store of natural gas source rows by gas day.
+
+    Parameters:
+        directory: Directory of the gzip compressed source files (<source>.json.gz). None
+            keeps them in memory only.
+
+    Each source keeps its rows, the range of gas days fetched and the latest settlement day
+    at the time of the fetch. Gas days up to that settlement day (up to refresh_days before
+    the last fetched day for sources that are not settled) are final and not fetched again.
+
+    Example:
+        >>> store = NaturalGasStore("data/natural_gas")
+        >>> df = get_ng_gas_day_table("2023-01-01", "2024-12-31", store=store, eptr=eptr)
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._sources: dict[str, dict] = {}
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, source: str) -> str:
+        return os.path.join(self.directory, f"{source}.json.gz")
+
+    def _load(self, source: str) -> dict | None:
+        if source not in self._sources and self.directory is not None:
+            path = self._path(source)
+            if os.path.exists(path):
+                self._sources[source] = read_json_gz(
+                    path, NG_STORE_VERSION, "natural gas store"
+                )
+        return self._sources.get(source)
+
+    def sources(self) -> list[str]:
+        """Stored sources."""
+        sources = set(self._sources)
+        if self.directory is not None:
+            sources.update(
+                x[: -len(".json.gz")]
+                for x in os.listdir(self.directory)
+                if x.endswith(".json.gz")
+            )
+        return sorted(sources)
+
+    def coverage(self, source: str) -> dict | None:
+        """First and last fetched gas days and the settlement day of a source."""
+        d = self._load(source)
+        if d is None:
+            return None
+        return {k: d[k] for k in ["first_day", "last_day", "settled_through"]}
+
+    def get(
+        self, source: str, start_date: str | None = None, end_date: str | None = None
+    ):
+        """Stored rows of a source between start_date and end_date (gas days)."""
+        d = self._load(source)
+        if d is None:
+            return pd.DataFrame(columns=["gas_day"])
+        df = pd.DataFrame(d["records"])
+        if len(df) == 0:
+            return pd.DataFrame(columns=["gas_day"])
+        if start_date is not None:
+            df = df[df["gas_day"] >= start_date]
+        if end_date is not None:
+            df = df[df["gas_day"] <= end_date]
+        return df.reset_index(drop=True)
+
+    def put(
+        self,
+        source: str,
+        df: pd.DataFrame,
+        start_date: str,
+        end_date: str,
+        settled_through: str | None = None,
+    ) -> None:
+        """
+        Replaces the stored rows of a source between start_date and end_date (gas days) with
+        df. The fetched ranges of a source are expected to be contiguous. Gas days after
+        today are not recorded as fetched, since they can still be published.
+        """
+        df = _add_gas_day(df) if "gas_day" not in df.columns else df
+        df = df[(df["gas_day"] >= start_date) & (df["gas_day"] <= end_date)]
+        records = json.loads(df.to_json(orient="records", force_ascii=False))
+
+        fetched_through = min(end_date, get_utc3_now().strftime("%Y-%m-%d"))
+
+        prev = self._load(source)
+        if prev is None:
+            if fetched_through < start_date:
+                ## Only future gas days were requested, nothing is final yet
+                return
+            first_day, last_day, kept = start_date, fetched_through, []
+        else:
+            ## Later days were fetched with the previous settlement day
+            if end_date < prev["last_day"]:
+                settled_through = prev["settled_through"]
+            first_day = min(prev["first_day"], start_date)
+            last_day = max(prev["last_day"], fetched_through)
+            kept = [
+                x
+                for x in prev["records"]
+                if not (start_date <= x["gas_day"] <= end_date)
+            ]
+        records = sorted(kept + records, key=lambda x: x["gas_day"])
+
+        d = {
+            "version": NG_STORE_VERSION,
+            "source": source,
+            "fetched_at": time.time(),
+            "first_day": first_day,
+            "last_day": last_day,
+            "settled_through": settled_through,
+            "records": records,
+        }
+        self._sources[source] = d
+        if self.directory is not None:
+            write_json_gz(self._path(source), d)
+
+    def missing_ranges(
+        self,
+        source: str,
+        start_date: str,
+        end_date: str,
+        settled: bool = False,
+        refresh_days: int = 1,
+    ) -> list[tuple[str, str]]:
+        """
+        Gas day ranges of a source between start_date and end_date that should be fetched:
+        days not fetched yet and days that were not final when they were fetched.
+        """
+        cov = self.coverage(source)
+        if cov is None:
+            return [(start_date, end_date)]
+
+        if settled:
+            final = min(cov["settled_through"] or "", cov["last_day"])
+        else:
+            final = (
+                to_date(cov["last_day"]) - timedelta(days=refresh_days)
+            ).isoformat()
+
+        ## Ranges are extended to the stored ones so that the fetched days stay contiguous
+        ranges = []
+        if start_date < cov["first_day"]:
+            before_end = to_date(cov["first_day"]) - timedelta(days=1)
+            ranges.append((start_date, before_end.isoformat()))
+        if final < end_date:
+            after_start = cov["first_day"]
+            if final:
+                after_start = max(
+                    after_start, (to_date(final) + timedelta(days=1)).isoformat()
+                )
+            if ranges and after_start <= cov["first_day"]:
+                ranges[-1] = (ranges[-1][0], end_date)
+            else:
+                ranges.append((after_start, end_date))
+        return ranges
+
+
+def _to_gas_day_table(frames: dict, specs: dict, start_date: str, end_date: str):
+    """Joins the rows of each source into one table with a row per gas day."""
+    table = pd.DataFrame(
+        index=pd.Index(
+            [
+                x.strftime("%Y-%m-%d")
+                for x in pd.date_range(start_date, end_date, freq="D")
+            ],
+            name="gas_day",
+        )
+    )
+    for source, df in frames.items():
+        if df is None or len(df) == 0:
+            continue
+        values = df.drop(columns=[x for x in NG_GAS_DAY_COLUMNS if x in df.columns])
+        values = values.apply(pd.to_numeric, errors="coerce")
+        values["gas_day"] = df["gas_day"]
+        values = values.dropna(axis=1, how="all")
+        agg = specs[source].get("agg", "last")
+        values = values.groupby("gas_day").agg(agg)
+        values.columns = [f"{source}_{x}" for x in values.columns]
+        table = table.join(values, how="left")
+
+    table.index = pd.to_datetime(table.index)
+    return table
+
+
+def get_ng_gas_day_table(
+    start_date: str,
+    end_date: str,
+    sources: list[str] | dict | None = None,
+    eptr: EPTR2 | None = None,
+    store: NaturalGasStore | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Fetches natural gas sources between start_date and end_date (gas days, both included)
+    concurrently and joins them into a table indexed by gas day.
+
+    Args:
+        start_date, end_date: Gas days in YYYY-MM-DD format.
+        sources: Source names of NG_SOURCES or a dictionary of source specs (see
+            plan_ng_requests). Default: all NG_SOURCES.
+        eptr: EPTR2 client. Created if not given.
+        store: NaturalGasStore. If given, only gas days that are not stored or not final
+            are fetched. Settled sources are final up to ng-latest-settlement-date, the
+            others up to refresh_days before their last fetched day.
+        max_workers: Number of concurrent calls (see EPTR2.call_many).
+        refresh_days: Last fetched days of sources without settlement that are fetched
+            again (default 1).
+
+    Returns a DataFrame indexed by gas day with <source>_<field> columns. Multiple rows of a
+    gas day are aggregated with the agg of the source spec (default "last").
+
+    Example:
+        >>> store = NaturalGasStore("data/natural_gas")
+        >>> df = get_ng_gas_day_table("2024-01-01", "2024-12-31", store=store, eptr=eptr)
+        >>> df["sgp_price_gasReferencePrice"]
+    """
+    if eptr is None:
+        eptr = EPTR2()
+    specs = _get_specs(sources)
+    refresh_days = kwargs.get("refresh_days", 1)
+
+    settled_through = None
+    plans = []
+    if store is None:
+        plans = plan_ng_requests(start_date, end_date, specs)
+    else:
+        if any(x.get("settled", False) for x in specs.values()):
+            settled_through = get_ng_latest_settlement_day(eptr)
+        for source, spec in specs.items():
+            for r_start, r_end in store.missing_ranges(
+                source,
+                start_date,
+                end_date,
+                settled=spec.get("settled", False),
+                refresh_days=refresh_days,
+            ):
+                plans += plan_ng_requests(r_start, r_end, {source: spec})
+
+    results = eptr.call_many(
+        [x["request"] for x in plans], max_workers=kwargs.get("max_workers", None)
+    )
+
+    fetched: dict[str, list] = {}
+    for plan, res in zip(plans, results):
+        df = _add_gas_day(res)
+        df = df[
+            (df["gas_day"] >= plan["start_date"]) & (df["gas_day"] <= plan["end_date"])
+        ]
+        fetched.setdefault(plan["source"], []).append((plan, df))
+
+    frames = {}
+    for source in specs:
+        parts = fetched.get(source, [])
+        if store is None:
+            frames[source] = (
+                pd.concat([df for _, df in parts], ignore_index=True) if parts else None
+            )
+            continue
+        for plan, df in parts:
+            store.put(
+                source,
+                df,
+                plan["start_date"],
+                plan["end_date"],
+                settled_through=settled_through,
+            )
+        frames[source] = store.get(source, start_date, end_date)
+
+    return _to_gas_day_table(frames, specs, start_date, end_date)
@@ -0,0 +1,363 @@
+"""
+Hourly unavailable capacity of the fleet from market messages (MMS).
+
+Each outage message is kept as one interval (case start and end, power loss, plant, fuel,
+UEVCB and organization) instead of being expanded to its hours. Hourly unavailability is
+computed with a difference array over int64 hour indices (see
+eptr2.util.contract_calendar): every interval adds its loss at its first hour and removes it
+after its last hour, and a cumulative sum gives the unavailable MW of all hours at once.
+Partially covered first and last hours get the covered fraction of the loss.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from eptr2 import EPTR2
+from eptr2.composite.mms import MMS_GROUP_COLUMNS
+from eptr2.util.store import read_json_gz, write_json_gz
+from eptr2.util.time import get_utc3_now, offset_date_by_n_days, split_date_range
+
+logger = logging.getLogger(__name__)
+
+OUTAGE_TIMELINE_VERSION = 1
+
+## Interval record fields, group fields are the MMS_GROUP_COLUMNS names except contract
+OUTAGE_GROUPS = ["plant", "fuel", "uevcb", "organization"]
+_RECORD_FIELDS = ["start", "end", "loss", *OUTAGE_GROUPS]
+
+
+def _to_ts(x) -> float | None:
+    if x is None or x == "":
+        return None
+    return pd.Timestamp(x).timestamp()
+
+
+def _day_hour(date: str) -> int:
+    """Hour index of 00:00 (UTC+3) of a YYYY-MM-DD date."""
+    return int(pd.Timestamp(date + "T00:00:00+03:00").timestamp()) // 3600
+
+
+def mms_outage_intervals(res, loss_column: str | None = None) -> dict:
+    """
+    Outage intervals of MMS messages, keyed by message id.
+
+    Args:
+        res: Raw "mms" response (dict with "items") or a list of messages.
+        loss_column: Message field of the power loss. By default the loss is
+            installedPower - capacityAtCaseTime, or the largest faultCausedPowerLoss of the
+            fault details if those fields are missing.
+
+    Returns a dictionary of message id to [start, end, loss, plant, fuel, uevcb,
+    organization] with epoch second start and end times. Messages without case dates or a
+    positive loss are skipped.
+    """
+    if isinstance(res, dict):
+        res = res.get("items", [])
+
+    intervals = {}
+    for msg in res or []:
+        start = _to_ts(msg.get("caseStartDate"))
+        end = _to_ts(msg.get("caseEndDate"))
+        if start is None or end is None or end <= start:
+            continue
+
+        if loss_column is not None:
+            loss = msg.get(loss_column)
+        elif (
+            msg.get("installedPower") is not None
+            and msg.get("capacityAtCaseTime") is not None
+        ):
+            loss = msg["installedPower"] - msg["capacityAtCaseTime"]
+        else:
+            losses = [
+                d.get("faultCausedPowerLoss")
+                for d in msg.get("faultDetails") or []
+                if d.get("faultCausedPowerLoss") is not None
+            ]
+            loss = max(losses) if losses else None
+        if loss is None or not loss > 0:
+            continue
+
+        groups = [msg.get(MMS_GROUP_COLUMNS[x]) for x in OUTAGE_GROUPS]
+        key = msg.get("id")
+        if key is None:
+            key = f"{start}|{end}|{groups[0]}"
+        intervals[str(key)] = [
+            start,
+            end,
+            float(loss),
+            *["unknown" if x in [None, ""] else str(x) for x in groups],
+        ]
+    return intervals
+
+
+def hourly_unavailability(
+    intervals,
+    start_date: str,
+    end_date: str,
+    by: str | None = "fuel",
+) -> pd.DataFrame:
+    """
+    Hourly unavailable MW of outage intervals with a difference array sweep.
+
+    Args:
+        intervals: Intervals of mms_outage_intervals (dictionary or list of records).
+        start_date, end_date: Dates in YYYY-MM-DD format.
+        by: Group of the columns: "plant", "fuel", "uevcb", "organization" or None for the
+            total only.
+
+    Returns a DataFrame of one row per hour with date (Europe/Istanbul), contract_hour,
+    a column per group and total.
+    """
+    if by is not None and by not in OUTAGE_GROUPS:
+        raise ValueError(f"Unknown group {by}. Available: {OUTAGE_GROUPS}")
+
+    h0 = _day_hour(start_date)
+    h1 = _day_hour(
+        (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime(
+            "%Y-%m-%d"
+        )
+    )
+    n = h1 - h0
+
+    records = list(intervals.values()) if isinstance(intervals, dict) else intervals
+    if records:
+        start = np.array([r[0] for r in records], dtype="float64")
+        end = np.array([r[1] for r in records], dtype="float64")
+        loss = np.array([r[2] for r in records], dtype="float64")
+        group_values = (
+            [r[3 + OUTAGE_GROUPS.index(by)] for r in records]
+            if by is not None
+            else ["total"] * len(records)
+        )
+    else:
+        start = end = loss = np.empty(0, dtype="float64")
+        group_values = []
+    codes, groups = pd.factorize(pd.Series(group_values, dtype="object"), sort=True)
+
+    ## Clip to the range, then spread each interval to four difference array points
+    start = np.maximum(start, h0 * 3600.0)
+    end = np.minimum(end, h1 * 3600.0)
+    keep = end > start
+    start, end, loss, codes = start[keep], end[keep], loss[keep], codes[keep]
+
+    hs = (start // 3600).astype("int64") - h0
+    he = (end // 3600).astype("int64") - h0
+    fs = (start % 3600) / 3600
+    fe = (end % 3600) / 3600
+
+    width = n + 2
+    offset = codes * width
+    diff = np.bincount(
+        np.concatenate([offset + hs, offset + hs + 1, offset + he, offset + he + 1]),
+        weights=np.concatenate(
+            [loss * (1 - fs), loss * fs, -loss * (1 - fe), -loss * fe]
+        ),
+        minlength=len(groups) * width,
+    )
+    values = np.cumsum(diff.reshape(len(groups), width), axis=1)[:, :n].round(6)
+
+    hours = np.arange(h0, h1, dtype="int64")
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(hours * 3600, unit="s", utc=True).tz_convert(
+                "Europe/Istanbul"
+            ),
+            "contract_hour": hours,
+        }
+    )
+    if by is not None:
+        df = pd.concat(
+            [df, pd.DataFrame(values.T, columns=[str(x) for x in groups])], axis=1
+        )
+    df["total"] = values.sum(axis=0).round(6) if len(groups) else 0.0
+    return df
+
+
+def join_outage_timeline(
+    df: pd.DataFrame,
+    timeline: pd.DataFrame,
+    date_column: str = "date",
+    prefix: str = "unavailable_",
+) -> pd.DataFrame:
+    """
+    Joins an hourly unavailability frame to an hourly frame (e.g. rt-gen or kgup) by hour.
+
+    Args:
+        df: Hourly frame with a date column of ISO datetimes or timestamps.
+        timeline: Result of hourly_unavailability or OutageTimeline.hourly.
+        date_column: Date column of df.
+        prefix: Prefix of the joined unavailability columns.
+
+    Example:
+        >>> rt = eptr.call("rt-gen", start_date="2024-07-01", end_date="2024-07-31")
+        >>> df = join_outage_timeline(rt, timeline.hourly("2024-07-01", "2024-07-31"))
+    """
+    hour = pd.to_datetime(df[date_column], utc=True).astype("datetime64[ns, UTC]")
+    key = hour.astype("int64") // 3_600_000_000_000
+    right = (
+        timeline.drop(columns=["date"]).set_index("contract_hour").add_prefix(prefix)
+    )
+    joined = right.reindex(key.to_numpy())
+    joined.index = df.index
+    return pd.concat([df, joined], axis=1)
+
+
+class OutageTimeline:
+    """
+    Outage intervals of MMS messages, updated incrementally by date.
+
+    Parameters:
+        path: Gzip compressed JSON file of the intervals and fetched days. None keeps them
+            in memory only.
+        loss_column: See mms_outage_intervals.
+
+    Messages are kept by id, so a message returned again (e.g. revised) replaces the stored
+    one. The hourly profile is computed from the intervals on demand.
+
+    Example:
+        >>> timeline = OutageTimeline("data/outages.json.gz")
+        >>> timeline.update("2024-01-01", "2024-12-31", eptr=eptr)
+        >>> df = timeline.hourly("2024-01-01", "2024-12-31", by="fuel")
+    """
+
+    def __init__(self, path: str | None = None, loss_column: str | None = None):
+        self.path = path
+        self.loss_column = loss_column
+        self.intervals: dict[str, list] = {}
+        self.first_day: str | None = None
+        self.last_day: str | None = None
+
+        if path is not None and os.path.exists(path):
+            d = read_json_gz(path, OUTAGE_TIMELINE_VERSION, "outage timeline")
+            self.intervals = d["intervals"]
+            self.first_day = d["first_day"]
+            self.last_day = d["last_day"]
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        d = {
+            "version": OUTAGE_TIMELINE_VERSION,
+            "updated_at": time.time(),
+            "first_day": self.first_day,
+            "last_day": self.last_day,
+            "fields": _RECORD_FIELDS,
+            "intervals": self.intervals,
+        }
+        write_json_gz(self.path, d)
+
+    def add(self, res) -> int:
+        """Adds (or replaces) the intervals of an MMS response. Returns their number."""
+        new = mms_outage_intervals(res, loss_column=self.loss_column)
+        self.intervals.update(new)
+        return len(new)
+
+    def update(
+        self,
+        start_date: str,
+        end_date: str,
+        eptr: EPTR2 | None = None,
+        refresh_days: int = 7,
+        chunk_days: int = 7,
+        max_workers: int | None = None,
+    ) -> None:
+        """
+        Fetches the messages of the days not fetched before and of the last refresh_days
+        fetched days (recent messages may still be revised), in chunks of chunk_days, and
+        saves the timeline. Fetched days are kept contiguous: a range after the fetched
+        days is fetched from the refresh window on, a range before them up to the first
+        fetched day. Days after today are fetched but not recorded as fetched.
+        """
+        if eptr is None:
+            eptr = EPTR2()
+
+        ## Ranges are extended to the fetched days so that they stay contiguous
+        ranges = []
+        if self.first_day is None:
+            ranges.append((start_date, end_date))
+        else:
+            if start_date < self.first_day:
+                ranges.append((start_date, offset_date_by_n_days(self.first_day, n=-1)))
+            refresh_from = max(
+                self.first_day,
+                offset_date_by_n_days(self.last_day, n=1 - refresh_days),
+            )
+            if refresh_from <= end_date:
+                ranges.append((refresh_from, end_date))
+
+        chunks = [c for sd, ed in ranges for c in split_date_range(sd, ed, chunk_days)]
+        results = eptr.call_many(
+            [
+                {"key": "mms", "start_date": sd, "end_date": ed, "postprocess": False}
+                for sd, ed in chunks
+            ],
+            max_workers=max_workers,
+        )
+        for res in results:
+            self.add(res)
+
+        ## Days after today can still get messages, they are not recorded as fetched
+        fetched_through = min(end_date, get_utc3_now().strftime("%Y-%m-%d"))
+        if self.first_day is not None or start_date <= fetched_through:
+            self.first_day = min(
+                x for x in [self.first_day, start_date] if x is not None
+            )
+            self.last_day = max(
+                x for x in [self.last_day, fetched_through] if x is not None
+            )
+        logger.info(
+            "Outage timeline updated with %d calls, %d intervals.",
+            len(chunks),
+            len(self.intervals),
+        )
+        self.save()
+
+    def hourly(
+        self, start_date: str, end_date: str, by: str | None = "fuel"
+    ) -> pd.DataFrame:
+        """Hourly unavailable MW (see hourly_unavailability)."""
+        return hourly_unavailability(self.intervals, start_date, end_date, by=by)
+
+
+def get_hourly_unavailability(
+    start_date: str,
+    end_date: str,
+    by: str | None = "fuel",
+    eptr: EPTR2 | None = None,
+    timeline: OutageTimeline | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Fetches the MMS messages of a date range and returns the hourly unavailable MW by
+    group (see hourly_unavailability).
+
+    Args:
+        start_date, end_date: Dates in YYYY-MM-DD format.
+        by: "plant", "fuel", "uevcb", "organization" or None.
+        eptr: EPTR2 client. Created if not given.
+        timeline: OutageTimeline to update and reuse. A new in-memory one if not given.
+        refresh_days, chunk_days, max_workers: See OutageTimeline.update.
+
+    Example:
+        >>> df = get_hourly_unavailability("2024-01-01", "2024-12-31", by="fuel", eptr=eptr)
+    """
+    if timeline is None:
+        timeline = OutageTimeline(loss_column=kwargs.get("loss_column", None))
+    timeline.update(
+        start_date,
+        end_date,
+        eptr=eptr,
+        refresh_days=kwargs.get("refresh_days", 7),
+        chunk_days=kwargs.get("chunk_days", 7),
+        max_workers=kwargs.get("max_workers", None),
+    )
+    return timeline.hourly(start_date, end_date, by=by)
@@ -4,6 +4,11 @@ import pandas as pd
 import numpy as np
 import time
 import logging
+import os
+import json
+import hashlib
+from eptr2.policy import get_request_timeout_kwargs
+from eptr2.util.store import read_json_gz, write_json_gz
 from eptr2.util.time import get_utc3_now, transform_date
 
 
@@ -105,7 +110,7 @@ def get_uevcb_ids(org_df: pd.DataFrame, period: str, **kwargs):
                 "uevcb-list-bulk",
                 start_date=the_date,
                 org_ids=org_ids_chunk,
-                request_kwargs={"timeout": 5},
+                **get_request_timeout_kwargs(eptr, 5),
                 retry_attempts=max_lives,
                 retry_backoff=retry_backoff,
                 retry_backoff_max=retry_backoff_max,
@@ -158,18 +163,11 @@ def get_generation_org_and_uevcb_wrapper(period: str, **kwargs):
     return org_uevcb_df
 
 
-def get_periodic_generation_organization_lists(
-    start_date: str, end_date: str, **kwargs
-) -> pd.DataFrame:
-    """
-    This wrapper function gets generation organization lists for periodic intervals (monthly) between the specified start and end dates. Each month organization names can be different, so it captures the changes over time.
-    """
-
+def get_monthly_periods(start_date: str, end_date: str) -> list[str]:
+    """Month start dates (YYYY-MM-DD) of the months between start_date and end_date, both included."""
     sd_dt = datetime.strptime(start_date, "%Y-%m-%d")
     ed_dt = datetime.strptime(end_date, "%Y-%m-%d")
 
-    df = pd.DataFrame()
-
     periods = []
     current_dt = transform_date(sd_dt, key="start_of_month", to_str=False)
 
@@ -179,6 +177,20 @@ def get_periodic_generation_organization_lists(
             current_dt + timedelta(days=31), key="start_of_month", to_str=False
         )
 
+    return periods
+
+
+def get_periodic_generation_organization_lists(
+    start_date: str, end_date: str, **kwargs
+) -> pd.DataFrame:
+    """
+    This wrapper function gets generation organization lists for periodic intervals (monthly) between the specified start and end dates. Each month organization names can be different, so it captures the changes over time.
+    """
+
+    df = pd.DataFrame()
+
+    periods = get_monthly_periods(start_date=start_date, end_date=end_date)
+
     for period in periods:
         logger.info("Processing period: %s", period)
         df_res = get_generation_organization_list(period=period, period_range="month")
@@ -194,40 +206,17 @@ def get_multiperiod_generation_org_and_uevcb_wrapper(
 ) -> pd.DataFrame:
     """
     This is a wrapper function to get generation organizations with their UEVCB IDs for multiple periods between start_date and end_date.
-    """
-
-    sd_dt = datetime.strptime(start_date, "%Y-%m-%d")
-    ed_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    ed_dt = transform_date(ed_dt, key="end_of_month", to_str=False)
-
-    df = pd.DataFrame()
 
-    periods = []
-    current_dt = transform_date(sd_dt, key="start_of_month", to_str=False)
-
-    while current_dt <= ed_dt:
-        periods.append(current_dt.strftime("%Y-%m-%d"))
-        current_dt = transform_date(
-            current_dt + timedelta(days=31), key="start_of_month", to_str=False
-        )
+    Periods are kept in an OrgUevcbSnapshotStore (store=... or snapshot_dir=... to persist them, in memory by default) and only the periods not already stored are fetched.
+    """
 
-    verbose = kwargs.get("verbose", False)
+    store = kwargs.pop("store", None)
+    if store is None:
+        store = OrgUevcbSnapshotStore(kwargs.pop("snapshot_dir", None))
 
-    try:
-        for period in periods:
-            if verbose:
-                logger.info("Processing period: %s", period)
-            df_res = get_generation_org_and_uevcb_wrapper(period=period, **kwargs)
-            df = pd.concat([df, df_res], ignore_index=True)
-            time.sleep(1)
-    except Exception as e:
-        logger.warning(
-            "Error processing period %s: %s returning data collected so far.",
-            period,
-            e,
-        )
+    store.sync(start_date=start_date, end_date=end_date, **kwargs)
 
-    return df
+    return store.get_snapshots(start_date=start_date, end_date=end_date)
 
 
 def get_aggregators_data_for_period(
@@ -256,3 +245,324 @@ def get_aggregators_data_for_period(
     )
 
     return df
+
+
+### Period snapshots of generation organizations and UEVCBs
+
+SNAPSHOT_VERSION = 1
+
+## Columns compared between consecutive snapshots
+ORG_DIFF_FIELDS = ["org_name", "org_short_name"]
+UEVCB_DIFF_FIELDS = ["uevcb_name", "uevcb_eic"]
+SNAPSHOT_DIFF_COLUMNS = ["change", "org_id", "uevcb_id", "field", "old", "new"]
+
+
+def _normalize_snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    """IDs as nullable integers, so that snapshots loaded from disk compare equal."""
+    df = df.copy()
+    for col in ["org_id", "uevcb_id"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    return df
+
+
+def _snapshot_hash(records: list[dict]) -> str:
+    return hashlib.sha1(
+        json.dumps(records, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _is_changed(a: pd.Series, b: pd.Series) -> pd.Series:
+    """Elementwise a != b where two missing values are equal."""
+    same = (a == b).astype("boolean").fillna(False) | (a.isna() & b.isna())
+    return ~same.astype(bool)
+
+
+def diff_org_uevcb_snapshots(
+    old_df: pd.DataFrame, new_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Differences between two organization/UEVCB snapshots (outputs of get_generation_org_and_uevcb_wrapper).
+
+    Returns a DataFrame with columns change, org_id, uevcb_id, field, old and new. Changes are org_added, org_removed, org_renamed (field org_name or org_short_name), uevcb_added, uevcb_removed, uevcb_renamed (field uevcb_name or uevcb_eic) and uevcb_moved (field org_id, old and new organization IDs, org_id is the new organization).
+    """
+    old_df = _normalize_snapshot(old_df)
+    new_df = _normalize_snapshot(new_df)
+    rows = []
+
+    def compare(key, fields, prefix, extra_cols):
+        cols = [key] + [x for x in fields + extra_cols if x != key]
+        o = old_df.loc[old_df[key].notna(), cols].drop_duplicates(subset=[key])
+        n = new_df.loc[new_df[key].notna(), cols].drop_duplicates(subset=[key])
+        m = o.merge(n, on=key, how="outer", suffixes=("_old", "_new"), indicator=True)
+        org_col = "org_id" if key == "org_id" else "org_id_new"
+        old_org_col = "org_id" if key == "org_id" else "org_id_old"
+        uevcb_of = (lambda r: None) if key == "org_id" else (lambda r: r[key])
+
+        for r in m[m["_merge"] == "right_only"].to_dict("records"):
+            rows.append([prefix + "_added", r[org_col], uevcb_of(r), None, None, None])
+        for r in m[m["_merge"] == "left_only"].to_dict("records"):
+            rows.append(
+                [prefix + "_removed", r[old_org_col], uevcb_of(r), None, None, None]
+            )
+
+        both = m[m["_merge"] == "both"]
+        for field in fields:
+            changed = both[_is_changed(both[field + "_old"], both[field + "_new"])]
+            for r in changed.to_dict("records"):
+                rows.append(
+                    [
+                        prefix + "_renamed",
+                        r[org_col],
+                        uevcb_of(r),
+                        field,
+                        r[field + "_old"],
+                        r[field + "_new"],
+                    ]
+                )
+        return both
+
+    compare("org_id", ORG_DIFF_FIELDS, "org", [])
+    both = compare("uevcb_id", UEVCB_DIFF_FIELDS, "uevcb", ["org_id"])
+
+    moved = both[_is_changed(both["org_id_old"], both["org_id_new"])]
+    for r in moved.to_dict("records"):
+        rows.append(
+            [
+                "uevcb_moved",
+                r["org_id_new"],
+                r["uevcb_id"],
+                "org_id",
+                r["org_id_old"],
+                r["org_id_new"],
+            ]
+        )
+
+    df = pd.DataFrame(rows, columns=SNAPSHOT_DIFF_COLUMNS, dtype=object)
+    df.replace({np.nan: None, pd.NA: None}, inplace=True)
+    return df
+
+
+class OrgUevcbSnapshotStore:
+    """
+    Store of monthly generation organization and UEVCB snapshots (outputs of get_generation_org_and_uevcb_wrapper) and of the differences between consecutive months.
+
+    Parameters:
+        directory: Directory of the gzip compressed snapshot (<period>.json.gz) and difference (<period>.diff.json.gz) files. None keeps them in memory only.
+
+    Stored periods are not fetched again, except the current month (refresh_current=True in sync) whose lists can still change. A difference is recomputed only if one of its two snapshots changed.
+
+    Example:
+        >>> store = OrgUevcbSnapshotStore("data/org_snapshots")
+        >>> store.sync("2023-01-01", "2025-12-31", eptr=eptr)
+        >>> get_aggregator_membership("2023-01-01", "2025-12-31", store=store)
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._snapshots: dict[str, dict] = {}
+        self._diffs: dict[str, dict] = {}
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, period: str, suffix: str = "json.gz") -> str:
+        return os.path.join(self.directory, f"{period}.{suffix}")
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        return read_json_gz(path, SNAPSHOT_VERSION, "snapshot")
+
+    @staticmethod
+    def _write(path: str, d: dict) -> None:
+        write_json_gz(path, d)
+
+    def periods(self) -> list[str]:
+        """Stored periods in ascending order."""
+        periods = set(self._snapshots)
+        if self.directory is not None:
+            periods.update(
+                x[: -len(".json.gz")]
+                for x in os.listdir(self.directory)
+                if x.endswith(".json.gz") and not x.endswith(".diff.json.gz")
+            )
+        return sorted(periods)
+
+    def has(self, period: str) -> bool:
+        return self._load(period) is not None
+
+    def _load(self, period: str) -> dict | None:
+        if period not in self._snapshots and self.directory is not None:
+            path = self._path(period)
+            if os.path.exists(path):
+                self._snapshots[period] = self._read(path)
+        return self._snapshots.get(period)
+
+    def put_snapshot(self, period: str, df: pd.DataFrame) -> bool:
+        """Stores the snapshot of a period. Returns whether it differs from the stored one."""
+        records = json.loads(
+            _normalize_snapshot(df).to_json(orient="records", force_ascii=False)
+        )
+        h = _snapshot_hash(records)
+        prev = self._load(period)
+        if prev is not None and prev["hash"] == h:
+            return False
+        d = {
+            "version": SNAPSHOT_VERSION,
+            "period": period,
+            "fetched_at": time.time(),
+            "hash": h,
+            "records": records,
+        }
+        self._snapshots[period] = d
+        if self.directory is not None:
+            self._write(self._path(period), d)
+        return True
+
+    def get_snapshot(self, period: str) -> pd.DataFrame | None:
+        """Snapshot of a period (YYYY-MM-DD, start of month) or None if not stored."""
+        d = self._load(period)
+        if d is None:
+            return None
+        return _normalize_snapshot(pd.DataFrame(d["records"]))
+
+    def get_snapshots(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """Stored snapshots of the months between start_date and end_date, concatenated."""
+        dfs = [
+            self.get_snapshot(period)
+            for period in get_monthly_periods(start_date, end_date)
+            if self.has(period)
+        ]
+        if not dfs:
+            return pd.DataFrame()
+        return pd.concat(dfs, ignore_index=True)
+
+    def sync(
+        self,
+        start_date: str,
+        end_date: str,
+        eptr: EPTR2 | None = None,
+        refresh_current: bool = True,
+        **kwargs,
+    ) -> list[str]:
+        """
+        Fetches the periods between start_date and end_date that are not stored (and the current month if refresh_current). kwargs are passed to get_generation_org_and_uevcb_wrapper. On an error, the periods fetched so far are kept and a warning is logged.
+
+        Returns the fetched periods.
+        """
+        verbose = kwargs.get("verbose", False)
+        sleep = kwargs.pop("sleep", 1)
+        current_period = get_utc3_now().replace(day=1).strftime("%Y-%m-%d")
+
+        periods = [
+            x
+            for x in get_monthly_periods(start_date, end_date)
+            if not self.has(x) or (refresh_current and x >= current_period)
+        ]
+
+        if periods and eptr is None:
+            eptr = EPTR2(recycle_tgt=True)
+
+        fetched = []
+        try:
+            for period in periods:
+                if verbose:
+                    logger.info("Processing period: %s", period)
+                if fetched and sleep:
+                    time.sleep(sleep)  # To avoid overwhelming the API
+                df = get_generation_org_and_uevcb_wrapper(
+                    period=period, eptr=eptr, **kwargs
+                )
+                self.put_snapshot(period, df)
+                fetched.append(period)
+        except Exception as e:
+            logger.warning(
+                "Error processing period %s: %s returning data collected so far.",
+                period,
+                e,
+            )
+
+        return fetched
+
+    def get_diff(self, period: str) -> pd.DataFrame | None:
+        """
+        Differences of a period from the previous month (see diff_org_uevcb_snapshots). None if either snapshot is not stored.
+        """
+        prev_period = transform_date(
+            datetime.strptime(period, "%Y-%m-%d") - timedelta(days=1),
+            key="start_of_month",
+            to_str=True,
+        )
+        new = self._load(period)
+        old = self._load(prev_period)
+        if new is None or old is None:
+            return None
+
+        d = self._diffs.get(period)
+        if d is None and self.directory is not None:
+            path = self._path(period, "diff.json.gz")
+            if os.path.exists(path):
+                d = self._read(path)
+        if d is None or d["hash"] != new["hash"] or d["prev_hash"] != old["hash"]:
+            df = diff_org_uevcb_snapshots(
+                self.get_snapshot(prev_period), self.get_snapshot(period)
+            )
+            d = {
+                "version": SNAPSHOT_VERSION,
+                "period": period,
+                "prev_period": prev_period,
+                "hash": new["hash"],
+                "prev_hash": old["hash"],
+                "records": json.loads(df.to_json(orient="records", force_ascii=False)),
+            }
+            if self.directory is not None:
+                self._write(self._path(period, "diff.json.gz"), d)
+        self._diffs[period] = d
+
+        return pd.DataFrame(d["records"], columns=SNAPSHOT_DIFF_COLUMNS)
+
+    def get_diffs(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """Differences of the months between start_date and end_date from their previous months, with a period column."""
+        dfs = []
+        for period in get_monthly_periods(start_date, end_date):
+            df = self.get_diff(period)
+            if df is not None:
+                df.insert(0, "period", period)
+                dfs.append(df)
+        if not dfs:
+            return pd.DataFrame(columns=["period"] + SNAPSHOT_DIFF_COLUMNS)
+        return pd.concat(dfs, ignore_index=True)
+
+
+def get_aggregator_membership(
+    start_date: str, end_date: str, store: OrgUevcbSnapshotStore | None = None, **kwargs
+) -> dict:
+    """
+    Aggregator (TOPLAYICI) organizations with their UEVCBs for each month between start_date and end_date, and the membership changes between months. Missing periods are fetched into the store (see OrgUevcbSnapshotStore.sync), stored ones are read locally.
+
+    Returns a dictionary of "members" (period, org_id, org_name, uevcb_id, uevcb_name) and "changes" (differences involving aggregator organizations).
+    """
+    if store is None:
+        store = OrgUevcbSnapshotStore(kwargs.pop("snapshot_dir", None))
+    store.sync(start_date=start_date, end_date=end_date, **kwargs)
+
+    df = store.get_snapshots(start_date=start_date, end_date=end_date)
+    if df.empty:
+        members = pd.DataFrame(
+            columns=["period", "org_id", "org_name", "uevcb_id", "uevcb_name"]
+        )
+    else:
+        members = (
+            df[df["org_name"].str.contains("TOPLAYICI", case=True, na=False)]
+            .sort_values(["period", "org_name", "uevcb_name"])
+            .reset_index(drop=True)
+        )[["period", "org_id", "org_name", "uevcb_id", "uevcb_name"]]
+
+    agg_org_ids = members["org_id"].dropna().unique().tolist()
+    changes = store.get_diffs(start_date=start_date, end_date=end_date)
+    is_member = changes["org_id"].isin(agg_org_ids) | (
+        (changes["change"] == "uevcb_moved") & changes["old"].isin(agg_org_ids)
+    )
+    changes = changes[is_member].reset_index(drop=True)
+
+    return {"members": members, "changes": changes}
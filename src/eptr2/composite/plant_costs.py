@@ -5,20 +5,33 @@ from typing import Literal
 import pandas as pd
 
 from eptr2 import EPTR2
-from eptr2.composite.price_and_cost import get_hourly_price_and_cost_data
+from eptr2.composite.price_and_cost import (
+    MarketPriceContext,
+    get_market_price_context,
+)
 from eptr2.composite.production import wrapper_hourly_production_plan_and_realized
 from eptr2.util.costs import (
     calculate_kupsm,
     get_kupst_tolerance,
     get_kupst_tolerance_by_contract,
+    get_regime_by_contract,
     calculate_unit_imbalance_cost,
     calculate_unit_kupst_cost,
 )
-from eptr2.util.time import contract_to_floor_ceil_prices, date_str_to_contract
+from eptr2.util.time import (
+    contract_to_datetime,
+    date_str_to_contract,
+    get_previous_contracts,
+)
 
 
 logger = logging.getLogger(__name__)
 
+## UEVM (settlement) values of an hour can be revised for about 60 days, as for the
+## renewables settlement (see RENEWABLES_SOURCES). Incremental portfolio runs refetch this
+## many hours before the last previous hour by default.
+PORTFOLIO_REVISION_LOOKBACK_HOURS = 60 * 24
+
 
 def postprocess_plant_cost_df(df: pd.DataFrame):
     df["cumulative_kupst_cost"] = df["total_kupst_cost"].cumsum()
@@ -52,11 +65,14 @@ def gather_and_calculate_plant_costs(
     verbose=False,
     timeout=5,
     postprocess: bool = False,
+    price_context: MarketPriceContext | None = None,
     **kwargs,
 ):
     """
     For a given power plant and selected forecast and actual production sources, this function gathers data and calculates imbalance and kupst costs.
 
+    Market prices are taken from price_context if given, otherwise from get_market_price_context which is memoized in process. Calculating costs of several plants in the same window makes a single price request.
+
     Example usage:
     pp_id=120,  ## BOZCAADA RES
     org_id=195,  ## EÜAŞ
@@ -100,15 +116,16 @@ def gather_and_calculate_plant_costs(
         **kwargs,
     )
 
-    cost_df = get_hourly_price_and_cost_data(
-        start_date=start_date,
-        end_date=end_date,
-        eptr=eptr,
-        verbose=verbose,
-        include_contract_symbol=True,
-        include_wap=False,
-        timeout=timeout,
-    )
+    if price_context is None:
+        price_context = get_market_price_context(
+            start_date=start_date,
+            end_date=end_date,
+            eptr=eptr,
+            verbose=verbose,
+            timeout=timeout,
+        )
+
+    cost_df = price_context.subset(start_date, end_date).get_cost_df()
 
     #### Merge and calculate costs
     prod_df = (
@@ -159,91 +176,23 @@ def gather_and_calculate_plant_costs(
     return merged_df
 
 
-def calculate_portfolio_costs(
+def _gather_portfolio_plan_realized(
     start_date: str,
     end_date: str,
     id_df: pd.DataFrame,
-    *,
     plant_name_col="plant_name",
-    export_to_excel: bool = False,
-    export_dir: str = "data",
-    check_existing: bool = False,
-    portfolio_name: str | None = None,
-    translate: bool = False,
     verbose=True,
     use_uevm=False,
     ignore_org_id=True,
     reduce_cost_details=False,
     forecast_source: Literal["kgup", "kudup"] = "kgup",
     use_latest_regulation: bool = False,
-    include_price_range_adjustment: bool = False,
     **kwargs,
-):
+) -> pd.DataFrame:
     """
-    For a given portfolio (e.g. an aggregator) of power plants, this function calculates the overall imbalance and kupst costs based on provided production data. There are some caveats to consider.
-
-    + This function is suitable for only production/generation portfolios (not consumption). If your portfolio includes consumption units, results will be inaccurate.
-    + KUPST calculations are based on a single plant type. Aggregators have more complex rules that are not covered here.
-    + Your portfolio does not have to be an aggregator but calculations resemble those of an aggregator. You can use this function to estimate costs for potential aggregators.
+    Gathers production plan and realized production data of every plant in the portfolio and calculates imbalance quantities and KUPSM values.
     """
-    #####
-    ### Validate forecast source
-    if forecast_source.lower() in ["kgüp", "kgup", "kagup", "kagüp"]:
-        forecast_source = "kgup"
-    elif forecast_source.lower() in ["kudüp", "kudup"]:
-        forecast_source = "kudup"
-
-    if forecast_source not in ["kgup", "kudup"]:
-        raise ValueError(
-            "forecast_source must be either 'kgup' or 'kudup'. For day ahead forecasts, we use kgup_v1 by default."
-        )
-
-    if use_latest_regulation:
-        if forecast_source == "kudup":
-            raise ValueError(
-                "When using latest regulation, 'kudup' forecast source is not supported as aggregator uevcb organizations might be different by then. Please use 'kgup' as forecast source."
-            )
-
-    if ignore_org_id:
-        if forecast_source == "kudup":
-            raise ValueError(
-                "When using 'kudup' as forecast source, org_id is required. Set ignore_org_id=False or use kgup as forecast_source."
-            )
-
-    if forecast_source == "kgup":
-        kwargs["skip_kgup"] = False
-        kwargs["skip_kudup"] = True
-    else:
-        kwargs["skip_kgup"] = True
-        kwargs["skip_kudup"] = False
-    ##########
-
-    res_d = {}
-
-    if not os.path.exists(export_dir):
-        os.makedirs(export_dir, exist_ok=True)
-
-    if portfolio_name is None:
-        portfolio_name = ""
-    else:
-        portfolio_name = f"_{portfolio_name.lower().replace(' ', '_')}"
-
-    excel_export_path = os.path.join(
-        export_dir, f"portfolio{portfolio_name}_costs_data_{start_date}_{end_date}.xlsx"
-    )
-
-    if check_existing and os.path.exists(excel_export_path):
-        res_d["costs_detail"] = pd.read_excel(
-            excel_export_path, sheet_name="costs_detail"
-        )
-        res_d["contract_summary"] = pd.read_excel(
-            excel_export_path, sheet_name="contract_summary"
-        )
-        return res_d
-
     plan_realized_df = pd.DataFrame()
-    id_df = id_df.reset_index(drop=True).copy()
-    res_d["plant_info"] = id_df.copy()
     for idx, row in id_df.iterrows():
         if verbose:
             logger.info(
@@ -279,7 +228,7 @@ def calculate_portfolio_costs(
 
         sub_df["da_forecast"] = sub_df["toplam_kgup_v1"]
         sub_df["forecast"] = sub_df[f"toplam_{forecast_source}"]
-        ## Negative means underproduction, negative imbalance
+        ## Negative means underproduction, negative imbalance
         sub_df["imb_qty"] = sub_df["actual"] - sub_df["forecast"]
         sub_df["da_imb_qty"] = sub_df["actual"] - sub_df["da_forecast"]
         for pfx in ["", "da_"]:
@@ -320,50 +269,72 @@ def calculate_portfolio_costs(
 
         plan_realized_df = pd.concat([plan_realized_df, sub_df], ignore_index=True)
 
-    # res_d["costs_detail"] = plan_realized_df.copy()
+    return plan_realized_df
 
-    cost_df = kwargs.get("cost_df", None)
-    if cost_df is None:
-        cost_df = get_hourly_price_and_cost_data(
+
+def _get_portfolio_cost_df(
+    start_date: str,
+    end_date: str,
+    verbose=True,
+    use_latest_regulation: bool = False,
+    price_context: MarketPriceContext | None = None,
+    use_cache: bool = True,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Gets hourly unit imbalance and KUPST costs for portfolio cost calculations. Set use_cache=False to fetch prices again instead of reusing a memoized market price context.
+    """
+    if price_context is None:
+        price_context = get_market_price_context(
             start_date=start_date,
             end_date=end_date,
-            include_contract_symbol=True,
-            add_kupst_cost=True,
-            add_unit_prefix_to_cost_colnames=True,
+            eptr=kwargs.get("eptr", None),
+            use_cache=use_cache,
             verbose=verbose,
         )
 
-        if use_latest_regulation:
-            if verbose:
-                logger.info(
-                    "Using latest regulation for cost data. But beware, currently we adjust ceiling prices only based on start date."
-                )
+    cost_df = price_context.subset(start_date, end_date).get_cost_df(
+        add_unit_prefix_to_cost_colnames=True
+    )
 
-            ceil_price = contract_to_floor_ceil_prices(
-                c=date_str_to_contract(start_date)
-            )["max"]
-
-            cost_df2 = cost_df[["contract", "mcp", "smp", "sd_sign"]].copy()
-            temp_series = cost_df2.apply(
-                lambda row: calculate_unit_imbalance_cost(
-                    mcp=row["mcp"],
-                    smp=row["smp"],
-                    include_prices=True,
-                    regulation_period="current",
-                    ceil_price=ceil_price,
-                    sd_sign=row["sd_sign"],
-                ),
-                axis=1,
-            )
-            cost_df2 = pd.concat([cost_df2, pd.json_normalize(temp_series)], axis=1)
-            cost_df2["unit_kupst_cost"] = cost_df2.apply(
-                lambda row: calculate_unit_kupst_cost(
-                    mcp=row["mcp"], smp=row["smp"], regulation_period="current"
-                ),
-                axis=1,
+    if use_latest_regulation:
+        if verbose:
+            logger.info(
+                "Using latest regulation for cost data. But beware, currently we adjust ceiling prices only based on start date."
             )
-            cost_df = cost_df2.reset_index(drop=True).copy()
 
+        ceil_price = get_regime_by_contract(date_str_to_contract(start_date))["max"]
+
+        cost_df2 = cost_df[["contract", "mcp", "smp", "sd_sign"]].copy()
+        temp_series = cost_df2.apply(
+            lambda row: calculate_unit_imbalance_cost(
+                mcp=row["mcp"],
+                smp=row["smp"],
+                include_prices=True,
+                regulation_period="current",
+                ceil_price=ceil_price,
+                sd_sign=row["sd_sign"],
+            ),
+            axis=1,
+        )
+        cost_df2 = pd.concat([cost_df2, pd.json_normalize(temp_series)], axis=1)
+        cost_df2["unit_kupst_cost"] = cost_df2.apply(
+            lambda row: calculate_unit_kupst_cost(
+                mcp=row["mcp"], smp=row["smp"], regulation_period="current"
+            ),
+            axis=1,
+        )
+        cost_df = cost_df2.reset_index(drop=True).copy()
+
+    return cost_df
+
+
+def _calculate_portfolio_cost_detail(
+    plan_realized_df: pd.DataFrame, cost_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Calculates plant level (pre aggregator) hourly imbalance, KUPST and total costs.
+    """
     plan_realized_w_costs_df = plan_realized_df.merge(
         cost_df[
             [
@@ -378,20 +349,6 @@ def calculate_portfolio_costs(
         how="left",
     )
 
-    # plan_realized_w_costs_df["kupsm_da"] = plan_realized_w_costs_df.apply(
-    #     lambda row: calculate_kupsm(
-    #         actual=row["actual"],
-    #         forecast=row["forecast"],
-    #         tol=get_kupst_tolerance_by_contract(
-    #             contract=row["contract"], source=row.get("source", "other")
-    #         ),
-    #     ),
-    #     axis=1,
-    # )
-
-    unit_costs_l = []
-    total_actual = plan_realized_w_costs_df["actual"].sum()
-
     for pfx in ["da_", ""]:
         plan_realized_w_costs_df[f"{pfx}imb_cost"] = plan_realized_w_costs_df.apply(
             lambda row: abs(row[f"{pfx}imb_qty"]) * row["unit_pos_imb_cost"]
@@ -408,44 +365,17 @@ def calculate_portfolio_costs(
             + plan_realized_w_costs_df[f"{pfx}kupst_cost"]
         ).round(2)
 
-        total_imb_cost = plan_realized_w_costs_df[f"{pfx}imb_cost"].sum()
-        total_kupst_cost = plan_realized_w_costs_df[f"{pfx}kupst_cost"].sum()
-
-        unit_costs_l.extend(
-            [
-                {
-                    "cost": f"{pfx}unit_kupst_cost",
-                    "cost_version": "pre_aggregator",
-                    "value": total_kupst_cost / total_actual,
-                },
-                {
-                    "cost": f"{pfx}unit_imb_cost",
-                    "cost_version": "pre_aggregator",
-                    "value": total_imb_cost / total_actual,
-                },
-                {
-                    "cost": f"{pfx}unit_total_cost",
-                    "cost_version": "pre_aggregator",
-                    "value": (total_kupst_cost + total_imb_cost) / total_actual,
-                },
-            ]
-        )
-
-    # plan_realized_w_costs_df = plan_realized_w_costs_df.drop(
-    #     columns=[
-    #         "unit_pos_imb_cost",
-    #         "unit_neg_imb_cost",
-    #         "unit_kupst_cost",
-    #     ]
-    # ).copy()
+    return plan_realized_w_costs_df
 
-    res_d["costs_detail"] = plan_realized_w_costs_df.copy()
 
-    #####
-    ## SUMMARY BY CONTRACT
-    #####
+def _summarize_portfolio_costs_by_contract(
+    costs_detail_df: pd.DataFrame, cost_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Aggregates plant level quantities by contract and calculates portfolio (aggregator) level costs.
+    """
     summary_by_contract_df_raw = (
-        plan_realized_w_costs_df[
+        costs_detail_df[
             [
                 "contract",
                 "da_forecast",
@@ -499,29 +429,6 @@ def calculate_portfolio_costs(
             ).round(2)
         )
 
-        total_imb_cost = cost_summary_by_contract_df[f"{pfx}imb_cost"].sum()
-        total_kupst_cost = cost_summary_by_contract_df[f"{pfx}kupst_cost"].sum()
-
-        unit_costs_l.extend(
-            [
-                {
-                    "cost": f"{pfx}unit_kupst_cost",
-                    "cost_version": "aggregator",
-                    "value": total_kupst_cost / total_actual,
-                },
-                {
-                    "cost": f"{pfx}unit_imb_cost",
-                    "cost_version": "aggregator",
-                    "value": total_imb_cost / total_actual,
-                },
-                {
-                    "cost": f"{pfx}unit_total_cost",
-                    "cost_version": "aggregator",
-                    "value": (total_kupst_cost + total_imb_cost) / total_actual,
-                },
-            ]
-        )
-
     cost_summary_by_contract_df["da_total_cost"] = (
         cost_summary_by_contract_df["da_imb_cost"]
         + cost_summary_by_contract_df["da_kupst_cost"]
@@ -563,40 +470,46 @@ def calculate_portfolio_costs(
     all_cols = col_order + [
         x for x in cost_summary_by_contract_df.columns if x not in col_order
     ]
-    cost_summary_by_contract_df = cost_summary_by_contract_df[all_cols]
 
-    if translate:
-        cost_summary_by_contract_df_translated = cost_summary_by_contract_df.rename(
-            columns={
-                "contract": "Kontrat",
-                "actual": "Gerçekleşen",
-                "da_forecast": "GÖP Tahmin",
-                "da_imb_qty": "GÖP Dengesizlik (MWh)",
-                "da_kupsm": "GÖP KUPSM (MWh)",
-                "da_imb_cost": "GÖP DM (TL)",
-                "da_kupst_cost": "GÖP KÜPST (TL)",
-                "da_total_cost": "GÖP Toplam (TL)",
-                "forecast": "Tahmin",
-                "imb_qty": "Dengesizlik (MWh)",
-                "kupsm": "KUPSM (MWh)",
-                "imb_cost": "DM (TL)",
-                "kupst_cost": "KÜPST (TL)",
-                "total_cost": "Toplam (TL)",
-                "mcp": "PTF (TL/MWh)",
-                "smp": "SMF (TL/MWh)",
-                "pos_imb_price": "PDF (TL/MWh)",
-                "neg_imb_price": "NDF (TL/MWh)",
-                "unit_pos_imb_cost": "Birim PDM (TL/MWh)",
-                "unit_neg_imb_cost": "Birim NDM (TL/MWh)",
-                "unit_kupst_cost": "Birim KÜPST (TL/MWh)",
-            }
-        )
+    return cost_summary_by_contract_df[all_cols]
 
-        res_d["contract_summary"] = cost_summary_by_contract_df_translated.copy()
-    else:
-        res_d["contract_summary"] = cost_summary_by_contract_df.copy()
 
-    ### Summary of summaries
+def _summarize_portfolio_costs(
+    costs_detail_df: pd.DataFrame, contract_summary_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Calculates total and unit costs before (plant level) and after (contract level) aggregation and the savings. Only the totals of the detail and contract summary tables are used.
+    """
+    unit_costs_l = []
+    total_actual = costs_detail_df["actual"].sum()
+
+    for cost_version, df in [
+        ("pre_aggregator", costs_detail_df),
+        ("aggregator", contract_summary_df),
+    ]:
+        for pfx in ["da_", ""]:
+            total_imb_cost = df[f"{pfx}imb_cost"].sum()
+            total_kupst_cost = df[f"{pfx}kupst_cost"].sum()
+
+            unit_costs_l.extend(
+                [
+                    {
+                        "cost": f"{pfx}unit_kupst_cost",
+                        "cost_version": cost_version,
+                        "value": total_kupst_cost / total_actual,
+                    },
+                    {
+                        "cost": f"{pfx}unit_imb_cost",
+                        "cost_version": cost_version,
+                        "value": total_imb_cost / total_actual,
+                    },
+                    {
+                        "cost": f"{pfx}unit_total_cost",
+                        "cost_version": cost_version,
+                        "value": (total_kupst_cost + total_imb_cost) / total_actual,
+                    },
+                ]
+            )
 
     unit_costs_df = pd.DataFrame(unit_costs_l)
     unit_costs_df["value"] = unit_costs_df["value"].round(2)
@@ -605,10 +518,10 @@ def calculate_portfolio_costs(
     ).reset_index()
 
     sos_df = (
-        plan_realized_w_costs_df[
+        costs_detail_df[
             [
                 x
-                for x in plan_realized_w_costs_df.columns
+                for x in costs_detail_df.columns
                 if x.endswith("_cost") and not x.startswith("unit_")
             ]
         ]
@@ -618,10 +531,10 @@ def calculate_portfolio_costs(
     )
 
     cs_df = (
-        cost_summary_by_contract_df[
+        contract_summary_df[
             [
                 x
-                for x in cost_summary_by_contract_df.columns
+                for x in contract_summary_df.columns
                 if x.endswith("_cost") and not x.startswith("unit_")
             ]
         ]
@@ -640,6 +553,282 @@ def calculate_portfolio_costs(
         1 - sos_df["aggregator"] / sos_df["pre_aggregator"]
     ).round(4)
 
+    return sos_df
+
+
+def _get_portfolio_refresh_start(
+    previous_results: dict,
+    id_df: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    revision_lookback_hours: int = PORTFOLIO_REVISION_LOOKBACK_HOURS,
+) -> str | None:
+    """
+    Finds the first date to be refetched in incremental mode. Hours after the previous run, hours within revision_lookback_hours of the last previous hour and hours without final data (missing actual/forecast values or UEVM) are refetched. Revised values are not detected by comparison: a revision of an hour older than revision_lookback_hours is not picked up. Returns None if previous results cannot be reused.
+    """
+    prev_detail_df: pd.DataFrame | None = previous_results.get("costs_detail")
+    prev_summary_df: pd.DataFrame | None = previous_results.get("contract_summary")
+    prev_plant_info_df: pd.DataFrame | None = previous_results.get("plant_info")
+
+    if prev_detail_df is None or prev_summary_df is None or prev_detail_df.empty:
+        return None
+
+    ## Translated or exported results cannot be reused
+    if "contract" not in prev_summary_df.columns:
+        logger.info("Previous results are translated. Recomputing from scratch.")
+        return None
+
+    if prev_plant_info_df is not None and sorted(
+        prev_plant_info_df["uevcb_id"].tolist()
+    ) != sorted(id_df["uevcb_id"].tolist()):
+        logger.info("Portfolio plants have changed. Recomputing from scratch.")
+        return None
+
+    if prev_detail_df["contract"].min() > date_str_to_contract(start_date):
+        logger.info("Start date is before previous results. Recomputing from scratch.")
+        return None
+
+    refresh_start = get_previous_contracts(
+        prev_detail_df["contract"].max(),
+        n=max(revision_lookback_hours - 1, 0),
+        include_current=True,
+    )[0]
+
+    ## Hours without final data (e.g. unpublished UEVM, actual values or prices)
+    check_cols = [
+        x
+        for x in [
+            "actual",
+            "forecast",
+            "da_forecast",
+            "total_uevm",
+            "unit_pos_imb_cost",
+            "unit_neg_imb_cost",
+            "unit_kupst_cost",
+            "da_imb_cost",
+            "imb_cost",
+            "da_kupst_cost",
+            "kupst_cost",
+        ]
+        if x in prev_detail_df.columns
+    ]
+    missing_contracts = prev_detail_df.loc[
+        prev_detail_df[check_cols].isna().any(axis=1), "contract"
+    ]
+    if not missing_contracts.empty:
+        refresh_start = min(refresh_start, missing_contracts.min())
+
+    refresh_start_date = contract_to_datetime(refresh_start).strftime("%Y-%m-%d")
+
+    return min(max(refresh_start_date, start_date), end_date)
+
+
+def calculate_portfolio_costs(
+    start_date: str,
+    end_date: str,
+    id_df: pd.DataFrame,
+    *,
+    plant_name_col="plant_name",
+    export_to_excel: bool = False,
+    export_dir: str = "data",
+    check_existing: bool = False,
+    portfolio_name: str | None = None,
+    translate: bool = False,
+    verbose=True,
+    use_uevm=False,
+    ignore_org_id=True,
+    reduce_cost_details=False,
+    forecast_source: Literal["kgup", "kudup"] = "kgup",
+    use_latest_regulation: bool = False,
+    include_price_range_adjustment: bool = False,
+    price_context: MarketPriceContext | None = None,
+    previous_results: dict | None = None,
+    revision_lookback_hours: int = PORTFOLIO_REVISION_LOOKBACK_HOURS,
+    **kwargs,
+):
+    """
+    For a given portfolio (e.g. an aggregator) of power plants, this function calculates the overall imbalance and kupst costs based on provided production data. There are some caveats to consider.
+
+    Market prices are taken from price_context if given, otherwise from get_market_price_context which is memoized in process (see gather_and_calculate_plant_costs). A precomputed cost_df (in the format of get_hourly_price_and_cost_data with add_unit_prefix_to_cost_colnames=True) can also be passed as a keyword argument; it is used as is.
+
+    Incremental mode: If previous_results (the untranslated output of a previous run with the same id_df and start_date) is given, only the new hours and the hours that may have been revised are fetched and recalculated. Revised hours are the last revision_lookback_hours of the previous run (KUDUP, real time generation and UEVM settlement revisions, default PORTFOLIO_REVISION_LOOKBACK_HOURS, i.e. the 60 day settlement lag) and hours with missing values (e.g. UEVM or prices not yet published). Revisions are not detected by comparing values, so revisions of hours older than revision_lookback_hours are not picked up; a shorter lookback fetches less but misses more of them. Prices of the refreshed hours are fetched again instead of being taken from the memoized market price context. Rows of costs_detail and contract_summary for these hours are replaced and final_summary is recalculated from the updated tables.
+
+    + This function is suitable for only production/generation portfolios (not consumption). If your portfolio includes consumption units, results will be inaccurate.
+    + KUPST calculations are based on a single plant type. Aggregators have more complex rules that are not covered here.
+    + Your portfolio does not have to be an aggregator but calculations resemble those of an aggregator. You can use this function to estimate costs for potential aggregators.
+    """
+    #####
+    ### Validate forecast source
+    if forecast_source.lower() in ["kgüp", "kgup", "kagup", "kagüp"]:
+        forecast_source = "kgup"
+    elif forecast_source.lower() in ["kudüp", "kudup"]:
+        forecast_source = "kudup"
+
+    if forecast_source not in ["kgup", "kudup"]:
+        raise ValueError(
+            "forecast_source must be either 'kgup' or 'kudup'. For day ahead forecasts, we use kgup_v1 by default."
+        )
+
+    if use_latest_regulation:
+        if forecast_source == "kudup":
+            raise ValueError(
+                "When using latest regulation, 'kudup' forecast source is not supported as aggregator uevcb organizations might be different by then. Please use 'kgup' as forecast source."
+            )
+
+    if ignore_org_id:
+        if forecast_source == "kudup":
+            raise ValueError(
+                "When using 'kudup' as forecast source, org_id is required. Set ignore_org_id=False or use kgup as forecast_source."
+            )
+
+    if forecast_source == "kgup":
+        kwargs["skip_kgup"] = False
+        kwargs["skip_kudup"] = True
+    else:
+        kwargs["skip_kgup"] = True
+        kwargs["skip_kudup"] = False
+    ##########
+
+    res_d = {}
+
+    if not os.path.exists(export_dir):
+        os.makedirs(export_dir, exist_ok=True)
+
+    if portfolio_name is None:
+        portfolio_name = ""
+    else:
+        portfolio_name = f"_{portfolio_name.lower().replace(' ', '_')}"
+
+    excel_export_path = os.path.join(
+        export_dir, f"portfolio{portfolio_name}_costs_data_{start_date}_{end_date}.xlsx"
+    )
+
+    if check_existing and os.path.exists(excel_export_path):
+        res_d["costs_detail"] = pd.read_excel(
+            excel_export_path, sheet_name="costs_detail"
+        )
+        res_d["contract_summary"] = pd.read_excel(
+            excel_export_path, sheet_name="contract_summary"
+        )
+        return res_d
+
+    id_df = id_df.reset_index(drop=True).copy()
+    res_d["plant_info"] = id_df.copy()
+
+    ### Incremental mode
+    fetch_start_date = start_date
+    if previous_results is not None:
+        refresh_start_date = _get_portfolio_refresh_start(
+            previous_results=previous_results,
+            id_df=id_df,
+            start_date=start_date,
+            end_date=end_date,
+            revision_lookback_hours=revision_lookback_hours,
+        )
+        if refresh_start_date is None:
+            previous_results = None
+        else:
+            fetch_start_date = refresh_start_date
+            if verbose:
+                logger.info(
+                    "Incremental mode. Recalculating from %s to %s.",
+                    fetch_start_date,
+                    end_date,
+                )
+
+    plan_realized_df = _gather_portfolio_plan_realized(
+        start_date=fetch_start_date,
+        end_date=end_date,
+        id_df=id_df,
+        plant_name_col=plant_name_col,
+        verbose=verbose,
+        use_uevm=use_uevm,
+        ignore_org_id=ignore_org_id,
+        reduce_cost_details=reduce_cost_details,
+        forecast_source=forecast_source,
+        use_latest_regulation=use_latest_regulation,
+        **kwargs,
+    )
+
+    cost_df = kwargs.get("cost_df", None)
+    if cost_df is None:
+        cost_df = _get_portfolio_cost_df(
+            start_date=fetch_start_date,
+            end_date=end_date,
+            verbose=verbose,
+            use_latest_regulation=use_latest_regulation,
+            price_context=price_context,
+            ## Refreshed hours may have prices published after the previous run
+            use_cache=previous_results is None,
+            **kwargs,
+        )
+
+    costs_detail_df = _calculate_portfolio_cost_detail(plan_realized_df, cost_df)
+
+    #####
+    ## SUMMARY BY CONTRACT
+    #####
+    cost_summary_by_contract_df = _summarize_portfolio_costs_by_contract(
+        costs_detail_df, cost_df
+    )
+
+    if previous_results is not None:
+        cutoff_contract = date_str_to_contract(fetch_start_date)
+
+        prev_detail_df: pd.DataFrame = previous_results["costs_detail"]
+        costs_detail_df = pd.concat(
+            [
+                prev_detail_df[prev_detail_df["contract"] < cutoff_contract],
+                costs_detail_df,
+            ],
+            ignore_index=True,
+        )
+
+        prev_summary_df: pd.DataFrame = previous_results["contract_summary"]
+        cost_summary_by_contract_df = pd.concat(
+            [
+                prev_summary_df[prev_summary_df["contract"] < cutoff_contract],
+                cost_summary_by_contract_df,
+            ],
+            ignore_index=True,
+        )
+
+    res_d["costs_detail"] = costs_detail_df.copy()
+
+    if translate:
+        cost_summary_by_contract_df_translated = cost_summary_by_contract_df.rename(
+            columns={
+                "contract": "Kontrat",
+                "actual": "Gerçekleşen",
+                "da_forecast": "GÖP Tahmin",
+                "da_imb_qty": "GÖP Dengesizlik (MWh)",
+                "da_kupsm": "GÖP KUPSM (MWh)",
+                "da_imb_cost": "GÖP DM (TL)",
+                "da_kupst_cost": "GÖP KÜPST (TL)",
+                "da_total_cost": "GÖP Toplam (TL)",
+                "forecast": "Tahmin",
+                "imb_qty": "Dengesizlik (MWh)",
+                "kupsm": "KUPSM (MWh)",
+                "imb_cost": "DM (TL)",
+                "kupst_cost": "KÜPST (TL)",
+                "total_cost": "Toplam (TL)",
+                "mcp": "PTF (TL/MWh)",
+                "smp": "SMF (TL/MWh)",
+                "pos_imb_price": "PDF (TL/MWh)",
+                "neg_imb_price": "NDF (TL/MWh)",
+                "unit_pos_imb_cost": "Birim PDM (TL/MWh)",
+                "unit_neg_imb_cost": "Birim NDM (TL/MWh)",
+                "unit_kupst_cost": "Birim KÜPST (TL/MWh)",
+            }
+        )
+
+        res_d["contract_summary"] = cost_summary_by_contract_df_translated.copy()
+    else:
+        res_d["contract_summary"] = cost_summary_by_contract_df.copy()
+
+    ### Summary of summaries
+    sos_df = _summarize_portfolio_costs(costs_detail_df, cost_summary_by_contract_df)
+
     if translate:
         sos_df_translated = sos_df.rename(
             columns={
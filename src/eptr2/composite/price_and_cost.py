@@ -1,14 +1,25 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from eptr2 import EPTR2
 from eptr2.util.costs import (
     calculate_unit_kupst_cost_by_contract,
 )
-from eptr2.util.time import iso_to_contract
+from eptr2.util.time import get_utc3_now, iso_to_contract
 import pandas as pd
 
 
 logger = logging.getLogger(__name__)
 
+### Keyword arguments of get_hourly_price_and_cost_data that change the unit KUPST cost values
+KUPST_COST_PARAMS = [
+    "kupst_multiplier",
+    "kupst_floor_price",
+    "include_maintenance_penalty",
+]
+
 
 def get_hourly_price_and_cost_data(
     start_date: str,
@@ -105,16 +116,7 @@ def get_hourly_price_and_cost_data(
         if verbose:
             logger.info("Calculating unit KUPST cost...")
 
-        added_params = {
-            k: v
-            for k, v in kwargs.items()
-            if k
-            in [
-                "kupst_multiplier",
-                "kupst_floor_price",
-                "include_maintenance_penalty",
-            ]
-        }
+        added_params = {k: v for k, v in kwargs.items() if k in KUPST_COST_PARAMS}
 
         price_df["kupst_cost"] = price_df.apply(
             lambda x: calculate_unit_kupst_cost_by_contract(
@@ -168,6 +170,168 @@ def get_hourly_price_and_cost_data(
     return price_df
 
 
+_market_price_cache: OrderedDict = OrderedDict()
+_market_price_cache_lock = threading.Lock()
+_market_price_inflight: dict = {}
+_MARKET_PRICE_CACHE_MAX_ENTRIES = 32
+
+
+class MarketPriceContext:
+    """
+    Market-wide hourly price and unit cost data for a date window. MCP, SMP, imbalance prices and unit imbalance/KUPST costs do not depend on the plant, so a single context can be shared by every plant-level and portfolio-level cost calculation in the same window.
+
+    Use get_market_price_context to get a (memoized) instance instead of creating one directly.
+    """
+
+    def __init__(
+        self,
+        start_date: str,
+        end_date: str,
+        price_df: pd.DataFrame,
+        fetched_at: float | None = None,
+    ) -> None:
+        self.start_date = start_date
+        self.end_date = end_date
+        self.price_df = price_df
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def __repr__(self) -> str:
+        return f"MarketPriceContext(start_date={self.start_date!r}, end_date={self.end_date!r}, n_rows={len(self.price_df)})"
+
+    def covers(self, start_date: str, end_date: str) -> bool:
+        """
+        Checks if the context window includes the given window (dates in YYYY-MM-DD format).
+        """
+        return self.start_date <= start_date and end_date <= self.end_date
+
+    def subset(self, start_date: str, end_date: str) -> "MarketPriceContext":
+        """
+        Returns a new context limited to the given window. Returns itself if the window is the same.
+        """
+        if not self.covers(start_date, end_date):
+            raise ValueError(
+                f"Window {start_date} - {end_date} is not covered by the market price context ({self.start_date} - {self.end_date})."
+            )
+
+        if start_date == self.start_date and end_date == self.end_date:
+            return self
+
+        dates = self.price_df["date"].str[:10]
+        sub_df = self.price_df[(dates >= start_date) & (dates <= end_date)]
+
+        return MarketPriceContext(
+            start_date=start_date,
+            end_date=end_date,
+            price_df=sub_df.reset_index(drop=True),
+            fetched_at=self.fetched_at,
+        )
+
+    def get_cost_df(self, add_unit_prefix_to_cost_colnames: bool = False):
+        """
+        Returns a copy of the price and cost data in the format of get_hourly_price_and_cost_data (without WAP). If add_unit_prefix_to_cost_colnames is True, cost columns are renamed to unit_pos_imb_cost, unit_neg_imb_cost and unit_kupst_cost.
+        """
+        df = self.price_df.copy()
+        if add_unit_prefix_to_cost_colnames:
+            df.rename(
+                columns={
+                    "pos_imb_cost": "unit_pos_imb_cost",
+                    "neg_imb_cost": "unit_neg_imb_cost",
+                    "kupst_cost": "unit_kupst_cost",
+                },
+                inplace=True,
+            )
+        return df
+
+
+def get_market_price_context(
+    start_date: str,
+    end_date: str,
+    eptr: EPTR2 | None = None,
+    use_cache: bool = True,
+    max_age: float | None = 3600,
+    verbose: bool = False,
+    timeout: int = 10,
+    **kwargs,
+) -> MarketPriceContext:
+    """
+    Gets market-wide price and cost data (see get_hourly_price_and_cost_data) for a date window as a MarketPriceContext.
+
+    Windows that end before today (UTC+3) are memoized in process. If a cached context (fetched at most max_age seconds ago) covers the requested window, it is reused (sliced to the window if necessary) and no request is made. This way cost calculations for a batch of plants in the same window make a single price request. Windows that include today or later days are always fetched, since their prices may not be published completely yet. Set use_cache=False to force a new request and max_age=None to never expire cached contexts. KUPST cost parameters (kupst_multiplier, kupst_floor_price, include_maintenance_penalty) are part of the cache key.
+    """
+
+    kupst_params = {k: v for k, v in kwargs.items() if k in KUPST_COST_PARAMS}
+    cache_key = tuple(sorted(kupst_params.items()))
+    use_cache = use_cache and end_date < get_utc3_now().strftime("%Y-%m-%d")
+    window_key = (cache_key, start_date, end_date)
+
+    owner = True
+    with _market_price_cache_lock:
+        if use_cache:
+            now = time.time()
+            for (c_key, c_start, c_end), ctx in reversed(_market_price_cache.items()):
+                if c_key != cache_key or not ctx.covers(start_date, end_date):
+                    continue
+                if max_age is not None and now - ctx.fetched_at > max_age:
+                    continue
+                if verbose:
+                    logger.info(
+                        "Using cached market price data (%s - %s).", c_start, c_end
+                    )
+                return ctx.subset(start_date, end_date)
+
+            ## Concurrent callers for the same window wait for a single request
+            future = _market_price_inflight.get(window_key)
+            if future is None:
+                future = Future()
+                _market_price_inflight[window_key] = future
+            else:
+                owner = False
+
+    if not owner:
+        return future.result()
+
+    try:
+        price_df = get_hourly_price_and_cost_data(
+            start_date=start_date,
+            end_date=end_date,
+            eptr=eptr,
+            include_wap=False,
+            add_kupst_cost=True,
+            verbose=verbose,
+            include_contract_symbol=True,
+            timeout=timeout,
+            **kwargs,
+        )
+    except BaseException as e:
+        if use_cache:
+            with _market_price_cache_lock:
+                _market_price_inflight.pop(window_key, None)
+            future.set_exception(e)
+        raise
+
+    ctx = MarketPriceContext(
+        start_date=start_date, end_date=end_date, price_df=price_df
+    )
+
+    if use_cache:
+        with _market_price_cache_lock:
+            _market_price_cache[window_key] = ctx
+            while len(_market_price_cache) > _MARKET_PRICE_CACHE_MAX_ENTRIES:
+                _market_price_cache.popitem(last=False)
+            _market_price_inflight.pop(window_key, None)
+        future.set_result(ctx)
+
+    return ctx
+
+
+def clear_market_price_cache():
+    """
+    Clears the in-process market price context cache.
+    """
+    with _market_price_cache_lock:
+        _market_price_cache.clear()
+
+
 def get_hourly_imbalance_data(
     start_date: str,
     end_date: str,
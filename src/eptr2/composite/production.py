@@ -1,5 +1,8 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
 from eptr2 import EPTR2
+from eptr2.policy import get_request_timeout_kwargs
 import pandas as pd
 from eptr2.util.time import (
     get_utc3_now,
@@ -11,114 +14,249 @@ from eptr2.util.time import (
 logger = logging.getLogger(__name__)
 
 
-def get_hourly_production_data(
-    start_date: str,
-    end_date: str,
-    eptr: EPTR2 | None = None,
-    rt_pp_id: str | int | None = None,
-    uevm_pp_id: str | int | None = None,
-    verbose: bool = False,
-    include_contract_symbol: bool = True,
-    skip_uevm: bool = False,
-    skip_rt: bool = False,
-    **kwargs,
-):
-    """
-    This composite function gets production data (Gerçek Zamanlı Üretim, UEVM) and merges them.
-
-    It is also possible to enter pp_id to get the production data for a specific production plan. Example ID values are given below.
-
-    rt_pp_id=641, ## ATATÜRK HES
-    uevm_pp_id=142, ## ATATÜRK HES
-    """
+### Call keys of the production plan and production (realized) sources. Dictionary keys are also used as column suffixes.
+PRODUCTION_PLAN_SOURCES = {"kgup_v1": "kgup-v1", "kgup": "kgup", "kudup": "kudup"}
+PRODUCTION_SOURCES = {"rt": "rt-gen", "uevm": "uevm"}
 
-    if eptr is None:
-        eptr = EPTR2(dotenv_path=kwargs.get("dotenv_path", ".env"))
 
-    max_trials = kwargs.get("max_trials", 2)
-    timeout = kwargs.get("timeout", 5)
+def _get_production_retry_kwargs(**kwargs) -> dict:
     sleep_interval = kwargs.get("sleep_interval", 3)
-    retry_kwargs = {
-        "retry_attempts": max_trials,
+    return {
+        "retry_attempts": kwargs.get("max_trials", 2),
         "retry_backoff": sleep_interval,
         "retry_backoff_max": sleep_interval,
         "retry_jitter": 0.0,
     }
 
-    if rt_pp_id is None:
-        skip_rt = True
-    if uevm_pp_id is None:
-        skip_uevm = True
 
-    #### SANITY CHECKS ####
-    if skip_rt and skip_uevm:
-        raise ValueError("Both skip_rt and skip_uevm cannot be True.")
+def _gather_frames(
+    jobs: dict[str, Callable[[], pd.DataFrame]], max_workers: int | None = None
+) -> dict[str, pd.DataFrame]:
+    """
+    Runs independent data gathering jobs concurrently and returns the resulting frames with the same keys. If max_workers is 1, jobs are run sequentially in the given order.
+    """
 
-    #### REAL TIME GENERATION PHASE ####
-    if skip_rt:
-        rt_included = False
-        rt_gen_df = pd.DataFrame()
+    if max_workers is None:
+        max_workers = len(jobs)
 
-    else:
-        rt_included = True
+    if max_workers <= 1 or len(jobs) <= 1:
+        return {k: job() for k, job in jobs.items()}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        futures = {k: executor.submit(job) for k, job in jobs.items()}
+        return {k: future.result() for k, future in futures.items()}
+
+
+def _fetch_production_plan_frame(
+    eptr: EPTR2,
+    source: str,
+    start_date: str,
+    end_date: str,
+    org_id: str | None = None,
+    uevcb_id: str | None = None,
+    verbose: bool = False,
+    timeout: int = 5,
+    retry_kwargs: dict | None = None,
+) -> pd.DataFrame:
+    label = source.upper().replace("_", " ")
+    if verbose:
+        logger.info("Loading %s...", label)
+
+    df: pd.DataFrame = eptr.call(
+        PRODUCTION_PLAN_SOURCES[source],
+        start_date=start_date,
+        end_date=end_date,
+        org_id=org_id,
+        uevcb_id=uevcb_id,
+        request_kwargs={"timeout": timeout},
+        **(retry_kwargs or {}),
+    )
+
+    if df.empty:
+        logger.info("No data (%s) is available for this date range.", label)
+        return df
+
+    df.columns = [
+        x + f"_{source}" if x not in ["date", "time"] else x for x in df.columns
+    ]
+
+    return df
+
+
+def _fetch_production_frame(
+    eptr: EPTR2,
+    source: str,
+    start_date: str,
+    end_date: str,
+    pp_id: str | int,
+    verbose: bool = False,
+    timeout: int = 5,
+    retry_kwargs: dict | None = None,
+) -> pd.DataFrame:
+    if verbose:
+        logger.info(
+            "Loading %s data...",
+            "real time production" if source == "rt" else source.upper(),
+        )
+
+    df: pd.DataFrame = eptr.call(
+        PRODUCTION_SOURCES[source],
+        start_date=start_date,
+        end_date=end_date,
+        pp_id=pp_id,
+        request_kwargs={"timeout": timeout},
+        **(retry_kwargs or {}),
+    )
+
+    if source == "rt" and df.empty:
+        raise ValueError("No data (production) is available for this date range.")
+
+    try:
+        df.drop("hour", axis=1, inplace=True)
+    except Exception as e:
+        if source == "uevm":
+            within_settlement = check_date_for_settlement(x=end_date)
+            if not within_settlement:
+                logger.warning("The end date may not be within the settlement period.")
         if verbose:
-            logger.info("Loading real time production data...")
-
-        rt_gen_df: pd.DataFrame = eptr.call(
-            "rt-gen",
-            start_date=start_date,
-            end_date=end_date,
-            pp_id=rt_pp_id,
-            request_kwargs={"timeout": timeout},
-            **retry_kwargs,
+            logger.info("%s", e)
+
+    df.columns = [x + f"_{source}" if x not in ["date"] else x for x in df.columns]
+
+    return df
+
+
+def _production_plan_jobs(
+    eptr: EPTR2,
+    start_date: str,
+    end_date: str,
+    org_id: str | None,
+    uevcb_id: str | None,
+    skip_d: dict[str, bool],
+    verbose: bool = False,
+    **kwargs,
+) -> dict[str, Callable[[], pd.DataFrame]]:
+    if all(skip_d.values()):
+        raise ValueError(
+            "At least one of skip_kgup, skip_kgupv1, or skip_kudup must be False."
         )
 
-        if rt_gen_df.empty:
-            raise ValueError("No data (production) is available for this date range.")
+    if uevcb_id is not None and not skip_d["kudup"]:
+        if org_id is None:
+            raise ValueError(
+                "org_id is required if uevcb_id is specified. Either provide org_id or set skip_kudup=True."
+            )
 
-        try:
-            rt_gen_df.drop("hour", axis=1, inplace=True)
-        except Exception as e:
-            if verbose:
-                logger.info("%s", e)
+    job_kwargs = {
+        "eptr": eptr,
+        "start_date": start_date,
+        "end_date": end_date,
+        "org_id": org_id,
+        "uevcb_id": uevcb_id,
+        "verbose": verbose,
+        "timeout": kwargs.get("timeout", 5),
+        "retry_kwargs": _get_production_retry_kwargs(**kwargs),
+    }
 
-        rt_gen_df.columns = [
-            x + "_rt" if x not in ["date"] else x for x in rt_gen_df.columns
-        ]
+    return {
+        source: (
+            lambda source=source: _fetch_production_plan_frame(
+                source=source, **job_kwargs
+            )
+        )
+        for source in PRODUCTION_PLAN_SOURCES
+        if not skip_d[source]
+    }
 
-    #### UEVM PHASE ####
-    if skip_uevm:
-        uevm_included = False
-        uevm_df = pd.DataFrame()
 
-    else:
-        uevm_included = True
-        if verbose:
-            logger.info("Loading UEVM data...")
-
-        uevm_df: pd.DataFrame = eptr.call(
-            "uevm",
-            start_date=start_date,
-            end_date=end_date,
-            pp_id=uevm_pp_id,
-            request_kwargs={"timeout": timeout},
-            **retry_kwargs,
+def _production_jobs(
+    eptr: EPTR2,
+    start_date: str,
+    end_date: str,
+    pp_id_d: dict[str, str | int | None],
+    skip_d: dict[str, bool],
+    verbose: bool = False,
+    **kwargs,
+) -> dict[str, Callable[[], pd.DataFrame]]:
+    skip_d = {k: v or pp_id_d[k] is None for k, v in skip_d.items()}
+
+    if all(skip_d.values()):
+        raise ValueError("Both skip_rt and skip_uevm cannot be True.")
+
+    job_kwargs = {
+        "eptr": eptr,
+        "start_date": start_date,
+        "end_date": end_date,
+        "verbose": verbose,
+        "timeout": kwargs.get("timeout", 5),
+        "retry_kwargs": _get_production_retry_kwargs(**kwargs),
+    }
+
+    return {
+        source: (
+            lambda source=source: _fetch_production_frame(
+                source=source, pp_id=pp_id_d[source], **job_kwargs
+            )
         )
+        for source in PRODUCTION_SOURCES
+        if not skip_d[source]
+    }
 
+
+def _merge_production_plan_frames(
+    frames: dict[str, pd.DataFrame],
+    include_contract_symbol: bool = True,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    if verbose:
+        logger.info("Merging dataframes...")
+
+    merged_df = None
+    for source in PRODUCTION_PLAN_SOURCES:
+        df = frames.get(source)
+        if df is None or df.empty:
+            continue
+        if merged_df is None:
+            merged_df = df.copy()
+        else:
+            merged_df = merged_df.merge(df, on=["date", "time"], how="outer")
+
+    if merged_df is None:
+        raise ValueError("No production plan data is available for this date range.")
+
+    ### Column reordering and contract addition
+    if include_contract_symbol:
         try:
-            uevm_df.drop("hour", axis=1, inplace=True)
+            merged_df["contract"] = merged_df["date"].apply(
+                lambda x: iso_to_contract(x)
+            )
         except Exception as e:
-            within_settlement = check_date_for_settlement(x=end_date)
-            if not within_settlement:
-                logger.warning("The end date may not be within the settlement period.")
-            if verbose:
-                logger.info("%s", e)
+            logger.warning("Contract information could not be added. Error: %s", e)
+
+    merged_df = merged_df.rename(columns={"date": "dt"})
+
+    col_order = (
+        ["dt", "time"] + ["contract"]
+        if include_contract_symbol
+        else [] + [x for x in merged_df.columns if x.startswith("toplam")]
+    )
+
+    merged_df = merged_df[
+        col_order + [x for x in merged_df.columns if x not in col_order]
+    ]
+
+    return merged_df
+
 
-        uevm_df.columns = [
-            x + "_uevm" if x not in ["date"] else x for x in uevm_df.columns
-        ]
+def _merge_production_frames(
+    frames: dict[str, pd.DataFrame],
+    include_contract_symbol: bool = True,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    rt_gen_df = frames.get("rt")
+    uevm_df = frames.get("uevm")
 
-    if uevm_included and rt_included:
+    if rt_gen_df is not None and uevm_df is not None:
         if verbose:
             logger.info("Merging data...")
 
@@ -126,9 +264,9 @@ def get_hourly_production_data(
             merged_df = rt_gen_df.copy()
         else:
             merged_df = rt_gen_df.merge(uevm_df, how="left", on=["date"])
-    elif uevm_included:
+    elif uevm_df is not None:
         merged_df = uevm_df.copy()
-    elif rt_included:
+    else:
         merged_df = rt_gen_df.copy()
 
     if include_contract_symbol:
@@ -144,6 +282,47 @@ def get_hourly_production_data(
     return merged_df
 
 
+def get_hourly_production_data(
+    start_date: str,
+    end_date: str,
+    eptr: EPTR2 | None = None,
+    rt_pp_id: str | int | None = None,
+    uevm_pp_id: str | int | None = None,
+    verbose: bool = False,
+    include_contract_symbol: bool = True,
+    skip_uevm: bool = False,
+    skip_rt: bool = False,
+    **kwargs,
+):
+    """
+    This composite function gets production data (Gerçek Zamanlı Üretim, UEVM) and merges them. Both calls are made concurrently (set max_workers=1 to make them sequentially).
+
+    It is also possible to enter pp_id to get the production data for a specific production plan. Example ID values are given below.
+
+    rt_pp_id=641, ## ATATÜRK HES
+    uevm_pp_id=142, ## ATATÜRK HES
+    """
+
+    if eptr is None:
+        eptr = EPTR2(dotenv_path=kwargs.get("dotenv_path", ".env"))
+
+    jobs = _production_jobs(
+        eptr=eptr,
+        start_date=start_date,
+        end_date=end_date,
+        pp_id_d={"rt": rt_pp_id, "uevm": uevm_pp_id},
+        skip_d={"rt": skip_rt, "uevm": skip_uevm},
+        verbose=verbose,
+        **kwargs,
+    )
+
+    frames = _gather_frames(jobs, max_workers=kwargs.get("max_workers", None))
+
+    return _merge_production_frames(
+        frames, include_contract_symbol=include_contract_symbol, verbose=verbose
+    )
+
+
 def get_hourly_production_plan_data(
     start_date: str,
     end_date: str,
@@ -158,7 +337,7 @@ def get_hourly_production_plan_data(
     **kwargs,
 ):
     """
-    This composite function gets KGUP v1, KGUP and KUDUP data and merges them.
+    This composite function gets KGUP v1, KGUP and KUDUP data and merges them. Calls are made concurrently (set max_workers=1 to make them sequentially).
 
     It is also possible to enter org_id to get the total production plan for a specific organization. If uevcb_id is also added with org_id, it will get the production plan for a specific uevcb. Example ID values are given below.
 
@@ -169,129 +348,22 @@ def get_hourly_production_plan_data(
     if eptr is None:
         eptr = EPTR2(dotenv_path=kwargs.get("dotenv_path", ".env"))
 
-    max_trials = kwargs.get("max_trials", 2)
-    timeout = kwargs.get("timeout", 5)
-    retry_kwargs = {
-        "retry_attempts": max_trials,
-        "retry_backoff": kwargs.get("sleep_interval", 3),
-        "retry_backoff_max": kwargs.get("sleep_interval", 3),
-        "retry_jitter": 0.0,
-    }
-
-    if all([skip_kgup_v1, skip_kgup, skip_kudup]):
-        raise ValueError(
-            "At least one of skip_kgup, skip_kgupv1, or skip_kudup must be False."
-        )
-
-    if uevcb_id is not None and not skip_kudup:
-        if org_id is None:
-            raise ValueError(
-                "org_id is required if uevcb_id is specified. Either provide org_id or set skip_kudup=True."
-            )
-
-    if not skip_kgup_v1:
-        if verbose:
-            logger.info("Loading KGUP v1...")
-
-        kgup_v1_df: pd.DataFrame = eptr.call(
-            "kgup-v1",
-            start_date=start_date,
-            end_date=end_date,
-            org_id=org_id,
-            uevcb_id=uevcb_id,
-            request_kwargs={"timeout": timeout},
-            **retry_kwargs,
-        )
-
-        if kgup_v1_df.empty:
-            skip_kgup_v1 = True
-            logger.info("No data (KGUP v1) is available for this date range.")
-        else:
-            kgup_v1_df.columns = [
-                x + "_kgup_v1" if x not in ["date", "time"] else x
-                for x in kgup_v1_df.columns
-            ]
-
-    if not skip_kgup:
-        if verbose:
-            logger.info("Loading KGUP...")
-
-        kgup_df: pd.DataFrame = eptr.call(
-            "kgup",
-            start_date=start_date,
-            end_date=end_date,
-            org_id=org_id,
-            uevcb_id=uevcb_id,
-            request_kwargs={"timeout": timeout},
-            **retry_kwargs,
-        )
-        if kgup_df.empty:
-            skip_kgup = True
-            logger.info("No data (KGUP) is available for this date range.")
-        else:
-            kgup_df.columns = [
-                x + "_kgup" if x not in ["date", "time"] else x for x in kgup_df.columns
-            ]
-
-    if not skip_kudup:
-        if verbose:
-            logger.info("Loading KUDUP...")
-
-        kudup_df: pd.DataFrame = eptr.call(
-            "kudup",
-            start_date=start_date,
-            end_date=end_date,
-            org_id=org_id,
-            uevcb_id=uevcb_id,
-            request_kwargs={"timeout": timeout},
-            **retry_kwargs,
-        )
-
-        if kudup_df.empty:
-            skip_kudup = True
-            logger.info("No data (KUDUP) is available for this date range.")
-        else:
-            kudup_df.columns = [
-                x + "_kudup" if x not in ["date", "time"] else x
-                for x in kudup_df.columns
-            ]
-
-    #### MERGE PHASE ####
-    if verbose:
-        logger.info("Merging dataframes...")
-
-    merged_df = None
-    for _ in ["kgup_v1", "kgup", "kudup"]:
-        if not eval(f"skip_{_}"):
-            if merged_df is None:
-                merged_df: pd.DataFrame = eval(f"{_}_df").copy()
-            else:
-                merged_df = merged_df.merge(
-                    eval(f"{_}_df"), on=["date", "time"], how="outer"
-                )
-
-    ### Column reordering and contract addition
-    if include_contract_symbol:
-        try:
-            merged_df["contract"] = merged_df["date"].apply(
-                lambda x: iso_to_contract(x)
-            )
-        except Exception as e:
-            logger.warning("Contract information could not be added. Error: %s", e)
-
-    merged_df = merged_df.rename(columns={"date": "dt"})
-
-    col_order = (
-        ["dt", "time"] + ["contract"]
-        if include_contract_symbol
-        else [] + [x for x in merged_df.columns if x.startswith("toplam")]
+    jobs = _production_plan_jobs(
+        eptr=eptr,
+        start_date=start_date,
+        end_date=end_date,
+        org_id=org_id,
+        uevcb_id=uevcb_id,
+        skip_d={"kgup_v1": skip_kgup_v1, "kgup": skip_kgup, "kudup": skip_kudup},
+        verbose=verbose,
+        **kwargs,
     )
 
-    merged_df = merged_df[
-        col_order + [x for x in merged_df.columns if x not in col_order]
-    ]
+    frames = _gather_frames(jobs, max_workers=kwargs.get("max_workers", None))
 
-    return merged_df
+    return _merge_production_plan_frames(
+        frames, include_contract_symbol=include_contract_symbol, verbose=verbose
+    )
 
 
 def wrapper_hourly_production_plan_and_realized(
@@ -306,38 +378,64 @@ def wrapper_hourly_production_plan_and_realized(
     include_contract_symbol: bool = True,
     **kwargs,
 ):
+    """
+    This composite function gets production plan (KGUP v1, KGUP, KUDUP) and production (real time generation, UEVM) data and merges them.
+
+    All calls are independent, so they are dispatched concurrently and the total latency is roughly that of the slowest call. Set max_workers=1 to make the calls sequentially. Individual sources can be skipped with skip_kgup_v1, skip_kgup, skip_kudup, skip_rt and skip_uevm keyword arguments.
+    """
     if eptr is None:
         eptr = EPTR2(dotenv_path=kwargs.get("dotenv_path", ".env"))
 
-    if verbose:
-        logger.info("Loading production plan data...")
+    plan_skip_d = {
+        source: kwargs.pop(f"skip_{source}", False)
+        for source in PRODUCTION_PLAN_SOURCES
+    }
+    production_skip_d = {
+        source: kwargs.pop(f"skip_{source}", False) for source in PRODUCTION_SOURCES
+    }
 
-    plan_df = get_hourly_production_plan_data(
+    plan_jobs = _production_plan_jobs(
+        eptr=eptr,
         start_date=start_date,
         end_date=end_date,
-        eptr=eptr,
         org_id=org_id,
         uevcb_id=uevcb_id,
+        skip_d=plan_skip_d,
         verbose=verbose,
-        include_contract_symbol=include_contract_symbol,
         **kwargs,
     )
 
-    if verbose:
-        logger.info("Loading production realizations data...")
-
-    realized_df = get_hourly_production_data(
+    production_jobs = _production_jobs(
+        eptr=eptr,
         start_date=start_date,
         end_date=end_date,
-        eptr=eptr,
-        rt_pp_id=rt_pp_id,
-        uevm_pp_id=uevm_pp_id,
-        skip_uevm=uevm_pp_id is None,
+        pp_id_d={"rt": rt_pp_id, "uevm": uevm_pp_id},
+        skip_d=production_skip_d,
         verbose=verbose,
-        include_contract_symbol=include_contract_symbol,
         **kwargs,
     )
 
+    if verbose:
+        logger.info("Loading production plan and production realizations data...")
+
+    ### Job keys are unique across plan and production sources
+    frames = _gather_frames(
+        {**plan_jobs, **production_jobs},
+        max_workers=kwargs.get("max_workers", None),
+    )
+
+    plan_df = _merge_production_plan_frames(
+        {k: v for k, v in frames.items() if k in PRODUCTION_PLAN_SOURCES},
+        include_contract_symbol=include_contract_symbol,
+        verbose=verbose,
+    )
+
+    realized_df = _merge_production_frames(
+        {k: v for k, v in frames.items() if k in PRODUCTION_SOURCES},
+        include_contract_symbol=include_contract_symbol,
+        verbose=verbose,
+    )
+
     merged_df = plan_df.merge(
         realized_df,
         how="outer",
@@ -405,7 +503,7 @@ def get_kgup_bulk_range(
                 "dpp-bulk",
                 date=date_str,
                 uevcb_ids=uevcb_ids,
-                request_kwargs={"timeout": 5},
+                **get_request_timeout_kwargs(eptr, 5),
             )
             if df.empty:
                 logger.info("No data found for %s. Skipping...", date_str)
@@ -492,7 +590,7 @@ def get_dpp_bulk_range(
                 "rt-gen-bulk",
                 date=date_str,
                 pp_ids=pp_ids,
-                request_kwargs={"timeout": 10},
+                **get_request_timeout_kwargs(eptr, 10),
             )
             if df.empty:
                 logger.info("No data found for %s. Skipping...", date_str)
@@ -0,0 +1,357 @@
+"""
+Renewables (YEKDEM) series of a date window in one table.
+
+get_renewables_data fetches the YEKDEM generation, injection, cost and income series and the
+wind forecast concurrently, one call per source and month, and aligns them on hourly or
+monthly keys with float64 columns. With a RenewablesStore, months are cached by source and
+months that are settled (settle_days after the month end) are never fetched again, so
+reruns of a monthly YEKDEM reconciliation are served from the store.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from eptr2 import EPTR2
+from eptr2.util.store import (
+    read_json_gz,
+    select_sources,
+    split_months,
+    to_date,
+    write_json_gz,
+)
+from eptr2.util.time import get_utc3_now
+
+logger = logging.getLogger(__name__)
+
+RENEWABLES_STORE_VERSION = 1
+
+### Renewables sources of get_renewables_data. freq is the resolution of the series:
+### monthly series are repeated on the hours of their month in hourly tables. agg
+### aggregates rows of a key: hours of a month in monthly tables, or versions of a month
+### ("last", rows are sorted by version) for monthly series.
+### A month is settled settle_days after its end and is not fetched again afterwards.
+RENEWABLES_SOURCES = {
+    "rt_gen": {"key": "ren-rt-gen", "freq": "hourly", "agg": "sum", "settle_days": 60},
+    "uevm": {"key": "ren-uevm", "freq": "hourly", "agg": "sum", "settle_days": 60},
+    "ul_gen": {"key": "ren-ul-gen", "freq": "hourly", "agg": "sum", "settle_days": 60},
+    "lic_cost": {
+        "key": "ren-lic-cost",
+        "freq": "hourly",
+        "agg": "sum",
+        "settle_days": 60,
+    },
+    "income": {
+        "key": "ren-income",
+        "freq": "monthly",
+        "agg": "last",
+        "settle_days": 60,
+    },
+    "total_cost": {
+        "key": "ren-total-cost",
+        "freq": "monthly",
+        "agg": "last",
+        "settle_days": 60,
+    },
+    "unit_cost": {
+        "key": "ren-unit-cost",
+        "freq": "monthly",
+        "agg": "last",
+        "settle_days": 60,
+    },
+    "wind_forecast": {
+        "key": "wind-forecast",
+        "freq": "hourly",
+        "agg": "mean",
+        "settle_days": 1,
+    },
+}
+
+### YEKDEM sources of get_yekdem_monthly
+YEKDEM_SOURCES = [
+    "rt_gen",
+    "uevm",
+    "ul_gen",
+    "lic_cost",
+    "income",
+    "total_cost",
+    "unit_cost",
+]
+
+### Candidate date columns of renewables responses, in order of preference
+RENEWABLES_DATE_COLUMNS = ["date", "period", "month", "effectiveDate"]
+
+
+def _get_specs(sources: list[str] | dict | None) -> dict:
+    return select_sources(sources, RENEWABLES_SOURCES, "renewables")
+
+
+def _typed(df: pd.DataFrame | None) -> pd.DataFrame:
+    """
+    Rows of a response with a tz-aware (Europe/Istanbul) hour column and float64 values.
+    Non-numeric columns are dropped.
+    """
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=["hour"])
+    col = next((x for x in RENEWABLES_DATE_COLUMNS if x in df.columns), None)
+    if col is None:
+        raise ValueError(
+            f"No date column ({', '.join(RENEWABLES_DATE_COLUMNS)}) in the response."
+        )
+    values = df.drop(
+        columns=[x for x in [*RENEWABLES_DATE_COLUMNS, "hour"] if x in df.columns]
+    )
+    values = values.apply(pd.to_numeric, errors="coerce").dropna(axis=1, how="all")
+    values = values.astype("float64")
+    hour = pd.to_datetime(df[col].astype(str), utc=True, format="ISO8601")
+    values.insert(0, "hour", hour.dt.tz_convert("Europe/Istanbul").dt.floor("h"))
+    return values.reset_index(drop=True)
+
+
+class RenewablesStore:
+    """
+    Local store of renewables source rows by month.
+
+    Parameters:
+        directory: Directory of the gzip compressed source files (<source>.json.gz). None
+            keeps them in memory only.
+
+    Each month of a source is stored with its rows and whether it was settled when it was
+    fetched. Settled months are final; the others are fetched again on every call.
+
+    Example:
+        >>> store = RenewablesStore("data/renewables")
+        >>> df = get_yekdem_monthly("2023-01", "2024-12", store=store, eptr=eptr)
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._sources: dict[str, dict] = {}
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, source: str) -> str:
+        return os.path.join(self.directory, f"{source}.json.gz")
+
+    def _load(self, source: str) -> dict:
+        if source not in self._sources:
+            d = None
+            if self.directory is not None and os.path.exists(self._path(source)):
+                d = read_json_gz(
+                    self._path(source), RENEWABLES_STORE_VERSION, "renewables store"
+                )
+            self._sources[source] = d or {
+                "version": RENEWABLES_STORE_VERSION,
+                "source": source,
+                "months": {},
+            }
+        return self._sources[source]
+
+    def settled_months(self, source: str) -> list[str]:
+        """Stored settled months (YYYY-MM) of a source."""
+        months = self._load(source)["months"]
+        return sorted(k for k, v in months.items() if v["settled"])
+
+    def get(self, source: str, month: str) -> pd.DataFrame | None:
+        """Stored rows of a source month (YYYY-MM) or None."""
+        m = self._load(source)["months"].get(month)
+        if m is None:
+            return None
+        return pd.DataFrame(m["records"])
+
+    def put(self, sources_months: list[tuple[str, str, pd.DataFrame, bool]]) -> None:
+        """Stores (source, month, rows, settled) tuples and saves the changed sources."""
+        changed = set()
+        for source, month, df, settled in sources_months:
+            records = json.loads(df.to_json(orient="records", force_ascii=False))
+            self._load(source)["months"][month] = {
+                "settled": settled,
+                "fetched_at": time.time(),
+                "records": records,
+            }
+            changed.add(source)
+
+        if self.directory is None:
+            return
+        for source in changed:
+            write_json_gz(self._path(source), self._sources[source])
+
+
+def _is_settled(m_end: date, settle_days: int) -> bool:
+    return m_end + timedelta(days=settle_days) < get_utc3_now().date()
+
+
+def _fetch_months(
+    specs: dict,
+    months: list[tuple[date, date]],
+    eptr: EPTR2,
+    store: RenewablesStore | None,
+    max_workers: int | None,
+) -> dict:
+    """Typed rows of each source, from the store or one call per source and month."""
+    plans = []
+    rows = {source: [] for source in specs}
+    for source in specs:
+        settled = set(store.settled_months(source)) if store is not None else set()
+        for m_start, m_end in months:
+            month = m_start.strftime("%Y-%m")
+            if month in settled:
+                rows[source].append(store.get(source, month))
+                continue
+            plans.append((source, month, m_end))
+
+    results = eptr.call_many(
+        [
+            {
+                "key": specs[source]["key"],
+                "start_date": f"{month}-01",
+                "end_date": m_end.isoformat(),
+            }
+            for source, month, m_end in plans
+        ],
+        max_workers=max_workers,
+    )
+
+    fetched = []
+    for (source, month, m_end), res in zip(plans, results):
+        res = res if isinstance(res, pd.DataFrame) else pd.DataFrame(res)
+        rows[source].append(res)
+        settled = _is_settled(m_end, specs[source].get("settle_days", 60))
+        fetched.append((source, month, res, settled))
+    if store is not None and fetched:
+        store.put(fetched)
+
+    logger.info(
+        "Renewables: %d calls, %d source months from the store.",
+        len(plans),
+        len(specs) * len(months) - len(plans),
+    )
+    return {
+        source: _typed(
+            pd.concat([x for x in parts if x is not None], ignore_index=True)
+        )
+        if parts
+        else _typed(None)
+        for source, parts in rows.items()
+    }
+
+
+def _aggregate(df: pd.DataFrame, key: pd.Series, agg: str) -> pd.DataFrame:
+    values = df.drop(columns=["hour"])
+    values.index = pd.DatetimeIndex(key)
+    values.index.name = None
+    return values.groupby(level=0, sort=True).agg(agg)
+
+
+def get_renewables_data(
+    start_date: str,
+    end_date: str,
+    sources: list[str] | dict | None = None,
+    freq: str = "hourly",
+    eptr: EPTR2 | None = None,
+    store: RenewablesStore | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Fetches renewables (YEKDEM) sources between start_date and end_date concurrently and
+    aligns them into one table.
+
+    Args:
+        start_date, end_date: Dates in YYYY-MM-DD format.
+        sources: Source names of RENEWABLES_SOURCES or a dictionary of source specs in the
+            same format. Default: all RENEWABLES_SOURCES.
+        freq: "hourly" (a row per hour, monthly series repeated on the hours of their
+            month) or "monthly" (a row per month, hourly series aggregated with the agg of
+            the source spec).
+        eptr: EPTR2 client. Created if not given.
+        store: RenewablesStore. If given, settled months are read from it and the other
+            months are fetched and stored.
+        max_workers: Number of concurrent calls (see EPTR2.call_many).
+
+    Returns a DataFrame indexed by hour (Europe/Istanbul) or month start with float64
+    <source>_<field> columns.
+
+    Example:
+        >>> df = get_renewables_data(
+        ...     "2024-01-01", "2024-03-31", sources=["rt_gen", "unit_cost"], eptr=eptr
+        ... )
+    """
+    if freq not in ["hourly", "monthly"]:
+        raise ValueError("freq should be 'hourly' or 'monthly'.")
+    specs = _get_specs(sources)
+    if eptr is None:
+        eptr = EPTR2()
+
+    months = split_months(start_date, end_date, full_months=True)
+    frames = _fetch_months(specs, months, eptr, store, kwargs.get("max_workers", None))
+
+    start = pd.Timestamp(start_date, tz="Europe/Istanbul")
+    end = pd.Timestamp(end_date, tz="Europe/Istanbul") + pd.Timedelta(hours=23)
+    if freq == "hourly":
+        index = pd.date_range(start, end, freq="h", name="hour")
+    else:
+        index = pd.DatetimeIndex(
+            [pd.Timestamp(m_start, tz="Europe/Istanbul") for m_start, _ in months],
+            name="month",
+        )
+
+    first_month = pd.Timestamp(months[0][0], tz="Europe/Istanbul")
+    table = pd.DataFrame(index=index)
+    for source, df in frames.items():
+        if len(df) == 0:
+            continue
+        ## Monthly rows are dated at the month start, possibly before start_date
+        df = df[(df["hour"] >= first_month) & (df["hour"] <= end)]
+        if "version" in df.columns:
+            df = df.sort_values(["hour", "version"], kind="stable")
+        month_key = df["hour"].dt.tz_localize(None).dt.to_period("M").dt.start_time
+        month_key = month_key.dt.tz_localize("Europe/Istanbul")
+        agg = specs[source].get("agg", "last")
+        if freq == "monthly":
+            values = _aggregate(df, month_key, agg)
+        elif specs[source].get("freq", "hourly") == "monthly":
+            values = _aggregate(df, month_key, agg)
+            hour_month = index.tz_localize(None).to_period("M").start_time
+            values = values.reindex(hour_month.tz_localize("Europe/Istanbul"))
+            values.index = index
+        else:
+            values = _aggregate(df, df["hour"], agg)
+        values.columns = [f"{source}_{x}" for x in values.columns]
+        table = table.join(values, how="left")
+
+    return table
+
+
+def get_yekdem_monthly(
+    start_month: str,
+    end_month: str | None = None,
+    eptr: EPTR2 | None = None,
+    store: RenewablesStore | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Monthly YEKDEM table of generation, injection, costs, income and unit cost for the
+    months between start_month and end_month (YYYY-MM), in one call. With a
+    RenewablesStore, settled months are served from the store on reruns.
+
+    Example:
+        >>> store = RenewablesStore("data/renewables")
+        >>> df = get_yekdem_monthly("2024-01", "2024-06", store=store, eptr=eptr)
+    """
+    end_month = end_month or start_month
+    m_start = to_date(f"{start_month[:7]}-01")
+    m_end = split_months(m_start, f"{end_month[:7]}-01", full_months=True)[-1][1]
+    return get_renewables_data(
+        m_start.isoformat(),
+        m_end.isoformat(),
+        sources=kwargs.get("sources", YEKDEM_SOURCES),
+        freq="monthly",
+        eptr=eptr,
+        store=store,
+        max_workers=kwargs.get("max_workers", None),
+    )
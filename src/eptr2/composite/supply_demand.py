@@ -0,0 +1,309 @@
+"""
+Hourly DAM supply-demand curves in contiguous arrays.
+
+The supply-demand endpoint returns the aggregate curve of a single hour. SupplyDemandCurves
+keeps the curves of many hours in one price, one demand and one supply array, with the
+curve of hour i at offsets[i]:offsets[i + 1], so that clearing prices and price impacts of
+quantity shifts are computed for all hours at once.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from eptr2 import EPTR2
+
+logger = logging.getLogger(__name__)
+
+SUPPLY_DEMAND_VERSION = 1
+
+
+def _segment_ids(offsets: np.ndarray) -> np.ndarray:
+    """Hour index of every point of the flat arrays."""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+class SupplyDemandCurves:
+    """
+    Hourly supply-demand curves stored in contiguous arrays.
+
+    Parameters:
+        hours: Hour labels (ISO date times), one per curve.
+        offsets: Start of each curve in the flat arrays (len(hours) + 1 values).
+        price, demand, supply: Flat arrays of price steps and the demand and supply
+            quantities at them. Prices are ascending within each curve.
+
+    Curves are linear between price steps. Use get_supply_demand_curves to fetch them or
+    from_frames to build them from DataFrames.
+
+    Example:
+        >>> curves = get_supply_demand_curves("2024-07-01", "2024-07-31", eptr=eptr)
+        >>> curves.price_impact(500, side="demand")  ## MCP impact of +500 MW demand
+    """
+
+    def __init__(
+        self,
+        hours,
+        offsets: np.ndarray,
+        price: np.ndarray,
+        demand: np.ndarray,
+        supply: np.ndarray,
+    ):
+        self.hours = np.asarray(hours, dtype=str)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.price = np.ascontiguousarray(price, dtype=np.float64)
+        self.demand = np.ascontiguousarray(demand, dtype=np.float64)
+        self.supply = np.ascontiguousarray(supply, dtype=np.float64)
+
+        if len(self.offsets) != len(self.hours) + 1 or self.offsets[-1] != len(
+            self.price
+        ):
+            raise ValueError(
+                "offsets should have len(hours) + 1 values ending at len(price)."
+            )
+        if not (len(self.price) == len(self.demand) == len(self.supply)):
+            raise ValueError("price, demand and supply should have the same length.")
+
+        self._segments = _segment_ids(self.offsets)
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: dict,
+        price_col: str = "price",
+        demand_col: str = "demand",
+        supply_col: str = "supply",
+    ) -> "SupplyDemandCurves":
+        """Builds curves from a dictionary of hour labels and supply-demand DataFrames."""
+        hours = list(frames)
+        lengths = [0 if frames[h] is None else len(frames[h]) for h in hours]
+        offsets = np.zeros(len(hours) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        price = np.empty(offsets[-1], dtype=np.float64)
+        demand = np.empty(offsets[-1], dtype=np.float64)
+        supply = np.empty(offsets[-1], dtype=np.float64)
+        for i, h in enumerate(hours):
+            if lengths[i] == 0:
+                continue
+            df = frames[h]
+            p = df[price_col].to_numpy(dtype=np.float64)
+            order = np.argsort(p, kind="stable")
+            s = slice(offsets[i], offsets[i + 1])
+            price[s] = p[order]
+            demand[s] = df[demand_col].to_numpy(dtype=np.float64)[order]
+            supply[s] = df[supply_col].to_numpy(dtype=np.float64)[order]
+
+        return cls(hours, offsets, price, demand, supply)
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of price steps of each curve."""
+        return np.diff(self.offsets)
+
+    def get_curve(self, hour: int | str) -> pd.DataFrame:
+        """Curve of an hour (index or label) as a DataFrame of price, demand and supply."""
+        i = hour if isinstance(hour, (int, np.integer)) else self._hour_index(hour)
+        s = slice(self.offsets[i], self.offsets[i + 1])
+        return pd.DataFrame(
+            {
+                "price": self.price[s],
+                "demand": self.demand[s],
+                "supply": self.supply[s],
+            }
+        )
+
+    def _hour_index(self, hour: str) -> int:
+        idx = np.flatnonzero(self.hours == hour)
+        if len(idx) == 0:
+            raise KeyError(hour)
+        return int(idx[0])
+
+    def to_frame(self) -> pd.DataFrame:
+        """All curves in a long DataFrame with an hour column."""
+        return pd.DataFrame(
+            {
+                "hour": self.hours[self._segments],
+                "price": self.price,
+                "demand": self.demand,
+                "supply": self.supply,
+            }
+        )
+
+    def _per_hour(self, x) -> np.ndarray:
+        """Scalar or per-hour values as a per-point array."""
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 0:
+            return np.full(len(self.price), float(x))
+        if len(x) != len(self):
+            raise ValueError("Per-hour values should have one value per hour.")
+        return x[self._segments]
+
+    def clearing_price(self, demand_shift=0.0, supply_shift=0.0) -> np.ndarray:
+        """
+        Price where demand + demand_shift meets supply + supply_shift in each hour.
+
+        Shifts are price-independent quantities (MWh), scalars or one value per hour. If
+        supply exceeds demand at the lowest price step the lowest price is returned, if
+        demand exceeds supply at the highest price step the highest price is returned.
+        Hours without a curve are NaN.
+        """
+        n = len(self)
+        result = np.full(n, np.nan)
+        if len(self.price) == 0:
+            return result
+
+        excess = (
+            self.demand
+            + self._per_hour(demand_shift)
+            - self.supply
+            - self._per_hour(supply_shift)
+        )
+        idx = np.arange(len(self.price))
+        nonempty = np.flatnonzero(self.lengths > 0)
+        starts = self.offsets[nonempty]
+        ends = self.offsets[nonempty + 1]
+
+        ## First point of each curve where supply covers demand
+        first = np.minimum.reduceat(np.where(excess <= 0, idx, len(idx)), starts)
+        first = np.where(first < ends, first, ends)
+
+        at_start = first == starts
+        at_end = first == ends
+        k = np.clip(first, starts + 1, ends - 1)
+        p0, p1 = self.price[k - 1], self.price[k]
+        e0, e1 = excess[k - 1], excess[k]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p = np.where(e0 != e1, p0 + (p1 - p0) * e0 / (e0 - e1), p1)
+
+        p = np.where(at_start, self.price[starts], p)
+        p = np.where(at_end, self.price[ends - 1], p)
+        result[nonempty] = p
+        return result
+
+    def quantity_at(self, price, side: str = "demand") -> np.ndarray:
+        """
+        Demand or supply quantity of each hour at the given price (scalar or one per hour),
+        interpolated between price steps and held constant outside them.
+        """
+        if side not in ["demand", "supply"]:
+            raise ValueError("side should be either 'demand' or 'supply'.")
+        q = self.demand if side == "demand" else self.supply
+        price = np.asarray(price, dtype=np.float64)
+        if price.ndim == 0:
+            price = np.full(len(self), float(price))
+        result = np.full(len(self), np.nan)
+        if len(self.price) == 0:
+            return result
+
+        nonempty = np.flatnonzero(self.lengths > 0)
+        starts = self.offsets[nonempty]
+        ends = self.offsets[nonempty + 1]
+        qp = np.clip(price[nonempty], self.price[starts], self.price[ends - 1])
+
+        ## Search all curves at once by shifting each curve's prices to its own range
+        p_min = self.price.min()
+        span = self.price.max() - p_min + 1.0
+        keys = self.price - p_min + self._segments * span
+        qkeys = qp - p_min + nonempty * span
+        k = np.searchsorted(keys, qkeys, side="right")
+        k = np.minimum(np.maximum(k, starts + 1), ends - 1)
+        k0 = np.maximum(k - 1, starts)
+        p0, p1 = self.price[k0], self.price[k]
+        q0, q1 = q[k0], q[k]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[nonempty] = np.where(
+                p1 != p0, q0 + (q1 - q0) * (qp - p0) / (p1 - p0), q1
+            )
+        return result
+
+    def price_impact(self, quantity, side: str = "demand") -> pd.DataFrame:
+        """
+        Clearing price change of each hour when quantity MWh (scalar or one per hour) of
+        price-independent demand (side="demand") or supply (side="supply") is added.
+        Negative quantities remove demand or supply.
+
+        Returns a DataFrame of hour, quantity, price (clearing price of the curves),
+        shifted_price and impact.
+        """
+        if side not in ["demand", "supply"]:
+            raise ValueError("side should be either 'demand' or 'supply'.")
+        base = self.clearing_price()
+        shift = {f"{side}_shift": quantity}
+        shifted = self.clearing_price(**shift)
+        return pd.DataFrame(
+            {
+                "hour": self.hours,
+                "quantity": np.broadcast_to(
+                    np.asarray(quantity, dtype=np.float64), (len(self),)
+                ),
+                "price": base,
+                "shifted_price": shifted,
+                "impact": shifted - base,
+            }
+        )
+
+    def save(self, path: str) -> None:
+        """Saves the curves to a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            version=np.array(SUPPLY_DEMAND_VERSION),
+            hours=self.hours,
+            offsets=self.offsets,
+            price=self.price,
+            demand=self.demand,
+            supply=self.supply,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SupplyDemandCurves":
+        with np.load(path) as d:
+            if int(d["version"]) != SUPPLY_DEMAND_VERSION:
+                raise ValueError(
+                    f"Unsupported supply-demand curves version {int(d['version'])} in {path}."
+                )
+            return cls(d["hours"], d["offsets"], d["price"], d["demand"], d["supply"])
+
+
+def get_supply_demand_curves(
+    start_date: str, end_date: str, eptr: EPTR2 | None = None, **kwargs
+) -> SupplyDemandCurves:
+    """
+    Fetches hourly supply-demand curves between start_date and end_date (both included)
+    concurrently and returns them as SupplyDemandCurves.
+
+    Args:
+        start_date, end_date: Dates in YYYY-MM-DD format.
+        eptr: EPTR2 client. Created if not given.
+        max_workers: Number of concurrent calls (see EPTR2.call_many).
+        skip_errors: If True (default False), hours whose call fails are kept with an
+            empty curve and a warning is logged instead of raising the error.
+    """
+    if eptr is None:
+        eptr = EPTR2()
+
+    hours = [
+        x.isoformat()
+        for x in pd.date_range(
+            f"{start_date}T00:00:00+03:00", f"{end_date}T23:00:00+03:00", freq="h"
+        )
+    ]
+    skip_errors = kwargs.get("skip_errors", False)
+    results = eptr.call_many(
+        [{"key": "supply-demand", "date_time": h} for h in hours],
+        max_workers=kwargs.get("max_workers", None),
+        return_exceptions=skip_errors,
+    )
+
+    frames = {}
+    for h, res in zip(hours, results):
+        if isinstance(res, Exception):
+            logger.warning("Supply-demand curve of %s could not be fetched: %s", h, res)
+            res = None
+        frames[h] = res
+
+    return SupplyDemandCurves.from_frames(frames)
@@ -0,0 +1,65 @@
+"""
+Exceptions raised by EPTR2 calls.
+
+All request failures derive from EPTR2RequestError and carry the HTTP status (None for
+timeouts without a response), the endpoint (call key or path), the elapsed time since the
+first attempt and the response body. Messages keep the "Request failed with status code"
+format of earlier versions.
+"""
+
+
+class EPTR2RequestError(Exception):
+    """Base class of failed EPTR2 requests."""
+
+    def __init__(
+        self,
+        message: str,
+        status: int | None = None,
+        endpoint: str | None = None,
+        elapsed: float | None = None,
+        body: str | None = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.endpoint = endpoint
+        self.elapsed = elapsed
+        self.body = body
+
+
+class ThrottledError(EPTR2RequestError):
+    """Too many requests (429). retry_after is the wait asked by the server, if any."""
+
+    def __init__(self, *args, retry_after: float | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+class AuthExpiredError(EPTR2RequestError):
+    """TGT is expired or invalid (401)."""
+
+
+class BadRequestError(EPTR2RequestError):
+    """Request rejected because of its parameters (4xx other than 401, 408 and 429)."""
+
+
+class ServerError(EPTR2RequestError):
+    """Server side failure (5xx other than 504)."""
+
+
+class RequestTimeoutError(EPTR2RequestError, TimeoutError):
+    """Request timed out on the client (no response) or on the server (408, 504)."""
+
+
+def get_error_class(status: int) -> type:
+    """Exception class of an HTTP status."""
+    if status == 429:
+        return ThrottledError
+    if status == 401:
+        return AuthExpiredError
+    if status in [408, 504]:
+        return RequestTimeoutError
+    if status >= 500:
+        return ServerError
+    if status >= 400:
+        return BadRequestError
+    return EPTR2RequestError
@@ -0,0 +1,312 @@
+"""
+Instrumentation hooks for EPTR2 calls.
+
+EPTR2 emits events during a call (request start/end, retries, TGT renewals, decoding
+and postprocessing). Hooks registered with `EPTR2(hooks=[...])` or `EPTR2.add_hook`
+receive every event. When no hook is registered, events are not even built.
+
+Events and their data:
+
++ call_start: call_id, key
++ request_start: call_id, key, path, attempt
++ request_end: call_id, key, path, attempt, status, bytes, elapsed
++ retry: call_id, key, path, attempt, sleep, reason
++ tgt_renewal: elapsed, success
++ decode: call_id, key, bytes, elapsed
++ postprocess: call_id, key, rows, elapsed
++ call_end: call_id, key, elapsed, bytes, rows, error
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+CALL_EVENTS = (
+    "call_start",
+    "request_start",
+    "request_end",
+    "retry",
+    "tgt_renewal",
+    "decode",
+    "postprocess",
+    "call_end",
+)
+
+
+class CallHook:
+    """
+    Base class of instrumentation hooks. Override on_event, or the on_<event> method of
+    the events you are interested in.
+    """
+
+    def on_event(self, event: str, data: dict) -> None:
+        handler = getattr(self, f"on_{event}", None)
+        if handler is not None:
+            handler(data)
+
+
+def emit_event(hooks: list, event: str, data: dict) -> None:
+    """
+    Send an event to every hook. Hook errors are logged and never break the call.
+    """
+    for hook in hooks:
+        try:
+            hook.on_event(event, data)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Instrumentation hook %s failed on %s: %s", hook, event, e)
+
+
+class LoggingHook(CallHook):
+    """Logs every event with its data."""
+
+    def __init__(self, log: logging.Logger | None = None, level: int = logging.DEBUG):
+        self.log = log or logger
+        self.level = level
+
+    def on_event(self, event: str, data: dict) -> None:
+        if self.log.isEnabledFor(self.level):
+            self.log.log(
+                self.level,
+                "eptr2 %s %s",
+                event,
+                " ".join(f"{k}={v}" for k, v in data.items()),
+            )
+
+
+### Prometheus-style metrics
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process registry of counters and histograms with labels. Values can be
+    read with get_counter/get_histogram or exported in Prometheus text format with render.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+        self._help: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels) -> None:
+        label_key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._counters.setdefault(name, {})
+            series[label_key] = series.get(label_key, 0) + value
+
+    def observe(self, name: str, value: float, help: str = "", **labels) -> None:
+        label_key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, help)
+            series = self._histograms.setdefault(name, {})
+            ## [bucket counts..., count, sum]
+            h = series.setdefault(label_key, [0] * (len(self.buckets) + 1) + [0.0])
+            h[bisect_left(self.buckets, value)] += 1
+            h[-2] += 1
+            h[-1] += value
+
+    def get_counter(self, name: str, **labels) -> float:
+        return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def get_histogram(self, name: str, **labels) -> dict:
+        """Count and sum of a histogram series."""
+        h = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+        if h is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": h[-2], "sum": h[-1]}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(label_key: tuple, extra: tuple = ()) -> str:
+        items = list(label_key) + list(extra)
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+    def render(self) -> str:
+        """Metrics in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} counter")
+                for label_key, value in series.items():
+                    lines.append(f"{name}{self._format_labels(label_key)} {value}")
+
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} histogram")
+                for label_key, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, h[: len(self.buckets)]):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket"
+                            f"{self._format_labels(label_key, (('le', bound),))}"
+                            f" {cumulative}"
+                        )
+                    lines.append(
+                        f"{name}_bucket"
+                        f"{self._format_labels(label_key, (('le', '+Inf'),))} {h[-2]}"
+                    )
+                    lines.append(
+                        f"{name}_count{self._format_labels(label_key)} {h[-2]}"
+                    )
+                    lines.append(f"{name}_sum{self._format_labels(label_key)} {h[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHook(CallHook):
+    """Records call, request, retry, TGT, decode and postprocess metrics in a MetricsRegistry."""
+
+    def __init__(self, registry: MetricsRegistry | None = None):
+        self.registry = registry or MetricsRegistry()
+
+    def on_request_end(self, data: dict) -> None:
+        self.registry.inc(
+            "eptr2_requests_total",
+            help="HTTP requests by call key and status",
+            key=data["key"],
+            status=data["status"],
+        )
+        self.registry.observe(
+            "eptr2_request_seconds",
+            data["elapsed"],
+            help="HTTP request latency",
+            key=data["key"],
+        )
+        self.registry.inc(
+            "eptr2_response_bytes_total",
+            data["bytes"],
+            help="Response bytes received",
+            key=data["key"],
+        )
+
+    def on_retry(self, data: dict) -> None:
+        self.registry.inc(
+            "eptr2_retries_total", help="Request retries", key=data["key"]
+        )
+
+    def on_tgt_renewal(self, data: dict) -> None:
+        self.registry.inc(
+            "eptr2_tgt_renewals_total",
+            help="TGT renewals",
+            success=data["success"],
+        )
+        self.registry.observe(
+            "eptr2_tgt_renewal_seconds", data["elapsed"], help="TGT renewal latency"
+        )
+
+    def on_decode(self, data: dict) -> None:
+        self.registry.observe(
+            "eptr2_decode_seconds",
+            data["elapsed"],
+            help="JSON decode time",
+            key=data["key"],
+        )
+
+    def on_postprocess(self, data: dict) -> None:
+        self.registry.observe(
+            "eptr2_postprocess_seconds",
+            data["elapsed"],
+            help="Postprocess time",
+            key=data["key"],
+        )
+        ## Rows are only known for DataFrame results
+        if data["rows"] is None:
+            return
+        self.registry.inc(
+            "eptr2_rows_total",
+            data["rows"],
+            help="Rows produced by postprocessing",
+            key=data["key"],
+        )
+
+    def on_call_end(self, data: dict) -> None:
+        self.registry.inc(
+            "eptr2_calls_total",
+            help="EPTR2.call invocations by call key and outcome",
+            key=data["key"],
+            outcome="error" if data["error"] else "ok",
+        )
+        self.registry.observe(
+            "eptr2_call_seconds",
+            data["elapsed"],
+            help="Total EPTR2.call time",
+            key=data["key"],
+        )
+
+
+### OpenTelemetry spans
+
+
+class OpenTelemetryHook(CallHook):
+    """
+    Creates an OpenTelemetry span per EPTR2.call. Request, retry, decode and postprocess
+    events are recorded as span events, sizes and timings as attributes. Requires
+    opentelemetry-api (pip install opentelemetry-api).
+    """
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetry is not installed. Install it with: pip install opentelemetry-api"
+            )
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("eptr2")
+        self._spans: dict = {}
+        self._lock = threading.Lock()
+
+    def on_call_start(self, data: dict) -> None:
+        span = self.tracer.start_span(
+            f"eptr2.call {data['key']}", attributes={"eptr2.key": data["key"]}
+        )
+        with self._lock:
+            self._spans[data["call_id"]] = span
+
+    def _add_event(self, event: str, data: dict) -> None:
+        with self._lock:
+            span = self._spans.get(data.get("call_id"))
+        if span is not None:
+            span.add_event(
+                event,
+                attributes={
+                    f"eptr2.{k}": v
+                    for k, v in data.items()
+                    if k != "call_id" and isinstance(v, (str, int, float, bool))
+                },
+            )
+
+    def on_event(self, event: str, data: dict) -> None:
+        if event == "call_start":
+            self.on_call_start(data)
+        elif event == "call_end":
+            self.on_call_end(data)
+        elif event != "tgt_renewal":
+            self._add_event(event, data)
+
+    def on_call_end(self, data: dict) -> None:
+        with self._lock:
+            span = self._spans.pop(data["call_id"], None)
+        if span is None:
+            return
+        span.set_attribute("eptr2.bytes", data["bytes"])
+        span.set_attribute("eptr2.rows", data["rows"])
+        if data["error"]:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+            span.set_attribute("eptr2.error", data["error"])
+        span.end()
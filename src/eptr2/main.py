@@ -9,6 +9,9 @@ import copy
 import time
 import random
 import socket
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from eptr2.mapping import (
     get_total_path,
     get_call_method,
@@ -22,13 +25,31 @@ from eptr2.mapping import (
 )
 from warnings import warn
 from eptr2.processing.preprocess import preprocess_parameter, process_special_calls
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import shlex
 from urllib.parse import quote
+from eptr2.instrumentation import emit_event
+from eptr2.policy import CallPolicy
+from eptr2.exceptions import (
+    AuthExpiredError,
+    RequestTimeoutError,
+    ThrottledError,
+    get_error_class,
+)
 
 
 logger = logging.getLogger(__name__)
 
+## Identifies calls in instrumentation events
+_call_ids = itertools.count(1)
+
+## Connections kept per host in the shared pool of a client
+DEFAULT_POOL_MAXSIZE = 16
+
+## Default number of threads of EPTR2.call_many
+DEFAULT_CALL_MANY_WORKERS = 8
+
 
 class EPTR2:
     def __init__(
@@ -46,7 +67,28 @@ class EPTR2:
         ### query_parameters: dict
         ### just_call_phrase: bool
         ### root_phrase: str
+        ### login_url: str
+        ### hooks: list of instrumentation hooks (see eptr2.instrumentation)
+        ### policy: CallPolicy (see eptr2.policy). True uses the default CallPolicy(), None (default) means no policy
+        ### pool_maxsize: int, connections kept per host in the shared connection pool
+        ### recorder: CallRecorder to record or replay calls (see eptr2.testing.recorder)
+
+        ## Instrumentation hooks. Events are only built when at least one hook is registered.
+        self.hooks = list(kwargs.get("hooks", None) or [])
+        self.recorder = kwargs.get("recorder", None)
+
+        ## Timeout, retry budget and circuit breaker policy (opt-in)
+        policy = kwargs.get("policy", None)
+        self.policy = CallPolicy() if policy is True else (policy or None)
+
+        ## Guards TGT renewal and export so that a client can be shared between threads
+        self._tgt_lock = threading.RLock()
+
         self.ssl_verify = kwargs.get("ssl_verify", True)
+
+        ## Connection pool shared by all calls of the client (created on first call)
+        self.pool_maxsize = kwargs.get("pool_maxsize", DEFAULT_POOL_MAXSIZE)
+        self._http = None
         self.check_postprocess(postprocess=kwargs.get("postprocess", True))
         self.get_raw_response = kwargs.get("get_raw_response", False)
 
@@ -54,6 +96,8 @@ class EPTR2:
         self.username = username
         self.password = password
         self.is_test = kwargs.get("is_test", False)  ## Currently not being used
+        ## Custom CAS ticket endpoint (e.g. a local stand-in server for offline benchmarks)
+        self.login_url = kwargs.get("login_url", None)
 
         self.temp_new_login_method = kwargs.get("new_login_method", False)
 
@@ -115,6 +159,8 @@ class EPTR2:
             root_phrase_test = "-prp" if self.is_test else ""
             root_phrase_default = f"https://seffaflik{root_phrase_test}.epias.com.tr"
             self.root_phrase = root_phrase_default
+        else:
+            self.root_phrase = custom_root_phrase
 
     ## Ref: https://stackoverflow.com/a/62303969/3608936
     def __getattr__(self, __name: str) -> Any:
@@ -153,19 +199,43 @@ class EPTR2:
 
     def check_renew_tgt(self, **kwargs):
         force_renew_tgt = kwargs.get("force_renew_tgt", False)
-        if (
-            self.tgt is None
-            or self.tgt_exp_0 < datetime.now().timestamp()
-            or force_renew_tgt
-        ):
-            self.get_tgt(**kwargs)
+        ## Replayed calls do not need a TGT
+        if self.recorder is not None and self.recorder.replaying:
+            return
+        with self._tgt_lock:
+            if (
+                self.tgt is None
+                or self.tgt_exp_0 < datetime.now().timestamp()
+                or force_renew_tgt
+            ):
+                self.get_tgt(**kwargs)
 
     def get_tgt(self, **kwargs):
         if self.username is None or self.password is None:
             raise Exception("Username and password must be provided for tgt renewal.")
 
+        if not self.hooks:
+            return self._get_tgt(**kwargs)
+
+        start_time = time.perf_counter()
+        success = False
+        try:
+            self._get_tgt(**kwargs)
+            success = True
+        finally:
+            emit_event(
+                self.hooks,
+                "tgt_renewal",
+                {"elapsed": time.perf_counter() - start_time, "success": success},
+            )
+
+    def _get_tgt(self, **kwargs):
+
         test_suffix = "-prp" if self.is_test else ""
-        login_url = f"""https://giris{test_suffix}.epias.com.tr/cas/v1/tickets"""
+        login_url = (
+            self.login_url
+            or f"""https://giris{test_suffix}.epias.com.tr/cas/v1/tickets"""
+        )
 
         body_str = f"username={quote(self.username)}&password={quote(self.password)}"
 
@@ -360,34 +430,274 @@ class EPTR2:
         if key in ["bpm-orders-w-avg"]:
             call_body["page"] = {"number": 1, "size": 24}
 
-        res = transparency_call(
-            call_path=call_path,
-            call_method=call_method,
-            call_body=call_body,
-            root_phrase=self.root_phrase,
-            ssl_verify=self.ssl_verify,
-            is_test=self.is_test,
-            tgt=self.tgt,
-            **kwargs,
-        )
+        if self.hooks:
+            return self._call_with_hooks(
+                key, call_path, call_method, call_body, **kwargs
+            )
+
+        return self._send_and_process(key, call_path, call_method, call_body, **kwargs)
+
+    def get_pool_manager(self) -> urllib3.PoolManager:
+        """
+        Connection pool shared by all calls of the client, so that connections are reused
+        between calls and threads.
+        """
+        if self._http is None:
+            with self._tgt_lock:
+                if self._http is None:
+                    self._http = urllib3.PoolManager(
+                        maxsize=self.pool_maxsize,
+                        cert_reqs="CERT_REQUIRED" if self.ssl_verify else "CERT_NONE",
+                    )
+        return self._http
+
+    def call_many(
+        self,
+        requests: list[dict],
+        max_workers: int | None = None,
+        return_exceptions: bool = False,
+        return_timing: bool = False,
+    ) -> list | tuple[list, list]:
+        """
+        Makes many calls concurrently and returns their results in input order.
+
+        Args:
+            requests: Calls as dictionaries of the call key ("key") and call parameters,
+                e.g. [{"key": "mcp", "start_date": "2024-07-29", "end_date": "2024-07-29"}].
+            max_workers: Number of threads (default DEFAULT_CALL_MANY_WORKERS). 1 makes the
+                calls sequentially.
+            return_exceptions: If True, failed calls return their exception in place of the
+                result. Otherwise the first failed call (in input order) raises its exception
+                once all calls are completed.
+            return_timing: If True, also returns the elapsed seconds of each call.
+
+        Identical requests (same call key or alias and parameters) are made once; duplicates
+        get a copy of the result. All calls share the connection pool and call policy of
+        the client. Calls are throttled only by the rate limit of a call policy
+        (CallPolicy(rate_limit=...)); otherwise up to max_workers requests are in flight.
+        """
+        jobs = []
+        job_ids = {}
+        order = []
+        for request in requests:
+            params = dict(request)
+            key = params.pop("key")
+            request_id = (
+                alias_to_path(alias=key, custom_aliases=self.custom_aliases),
+                json.dumps(params, sort_keys=True, default=str),
+            )
+            if request_id not in job_ids:
+                job_ids[request_id] = len(jobs)
+                jobs.append((key, params))
+            order.append(job_ids[request_id])
+
+        if len(jobs) == 0:
+            return ([], []) if return_timing else []
+
+        ## Renew TGT before dispatching, so that workers do not wait on each other to log in
+        self.check_renew_tgt()
+
+        def run(job):
+            key, params = job
+            start_time = time.perf_counter()
+            try:
+                return self.call(key, **params), None, time.perf_counter() - start_time
+            except Exception as e:  # noqa: BLE001
+                ## Raised or returned in input order once all calls are completed
+                return None, e, time.perf_counter() - start_time
+
+        n_workers = min(max_workers or DEFAULT_CALL_MANY_WORKERS, len(jobs))
+        if n_workers <= 1:
+            outcomes = [run(job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=n_workers, thread_name_prefix="eptr2-call-many"
+            ) as executor:
+                outcomes = list(executor.map(run, jobs))
+
+        results = []
+        timings = []
+        returned = set()
+        for job_idx in order:
+            result, error, elapsed = outcomes[job_idx]
+            if error is not None:
+                if not return_exceptions:
+                    raise error
+                result = error
+            elif job_idx in returned and hasattr(result, "copy"):
+                result = result.copy()
+            returned.add(job_idx)
+            results.append(result)
+            timings.append(elapsed)
+
+        if return_timing:
+            return results, timings
+        return results
+
+    def get_stats(self) -> dict:
+        """
+        Statistics of the call policy: request, retry, success and failure counts, retry
+        budget usage and circuit breaker state of each endpoint.
+        """
+        if self.policy is None:
+            return {}
+        return self.policy.stats()
+
+    def add_hook(self, hook) -> None:
+        """
+        Registers an instrumentation hook (see eptr2.instrumentation).
+        """
+        self.hooks = self.hooks + [hook]
+
+    def remove_hook(self, hook) -> None:
+        """
+        Removes a registered instrumentation hook.
+        """
+        self.hooks = [x for x in self.hooks if x is not hook]
+
+    def _call_with_hooks(self, key, call_path, call_method, call_body, **kwargs):
+        hooks = self.hooks
+        call_id = next(_call_ids)
+        totals = {"bytes": 0, "rows": None}
+
+        def emit(event: str, data: dict) -> None:
+            if event == "request_end":
+                totals["bytes"] += data["bytes"]
+            elif event == "postprocess":
+                totals["rows"] = data["rows"]
+            emit_event(hooks, event, {"call_id": call_id, "key": key, **data})
+
+        emit_event(hooks, "call_start", {"call_id": call_id, "key": key})
+        start_time = time.perf_counter()
+        error = None
+        try:
+            return self._send_and_process(
+                key, call_path, call_method, call_body, _emit=emit, **kwargs
+            )
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            emit_event(
+                hooks,
+                "call_end",
+                {
+                    "call_id": call_id,
+                    "key": key,
+                    "elapsed": time.perf_counter() - start_time,
+                    "bytes": totals["bytes"],
+                    "rows": totals["rows"],
+                    "error": error,
+                },
+            )
+
+    def _send_and_process(
+        self, key, call_path, call_method, call_body, _emit=None, **kwargs
+    ):
+        kwargs["http"] = self.get_pool_manager()
+        kwargs["endpoint"] = key
+
+        if self.policy is not None:
+            kwargs["policy"] = self.policy
+            request_kwargs = kwargs.get("request_kwargs", {})
+            timeout = self.policy.get_timeout(key)
+            if "timeout" not in request_kwargs and timeout is not None:
+                kwargs["request_kwargs"] = {**request_kwargs, "timeout": timeout}
+
+        def send_once(tgt):
+            return transparency_call(
+                call_path=call_path,
+                call_method=call_method,
+                call_body=call_body,
+                root_phrase=self.root_phrase,
+                ssl_verify=self.ssl_verify,
+                is_test=self.is_test,
+                tgt=tgt,
+                event_callback=_emit,
+                **kwargs,
+            )
+
+        def send():
+            tgt = self.tgt
+            try:
+                return send_once(tgt)
+            except AuthExpiredError:
+                ## Re-login once. Concurrent calls failing with the same TGT renew it only once.
+                logger.info("TGT is expired or invalid. Renewing TGT and retrying.")
+                with self._tgt_lock:
+                    if self.tgt == tgt:
+                        self.get_tgt(
+                            request_kwargs=kwargs.get("request_kwargs", {"timeout": 10})
+                        )
+                    tgt = self.tgt
+                return send_once(tgt)
+
+        if self.recorder is None:
+            res = send()
+        elif self.recorder.replaying:
+            if _emit is not None:
+                _emit("request_start", {"path": call_path, "attempt": 1})
+                start_time = time.perf_counter()
+            res = self.recorder.call(key, call_path, call_body, send)
+            if _emit is not None:
+                _emit(
+                    "request_end",
+                    {
+                        "path": call_path,
+                        "attempt": 1,
+                        "status": res.status,
+                        "bytes": len(res.data),
+                        "elapsed": time.perf_counter() - start_time,
+                    },
+                )
+            return self._process_response(key, res, _emit=_emit, **kwargs)
+        else:
+            res = self.recorder.call(key, call_path, call_body, send)
 
         ## Set soft timeout for tgt renewal
-        self.tgt_exp_0 = min(
-            self.tgt_exp,
-            datetime.now().timestamp() + 60 * 90,
-        )
+        with self._tgt_lock:
+            self.tgt_exp_0 = min(
+                self.tgt_exp,
+                datetime.now().timestamp() + 60 * 90,
+            )
 
-        if self.recycle_tgt:
-            self.export_tgt_info()
+            if self.recycle_tgt:
+                self.export_tgt_info()
+
+        return self._process_response(key, res, _emit=_emit, **kwargs)
 
+    def _process_response(self, key, res, _emit=None, **kwargs):
         if kwargs.get("get_raw_response", self.get_raw_response):
             return res
 
+        if _emit is not None:
+            start_time = time.perf_counter()
+            n_bytes = len(res.data)
+
         res = json.loads(res.data.decode("utf-8"))
+
+        if _emit is not None:
+            _emit(
+                "decode",
+                {"bytes": n_bytes, "elapsed": time.perf_counter() - start_time},
+            )
+
         if kwargs.get("postprocess", self.postprocess):
             from eptr2.mapping.processing import get_postprocess_function
 
+            if _emit is not None:
+                start_time = time.perf_counter()
+
             df = get_postprocess_function(key)(res, key=key)
+
+            if _emit is not None:
+                _emit(
+                    "postprocess",
+                    {
+                        "rows": len(df) if hasattr(df, "__len__") else None,
+                        "elapsed": time.perf_counter() - start_time,
+                    },
+                )
             return df
 
         return res
@@ -409,6 +719,15 @@ def transparency_call(
     ### secure: bool
     ### query_parameters: dict
     ### just_call_phrase: bool
+    ### event_callback: callable(event, data) receiving request_start, request_end and retry events
+    ### policy: CallPolicy applying the retry budget and circuit breaker (see eptr2.policy)
+    ### endpoint: Endpoint identifier (call key) used by the policy and in exceptions, defaults to call_path
+    ### http: urllib3.PoolManager to reuse connections, a new one is created if not given
+    ### retry_after_max: Longest Retry-After wait (seconds) honored before giving up
+
+    event_callback = kwargs.pop("event_callback", None)
+    policy = kwargs.pop("policy", None)
+    endpoint = kwargs.pop("endpoint", call_path)
 
     root_phrase_test = "-prp" if is_test else ""
     root_phrase_default = f"https://seffaflik{root_phrase_test}.epias.com.tr"
@@ -432,7 +751,11 @@ def transparency_call(
 
     ssl_verify = kwargs.pop("ssl_verify", True)
 
-    http = urllib3.PoolManager(cert_reqs="CERT_REQUIRED" if ssl_verify else "CERT_NONE")
+    http = kwargs.pop("http", None)
+    if http is None:
+        http = urllib3.PoolManager(
+            cert_reqs="CERT_REQUIRED" if ssl_verify else "CERT_NONE"
+        )
 
     header_d = {"Content-Type": "application/json"}
     if tgt is not None:
@@ -453,17 +776,42 @@ def transparency_call(
         TimeoutError,
     )
     retry_on_exceptions = tuple(kwargs.pop("retry_on_exceptions", timeout_exceptions))
+    retry_after_max = float(kwargs.pop("retry_after_max", 60.0))
     request_kwargs = kwargs.get("request_kwargs", {})
 
-    def _sleep_with_backoff(current_delay: float) -> float:
-        jitter_factor = 1 + random.uniform(-retry_jitter, retry_jitter)
-        sleep_time = max(0.0, min(current_delay * jitter_factor, retry_backoff_max))
+    def _sleep_with_backoff(
+        current_delay: float, reason: str = "", retry_after: float | None = None
+    ) -> float:
+        if retry_after is not None:
+            ## Sleep exactly as long as the server asks
+            sleep_time = retry_after
+        else:
+            jitter_factor = 1 + random.uniform(-retry_jitter, retry_jitter)
+            sleep_time = max(0.0, min(current_delay * jitter_factor, retry_backoff_max))
+        if event_callback is not None:
+            event_callback(
+                "retry",
+                {
+                    "path": call_path,
+                    "attempt": attempt,
+                    "sleep": sleep_time,
+                    "reason": reason,
+                },
+            )
         time.sleep(sleep_time)
+        if retry_after is not None:
+            return current_delay
         return min(current_delay * 2, retry_backoff_max)
 
     attempt = 1
     delay = retry_backoff
+    first_start_time = time.perf_counter()
     while True:
+        if policy is not None:
+            policy.before_request(endpoint, attempt)
+        if event_callback is not None:
+            event_callback("request_start", {"path": call_path, "attempt": attempt})
+            start_time = time.perf_counter()
         try:
             res = http.request(
                 method=call_method,
@@ -472,28 +820,113 @@ def transparency_call(
                 headers=header_d,
                 **request_kwargs,
             )
-        except retry_on_exceptions:
-            if attempt >= retry_attempts:
+        except retry_on_exceptions as e:
+            if policy is not None:
+                policy.record_failure(endpoint)
+            if attempt >= retry_attempts or (
+                policy is not None and not policy.allow_retry(endpoint)
+            ):
+                if isinstance(e, timeout_exceptions):
+                    raise RequestTimeoutError(
+                        f"Request timed out: {e}",
+                        endpoint=endpoint,
+                        elapsed=time.perf_counter() - first_start_time,
+                    ) from e
                 raise
-            delay = _sleep_with_backoff(delay)
+            delay = _sleep_with_backoff(delay, reason=type(e).__name__)
             attempt += 1
             continue
+        except urllib3.exceptions.HTTPError:
+            ## Connection errors
+            if policy is not None:
+                policy.record_failure(endpoint)
+            raise
+        except BaseException:
+            ## Unexpected errors do not count as failures but must end a half-open probe
+            if policy is not None:
+                policy.release(endpoint)
+            raise
+
+        if event_callback is not None:
+            event_callback(
+                "request_end",
+                {
+                    "path": call_path,
+                    "attempt": attempt,
+                    "status": res.status,
+                    "bytes": len(res.data),
+                    "elapsed": time.perf_counter() - start_time,
+                },
+            )
 
         if res.status in [200, 201]:
+            if policy is not None:
+                policy.record_success(endpoint)
             return res
 
-        if res.status not in retry_on_status or attempt >= retry_attempts:
-            raise Exception(
-                "Request failed with status code: "
-                + str(res.status)
-                + "\n"
-                + res.data.decode("utf-8")
+        if policy is not None:
+            ## Only endpoint-side failures count towards opening the circuit
+            if res.status >= 500 or res.status in [408, 429]:
+                policy.record_failure(endpoint)
+            else:
+                policy.record_success(endpoint)
+
+        retry_after = None
+        if res.status in [429, 503]:
+            retry_after = parse_retry_after(res.headers.get("Retry-After"))
+
+        ## Throttling and unavailability with Retry-After are retried even if not in
+        ## retry_on_status, with at least one extra attempt regardless of retry_attempts
+        honour_retry_after = retry_after is not None and retry_after <= retry_after_max
+        retryable = res.status in retry_on_status or honour_retry_after
+        max_attempts = max(retry_attempts, 2) if honour_retry_after else retry_attempts
+
+        if (
+            not retryable
+            or attempt >= max_attempts
+            or (policy is not None and not policy.allow_retry(endpoint))
+        ):
+            body = res.data.decode("utf-8", errors="replace")
+            error_class = get_error_class(res.status)
+            error_kwargs = {
+                "status": res.status,
+                "endpoint": endpoint,
+                "elapsed": time.perf_counter() - first_start_time,
+                "body": body,
+            }
+            if error_class is ThrottledError:
+                error_kwargs["retry_after"] = retry_after
+            raise error_class(
+                "Request failed with status code: " + str(res.status) + "\n" + body,
+                **error_kwargs,
             )
 
-        delay = _sleep_with_backoff(delay)
+        delay = _sleep_with_backoff(
+            delay, reason=f"status {res.status}", retry_after=retry_after
+        )
         attempt += 1
 
 
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_dt.tzinfo is None:
+        retry_dt = retry_dt.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_dt - datetime.now(timezone.utc)).total_seconds())
+
+
 def load_eptr_credentials_from_dotenv(env_file_path: str = ".env") -> None:
     """
     Load (only) EPTR credentials from a .env file and set them as environment variables.
@@ -363,15 +363,20 @@ def get_optional_parameters(key):
         "eic-w-uevcb-list": ["province_id"],
         "mms": ["org_id", "uevcb_id", "pp_id", "message_type_id"],
         "mms-pp-list": ["org_id"],
-        "dams-active-fullness": ["basin_name", "dam_name"],
-        "dams-daily-level": ["basin_name", "dam_name"],
-        "dams-active-volume": ["basin_name", "dam_name"],
-        "dams-daily-volume": ["basin_name", "dam_name"],
+        "dams-active-fullness": ["basin_name", "dam_name", "start_date", "end_date"],
+        "dams-daily-level": ["basin_name", "dam_name", "start_date", "end_date"],
+        "dams-active-volume": ["basin_name", "dam_name", "start_date", "end_date"],
+        "dams-daily-volume": ["basin_name", "dam_name", "start_date", "end_date"],
         "dam-list": ["basin_name"],
         "dams-level-minmax": ["basin_name", "dam_name"],
         "dams-volume-minmax": ["basin_name", "dam_name"],
-        "dams-info": ["basin_name", "dam_name"],
-        "dams-water-energy-provision": ["basin_name", "dam_name"],
+        "dams-info": ["basin_name", "dam_name", "start_date", "end_date"],
+        "dams-water-energy-provision": [
+            "basin_name",
+            "dam_name",
+            "start_date",
+            "end_date",
+        ],
         "long-term-demand-forecast": ["dist_org_id"],
         "consumption-breakdown": ["province_id", "profile_group_id"],
         "consumer-breakdown": ["province_id", "profile_group_id"],
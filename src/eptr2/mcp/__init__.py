@@ -1,5 +1,23 @@
 """Public MCP APIs for eptr2."""
 
-from eptr2.mcp.server import create_mcp_server, run_mcp_server, main
+from eptr2.mcp.server import (
+    clear_response_cache,
+    configure_response_cache,
+    configure_tool_concurrency,
+    create_mcp_server,
+    get_response_cache_stats,
+    prefetch_common_data,
+    run_mcp_server,
+    main,
+)
 
-__all__ = ["create_mcp_server", "run_mcp_server", "main"]
+__all__ = [
+    "clear_response_cache",
+    "configure_response_cache",
+    "configure_tool_concurrency",
+    "create_mcp_server",
+    "get_response_cache_stats",
+    "prefetch_common_data",
+    "run_mcp_server",
+    "main",
+]
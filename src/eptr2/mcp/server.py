@@ -5,13 +5,27 @@ This server exposes eptr2 API functionality through the Model Context Protocol,
 allowing AI agents to query Turkish electricity market data from EPIAS Transparency Platform.
 """
 
+import base64
 import json
+import os
 import sys
 import logging
 import asyncio
-from typing import Any, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import Any, Literal
+
+import urllib3
 
 from eptr2 import EPTR2
+from eptr2.exceptions import EPTR2RequestError
+from eptr2.util.time import get_utc3_now
 
 
 logger = logging.getLogger(__name__)
@@ -29,41 +43,161 @@ except ImportError:
 
 
 # Global EPTR2 client instance (lazy-loaded)
-_eptr_client: Optional[EPTR2] = None
+## EPTR2 logs in on creation, so the client is only created on the tool executor (or
+## before the event loop starts), never in async code.
+_eptr_client: EPTR2 | None = None
+_eptr_client_lock = threading.Lock()
 
 
 def _get_eptr_client() -> EPTR2:
-    """Get or create the EPTR2 client instance."""
+    """Get or create the EPTR2 client instance. Blocks on the first call (login)."""
     global _eptr_client
     if _eptr_client is None:
-        _eptr_client = EPTR2(use_dotenv=True, recycle_tgt=True)
+        with _eptr_client_lock:
+            if _eptr_client is None:
+                _eptr_client = EPTR2(use_dotenv=True, recycle_tgt=True)
     return _eptr_client
 
 
+def _client_call(call_key: str, **params) -> Any:
+    """Call an endpoint with the shared client, on the tool executor."""
+    return _get_eptr_client().call(call_key, **params)
+
+
+def _composite_call(func: Callable[..., Any], **params) -> Any:
+    """Run a composite function with the shared client, on the tool executor."""
+    return func(eptr=_get_eptr_client(), **params)
+
+
+### Tool execution
+## Blocking EPTR2 calls run on a bounded thread pool so that the event loop keeps
+## serving other sessions. Per-tool semaphores prevent a single slow tool (e.g.
+## idm-log through call_eptr2_api or composite tools) from occupying every worker.
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_TOOL_CONCURRENCY = 8
+DEFAULT_TOOL_CONCURRENCY_LIMITS = {
+    "call_eptr2_api": 4,
+    "get_hourly_consumption_and_forecast": 2,
+    "get_price_and_cost_data": 2,
+}
+
+_max_workers: int = DEFAULT_MAX_WORKERS
+_tool_concurrency_limits: dict[str, int] = dict(DEFAULT_TOOL_CONCURRENCY_LIMITS)
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+## asyncio semaphores are bound to an event loop, keep one set per loop
+_tool_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def configure_tool_concurrency(
+    max_workers: int | None = None,
+    tool_concurrency_limits: dict[str, int] | None = None,
+) -> None:
+    """
+    Configure the worker pool size and per-tool concurrency limits of the MCP tools.
+
+    Tools that are not in tool_concurrency_limits are limited by DEFAULT_TOOL_CONCURRENCY.
+    Changes apply to the tool calls started after the call.
+    """
+    global _max_workers
+
+    if max_workers is not None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
+        _max_workers = max_workers
+        _shutdown_executor()
+
+    if tool_concurrency_limits is not None:
+        if any(v < 1 for v in tool_concurrency_limits.values()):
+            raise ValueError("Tool concurrency limits must be positive integers.")
+        _tool_concurrency_limits.update(tool_concurrency_limits)
+        _tool_semaphores.clear()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get or create the shared tool executor."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers, thread_name_prefix="eptr2-mcp"
+            )
+        return _executor
+
+
+def _shutdown_executor() -> None:
+    """Shut down the shared tool executor without waiting for running calls."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _get_tool_semaphore(tool_name: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    loop_semaphores = _tool_semaphores.setdefault(loop, {})
+    if tool_name not in loop_semaphores:
+        loop_semaphores[tool_name] = asyncio.Semaphore(
+            _tool_concurrency_limits.get(tool_name, DEFAULT_TOOL_CONCURRENCY)
+        )
+    return loop_semaphores[tool_name]
+
+
+async def _run_tool(tool_name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking tool function on the shared executor under the tool's concurrency limit.
+
+    If the calling task is cancelled (e.g. the client cancels the request), a call that
+    is still waiting for a worker is dropped. A call that has already started cannot be
+    interrupted; its result is discarded.
+    """
+    async with _get_tool_semaphore(tool_name):
+        future = _get_executor().submit(partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            logger.info("MCP tool call cancelled: %s", tool_name)
+            raise
+
+
 def create_mcp_server(
     use_dotenv: bool = True,
     recycle_tgt: bool = True,
     dotenv_path: str = ".env",
     tgt_path: str = ".",
+    max_workers: int | None = None,
+    tool_concurrency_limits: dict[str, int] | None = None,
+    cache_size: int | None = None,
 ):
     """
     Create and configure the FastMCP server instance for eptr2.
 
     Parameters mirror EPTR2 initialization so users can configure credential loading
-    and TGT recycling behavior programmatically.
+    and TGT recycling behavior programmatically. max_workers and tool_concurrency_limits
+    are passed to configure_tool_concurrency, cache_size to configure_response_cache.
     """
     if not MCP_AVAILABLE:
         raise ImportError(
             "FastMCP is not installed. Install it with: pip install fastmcp"
         )
 
+    configure_tool_concurrency(
+        max_workers=max_workers, tool_concurrency_limits=tool_concurrency_limits
+    )
+    configure_response_cache(maxsize=cache_size)
+
     global _eptr_client
-    _eptr_client = EPTR2(
+    client = EPTR2(
         use_dotenv=use_dotenv,
         recycle_tgt=recycle_tgt,
         dotenv_path=dotenv_path,
         tgt_path=tgt_path,
     )
+    with _eptr_client_lock:
+        _eptr_client = client
     return mcp
 
 
@@ -72,88 +206,552 @@ async def run_mcp_server(
     recycle_tgt: bool = True,
     dotenv_path: str = ".env",
     tgt_path: str = ".",
+    max_workers: int | None = None,
+    tool_concurrency_limits: dict[str, int] | None = None,
+    cache_size: int | None = None,
+    prefetch: bool = False,
+    prefetch_interval: float | None = None,
 ) -> None:
-    """Run the eptr2 MCP server with configurable EPTR2 initialization."""
-    server = create_mcp_server(
+    """
+    Run the eptr2 MCP server with configurable EPTR2 initialization.
+
+    If prefetch is True, today/tomorrow data of the common tools is loaded into the
+    response cache on startup and, if prefetch_interval (seconds) is given, refreshed
+    periodically in the background.
+
+    The EPTR2 client logs in on creation, so the server is created on a worker thread
+    and does not block the event loop.
+    """
+    server = await asyncio.to_thread(
+        create_mcp_server,
         use_dotenv=use_dotenv,
         recycle_tgt=recycle_tgt,
         dotenv_path=dotenv_path,
         tgt_path=tgt_path,
+        max_workers=max_workers,
+        tool_concurrency_limits=tool_concurrency_limits,
+        cache_size=cache_size,
     )
-    await asyncio.to_thread(server.run)
+    prefetch_task = (
+        asyncio.create_task(_prefetch_loop(prefetch_interval)) if prefetch else None
+    )
+    try:
+        await server.run_async()
+    finally:
+        if prefetch_task is not None:
+            prefetch_task.cancel()
+        _shutdown_executor()
+
+
+### Result formatting
+## Tool results are compact by default. Large tables can be paged with cursor and
+## page_size, reduced with column projection or replaced by a per-day summary.
+
+OUTPUT_FORMATS = ("json", "csv")
+MAX_PAGE_SIZE = 5000
+SUMMARY_DATE_COLUMNS = ("date", "dt", "datetime", "period")
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def _decode_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    try:
+        prefix, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "offset" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _project_columns(df, columns: list[str] | str | None):
+    if not columns:
+        return df
+    if isinstance(columns, str):
+        columns = [x.strip() for x in columns.split(",") if x.strip()]
+    missing = [x for x in columns if x not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Unknown columns: {missing}. Available columns: {list(df.columns)}"
+        )
+    return df[columns]
+
 
+def _summarize_by_day(df) -> list[dict[str, Any]]:
+    """Min, max and mean of every numeric column per day (or overall without a date column)."""
+    import pandas as pd
 
-def _format_result(result: Any) -> str:
-    """Format result for MCP response."""
-    if hasattr(result, "to_json"):
-        return result.to_json(orient="records", date_format="iso", indent=2)
-    elif isinstance(result, (dict, list)):
-        return json.dumps(result, indent=2, default=str)
+    numeric_cols = [x for x in df.select_dtypes(include="number").columns if x != "day"]
+    date_col = next((x for x in SUMMARY_DATE_COLUMNS if x in df.columns), None)
+
+    if date_col is None:
+        days = pd.Series("all", index=df.index)
     else:
+        days = pd.to_datetime(df[date_col], errors="coerce").dt.strftime("%Y-%m-%d")
+
+    summary_df = (
+        df[numeric_cols]
+        .groupby(days.rename("day"))
+        .agg(["min", "max", "mean"])
+        .stack(level=0, future_stack=True)
+        .reset_index()
+        .rename(columns={"level_1": "column"})
+    )
+    summary_df["mean"] = summary_df["mean"].round(4)
+
+    return summary_df.to_dict(orient="records")
+
+
+def _format_result(
+    result: Any,
+    columns: list[str] | str | None = None,
+    page_size: int | None = None,
+    cursor: str | None = None,
+    output_format: str = "json",
+    summary: bool = False,
+) -> str:
+    """
+    Format result for MCP response.
+
+    Without paging or summary options, DataFrames are returned as compact JSON records
+    (or CSV). With page_size or cursor, a JSON envelope with total_rows, next_cursor and
+    data (records or CSV string) is returned. With summary, only the per-day min/max/mean
+    of numeric columns is returned.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}.")
+
+    if not hasattr(result, "to_json"):
+        if isinstance(result, (dict, list)):
+            return json.dumps(result, separators=(",", ":"), default=str)
         return str(result)
 
+    df = _project_columns(result, columns)
+
+    if summary:
+        return json.dumps(
+            {"total_rows": len(df), "summary": _summarize_by_day(df)},
+            separators=(",", ":"),
+            default=str,
+        )
+
+    if page_size is None and not cursor:
+        if output_format == "csv":
+            return df.to_csv(index=False)
+        return df.to_json(orient="records", date_format="iso")
+
+    page_size = min(page_size or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer.")
+
+    offset = _decode_cursor(cursor)
+    page_df = df.iloc[offset : offset + page_size]
+    next_offset = offset + len(page_df)
+
+    if output_format == "csv":
+        data = page_df.to_csv(index=False)
+    else:
+        data = json.loads(page_df.to_json(orient="records", date_format="iso"))
+
+    return json.dumps(
+        {
+            "total_rows": len(df),
+            "offset": offset,
+            "page_size": page_size,
+            "next_cursor": _encode_cursor(next_offset)
+            if next_offset < len(df)
+            else None,
+            "columns": list(df.columns),
+            "data": data,
+        },
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+### Response cache
+## Raw tool results are kept in an in-memory LRU so that repeated questions about
+## the same recent days (and further pages of the same result) are served without
+## calling the API. Expiry follows publication times of the data.
+
+DAM_PUBLICATION_HOUR = 14
+DAM_CALL_KEYS = ("mcp", "dam-clearing", "dam-bid", "dam-offer", "dam-volume")
+FINAL_DATA_TTL = 24 * 3600
+PAST_DATA_TTL = 3600
+LIVE_DATA_TTL = 300
+UNPUBLISHED_DATA_TTL = 60
+DEFAULT_CACHE_SIZE = 256
+PREFETCH_CALLS = {
+    "mcp": ("today", "tomorrow"),
+    "smp": ("today",),
+    "mcp-smp-imb": ("today",),
+    "rt-cons": ("today",),
+    "rt-gen": ("today",),
+    "load-plan": ("today", "tomorrow"),
+}
+
+
+class _ResponseCache:
+    """Thread-safe LRU cache with per-entry expiry times."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, record_stats: bool = True) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += record_stats
+                return None
+            self._data.move_to_end(key)
+            self.hits += record_stats
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.maxsize < 1 or ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_response_cache = _ResponseCache()
+
+
+def configure_response_cache(maxsize: int | None = None) -> None:
+    """
+    Configure the MCP response cache. maxsize=0 disables caching.
+    """
+    if maxsize is not None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer.")
+        _response_cache.maxsize = maxsize
+        _response_cache.clear()
+
+
+def clear_response_cache() -> None:
+    """Remove all entries from the MCP response cache."""
+    _response_cache.clear()
+
+
+def get_response_cache_stats() -> dict[str, int]:
+    """Get size, capacity, hits and misses of the MCP response cache."""
+    return {
+        "size": len(_response_cache),
+        "maxsize": _response_cache.maxsize,
+        "hits": _response_cache.hits,
+        "misses": _response_cache.misses,
+    }
+
+
+def _make_cache_key(source: str, params: dict[str, Any]) -> str:
+    return source + "|" + json.dumps(params, sort_keys=True, default=str)
+
+
+def _get_cache_ttl(source: str, params: dict[str, Any], now=None) -> float:
+    """
+    Time to live (seconds) of a result based on the requested dates and publication times.
+
+    + Day-ahead prices of a delivery day are final once published (~14:00 Istanbul time
+      of the previous day). Before that, results are kept for a short time only.
+    + Data of past days can still be revised (e.g. real time generation), so it is kept
+      for an hour. Data including today changes hourly and is kept for a few minutes.
+    """
+    if now is None:
+        now = get_utc3_now()
+    today = now.strftime("%Y-%m-%d")
+    end_date = str(params.get("end_date") or params.get("start_date") or "")[:10]
+
+    if not end_date:
+        return LIVE_DATA_TTL
+
+    if source in DAM_CALL_KEYS:
+        tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        if end_date <= today or (
+            end_date == tomorrow and now.hour >= DAM_PUBLICATION_HOUR
+        ):
+            return FINAL_DATA_TTL
+        if end_date == tomorrow:
+            publication = now.replace(
+                hour=DAM_PUBLICATION_HOUR, minute=0, second=0, microsecond=0
+            )
+            return max(
+                min((publication - now).total_seconds(), UNPUBLISHED_DATA_TTL), 1
+            )
+        return UNPUBLISHED_DATA_TTL
+
+    if end_date < today:
+        return PAST_DATA_TTL
+
+    return LIVE_DATA_TTL
+
+
+def _fetch_cached(source: str, params: dict[str, Any], fetch: Callable[[], Any]):
+    key = _make_cache_key(source, params)
+    ## Another call may have filled the entry while this one was waiting for a worker
+    result = _response_cache.get(key, record_stats=False)
+    if result is None:
+        result = fetch()
+        _response_cache.set(key, result, _get_cache_ttl(source, params))
+    return result
+
+
+def _fetch_and_format(
+    source: str, params: dict[str, Any], fetch: Callable[[], Any], **format_kwargs
+) -> str:
+    """Fetch (or get from cache) and format a result, on the tool executor."""
+    return _format_result(_fetch_cached(source, params, fetch), **format_kwargs)
+
+
+async def _run_data_tool(
+    tool_name: str,
+    source: str,
+    params: dict[str, Any],
+    fetch: Callable[[], Any],
+    **format_kwargs,
+) -> str:
+    """
+    Serve a data tool call. Cached results skip the tool concurrency limit; only
+    formatting runs on the executor.
+    """
+    cached = _response_cache.get(_make_cache_key(source, params))
+    if cached is not None:
+        return await asyncio.wrap_future(
+            _get_executor().submit(partial(_format_result, cached, **format_kwargs))
+        )
+
+    return await _run_tool(
+        tool_name, _fetch_and_format, source, params, fetch, **format_kwargs
+    )
+
+
+def prefetch_common_data() -> dict[str, str]:
+    """
+    Warm the response cache with today/tomorrow data of the common price and consumption
+    calls (see PREFETCH_CALLS). Failed calls are logged and skipped.
+
+    Returns a dictionary of cache keys and "ok" or the error message.
+    """
+    client = _get_eptr_client()
+    now = get_utc3_now()
+    dates = {
+        "today": now.strftime("%Y-%m-%d"),
+        "tomorrow": (now + timedelta(days=1)).strftime("%Y-%m-%d"),
+    }
+
+    status = {}
+    for call_key, days in PREFETCH_CALLS.items():
+        for day in days:
+            params = {"start_date": dates[day], "end_date": dates[day]}
+            key = _make_cache_key(call_key, params)
+            try:
+                result = client.call(call_key, **params)
+                _response_cache.set(key, result, _get_cache_ttl(call_key, params))
+                status[key] = "ok"
+            except (EPTR2RequestError, urllib3.exceptions.HTTPError, ValueError) as e:
+                logger.warning("Prefetch failed for %s: %s", key, e)
+                status[key] = str(e)
+
+    return status
+
+
+async def _prefetch_loop(interval: float | None = None) -> None:
+    """Prefetch once, then every interval seconds (if given) until cancelled."""
+    while True:
+        await asyncio.wrap_future(_get_executor().submit(prefetch_common_data))
+        if not interval:
+            return
+        await asyncio.sleep(interval)
+
 
 # Only define tools if FastMCP is available
 if MCP_AVAILABLE:
 
     @mcp.tool()
-    def get_market_clearing_price(start_date: str, end_date: str) -> str:
+    async def get_market_clearing_price(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get Market Clearing Price (MCP/PTF) data from Turkish electricity market."""
-        client = _get_eptr_client()
-        result = client.call("mcp", start_date=start_date, end_date=end_date)
-        return _format_result(result)
+        return await _run_data_tool(
+            "get_market_clearing_price",
+            "mcp",
+            {"start_date": start_date, "end_date": end_date},
+            partial(_client_call, "mcp", start_date=start_date, end_date=end_date),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_system_marginal_price(start_date: str, end_date: str) -> str:
+    async def get_system_marginal_price(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get System Marginal Price (SMP/SMF) data from Turkish electricity market."""
-        client = _get_eptr_client()
-        result = client.call("smp", start_date=start_date, end_date=end_date)
-        return _format_result(result)
+        return await _run_data_tool(
+            "get_system_marginal_price",
+            "smp",
+            {"start_date": start_date, "end_date": end_date},
+            partial(_client_call, "smp", start_date=start_date, end_date=end_date),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_real_time_consumption(start_date: str, end_date: str) -> str:
+    async def get_real_time_consumption(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get real-time electricity consumption data in MWh."""
-        client = _get_eptr_client()
-        result = client.call("rt-cons", start_date=start_date, end_date=end_date)
-        return _format_result(result)
+        return await _run_data_tool(
+            "get_real_time_consumption",
+            "rt-cons",
+            {"start_date": start_date, "end_date": end_date},
+            partial(_client_call, "rt-cons", start_date=start_date, end_date=end_date),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_real_time_generation(start_date: str, end_date: str) -> str:
+    async def get_real_time_generation(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get real-time generation data by resource type (wind, solar, hydro, etc.)."""
-        client = _get_eptr_client()
-        result = client.call("rt-gen", start_date=start_date, end_date=end_date)
-        return _format_result(result)
+        return await _run_data_tool(
+            "get_real_time_generation",
+            "rt-gen",
+            {"start_date": start_date, "end_date": end_date},
+            partial(_client_call, "rt-gen", start_date=start_date, end_date=end_date),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_demand_forecast(start_date: str, end_date: str) -> str:
+    async def get_demand_forecast(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get demand forecast data (Load Plan/UECM)."""
-        client = _get_eptr_client()
-        result = client.call("load-plan", start_date=start_date, end_date=end_date)
-        return _format_result(result)
+        return await _run_data_tool(
+            "get_demand_forecast",
+            "load-plan",
+            {"start_date": start_date, "end_date": end_date},
+            partial(
+                _client_call, "load-plan", start_date=start_date, end_date=end_date
+            ),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_imbalance_price(start_date: str, end_date: str) -> str:
+    async def get_imbalance_price(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get electricity imbalance prices (positive and negative)."""
-        client = _get_eptr_client()
-        result = client.call("mcp-smp-imb", start_date=start_date, end_date=end_date)
-        return _format_result(result)
+        return await _run_data_tool(
+            "get_imbalance_price",
+            "mcp-smp-imb",
+            {"start_date": start_date, "end_date": end_date},
+            partial(
+                _client_call, "mcp-smp-imb", start_date=start_date, end_date=end_date
+            ),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_available_eptr2_calls() -> str:
+    async def get_available_eptr2_calls() -> str:
         """List all 213+ available API calls in the eptr2 library."""
-        client = _get_eptr_client()
-        calls = client.get_available_calls(include_aliases=True)
+        calls = await _run_tool(
+            "get_available_eptr2_calls",
+            lambda: _get_eptr_client().get_available_calls(include_aliases=True),
+        )
         return json.dumps(calls, indent=2)
 
     @mcp.tool()
-    def call_eptr2_api(
+    async def call_eptr2_api(
         call_key: str,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        additional_params: Optional[dict[str, Any] | str] = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        additional_params: dict[str, Any] | str | None = None,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
     ) -> str:
-        """Generic function to call any eptr2 API endpoint. Use get_available_eptr2_calls first."""
-        client = _get_eptr_client()
+        """Generic function to call any eptr2 API endpoint. Use get_available_eptr2_calls first. For large results use page_size/cursor, columns or summary."""
         params = {}
         if start_date:
             params["start_date"] = start_date
@@ -165,30 +763,96 @@ if MCP_AVAILABLE:
             if not isinstance(additional_params, dict):
                 raise TypeError("additional_params must be a dictionary or JSON string")
             params.update(additional_params)
-        result = client.call(call_key, **params)
-        return _format_result(result)
+        return await _run_data_tool(
+            "call_eptr2_api",
+            call_key,
+            params,
+            partial(_client_call, call_key, **params),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
+        )
 
     @mcp.tool()
-    def get_hourly_consumption_and_forecast(start_date: str, end_date: str) -> str:
+    async def get_hourly_consumption_and_forecast(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get composite data combining load plan, UECM, and real-time consumption."""
-        client = _get_eptr_client()
         from eptr2.composite import get_hourly_consumption_and_forecast_data
 
-        result = get_hourly_consumption_and_forecast_data(
-            client, start_date=start_date, end_date=end_date
+        return await _run_data_tool(
+            "get_hourly_consumption_and_forecast",
+            "get_hourly_consumption_and_forecast_data",
+            {"start_date": start_date, "end_date": end_date},
+            partial(
+                _composite_call,
+                get_hourly_consumption_and_forecast_data,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
         )
-        return _format_result(result)
 
     @mcp.tool()
-    def get_price_and_cost_data(start_date: str, end_date: str) -> str:
+    async def get_price_and_cost_data(
+        start_date: str,
+        end_date: str,
+        columns: list[str] | str | None = None,
+        page_size: int | None = None,
+        cursor: str | None = None,
+        output_format: Literal["json", "csv"] = "json",
+        summary: bool = False,
+    ) -> str:
         """Get comprehensive price and cost data including MCP, SMP, and imbalance costs."""
-        client = _get_eptr_client()
         from eptr2.composite import get_hourly_price_and_cost_data
 
-        result = get_hourly_price_and_cost_data(
-            client, start_date=start_date, end_date=end_date
+        return await _run_data_tool(
+            "get_price_and_cost_data",
+            "get_hourly_price_and_cost_data",
+            {"start_date": start_date, "end_date": end_date},
+            partial(
+                _composite_call,
+                get_hourly_price_and_cost_data,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            columns=columns,
+            page_size=page_size,
+            cursor=cursor,
+            output_format=output_format,
+            summary=summary,
         )
-        return _format_result(result)
+
+
+def _prefetch_options_from_env() -> dict[str, Any]:
+    """
+    Read the prefetch options of the eptr2-mcp-server command. Prefetch is off unless
+    EPTR2_MCP_PREFETCH is "1", "true" or "yes". EPTR2_MCP_PREFETCH_INTERVAL is the
+    refresh interval in seconds.
+    """
+    prefetch = os.environ.get("EPTR2_MCP_PREFETCH", "").strip().lower()
+    interval = os.environ.get("EPTR2_MCP_PREFETCH_INTERVAL", "").strip()
+    try:
+        prefetch_interval = float(interval) if interval else None
+    except ValueError:
+        logger.warning("Invalid EPTR2_MCP_PREFETCH_INTERVAL: %s", interval)
+        prefetch_interval = None
+    return {
+        "prefetch": prefetch in ("1", "true", "yes"),
+        "prefetch_interval": prefetch_interval,
+    }
 
 
 def main():
@@ -196,7 +860,7 @@ def main():
     if not MCP_AVAILABLE:
         logger.error("FastMCP is not installed. Install it with: pip install fastmcp")
         sys.exit(1)
-    asyncio.run(run_mcp_server())
+    asyncio.run(run_mcp_server(**_prefetch_options_from_env()))
 
 
 if __name__ == "__main__":
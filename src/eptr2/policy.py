@@ -0,0 +1,367 @@
+"""
+Call policy of EPTR2 clients: per-endpoint default timeouts, a global retry budget and a
+per-endpoint circuit breaker.
+
+The policy is opt-in: EPTR2(policy=True) uses CallPolicy() and EPTR2(policy=CallPolicy(...))
+a custom one. Clients without a policy send requests with the timeouts of their callers, do
+not throttle and do not retry beyond retry_attempts. The state of a policy can be inspected
+with EPTR2.get_stats().
+"""
+
+import threading
+import time
+from collections import deque
+
+from eptr2.exceptions import EPTR2RequestError
+
+### Default timeouts (seconds) by expected payload size
+
+DEFAULT_TIMEOUT = 15
+LARGE_PAYLOAD_TIMEOUT = 45
+BULK_TIMEOUT = 90
+
+## Lists, logs, order books and bulk endpoints returning large payloads
+LARGE_PAYLOAD_CALLS = [
+    "supply-demand",
+    "dam-bid",
+    "dam-offer",
+    "dam-block-bid",
+    "dam-block-offer",
+    "dam-flexible-bid",
+    "dam-flexible-offer",
+    "dam-flexible-matching",
+    "idm-log",
+    "idm-order-history",
+    "idm-contract-list",
+    "bpm-orders",
+    "bpm-orders-w-avg",
+    "mms",
+    "planned-outages",
+    "unplanned-outages",
+    "market-participants",
+    "ra-meters",
+    "ng-transaction-history",
+    "ng-vgp-order-book",
+    "ng-vgp-transaction-history",
+    "vep-transaction-history",
+]
+
+## Bulk master data and plant-level endpoints
+BULK_CALLS = [
+    "pp-list",
+    "pp-list-for-date-range",
+    "uevm-pp-list",
+    "gen-org",
+    "gen-uevcb",
+    "uevcb-list-bulk",
+    "lic-pp-list",
+    "mms-pp-list",
+    "mms-uevcb-list",
+    "dpp-bulk",
+    "rt-gen-bulk",
+    "ren-pp-list",
+]
+
+
+def get_default_timeouts() -> dict:
+    """Default request timeouts by call key. Keys not listed use DEFAULT_TIMEOUT."""
+    d = {k: LARGE_PAYLOAD_TIMEOUT for k in LARGE_PAYLOAD_CALLS}
+    d.update({k: BULK_TIMEOUT for k in BULK_CALLS})
+    return d
+
+
+class CircuitOpenError(EPTR2RequestError):
+    """Raised without sending a request while the circuit of an endpoint is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"Circuit for {endpoint} is open after consecutive failures. Retry in {retry_in:.1f} seconds.",
+            endpoint=endpoint,
+            elapsed=0.0,
+        )
+        self.retry_in = retry_in
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of the requests in a sliding time window. min_retries
+    retries are always allowed so that a few failures on a quiet client can be retried.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 60.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        limit = now - self.window
+        for q in (self._requests, self._retries):
+            while q and q[0] < limit:
+                q.popleft()
+
+    def record_request(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._requests.append(now)
+
+    def try_spend(self, now: float | None = None) -> bool:
+        """Spend a retry if the budget allows it."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._trim(now)
+            allowed = max(self.min_retries, self.ratio * len(self._requests))
+            if len(self._retries) >= allowed:
+                self.denied += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "denied": self.denied,
+                "ratio": self.ratio,
+            }
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker. After failure_threshold consecutive failures the circuit
+    opens and requests fail fast with CircuitOpenError. After cooldown seconds it half-opens
+    and lets a single probe request through; success closes the circuit, failure opens it
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._states: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _get_state(self, endpoint: str) -> dict:
+        return self._states.setdefault(
+            endpoint,
+            {
+                "state": self.CLOSED,
+                "failures": 0,
+                "opened_at": None,
+                "probing": False,
+                "rejected": 0,
+            },
+        )
+
+    def before_request(self, endpoint: str, now: float | None = None) -> None:
+        """Raises CircuitOpenError if the request should not be sent."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            s = self._get_state(endpoint)
+            if s["state"] == self.CLOSED:
+                return
+            if s["state"] == self.OPEN:
+                retry_in = s["opened_at"] + self.cooldown - now
+                if retry_in > 0:
+                    s["rejected"] += 1
+                    raise CircuitOpenError(endpoint, retry_in)
+                s["state"] = self.HALF_OPEN
+                s["probing"] = False
+            if s["probing"]:
+                s["rejected"] += 1
+                raise CircuitOpenError(endpoint, 0.0)
+            s["probing"] = True
+
+    def record_success(self, endpoint: str) -> None:
+        with self._lock:
+            s = self._get_state(endpoint)
+            s.update(state=self.CLOSED, failures=0, opened_at=None, probing=False)
+
+    def record_failure(self, endpoint: str, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            s = self._get_state(endpoint)
+            s["failures"] += 1
+            s["probing"] = False
+            if s["state"] == self.HALF_OPEN or s["failures"] >= self.failure_threshold:
+                s["state"] = self.OPEN
+                s["opened_at"] = now
+
+    def release(self, endpoint: str) -> None:
+        """Ends a half-open probe that failed without an endpoint-side failure."""
+        with self._lock:
+            self._get_state(endpoint)["probing"] = False
+
+    def get_state(self, endpoint: str) -> str:
+        with self._lock:
+            return self._states.get(endpoint, {}).get("state", self.CLOSED)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                k: {
+                    "state": v["state"],
+                    "failures": v["failures"],
+                    "rejected": v["rejected"],
+                }
+                for k, v in self._states.items()
+            }
+
+
+class RateLimiter:
+    """
+    Token bucket limiting requests to rate per second with bursts of up to burst
+    requests. acquire blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        if rate <= 0:
+            raise ValueError("rate should be positive.")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping if needed. Returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            ## Tokens may go negative; later callers wait for their own slot
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rate": self.rate, "burst": self.burst, "waited": self.waited}
+
+
+class CallPolicy:
+    """
+    Central timeout, retry and failure policy of an EPTR2 client.
+
+    Parameters:
+        timeouts: Request timeouts by call key, merged over get_default_timeouts().
+        default_timeout: Timeout of call keys without a specific timeout.
+        retry_budget: RetryBudget shared by all calls of the client (default RetryBudget()).
+            False disables it.
+        circuit_breaker: CircuitBreaker of the client (default CircuitBreaker()). False
+            disables it.
+        rate_limit: Maximum requests per second shared by all calls (and threads) of the
+            client, including retries. None (default) means no limit.
+        burst: Maximum burst of requests of the rate limit.
+
+    Explicit request_kwargs={"timeout": ...} in a call override the policy timeout.
+    """
+
+    def __init__(
+        self,
+        timeouts: dict | None = None,
+        default_timeout: float | None = DEFAULT_TIMEOUT,
+        retry_budget: RetryBudget | bool | None = None,
+        circuit_breaker: CircuitBreaker | bool | None = None,
+        rate_limit: float | None = None,
+        burst: int | None = None,
+    ):
+        self.timeouts = get_default_timeouts()
+        self.timeouts.update(timeouts or {})
+        self.default_timeout = default_timeout
+        self.retry_budget = (
+            RetryBudget() if retry_budget is None else (retry_budget or None)
+        )
+        self.circuit_breaker = (
+            CircuitBreaker() if circuit_breaker is None else (circuit_breaker or None)
+        )
+        self.rate_limiter = (
+            RateLimiter(rate_limit, burst=burst) if rate_limit is not None else None
+        )
+
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "retries": 0, "successes": 0, "failures": 0}
+
+    def get_timeout(self, key: str) -> float | None:
+        return self.timeouts.get(key, self.default_timeout)
+
+    def before_request(self, key: str, attempt: int) -> None:
+        """Called before every attempt. Raises CircuitOpenError when open."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request(key)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
+        with self._lock:
+            self._counts["requests"] += 1
+            if attempt > 1:
+                self._counts["retries"] += 1
+
+    def allow_retry(self, key: str) -> bool:
+        """Whether a failed attempt of the call may be retried."""
+        if self.retry_budget is None:
+            return True
+        return self.retry_budget.try_spend()
+
+    def record_success(self, key: str) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success(key)
+        with self._lock:
+            self._counts["successes"] += 1
+
+    def record_failure(self, key: str) -> None:
+        """Records a failure caused by the endpoint (timeouts, 5xx, throttling)."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure(key)
+        with self._lock:
+            self._counts["failures"] += 1
+
+    def release(self, key: str) -> None:
+        """Called when an attempt fails with an unexpected exception."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            d = dict(self._counts)
+        d["retry_budget"] = (
+            self.retry_budget.stats() if self.retry_budget is not None else None
+        )
+        d["rate_limit"] = (
+            self.rate_limiter.stats() if self.rate_limiter is not None else None
+        )
+        d["circuits"] = (
+            self.circuit_breaker.stats() if self.circuit_breaker is not None else {}
+        )
+        return d
+
+
+def get_request_timeout_kwargs(
+    eptr, default: float, timeout: float | None = None
+) -> dict:
+    """
+    Call kwargs of the timeout of a composite request. An explicit timeout is always
+    used. Otherwise default is used by clients without a call policy and clients with a
+    policy use its endpoint timeouts.
+
+    Example:
+        >>> eptr.call("mcp", start_date=sd, end_date=ed, **get_request_timeout_kwargs(eptr, 5))
+    """
+    if timeout is None and getattr(eptr, "policy", None) is not None:
+        return {}
+    return {"request_kwargs": {"timeout": default if timeout is None else timeout}}
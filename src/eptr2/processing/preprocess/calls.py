@@ -25,4 +25,17 @@ def process_special_calls(call_key, param_d):
     ]:
         param_d["is_txn_period"] = True
 
+    if call_key in [
+        "dams-active-fullness",
+        "dams-daily-level",
+        "dams-active-volume",
+        "dams-daily-volume",
+        "dams-info",
+        "dams-water-energy-provision",
+    ]:
+        ## Date range is optional, it is not sent unless given
+        for k in ["start_date", "end_date"]:
+            if k in param_d and param_d[k] is None:
+                param_d.pop(k)
+
     return param_d
@@ -0,0 +1,6 @@
+"""Offline testing helpers for eptr2."""
+
+from eptr2.testing.recorder import CallRecorder, RecordedResponse
+from eptr2.testing.standin import StandInServer, load_payloads
+
+__all__ = ["CallRecorder", "RecordedResponse", "StandInServer", "load_payloads"]
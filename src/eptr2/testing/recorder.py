@@ -0,0 +1,224 @@
+"""
+Record and replay of EPIAS Transparency calls.
+
+In record mode every request sent through `transparency_call` (call key and mapped
+body) is stored with the raw response bytes, status and elapsed time. The archive is a
+zip file with an `index.json` and one compressed member per response. In replay mode the
+responses are served back from the archive, optionally with their original timing, so
+that composites can be profiled and benchmarked repeatably without network access.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_MEMBER = "index.json"
+ARCHIVE_VERSION = 1
+
+
+class RecordedResponse:
+    """Minimal urllib3-like response served in replay mode."""
+
+    __slots__ = ("data", "headers", "status")
+
+    def __init__(self, status: int, data: bytes, headers: dict | None = None):
+        self.status = status
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.data.decode("utf-8"))
+
+
+def request_id(key: str, call_body: dict | None) -> str:
+    """Identifier of a request, independent of body key order."""
+    body = json.dumps(call_body, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(f"{key}|{body}".encode()).hexdigest()
+
+
+class CallRecorder:
+    """
+    Recorder/replayer of transparency calls. Pass it to EPTR2 as `recorder`.
+
+    Parameters:
+        path: Archive path (zip).
+        mode: "record" or "replay".
+        replay_timing: Sleep the recorded elapsed time before serving a response.
+        timing_scale: Multiplier of the recorded elapsed time in replay_timing.
+
+    Identical requests recorded more than once are replayed in recorded order; the last
+    one is repeated once they are exhausted. Replaying a request that is not in the
+    archive raises LookupError.
+
+    Example:
+        >>> with CallRecorder("portfolio.zip", mode="record") as recorder:
+        ...     eptr = EPTR2(recorder=recorder)
+        ...     calculate_portfolio_costs(..., eptr=eptr)
+        >>> eptr = CallRecorder("portfolio.zip", mode="replay").client()
+        >>> calculate_portfolio_costs(..., eptr=eptr)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "record",
+        replay_timing: bool = False,
+        timing_scale: float = 1.0,
+    ):
+        if mode not in ["record", "replay"]:
+            raise ValueError("mode should be either 'record' or 'replay'.")
+
+        self.path = path
+        self.mode = mode
+        self.replay_timing = replay_timing
+        self.timing_scale = timing_scale
+
+        self.entries: list[dict] = []
+        self._responses: list[bytes] = []
+        self._positions: dict[str, int] = {}
+        self._by_id: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+        if mode == "replay":
+            self.load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self.mode == "record":
+            self.save()
+
+    def call(self, key: str, call_path: str, call_body: dict | None, send):
+        """
+        Record the response of send() or replay a recorded one. send is a function without
+        arguments performing the actual transparency call.
+        """
+        rid = request_id(key, call_body)
+
+        if self.replaying:
+            return self._replay(rid, key, call_body)
+
+        start_time = time.perf_counter()
+        res = send()
+        elapsed = time.perf_counter() - start_time
+
+        with self._lock:
+            self._by_id.setdefault(rid, []).append(len(self.entries))
+            self.entries.append(
+                {
+                    "id": rid,
+                    "key": key,
+                    "path": call_path,
+                    "body": call_body,
+                    "status": res.status,
+                    "content_type": res.headers.get("Content-Type"),
+                    "elapsed": round(elapsed, 6),
+                    "recorded_at": time.time(),
+                }
+            )
+            self._responses.append(res.data)
+
+        return res
+
+    def _replay(self, rid: str, key: str, call_body: dict | None) -> RecordedResponse:
+        with self._lock:
+            indices = self._by_id.get(rid)
+            if not indices:
+                raise LookupError(
+                    f"No recorded response for call {key} with body {call_body} in {self.path}."
+                )
+            position = self._positions.get(rid, 0)
+            self._positions[rid] = position + 1
+            idx = indices[min(position, len(indices) - 1)]
+            entry = self.entries[idx]
+            data = self._responses[idx]
+
+        if self.replay_timing:
+            time.sleep(entry["elapsed"] * self.timing_scale)
+
+        headers = {}
+        if entry.get("content_type"):
+            headers["Content-Type"] = entry["content_type"]
+        return RecordedResponse(entry["status"], data, headers)
+
+    def rewind(self) -> None:
+        """Serve recorded responses from the beginning again."""
+        with self._lock:
+            self._positions = {}
+
+    def save(self, path: str | None = None) -> None:
+        """Write the recorded calls to the archive."""
+        path = path or self.path
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        with self._lock:
+            index = {"version": ARCHIVE_VERSION, "entries": []}
+            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for i, (entry, data) in enumerate(zip(self.entries, self._responses)):
+                    member = f"responses/{i:06d}"
+                    zf.writestr(member, data)
+                    index["entries"].append({**entry, "member": member})
+                zf.writestr(INDEX_MEMBER, json.dumps(index, default=str))
+
+        logger.info("Recorded %d calls to %s", len(self.entries), path)
+
+    def load(self, path: str | None = None) -> None:
+        """Read recorded calls from the archive."""
+        path = path or self.path
+        with zipfile.ZipFile(path, "r") as zf:
+            index = json.loads(zf.read(INDEX_MEMBER))
+            if index.get("version") != ARCHIVE_VERSION:
+                raise ValueError(
+                    f"Unsupported recording version {index.get('version')} in {path}."
+                )
+            entries = index["entries"]
+            responses = [zf.read(x.pop("member")) for x in entries]
+
+        with self._lock:
+            self.entries = entries
+            self._responses = responses
+            self._positions = {}
+            self._by_id = {}
+            for i, entry in enumerate(entries):
+                self._by_id.setdefault(entry["id"], []).append(i)
+
+    def client(self, **kwargs):
+        """
+        Create an EPTR2 client using this recorder. In replay mode no credentials or
+        network access are needed. Keyword arguments are passed to EPTR2.
+        """
+        from eptr2 import EPTR2
+
+        params = {"recorder": self}
+        if self.replaying:
+            params.update(
+                {
+                    "username": "replay",
+                    "password": "replay",
+                    "use_dotenv": False,
+                    "recycle_tgt": False,
+                }
+            )
+        params.update(kwargs)
+        return EPTR2(**params)
@@ -0,0 +1,366 @@
+"""
+Local stand-in for EPIAS Transparency and CAS login endpoints.
+
+The server answers every transparency path with recorded or synthetic `items` payloads
+and the CAS ticket endpoint with a dummy TGT, so that EPTR2 calls, postprocessing and
+composite functions can be exercised (and benchmarked) without network access.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+from eptr2.mapping.path import get_path_map, get_total_path
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+logger = logging.getLogger(__name__)
+
+LOGIN_PATH = "/cas/v1/tickets"
+
+## Field layout of synthetic items per call key. Date fields are filled with the hour
+## of the row, value fields with random numbers. Keys not listed use the default layout.
+SYNTHETIC_ITEM_FIELDS = {
+    "default": {"date_fields": ["date", "hour"], "value_fields": ["value"]},
+    "mcp": {
+        "date_fields": ["date", "hour"],
+        "value_fields": ["price", "priceUsd", "priceEur"],
+    },
+    "smp": {
+        "date_fields": ["date", "hour"],
+        "value_fields": ["systemMarginalPrice"],
+    },
+    "wap": {"date_fields": ["date", "hour"], "value_fields": ["wap"]},
+    "mcp-smp-imb": {
+        "date_fields": ["date", "time"],
+        "value_fields": ["ptf", "smf", "positiveImbalance", "negativeImbalance"],
+        "constant_fields": {"systemStatus": "Enerji Açığı"},
+    },
+    "load-plan": {"date_fields": ["date", "time"], "value_fields": ["lep"]},
+    "uecm": {"date_fields": ["period"], "value_fields": ["swv"]},
+    "rt-cons": {"date_fields": ["date", "time"], "value_fields": ["consumption"]},
+    "rt-gen": {
+        "date_fields": ["date", "hour"],
+        "value_fields": ["total", "naturalGas", "wind", "sun", "river"],
+    },
+    "uevm": {
+        "date_fields": ["date", "hour"],
+        "value_fields": ["total", "naturalGas", "wind", "sun"],
+    },
+    "kgup": {
+        "date_fields": ["date", "time"],
+        "value_fields": ["toplam", "dogalgaz", "ruzgar", "gunes"],
+    },
+    "kgup-v1": {
+        "date_fields": ["date", "time"],
+        "value_fields": ["toplam", "dogalgaz", "ruzgar", "gunes"],
+    },
+    "kudup": {
+        "date_fields": ["date", "time"],
+        "value_fields": ["toplam", "dogalgaz", "ruzgar", "gunes"],
+    },
+}
+
+
+def load_payloads(directory: str) -> dict:
+    """
+    Load recorded payloads from a directory of `<call key>.json` files.
+
+    Returns a dictionary of call keys and response dictionaries to be passed to
+    StandInServer(payloads=...).
+    """
+    payloads = {}
+    for file_name in os.listdir(directory):
+        if file_name.endswith(".json"):
+            with open(os.path.join(directory, file_name), "r") as f:
+                payloads[file_name[: -len(".json")]] = json.load(f)
+    return payloads
+
+
+def _parse_body_datetime(x: str | None) -> datetime | None:
+    if not x:
+        return None
+    try:
+        return datetime.fromisoformat(x)
+    except ValueError:
+        return None
+
+
+class StandInServer:
+    """
+    Local HTTP stand-in for the EPIAS Transparency Platform.
+
+    Parameters:
+        payloads: Recorded responses by call key (see load_payloads). Served as is.
+        latency: Seconds to wait before every response, or a (min, max) range.
+        error_rate: Probability (0-1) of answering a transparency call with error_status.
+        error_status: HTTP status code of injected errors.
+        fail_first: Number of first transparency calls answered with error_status,
+            regardless of error_rate.
+        retry_after: Retry-After header value (seconds or HTTP date) of injected errors.
+        n_items: Fixed number of synthetic items per response. By default one item per
+            hour between startDate and endDate of the request body (24 without dates).
+        extra_fields: Number of additional numeric fields per synthetic item, to increase
+            payload size.
+        seed: Random seed for synthetic values and error injection.
+        host, port: Bind address. Port 0 picks a free port.
+
+    Example:
+        >>> with StandInServer(latency=0.01) as server:
+        ...     eptr = server.client()
+        ...     df = eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+        >>> len(df)
+        24
+    """
+
+    def __init__(
+        self,
+        payloads: dict | None = None,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        fail_first: int = 0,
+        retry_after: float | str | None = None,
+        n_items: int | None = None,
+        extra_fields: int = 0,
+        seed: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.payloads = payloads or {}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.n_items = n_items
+        self.extra_fields = extra_fields
+        self.host = host
+        self.port = port
+
+        self.request_counts: dict[str, int] = {}
+        self.login_count = 0
+        self.error_count = 0
+
+        self._expired_tgts: set[str] = set()
+        self._issued_tgts: set[str] = set()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._path_to_key = {
+            "/" + get_total_path(k): k for k in get_path_map(just_call_keys=True)
+        }
+        self._httpd: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Root URL to be used as EPTR2 root_phrase."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def login_url(self) -> str:
+        """CAS ticket URL to be used as EPTR2 login_url."""
+        return self.url + LOGIN_PATH
+
+    def start(self) -> "StandInServer":
+        """Start serving in a background thread."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="eptr2-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "Self":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def client(self, **kwargs):
+        """
+        Create an EPTR2 client connected to the stand-in server. Keyword arguments are
+        passed to EPTR2.
+        """
+        from eptr2 import EPTR2
+
+        params = {
+            "username": "standin",
+            "password": "standin",
+            "use_dotenv": False,
+            "recycle_tgt": False,
+            "root_phrase": self.url,
+            "login_url": self.login_url,
+        }
+        params.update(kwargs)
+        return EPTR2(**params)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.request_counts = {}
+            self.login_count = 0
+            self.error_count = 0
+
+    def _sleep(self) -> None:
+        if isinstance(self.latency, (tuple, list)):
+            with self._lock:
+                delay = self._rng.uniform(*self.latency)
+        else:
+            delay = self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+    def expire_tgts(self) -> None:
+        """Expire all TGTs issued so far. Calls with them are answered with 401."""
+        with self._lock:
+            self._expired_tgts |= self._issued_tgts
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return True
+            if self.error_rate <= 0:
+                return False
+            return self._rng.random() < self.error_rate
+
+    def build_payload(self, key: str | None, body: dict) -> dict:
+        """Recorded payload of the key if available, otherwise a synthetic one."""
+        if key in self.payloads:
+            return self.payloads[key]
+
+        layout = SYNTHETIC_ITEM_FIELDS.get(key, SYNTHETIC_ITEM_FIELDS["default"])
+
+        start_dt = _parse_body_datetime(body.get("startDate") or body.get("date"))
+        end_dt = _parse_body_datetime(body.get("endDate")) or start_dt
+        if start_dt is None:
+            start_dt = datetime.fromisoformat("2024-01-01T00:00:00+03:00")
+            end_dt = start_dt
+
+        n_items = self.n_items
+        if n_items is None:
+            n_items = int((end_dt - start_dt).total_seconds() // 3600) + 24
+
+        extra_fields = [f"extra{i}" for i in range(self.extra_fields)]
+        with self._lock:
+            rng_values = [
+                [
+                    round(self._rng.uniform(0, 3000), 2)
+                    for _ in range(len(layout["value_fields"]) + len(extra_fields))
+                ]
+                for _ in range(n_items)
+            ]
+
+        items = []
+        for i in range(n_items):
+            dt = start_dt + timedelta(hours=i)
+            item = {}
+            for f in layout["date_fields"]:
+                if f in ["hour", "time"]:
+                    item[f] = dt.strftime("%H:00")
+                else:
+                    item[f] = dt.isoformat(timespec="seconds")
+            item.update(
+                zip(layout["value_fields"] + extra_fields, rng_values[i], strict=True)
+            )
+            item.update(layout.get("constant_fields", {}))
+            items.append(item)
+
+        return {
+            "items": items,
+            "page": {"number": 1, "size": n_items, "total": n_items},
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug("Stand-in server: " + format, *args)
+
+            def _send(self, status: int, body: bytes, content_type: str, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    ## Client gave up (e.g. timed out) before the response
+                    logger.debug("Stand-in server: client disconnected")
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _handle(self):
+                raw_body = self._read_body()
+                path = self.path.split("?", 1)[0]
+                server._sleep()
+
+                if path == LOGIN_PATH:
+                    with server._lock:
+                        server.login_count += 1
+                        n = server.login_count
+                        tgt = f"TGT-{n}-standin"
+                        server._issued_tgts.add(tgt)
+                    self._send(201, tgt.encode(), "text/plain")
+                    return
+
+                with server._lock:
+                    server.request_counts[path] = server.request_counts.get(path, 0) + 1
+
+                if self.headers.get("TGT") in server._expired_tgts:
+                    self._send(
+                        401,
+                        json.dumps({"errors": ["TGT expired"]}).encode(),
+                        "application/json",
+                    )
+                    return
+
+                if server._should_fail():
+                    with server._lock:
+                        server.error_count += 1
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = str(server.retry_after)
+                    self._send(
+                        server.error_status,
+                        json.dumps({"errors": ["injected error"]}).encode(),
+                        "application/json",
+                        headers=headers,
+                    )
+                    return
+
+                try:
+                    body = json.loads(raw_body or b"{}") or {}
+                except ValueError:
+                    body = {}
+
+                payload = server.build_payload(server._path_to_key.get(path), body)
+                self._send(200, json.dumps(payload).encode(), "application/json")
+
+            do_GET = _handle
+            do_POST = _handle
+
+        return _Handler
@@ -0,0 +1,311 @@
+"""
+Array-backed hourly contract calendar.
+
+Contracts are represented as int64 hour indices (hours since the Unix epoch of the delivery
+start, UTC) instead of 'PHyyMMDDHH' strings. Open and close times of a contiguous range of
+contracts are precomputed as epoch arrays, so remaining times, gate states, active windows
+and neighbours of many contracts are computed with numpy at once. Strings are only parsed
+and formatted at the edges (contracts_to_hours, hours_to_contracts).
+
+Contract times follow eptr2.util.time: delivery hours are in UTC+3, gates open at 18:00 of
+the previous day and close 1 hour before delivery.
+"""
+
+import numpy as np
+
+from eptr2.util.time import _format_remaining_seconds, get_utc3_now
+
+UTC3_OFFSET_HOURS = 3
+
+
+def _now_ts() -> float:
+    return get_utc3_now().timestamp()
+
+
+def contracts_to_hours(contracts) -> np.ndarray | int:
+    """
+    Convert contract strings ('PHyyMMDDHH') to int64 hour indices.
+
+    Args:
+        contracts: A contract string or a sequence/array of contract strings.
+
+    Returns:
+        int64 array of hour indices (an int for a single contract).
+
+    Raises:
+        ValueError: If a contract is not a valid hourly contract string.
+
+    Example:
+        >>> contracts_to_hours("PH24072914")
+        478403
+    """
+    scalar = np.ndim(contracts) == 0
+    a = np.atleast_1d(np.asarray(contracts, dtype=str))
+    if len(a) == 0:
+        return np.empty(0, dtype=np.int64)
+    if (np.char.str_len(a) != 10).any() or not np.char.startswith(a, "PH").all():
+        raise ValueError("Contracts should be hourly contracts in 'PHyyMMDDHH' format.")
+
+    digits = a.astype("U10").view(np.uint32).reshape(-1, 10)[:, 2:].astype(np.int64)
+    digits -= ord("0")
+    if ((digits < 0) | (digits > 9)).any():
+        raise ValueError("Contracts should be hourly contracts in 'PHyyMMDDHH' format.")
+
+    year = 2000 + digits[:, 0] * 10 + digits[:, 1]
+    month = digits[:, 2] * 10 + digits[:, 3]
+    day = digits[:, 4] * 10 + digits[:, 5]
+    hour = digits[:, 6] * 10 + digits[:, 7]
+
+    months = (year - 1970) * 12 + month - 1
+    month_start = (
+        months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    )
+    month_days = (months + 1).astype("datetime64[M]").astype("datetime64[D]").astype(
+        np.int64
+    ) - month_start
+    if (
+        ((month < 1) | (month > 12)).any()
+        or ((day < 1) | (day > month_days)).any()
+        or (hour > 23).any()
+    ):
+        raise ValueError("Contracts should be hourly contracts in 'PHyyMMDDHH' format.")
+
+    hours = (month_start + day - 1) * 24 + hour - UTC3_OFFSET_HOURS
+    return int(hours[0]) if scalar else hours
+
+
+def hours_to_contracts(hours) -> np.ndarray | str:
+    """
+    Convert int64 hour indices to contract strings ('PHyyMMDDHH').
+
+    Example:
+        >>> hours_to_contracts(478403)
+        'PH24072914'
+    """
+    scalar = np.ndim(hours) == 0
+    h = np.atleast_1d(np.asarray(hours, dtype=np.int64))
+    local = (h + UTC3_OFFSET_HOURS).astype("datetime64[h]")
+    ## 'YYYY-MM-DDTHH' -> 'PHyyMMDDHH'
+    chars = np.datetime_as_string(local, unit="h").astype("U13").view(np.uint32)
+    chars = chars.reshape(-1, 13)[:, [2, 3, 5, 6, 8, 9, 11, 12]]
+    out = np.empty((len(h), 10), dtype=np.uint32)
+    out[:, 0] = ord("P")
+    out[:, 1] = ord("H")
+    out[:, 2:] = chars
+    out = out.view("U10").ravel()
+    return str(out[0]) if scalar else out
+
+
+def contract_open_timestamps(hours, start_hour: int = 18) -> np.ndarray:
+    """Gate opening times (epoch seconds) of hour indices, start_hour of the previous day."""
+    h = np.asarray(hours, dtype=np.int64)
+    local_day = (h + UTC3_OFFSET_HOURS) // 24
+    return ((local_day - 1) * 24 + start_hour - UTC3_OFFSET_HOURS) * 3600
+
+
+def contract_close_timestamps(hours, delta: int = 3600) -> np.ndarray:
+    """Gate closure times (epoch seconds) of hour indices, delta seconds before delivery."""
+    return np.asarray(hours, dtype=np.int64) * 3600 - delta
+
+
+def active_contract_window(ts=None, delta: int = 3600, start_hour: int = 18):
+    """
+    First and last hour index of the contracts whose gate is open at ts.
+
+    Args:
+        ts: Epoch seconds, scalar or array (default: now).
+        delta, start_hour: Gate closure and opening rules (see contract_close_timestamps
+            and contract_open_timestamps).
+
+    Returns:
+        Tuple of first and last hour indices (arrays if ts is an array). The window is
+        empty if first > last.
+
+    Example:
+        >>> first, last = active_contract_window(1722236400)  ## 2024-07-29 10:00
+        >>> hours_to_contracts([first, last]).tolist()
+        ['PH24072912', 'PH24072923']
+    """
+    if ts is None:
+        ts = _now_ts()
+    t = np.asarray(ts, dtype=np.float64)
+    ## Smallest hour closing after ts
+    first = np.floor((t + delta) / 3600).astype(np.int64) + 1
+    ## Last local day whose gate has opened and its last hour
+    local_hours = np.floor(t / 3600).astype(np.int64) + UTC3_OFFSET_HOURS
+    last_day = (local_hours - start_hour) // 24 + 1
+    last = (last_day + 1) * 24 - 1 - UTC3_OFFSET_HOURS
+    if t.ndim == 0:
+        return int(first), int(last)
+    return first, last
+
+
+class ContractCalendar:
+    """
+    Contiguous range of hourly contracts with precomputed gate times.
+
+    Parameters:
+        first_hour, last_hour: First and last contract as hour indices or contract strings
+            (both included).
+        delta: Seconds before delivery when the gate closes (default 3600).
+        start_hour: Hour of the previous day when the gate opens (default 18).
+
+    Attributes:
+        hours: int64 hour indices of the contracts.
+        epoch, open_ts, close_ts: int64 epoch seconds of delivery start, gate opening and
+            gate closure.
+
+    Positions in the calendar are hour - first_hour, so mapping contracts to rows needs no
+    lookups. Methods taking hours accept hour indices; convert strings at the edges with
+    contracts_to_hours or index_of.
+
+    Example:
+        >>> cal = ContractCalendar.around()  ## yesterday to tomorrow
+        >>> active = cal.active()            ## hour indices of open contracts
+        >>> cal.remaining(hours=active)      ## seconds to gate closure
+        >>> cal.symbols(active)
+    """
+
+    def __init__(
+        self,
+        first_hour: int | str,
+        last_hour: int | str,
+        delta: int = 3600,
+        start_hour: int = 18,
+    ):
+        if isinstance(first_hour, str):
+            first_hour = contracts_to_hours(first_hour)
+        if isinstance(last_hour, str):
+            last_hour = contracts_to_hours(last_hour)
+        if last_hour < first_hour:
+            raise ValueError("last_hour should not be before first_hour.")
+
+        self.first_hour = int(first_hour)
+        self.last_hour = int(last_hour)
+        self.delta = delta
+        self.start_hour = start_hour
+        self.hours = np.arange(self.first_hour, self.last_hour + 1, dtype=np.int64)
+        self.epoch = self.hours * 3600
+        self.open_ts = contract_open_timestamps(self.hours, start_hour=start_hour)
+        self.close_ts = contract_close_timestamps(self.hours, delta=delta)
+
+    @classmethod
+    def from_dates(cls, start_date: str, end_date: str, **kwargs) -> "ContractCalendar":
+        """Calendar of all hours from start_date to end_date (YYYY-MM-DD, both included)."""
+        first = contracts_to_hours("PH" + start_date[2:].replace("-", "") + "00")
+        last = contracts_to_hours("PH" + end_date[2:].replace("-", "") + "23")
+        return cls(first, last, **kwargs)
+
+    @classmethod
+    def around(
+        cls, ts=None, days_before: int = 1, days_after: int = 1, **kwargs
+    ) -> "ContractCalendar":
+        """Calendar of the local days from days_before before ts (default: now) to
+        days_after after it."""
+        if ts is None:
+            ts = _now_ts()
+        day = (int(ts // 3600) + UTC3_OFFSET_HOURS) // 24
+        first = (day - days_before) * 24 - UTC3_OFFSET_HOURS
+        last = (day + days_after + 1) * 24 - 1 - UTC3_OFFSET_HOURS
+        return cls(first, last, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+    def __repr__(self):
+        return (
+            f"ContractCalendar({hours_to_contracts(self.first_hour)!r}, "
+            f"{hours_to_contracts(self.last_hour)!r})"
+        )
+
+    def __contains__(self, hour) -> bool:
+        if isinstance(hour, str):
+            hour = contracts_to_hours(hour)
+        return self.first_hour <= hour <= self.last_hour
+
+    def positions(self, hours) -> np.ndarray:
+        """Positions of hour indices in the calendar arrays."""
+        pos = np.asarray(hours, dtype=np.int64) - self.first_hour
+        if ((pos < 0) | (pos >= len(self))).any():
+            raise KeyError("Some hours are outside of the calendar.")
+        return pos
+
+    def index_of(self, contracts) -> np.ndarray:
+        """Positions of contract strings in the calendar arrays."""
+        return self.positions(contracts_to_hours(contracts))
+
+    def symbols(self, hours=None) -> list[str]:
+        """Contract strings of hour indices (default: all contracts of the calendar)."""
+        if hours is None:
+            hours = self.hours
+        return hours_to_contracts(np.atleast_1d(hours)).tolist()
+
+    def _select(self, x: np.ndarray, hours) -> np.ndarray:
+        return x if hours is None else x[self.positions(hours)]
+
+    def remaining(self, ts=None, hours=None) -> np.ndarray:
+        """Seconds to gate closure at ts (default: now) of hours (default: all).
+        Negative if the gate has closed."""
+        if ts is None:
+            ts = _now_ts()
+        return self._select(self.close_ts, hours) - ts
+
+    def is_open(self, ts=None, hours=None) -> np.ndarray:
+        """Whether the gate of each contract is open at ts (default: now)."""
+        if ts is None:
+            ts = _now_ts()
+        return (self._select(self.open_ts, hours) <= ts) & (
+            ts < self._select(self.close_ts, hours)
+        )
+
+    def active_slice(self, ts=None) -> slice:
+        """Slice of calendar positions of the contracts whose gate is open at ts."""
+        if ts is None:
+            ts = _now_ts()
+        ## Open and close times are non-decreasing, so open contracts are contiguous
+        lo = int(np.searchsorted(self.close_ts, ts, side="right"))
+        hi = int(np.searchsorted(self.open_ts, ts, side="right"))
+        return slice(lo, max(lo, hi))
+
+    def active(self, ts=None) -> np.ndarray:
+        """Hour indices of the contracts whose gate is open at ts (default: now)."""
+        return self.hours[self.active_slice(ts)]
+
+    def active_windows(self, ts) -> tuple[np.ndarray, np.ndarray]:
+        """Start and stop calendar positions of the open contracts at each of many times."""
+        ts = np.asarray(ts)
+        lo = np.searchsorted(self.close_ts, ts, side="right")
+        hi = np.maximum(lo, np.searchsorted(self.open_ts, ts, side="right"))
+        return lo, hi
+
+    def remaining_formatted(
+        self, ts=None, hours=None, no_time_label: str = "-", **labels
+    ) -> list[str]:
+        """Remaining times as strings (see contract_remaining_time_formatted)."""
+        return [
+            _format_remaining_seconds(int(x), no_time_label=no_time_label, **labels)
+            for x in self.remaining(ts, hours)
+        ]
+
+    @staticmethod
+    def window(hours, n_before: int = 1, n_after: int = 1) -> np.ndarray:
+        """
+        Neighbour hour indices of each hour, one row per hour with n_before previous
+        contracts, the contract itself and n_after next contracts.
+        """
+        if n_before < 0 or n_after < 0:
+            raise ValueError("n_before and n_after must be non-negative integers")
+        h = np.asarray(hours, dtype=np.int64)
+        return h[..., None] + np.arange(-n_before, n_after + 1)
+
+    @staticmethod
+    def previous(hours, n: int = 1, include_current: bool = False) -> np.ndarray:
+        """Previous n hour indices of each hour (oldest first), as in get_previous_contracts."""
+        w = ContractCalendar.window(hours, n_before=n, n_after=0)
+        return w if include_current else w[..., :-1]
+
+    @staticmethod
+    def next(hours, n: int = 1, include_current: bool = False) -> np.ndarray:
+        """Next n hour indices of each hour, as in get_next_contracts."""
+        w = ContractCalendar.window(hours, n_before=0, n_after=n)
+        return w if include_current else w[..., 1:]
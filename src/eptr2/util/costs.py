@@ -1,8 +1,14 @@
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 import warnings
 from typing import Literal
 import math
-from eptr2.util.time import contract_to_floor_ceil_prices, iso_to_contract
+from eptr2.util.time import (
+    contract_to_datetime,
+    get_floor_ceil_price_table,
+    iso_to_contract,
+)
 
 
 def get_regulation_period_by_contract(contract: str):
@@ -119,8 +125,10 @@ def get_kupst_tolerance_by_contract(
     >>> get_kupst_tolerance_by_contract('wind', 'PH25123100')
     0.17
     """
-    regulation_period = get_regulation_period_by_contract(contract)
-    return get_kupst_tolerance(source, regulation_period=regulation_period)
+    source = {"sun": "solar"}.get(source, source)
+    if source not in REGIME_KUPST_SOURCES:
+        source = "other"
+    return get_regime_by_contract(contract)[f"kupst_tolerance_{source}"]
 
 
 def get_kupst_tolerance(
@@ -231,6 +239,232 @@ def get_kupst_tolerance_2026(
 ### KUPST TOLERANCE FUNCTIONS END###
 
 
+def get_dsg_tolerance(
+    regulation_period: Literal["current", "26_01", "pre_2026"] = "current",
+):
+    """
+    Get DSG (Balancing Responsible Group) tolerance for a given regulation period.
+
+    Parameters
+    ----------
+    regulation_period : {'current', '26_01', 'pre_2026'}, default 'current'
+        The regulation period. 'current' and '26_01' both refer to 2026 regulation.
+
+    Returns
+    -------
+    float
+        Tolerance as a decimal: 0.05 (2026 regulation) or 0.1 (pre-2026 regulation).
+
+    Raises
+    ------
+    ValueError
+        If regulation_period is not one of the valid values.
+    """
+    if regulation_period in ["current", "26_01"]:
+        return 0.05
+    elif regulation_period == "pre_2026":
+        return 0.1
+    else:
+        raise ValueError(
+            "Invalid period specified. Use 'current', '26_01' or 'pre_2026'."
+        )
+
+
+### REGIME TABLE FUNCTIONS ###
+
+REGIME_KUPST_SOURCES = ("wind", "solar", "unlicensed", "other")
+
+
+@lru_cache(maxsize=1)
+def get_regime_table():
+    """
+    Get the compiled (cached) regime table of regulation and price limit periods.
+
+    Every row is valid from its start contract until the start contract of the next row.
+    Boundaries are the union of regulation period changes and price floor/ceiling changes.
+
+    Returns
+    -------
+    tuple
+        (start_contracts, rows) sorted by start contract ascending.
+        Each row is a dictionary with keys:
+        - 'start_contract': First contract of the period
+        - 'regulation_period': 'pre_2026' or '26_01'
+        - 'kupst_tolerance_<source>': KUPST tolerance for each source in REGIME_KUPST_SOURCES
+        - 'dsg_tolerance': DSG tolerance
+        - 'min', 'max': DAM price floor and ceiling (None before the first known period)
+        - 'idm_min', 'idm_max': IDM price floor and ceiling (None before the first known period)
+
+    Notes
+    -----
+    The table is built once per process. Do not mutate the returned dictionaries,
+    use get_regime_by_contract or get_regime_by_contracts instead.
+    """
+    price_starts, price_periods = get_floor_ceil_price_table()
+
+    boundaries = sorted(
+        {
+            get_starting_contract_by_regulation_period("pre_2026"),
+            get_starting_contract_by_regulation_period("26_01"),
+            *price_starts,
+        }
+    )
+
+    rows = []
+    for start_contract in boundaries:
+        regulation_period = get_regulation_period_by_contract(start_contract)
+        price_idx = bisect_right(price_starts, start_contract) - 1
+        price_d = price_periods[price_idx] if price_idx >= 0 else {}
+
+        row = {
+            "start_contract": start_contract,
+            "regulation_period": regulation_period,
+        }
+        for source in REGIME_KUPST_SOURCES:
+            row[f"kupst_tolerance_{source}"] = get_kupst_tolerance(
+                source, regulation_period=regulation_period
+            )
+        row["dsg_tolerance"] = get_dsg_tolerance(regulation_period)
+        for k in ["min", "max", "idm_min", "idm_max"]:
+            row[k] = price_d.get(k)
+
+        rows.append(row)
+
+    return tuple(boundaries), tuple(rows)
+
+
+@lru_cache(maxsize=1)
+def _get_regime_arrays():
+    """
+    NumPy version of the regime table for vectorized lookups. Requires numpy.
+    """
+    import numpy as np
+
+    start_contracts, rows = get_regime_table()
+
+    arrays = {"start_contract": np.array(start_contracts)}
+    for k in rows[0]:
+        if k == "start_contract":
+            continue
+        if k == "regulation_period":
+            arrays[k] = np.array([x[k] for x in rows], dtype=object)
+        else:
+            arrays[k] = np.array(
+                [np.nan if x[k] is None else x[k] for x in rows], dtype=float
+            )
+
+    return arrays
+
+
+def get_regime_by_contract(contract: str):
+    """
+    Get regulation period, tolerances and price limits of a contract from the regime table.
+
+    Parameters
+    ----------
+    contract : str
+        Contract code in format 'PHYYMMDDhh'.
+
+    Returns
+    -------
+    dict
+        A copy of the regime table row of the contract (see get_regime_table).
+
+    Raises
+    ------
+    ValueError
+        If the contract is not a valid 'PHyyMMDDhh' contract or is before the first
+        regulation period.
+
+    Examples
+    --------
+    >>> d = get_regime_by_contract('PH26020112')
+    >>> d['regulation_period'], d['kupst_tolerance_wind'], d['dsg_tolerance']
+    ('26_01', 0.15, 0.05)
+    """
+    ### Malformed contracts would be ordered next to a valid period, so validate first
+    if (
+        not isinstance(contract, str)
+        or len(contract) != 10
+        or not contract.startswith("PH")
+        or not contract[2:].isdigit()
+    ):
+        raise ValueError(
+            f"Invalid contract {contract!r}. Expected format is 'PHyyMMDDHH'."
+        )
+    contract_to_datetime(contract)
+
+    start_contracts, rows = get_regime_table()
+    idx = bisect_right(start_contracts, contract) - 1
+
+    if idx < 0:
+        raise ValueError(f"Contract {contract} is before the first regulation period.")
+
+    return dict(rows[idx])
+
+
+def get_regime_by_contracts(contracts):
+    """
+    Vectorized regime table lookup for an array of contracts. Requires numpy.
+
+    Parameters
+    ----------
+    contracts : array-like of str
+        Contract codes in format 'PHYYMMDDhh' (list, numpy array or pandas Series).
+
+    Returns
+    -------
+    dict
+        Dictionary of numpy arrays with the same keys as get_regime_table rows
+        (except 'start_contract'), aligned with the input contracts.
+        Missing price limits are NaN.
+
+    Raises
+    ------
+    ValueError
+        If any contract is not a valid 'PHyyMMDDhh' contract or is before the first
+        regulation period.
+
+    Examples
+    --------
+    >>> d = get_regime_by_contracts(['PH25123123', 'PH26010100'])
+    >>> d['regulation_period'].tolist(), d['max'].tolist()
+    (['pre_2026', '26_01'], [3400.0, 3400.0])
+    """
+    import numpy as np
+
+    arrays = _get_regime_arrays()
+    contracts = np.asarray(contracts).astype(str)
+
+    ### Malformed contracts would be ordered next to a valid period, so validate first
+    digits = np.char.lstrip(contracts, "PH")
+    valid = (
+        (np.char.str_len(contracts) == 10)
+        & np.char.startswith(contracts, "PH")
+        & (np.char.str_len(digits) == 8)
+        & np.char.isdigit(digits)
+    )
+    if valid.all() and len(contracts) > 0:
+        n = digits.astype(np.int64)
+        month, day, hour = n // 10000 % 100, n // 100 % 100, n % 100
+        valid = (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31) & (hour <= 23)
+    if not valid.all():
+        invalid = contracts[~valid][:5].tolist()
+        raise ValueError(
+            f"Invalid contracts {invalid}. Expected format is 'PHyyMMDDHH'."
+        )
+
+    idx = np.searchsorted(arrays["start_contract"], contracts, side="right") - 1
+
+    if (idx < 0).any():
+        raise ValueError("Some contracts are before the first regulation period.")
+
+    return {k: v[idx] for k, v in arrays.items() if k != "start_contract"}
+
+
+### REGIME TABLE FUNCTIONS END###
+
+
 ### KUPST COST FUNCTIONS ###
 def calculate_unit_kupst_cost_by_contract(
     contract: str,
@@ -1393,13 +1627,13 @@ def calculate_unit_price_and_costs_by_contract(
     ... )
     {'pos_price': 94.0, 'neg_price': 116.5, 'pos_cost': 6.0, 'neg_cost': 16.5, 'unit_kupst': 5.5}
     """
-    regulation_period = get_regulation_period_by_contract(contract=contract)
+    regime = get_regime_by_contract(contract)
+    regulation_period = regime["regulation_period"]
 
     if include_dynamic_floor_ceil:
-        fc_d = contract_to_floor_ceil_prices(contract)
         ## Only set floor and ceil if not already provided in kwargs, to allow overrides
-        kwargs["floor_price"] = kwargs.get("floor_price", fc_d["min"])
-        kwargs["ceil_price"] = kwargs.get("ceil_price", fc_d["max"])
+        kwargs["floor_price"] = kwargs.get("floor_price", regime["min"])
+        kwargs["ceil_price"] = kwargs.get("ceil_price", regime["max"])
 
     res = calculate_unit_price_and_costs(
         mcp=mcp,
@@ -1585,10 +1819,7 @@ def calculate_imbalance_amount(
     if kwargs.get("dsg_tolerance") is not None:
         dsg_tolerance = kwargs.get("dsg_tolerance")
     else:
-        if regulation_period in ["current", "26_01"]:
-            dsg_tolerance = 0.05
-        elif regulation_period == "pre_2026":
-            dsg_tolerance = 0.1
+        dsg_tolerance = get_dsg_tolerance(regulation_period)
 
     if is_producer:
         raw_imb = actual - forecast
@@ -1745,13 +1976,13 @@ def calculate_diff_costs_by_contract(
     ... )
     {'imb_cost': 100.0, 'kupst_cost': 90.0, 'total_cost': 190.0, 'imb_qty': -20.0, 'kupsm': 2.0}
     """
-    regulation_period = get_regulation_period_by_contract(contract)
+    regime = get_regime_by_contract(contract)
+    regulation_period = regime["regulation_period"]
 
     if include_dynamic_floor_ceil:
-        fc_d = contract_to_floor_ceil_prices(contract)
         # Only set floor and ceil if not already provided in kwargs, to allow overrides
-        kwargs["floor_price"] = kwargs.get("floor_price", fc_d["min"])
-        kwargs["ceil_price"] = kwargs.get("ceil_price", fc_d["max"])
+        kwargs["floor_price"] = kwargs.get("floor_price", regime["min"])
+        kwargs["ceil_price"] = kwargs.get("ceil_price", regime["max"])
 
     return calculate_diff_costs(
         forecast=forecast,
@@ -1921,6 +2152,308 @@ def calculate_diff_costs(
     return d
 
 
+### SCENARIO COST FUNCTIONS ###
+
+SCENARIO_COST_METRICS = ("imb_cost", "kupst_cost", "total_cost", "imb_qty", "kupsm")
+
+
+def get_unit_cost_arrays(contracts, mcp, smp, **kwargs) -> dict:
+    """
+    Unit imbalance and KUPST costs of a price series as numpy arrays. Requires numpy.
+
+    Parameters
+    ----------
+    contracts : array-like of str
+        Contract codes in format 'PHYYMMDDhh'.
+    mcp, smp : array-like of float
+        Market Clearing Price and System Marginal Price aligned with contracts.
+    **kwargs
+        Passed to calculate_unit_price_and_costs_by_contract.
+
+    Returns
+    -------
+    dict
+        'unit_pos_imb_cost', 'unit_neg_imb_cost' and 'unit_kupst' arrays (NaN where
+        prices are missing).
+    """
+    import numpy as np
+
+    keys = ["unit_pos_imb_cost", "unit_neg_imb_cost", "unit_kupst"]
+    out = {k: np.full(len(contracts), np.nan) for k in keys}
+
+    for i, (contract, mcp_i, smp_i) in enumerate(zip(contracts, mcp, smp, strict=True)):
+        res = calculate_unit_price_and_costs_by_contract(
+            contract=contract, mcp=float(mcp_i), smp=float(smp_i), **kwargs
+        )
+        for k in keys:
+            if res.get(k) is not None:
+                out[k][i] = res[k]
+
+    return out
+
+
+def _evaluate_scenarios(
+    forecasts,
+    actuals,
+    unit_pos_imb_cost,
+    unit_neg_imb_cost,
+    unit_kupst,
+    tolerances,
+    source_idx,
+    is_producer: bool,
+    rows: slice,
+) -> dict:
+    """
+    Per-scenario cost totals of the given rows. 1-D forecasts or actuals are shared by all
+    scenarios.
+    """
+    import numpy as np
+
+    f = forecasts[rows] if forecasts.ndim == 2 else forecasts[np.newaxis, :]
+    a = actuals[rows] if actuals.ndim == 2 else actuals[np.newaxis, :]
+
+    imb = a - f if is_producer else f - a
+    unit_imb_cost = np.where(imb < 0, unit_neg_imb_cost, unit_pos_imb_cost)
+    imb_cost = np.round(np.abs(imb) * unit_imb_cost, 2)
+
+    n_rows = max(f.shape[0], a.shape[0])
+    d = {
+        "imb_cost": np.nansum(
+            np.broadcast_to(imb_cost, (n_rows, imb.shape[1])), axis=1
+        ),
+        "imb_qty": np.broadcast_to(np.nansum(imb, axis=1), (n_rows,)).copy(),
+    }
+
+    if is_producer:
+        tol = tolerances[source_idx[rows]]
+        kupsm = np.maximum(0, np.abs(f - a) - f * tol)
+        d["kupsm"] = np.nansum(kupsm, axis=1)
+        d["kupst_cost"] = np.nansum(kupsm * unit_kupst, axis=1)
+        d["total_cost"] = d["imb_cost"] + d["kupst_cost"]
+    else:
+        d["total_cost"] = d["imb_cost"].copy()
+
+    return d
+
+
+def _evaluate_scenario_shard(
+    shared_specs: dict, is_producer: bool, start: int, stop: int
+):
+    """
+    Process pool task. Attaches the shared memory arrays, evaluates scenario rows
+    [start, stop) and returns their totals.
+    """
+    from multiprocessing import shared_memory
+
+    import numpy as np
+
+    handles = []
+    arrays = {}
+    try:
+        for k, (name, shape, dtype) in shared_specs.items():
+            shm = shared_memory.SharedMemory(name=name)
+            handles.append(shm)
+            arrays[k] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+        d = _evaluate_scenarios(
+            **arrays, is_producer=is_producer, rows=slice(start, stop)
+        )
+    finally:
+        del arrays
+        for shm in handles:
+            shm.close()
+
+    return start, d
+
+
+def calculate_scenario_costs(
+    forecasts,
+    actuals,
+    contracts,
+    mcp,
+    smp,
+    is_producer: bool = True,
+    production_source: str | list | None = None,
+    percentiles: tuple = (5, 50, 95),
+    max_workers: int | None = None,
+    shard_size: int | None = None,
+    **kwargs,
+) -> dict:
+    """
+    Evaluate imbalance and KUPST costs of many forecast/actual scenarios against one price
+    series, in parallel processes. Requires numpy.
+
+    Unit costs are calculated once from the price series. Scenario rows are then sharded
+    across a process pool; scenario matrices and unit cost arrays are placed in shared
+    memory so that they are not pickled per task.
+
+    Parameters
+    ----------
+    forecasts, actuals : array-like of float
+        Either a (scenarios x hours) matrix or a single (hours,) series shared by all
+        scenarios. At least one of them is usually a scenario matrix, e.g. forecast
+        scenarios against the realized production.
+    contracts : array-like of str
+        Contract codes in format 'PHYYMMDDhh' of the hours.
+    mcp, smp : array-like of float
+        Market Clearing Price and System Marginal Price of the hours.
+    is_producer : bool, default True
+        True for production units (imbalance and KUPST costs), False for consumption
+        units (only imbalance costs).
+    production_source : str or list of str, optional
+        KUPST source of all scenarios or of each scenario row (e.g. rows of different
+        plants). Required for producers.
+    percentiles : tuple, default (5, 50, 95)
+        Percentiles of the cost distribution over scenarios.
+    max_workers : int, optional
+        Number of processes. Default is the CPU count. 1 evaluates in process.
+    shard_size : int, optional
+        Scenario rows per task. Default splits the rows evenly into 4 tasks per process.
+    **kwargs
+        Passed to calculate_unit_price_and_costs_by_contract (e.g. include_maintenance_penalty).
+
+    Returns
+    -------
+    dict
+        - 'imb_cost', 'kupst_cost', 'total_cost': Per-scenario totals in TL (numpy arrays)
+        - 'imb_qty': Per-scenario net imbalance in MWh
+        - 'kupsm': Per-scenario total KUPST deviation in MWh
+        - 'percentiles': {metric: {percentile: value}} of the cost totals over scenarios
+        KUPST metrics are only included for producers.
+
+    Notes
+    -----
+    Hourly costs are calculated as in calculate_diff_costs_by_contract (imbalance costs
+    rounded to 2 decimals per hour). Hours with missing prices are skipped in totals.
+
+    Examples
+    --------
+    >>> res = calculate_scenario_costs(
+    ...     forecasts=[[120, 100], [100, 100]],
+    ...     actuals=[100, 100],
+    ...     contracts=['PH26010100', 'PH26010101'],
+    ...     mcp=[2000, 2000],
+    ...     smp=[2200, 2200],
+    ...     production_source='wind',
+    ...     max_workers=1,
+    ... )
+    >>> res['total_cost'].tolist()
+    [6860.0, 0.0]
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    import numpy as np
+
+    forecasts = np.ascontiguousarray(forecasts, dtype=float)
+    actuals = np.ascontiguousarray(actuals, dtype=float)
+    n_hours = len(contracts)
+
+    for name, x in [("forecasts", forecasts), ("actuals", actuals)]:
+        if x.ndim not in [1, 2] or x.shape[-1] != n_hours:
+            raise ValueError(
+                f"{name} should be a (scenarios x hours) matrix or an (hours,) series with {n_hours} hours."
+            )
+
+    n_scenarios = max(
+        forecasts.shape[0] if forecasts.ndim == 2 else 1,
+        actuals.shape[0] if actuals.ndim == 2 else 1,
+    )
+    for x in [forecasts, actuals]:
+        if x.ndim == 2 and x.shape[0] != n_scenarios:
+            raise ValueError(
+                "forecasts and actuals have different numbers of scenarios."
+            )
+
+    arrays = get_unit_cost_arrays(contracts, mcp, smp, **kwargs)
+
+    ## KUPST tolerances by source and hour
+    if is_producer:
+        if production_source is None:
+            raise ValueError("production_source must be provided for producers")
+        row_sources = (
+            [production_source] * n_scenarios
+            if isinstance(production_source, str)
+            else list(production_source)
+        )
+        if len(row_sources) != n_scenarios:
+            raise ValueError("production_source should have one source per scenario.")
+        sources = sorted(set(row_sources))
+        regulation_periods = get_regime_by_contracts(contracts)["regulation_period"]
+        tolerances = np.array(
+            [
+                [
+                    get_kupst_tolerance(source, regulation_period=rp)
+                    for rp in regulation_periods
+                ]
+                for source in sources
+            ],
+            dtype=float,
+        )
+        source_idx = np.array([sources.index(x) for x in row_sources], dtype=np.int64)
+    else:
+        tolerances = np.zeros((1, n_hours))
+        source_idx = np.zeros(n_scenarios, dtype=np.int64)
+
+    arrays.update(
+        forecasts=forecasts,
+        actuals=actuals,
+        tolerances=tolerances,
+        source_idx=source_idx,
+    )
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, n_scenarios)
+    if shard_size is None:
+        shard_size = max(1, -(-n_scenarios // (max_workers * 4)))
+
+    if max_workers <= 1:
+        totals = _evaluate_scenarios(
+            **arrays, is_producer=is_producer, rows=slice(0, n_scenarios)
+        )
+    else:
+        handles = []
+        try:
+            shared_specs = {}
+            for k, x in arrays.items():
+                shm = shared_memory.SharedMemory(create=True, size=max(1, x.nbytes))
+                handles.append(shm)
+                np.ndarray(x.shape, dtype=x.dtype, buffer=shm.buf)[...] = x
+                shared_specs[k] = (shm.name, x.shape, x.dtype.str)
+
+            shards = [
+                (start, min(start + shard_size, n_scenarios))
+                for start in range(0, n_scenarios, shard_size)
+            ]
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        _evaluate_scenario_shard, shared_specs, is_producer, start, stop
+                    )
+                    for start, stop in shards
+                ]
+                results = [f.result() for f in futures]
+        finally:
+            for shm in handles:
+                shm.close()
+                shm.unlink()
+
+        totals = {k: np.concatenate([d[k] for _, d in results]) for k in results[0][1]}
+
+    totals["percentiles"] = {
+        k: dict(zip(percentiles, np.percentile(totals[k], percentiles).tolist()))
+        for k in ["imb_cost", "kupst_cost", "total_cost"]
+        if k in totals
+    }
+
+    return totals
+
+
+### SCENARIO COST FUNCTIONS END ###
+
+
 #####
 ### DEPRECATED FUNCTIONS BELOW
 #####
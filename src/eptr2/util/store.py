@@ -0,0 +1,101 @@
+"""
+Shared helpers of the composite functions that fetch in bulk and keep local stores: source
+spec selection, month ranges and versioned gzip compressed JSON files.
+"""
+
+import calendar
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+
+
+def to_date(x: str | date) -> date:
+    """
+    Convert a date string (YYYY-MM-DD, longer ISO strings are cut), date or datetime to a
+    date.
+
+    Example:
+        >>> to_date("2024-07-29T00:00:00+03:00")
+        datetime.date(2024, 7, 29)
+    """
+    if isinstance(x, datetime):
+        return x.date()
+    if isinstance(x, date):
+        return x
+    return datetime.strptime(x[:10], "%Y-%m-%d").date()
+
+
+def split_months(
+    start_date: str | date, end_date: str | date, full_months: bool = False
+) -> list[tuple[date, date]]:
+    """
+    First and last days of the months between start_date and end_date (both included).
+
+    Args:
+        start_date, end_date: Dates (see to_date).
+        full_months: If True, the first and last months are not cut at start_date and
+            end_date.
+
+    Example:
+        >>> split_months("2024-01-15", "2024-02-10")
+        [(datetime.date(2024, 1, 15), datetime.date(2024, 1, 31)), (datetime.date(2024, 2, 1), datetime.date(2024, 2, 10))]
+    """
+    sd = to_date(start_date)
+    ed = to_date(end_date)
+    if full_months:
+        sd = sd.replace(day=1)
+        ed = ed.replace(day=calendar.monthrange(ed.year, ed.month)[1])
+    months = []
+    while sd <= ed:
+        m_end = sd.replace(day=calendar.monthrange(sd.year, sd.month)[1])
+        months.append((sd, min(m_end, ed)))
+        sd = m_end + timedelta(days=1)
+    return months
+
+
+def select_sources(
+    sources: list[str] | dict | None, available: dict, name: str
+) -> dict:
+    """
+    Source specs of the given source names. None selects all available sources, a
+    dictionary is used as is.
+
+    Raises:
+        ValueError: Source names that are not available.
+    """
+    if sources is None:
+        return dict(available)
+    if isinstance(sources, dict):
+        return sources
+    unknown = [x for x in sources if x not in available]
+    if unknown:
+        raise ValueError(
+            f"Unknown {name} sources: {unknown}. Available: {list(available)}"
+        )
+    return {x: available[x] for x in sources}
+
+
+def read_json_gz(path: str, version: int, name: str) -> dict:
+    """
+    Read a gzip compressed JSON file of a store.
+
+    Raises:
+        ValueError: The version field of the file is not version.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        d = json.load(f)
+    if d.get("version") != version:
+        raise ValueError(f"Unsupported {name} version {d.get('version')} in {path}.")
+    return d
+
+
+def write_json_gz(path: str, d: dict) -> None:
+    """
+    Write a gzip compressed JSON file of a store. The file is written to a temporary file
+    first and then replaced, so readers never see a partial file.
+    """
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(d, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -1,4 +1,6 @@
+from bisect import bisect_right
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import logging
 import pytz
 from typing import Literal, Union
@@ -6,6 +8,9 @@ from typing import Literal, Union
 
 logger = logging.getLogger(__name__)
 
+### Maximum number of memoized entries for pure contract parsing helpers
+CONTRACT_CACHE_MAXSIZE = 4096
+
 
 def contract_duration(
     contract: str, return_type: Literal["hours", "minutes", "seconds"] = "seconds"
@@ -283,6 +288,7 @@ def iso_to_contract(dt):
     return datetime_to_contract(check_iso_format(dt, convert_to_hour_format=True))
 
 
+@lru_cache(maxsize=CONTRACT_CACHE_MAXSIZE)
 def contract_to_datetime(
     contract, timestamp: bool = False, localize: bool = True, to_str: bool = False
 ):
@@ -308,6 +314,9 @@ def contract_to_datetime(
         1722250800.0
         >>> contract_to_datetime("PH24072914", to_str=True)
         '2024-07-29T14:00:00+03:00'
+
+    Note:
+        Results are memoized (bounded LRU, see clear_contract_caches).
     """
     dt_obj = datetime.strptime(contract[2:10] + ":00:00+03:00", "%y%m%d%H:%M:%S%z")
 
@@ -461,6 +470,7 @@ def change_wday_name_to_tr(wday_name):
     return days_tr.get(wday_name, wday_name)
 
 
+@lru_cache(maxsize=CONTRACT_CACHE_MAXSIZE)
 def contract_to_wday(c, named=False, tr_name=False):
     """
     Extract the weekday from a contract string.
@@ -701,6 +711,7 @@ def calculate_active_contracts():
     return l
 
 
+@lru_cache(maxsize=CONTRACT_CACHE_MAXSIZE)
 def contract_close_time(c, to_timestamp=False, delta=3600):
     """
     Calculate the gate closure time for a contract (when trading stops).
@@ -736,7 +747,7 @@ def time_to_contract_close(c, dt_then: datetime | str = None, ts_then: float = N
     Calculate the remaining time (in seconds) until a contract's gate closes.
 
     Args:
-        c: Contract string in format 'PHyyMMDDHH'
+        c: Contract string in format 'PHyyMMDDHH' or a Contract object
         dt_then: Reference datetime (datetime object or ISO string). If None, uses current time.
         ts_then: Reference timestamp. Takes precedence over dt_then if both provided.
 
@@ -755,7 +766,10 @@ def time_to_contract_close(c, dt_then: datetime | str = None, ts_then: float = N
         >>> time_to_contract_close("PH24072914", dt_then=ref_time)
         1800.0  # 30 minutes = 1800 seconds remaining
     """
-    dt_close = contract_close_time(c, to_timestamp=True)
+    if isinstance(c, Contract):
+        dt_close = c.close_ts
+    else:
+        dt_close = contract_close_time(c, to_timestamp=True)
     if ts_then is not None:
         now_ts = ts_then
     elif dt_then is None:
@@ -891,6 +905,9 @@ def contract_to_floor_ceil_prices(c: str | None = None):
             - 'idm_max': Maximum IDM price (TL/MWh)
         Returns None if no matching period found (shouldn't happen for valid contracts).
 
+    Raises:
+        ValueError: If the contract is not a valid 'PHyyMMDDHH' contract.
+
     Example:
         >>> contract_to_floor_ceil_prices("PH24072914")
         {'date': '2024-06-01', 'min': 0, 'max': 3000.0, 'idm_min': 0, 'idm_max': 3090.0}
@@ -899,20 +916,59 @@ def contract_to_floor_ceil_prices(c: str | None = None):
         {'date': '2025-04-05', 'min': 0, 'max': 3400.0, 'idm_min': 0, 'idm_max': 3502.0}
     """
 
-    ### Min max price map is always sorted by date descending
-    mm_map = get_time_min_max_price_map()
-
     ### If contract is not given return the latest
     if c is None:
-        return mm_map[0]
+        return get_time_min_max_price_map()[0]
 
-    the_date = contract_to_datetime(c).date()
+    idx = _contract_to_floor_ceil_index(str(c))
 
-    for x in mm_map:
-        if the_date >= datetime.strptime(x["date"], "%Y-%m-%d").date():
-            return x
+    if idx < 0:
+        return None
+
+    return dict(get_floor_ceil_price_table()[1][idx])
+
+
+@lru_cache(maxsize=CONTRACT_CACHE_MAXSIZE)
+def _contract_to_floor_ceil_index(c: str) -> int:
+    """
+    Index of the price limit period of a contract in get_floor_ceil_price_table (-1 if none).
+    """
+    ### Malformed contracts would be ordered next to a valid period, so validate first
+    if len(c) != 10 or not c.startswith("PH") or not c[2:].isdigit():
+        raise ValueError(f"Invalid contract {c!r}. Expected format is 'PHyyMMDDHH'.")
+    contract_to_datetime(c)
+
+    ### Contract codes are lexicographically ordered by date
+    return bisect_right(get_floor_ceil_price_table()[0], c) - 1
 
-    return None
+
+@lru_cache(maxsize=1)
+def get_floor_ceil_price_table():
+    """
+    Get the compiled (cached) price floor and ceiling table for fast lookups.
+
+    Returns:
+        tuple: (start_contracts, periods) sorted by date ascending
+            - start_contracts: Tuple of the first contracts ('PHyyMMDD00') of each price limit period
+            - periods: Tuple of price limit dictionaries (see get_time_min_max_price_map)
+
+    Note:
+        - The table is built once per process. Do not mutate the returned dictionaries.
+        - Use bisect on start_contracts (scalar) or numpy.searchsorted (vectorized) to find
+          the period index of a contract.
+
+    Example:
+        >>> start_contracts, periods = get_floor_ceil_price_table()
+        >>> start_contracts[0]
+        'PH22090200'
+    """
+    periods = tuple(reversed(get_time_min_max_price_map()))
+    start_contracts = tuple(
+        "PH" + datetime.strptime(x["date"], "%Y-%m-%d").strftime("%y%m%d") + "00"
+        for x in periods
+    )
+
+    return start_contracts, periods
 
 
 def get_probable_settlement_date(x: str | None = None, settlement_day=15):
@@ -1058,6 +1114,33 @@ def offset_date_by_n_days(date_str: str, fmt: str = "%Y-%m-%d", n: int = 1):
     return None
 
 
+def split_date_range(start_date: str, end_date: str, max_days: int) -> list[tuple]:
+    """
+    Split a date range into consecutive ranges of at most max_days days.
+
+    Args:
+        start_date: First date in YYYY-MM-DD format
+        end_date: Last date in YYYY-MM-DD format (included)
+        max_days: Maximum number of days of a range
+
+    Returns:
+        list: (start_date, end_date) tuples in YYYY-MM-DD format, empty if end_date is
+              before start_date
+
+    Example:
+        >>> split_date_range("2024-07-01", "2024-07-10", 4)
+        [('2024-07-01', '2024-07-04'), ('2024-07-05', '2024-07-08'), ('2024-07-09', '2024-07-10')]
+    """
+    sd = datetime.strptime(start_date, "%Y-%m-%d")
+    ed = datetime.strptime(end_date, "%Y-%m-%d")
+    chunks = []
+    while sd <= ed:
+        chunk_end = min(ed, sd + timedelta(days=max_days - 1))
+        chunks.append((sd.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")))
+        sd = chunk_end + timedelta(days=1)
+    return chunks
+
+
 def get_previous_day(date_str: str | None = None, fmt: str = "%Y-%m-%d"):
     """
     Get the previous day from a given date string.
@@ -1156,8 +1239,28 @@ def contract_remaining_time_formatted(
         '-'
     """
     seconds = time_to_contract_close(contract)
-    if seconds is not None:
-        seconds = int(seconds)
+    if seconds is None:
+        return no_time_label
+    return _format_remaining_seconds(
+        int(seconds),
+        day_label=day_label,
+        hour_label=hour_label,
+        minute_label=minute_label,
+        second_label=second_label,
+        no_time_label=no_time_label,
+    )
+
+
+def _format_remaining_seconds(
+    seconds: int,
+    day_label="D",
+    hour_label="H",
+    minute_label="m",
+    second_label="s",
+    no_time_label="-",
+) -> str:
+    """Formats seconds with the largest relevant units (see contract_remaining_time_formatted)."""
+    if seconds > 0:
         d = seconds // (3600 * 24)
         h = seconds // 3600 % 24
         m = seconds % 3600 // 60
@@ -1336,3 +1439,115 @@ def contract_open_time(c, to_timestamp=False, start_hour=18):
     if to_timestamp:
         return dt.timestamp()
     return dt
+
+
+def clear_contract_caches():
+    """
+    Clear memoized results of the contract parsing helpers.
+
+    Memoized helpers are contract_to_datetime, contract_close_time, contract_to_wday,
+    contract_to_floor_ceil_prices and Contract.from_symbol. Each cache holds at most
+    CONTRACT_CACHE_MAXSIZE entries, so clearing is only needed to release memory.
+    """
+    for f in [
+        contract_to_datetime,
+        contract_close_time,
+        contract_to_wday,
+        _contract_to_floor_ceil_index,
+        _contract_from_symbol,
+    ]:
+        f.cache_clear()
+
+
+class Contract:
+    """
+    Compact, immutable hourly contract value with precomputed timestamps.
+
+    Parsing a contract string once and passing Contract objects around avoids
+    repeated string parsing in hot loops (e.g. intraday bots evaluating active
+    contracts many times per second).
+
+    Attributes:
+        symbol: Contract string in format 'PHyyMMDDHH'
+        epoch: Unix timestamp of the delivery start
+        open_ts: Unix timestamp of the gate opening (18:00 of the previous day)
+        close_ts: Unix timestamp of the gate closure (1 hour before delivery)
+
+    Example:
+        >>> c = Contract.from_symbol("PH24072914")
+        >>> c.epoch, c.close_ts
+        (1722250800.0, 1722247200.0)
+        >>> c.time_to_close(ts_then=1722243600.0)
+        3600.0
+        >>> str(c)
+        'PH24072914'
+    """
+
+    __slots__ = ("close_ts", "epoch", "open_ts", "symbol")
+
+    def __init__(self, symbol: str):
+        object.__setattr__(self, "symbol", symbol)
+        object.__setattr__(self, "epoch", contract_to_datetime(symbol, timestamp=True))
+        object.__setattr__(
+            self, "open_ts", contract_open_time(symbol, to_timestamp=True)
+        )
+        object.__setattr__(
+            self, "close_ts", contract_close_time(symbol, to_timestamp=True)
+        )
+
+    @classmethod
+    def from_symbol(cls, symbol: "str | Contract") -> "Contract":
+        """
+        Get the (memoized) Contract object of a contract string.
+        """
+        if isinstance(symbol, cls):
+            return symbol
+        return _contract_from_symbol(symbol)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Contract objects are immutable.")
+
+    def __repr__(self):
+        return f"Contract({self.symbol!r})"
+
+    def __str__(self):
+        return self.symbol
+
+    def __eq__(self, other):
+        if isinstance(other, Contract):
+            return self.symbol == other.symbol
+        if isinstance(other, str):
+            return self.symbol == other
+        return NotImplemented
+
+    def __lt__(self, other):
+        return self.symbol < str(other)
+
+    def __hash__(self):
+        return hash(self.symbol)
+
+    @property
+    def dt(self) -> datetime:
+        """Delivery start as a UTC+3 datetime."""
+        return contract_to_datetime(self.symbol)
+
+    def is_open(self, ts_then: float | None = None) -> bool:
+        """
+        Check if the contract gate is open at ts_then (default: now).
+        """
+        if ts_then is None:
+            ts_then = get_utc3_now().timestamp()
+        return self.open_ts <= ts_then < self.close_ts
+
+    def time_to_close(self, ts_then: float | None = None) -> float:
+        """
+        Seconds until gate closure at ts_then (default: now). Negative if the gate is closed.
+        """
+        if ts_then is None:
+            ts_then = get_utc3_now().timestamp()
+        return self.close_ts - ts_then
+
+
+@lru_cache(maxsize=CONTRACT_CACHE_MAXSIZE)
+def _contract_from_symbol(symbol: str) -> Contract:
+    return Contract(symbol)
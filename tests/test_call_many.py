@@ -0,0 +1,73 @@
+"""Offline tests for EPTR2.call_many."""
+
+import time
+
+import pytest
+
+from eptr2.exceptions import ServerError
+from eptr2.policy import CallPolicy
+from eptr2.testing import StandInServer
+
+MCP_PATH = "/electricity-service/v1/markets/dam/data/mcp"
+
+
+def _mcp(start_date, end_date=None):
+    return {"key": "mcp", "start_date": start_date, "end_date": end_date or start_date}
+
+
+def test_results_are_in_input_order_and_deduplicated():
+    with StandInServer(latency=0.1) as server:
+        eptr = server.client()
+        requests = [
+            _mcp("2024-07-29", "2024-07-30"),
+            {"key": "smp", "start_date": "2024-07-29", "end_date": "2024-07-29"},
+            _mcp("2024-07-29"),
+            {"key": "ptf", "end_date": "2024-07-29", "start_date": "2024-07-29"},
+        ]
+        start = time.perf_counter()
+        results, timings = eptr.call_many(requests, return_timing=True)
+        elapsed = time.perf_counter() - start
+
+        assert server.request_counts[MCP_PATH] == 2
+
+    assert [len(x) for x in results] == [48, 24, 24, 24]
+    assert "systemMarginalPrice" in results[1].columns
+    assert results[2].equals(results[3])
+    assert results[2] is not results[3]
+    assert len(timings) == 4 and all(t >= 0.1 for t in timings)
+    ## Three unique requests run concurrently
+    assert elapsed < 3 * 0.1
+
+
+def test_return_exceptions():
+    with StandInServer(fail_first=1, error_status=500) as server:
+        eptr = server.client()
+        results = eptr.call_many(
+            [_mcp("2024-07-29"), _mcp("2024-07-30")],
+            max_workers=1,
+            return_exceptions=True,
+        )
+
+    assert isinstance(results[0], ServerError)
+    assert len(results[1]) == 24
+
+
+def test_first_error_is_raised():
+    with StandInServer(fail_first=1, error_status=500) as server:
+        eptr = server.client()
+        with pytest.raises(ServerError):
+            eptr.call_many([_mcp("2024-07-29"), _mcp("2024-07-30")], max_workers=1)
+
+    assert eptr.call_many([]) == []
+
+
+def test_shared_rate_limit():
+    with StandInServer() as server:
+        eptr = server.client(policy=CallPolicy(rate_limit=20, burst=1))
+        start = time.perf_counter()
+        eptr.call_many([_mcp(f"2024-07-{d:02d}") for d in range(1, 7)])
+        elapsed = time.perf_counter() - start
+
+    ## 6 requests at 20 per second with no burst
+    assert elapsed >= 5 / 20
+    assert eptr.get_stats()["rate_limit"]["waited"] > 0
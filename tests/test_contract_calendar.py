@@ -0,0 +1,133 @@
+"""
+Unit tests for the array-backed contract calendar in eptr2.util.contract_calendar.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from eptr2.util import contract_calendar
+from eptr2.util import time as time_util
+from eptr2.util.contract_calendar import (
+    ContractCalendar,
+    active_contract_window,
+    contracts_to_hours,
+    hours_to_contracts,
+)
+from eptr2.util.time import (
+    contract_close_time,
+    contract_open_time,
+    contract_remaining_time_formatted,
+    contract_to_datetime,
+    get_next_contracts,
+    get_previous_contracts,
+    get_utc3_now,
+)
+
+
+def _fixed_now(monkeypatch, dt):
+    monkeypatch.setattr(time_util, "get_utc3_now", lambda: dt)
+    monkeypatch.setattr(contract_calendar, "get_utc3_now", lambda: dt)
+
+
+class TestConversions:
+    def test_round_trip_matches_string_helpers(self):
+        """Test hour indices match contract_to_datetime across years and month ends."""
+        cal = ContractCalendar.from_dates("2023-12-30", "2025-03-02")
+        symbols = cal.symbols()
+
+        assert symbols[0] == "PH23123000" and symbols[-1] == "PH25030223"
+        assert contracts_to_hours(symbols).tolist() == cal.hours.tolist()
+        for c in symbols[::97] + ["PH24022923", "PH24030100"]:
+            h = contracts_to_hours(c)
+            assert h * 3600 == contract_to_datetime(c, timestamp=True)
+            assert hours_to_contracts(h) == c
+
+    @pytest.mark.parametrize(
+        "c", ["PH240729", "PB24072914-03", "PH24023014", "PH24072924", "PH2407291x"]
+    )
+    def test_invalid_contracts(self, c):
+        with pytest.raises(ValueError):
+            contracts_to_hours(["PH24072914", c])
+
+
+class TestContractCalendar:
+    def test_gate_times_match_scalar_helpers(self):
+        cal = ContractCalendar("PH24072900", "PH24073023")
+        pos = cal.index_of(["PH24072900", "PH24072914", "PH24073023"])
+
+        for c, p in zip(["PH24072900", "PH24072914", "PH24073023"], pos):
+            assert cal.open_ts[p] == contract_open_time(c, to_timestamp=True)
+            assert cal.close_ts[p] == contract_close_time(c, to_timestamp=True)
+
+        ts = 1722243600.0  ## 2024-07-29 12:00
+        h = contracts_to_hours("PH24072914")
+        assert cal.remaining(ts, hours=[h]).tolist() == [3600.0]
+        assert cal.remaining_formatted(ts, hours=[h, h - 2]) == ["01H 00m 00s", "-"]
+
+    @pytest.mark.parametrize("hour", [0, 10, 17, 18, 22, 23])
+    def test_active_matches_calculate_active_contracts(self, monkeypatch, hour):
+        now = datetime(2024, 7, 29, hour, 30, tzinfo=get_utc3_now().tzinfo)
+        _fixed_now(monkeypatch, now)
+        expected = time_util.calculate_active_contracts()
+
+        cal = ContractCalendar.around(now.timestamp())
+        assert cal.symbols(cal.active(now.timestamp())) == expected
+
+        first, last = active_contract_window(now.timestamp())
+        assert hours_to_contracts(np.arange(first, last + 1)).tolist() == expected
+
+        ## Defaults to now
+        assert cal.symbols(cal.active()) == expected
+
+    def test_active_windows_of_many_times(self):
+        cal = ContractCalendar.from_dates("2024-07-28", "2024-07-31")
+        start = datetime(2024, 7, 29, tzinfo=get_utc3_now().tzinfo).timestamp()
+        ts = start + np.arange(0, 2 * 86400, 60)
+
+        lo, hi = cal.active_windows(ts)
+        first, last = active_contract_window(ts)
+        np.testing.assert_array_equal(cal.hours[lo], first)
+        np.testing.assert_array_equal(cal.hours[hi - 1], last)
+
+        mask = cal.is_open(ts[1000])
+        assert np.flatnonzero(mask).tolist() == list(range(lo[1000], hi[1000]))
+
+    def test_neighbours(self):
+        h = contracts_to_hours(["PH24072914", "PH24073100"])
+
+        prev = ContractCalendar.previous(h, n=3)
+        assert hours_to_contracts(prev[0]).tolist() == get_previous_contracts(
+            "PH24072914", n=3
+        )
+        assert hours_to_contracts(prev[1]).tolist() == get_previous_contracts(
+            "PH24073100", n=3
+        )
+        nxt = ContractCalendar.next(h, n=2, include_current=True)
+        assert hours_to_contracts(nxt[1]).tolist() == get_next_contracts(
+            "PH24073100", n=2, include_current=True
+        )
+        assert ContractCalendar.window(h, 1, 1).shape == (2, 3)
+
+    def test_outside_calendar(self):
+        cal = ContractCalendar.around(
+            datetime(2024, 7, 29, tzinfo=get_utc3_now().tzinfo).timestamp(),
+            days_before=0,
+            days_after=0,
+        )
+        assert len(cal) == 24
+        assert "PH24072914" in cal and "PH24073000" not in cal
+        with pytest.raises(KeyError):
+            cal.index_of("PH24073000")
+
+    def test_remaining_formatted_matches_scalar(self, monkeypatch):
+        now = datetime(2024, 7, 29, 10, 0, 15, tzinfo=get_utc3_now().tzinfo)
+        _fixed_now(monkeypatch, now)
+        cal = ContractCalendar.from_dates("2024-07-29", "2024-07-31")
+
+        assert cal.remaining_formatted() == [
+            contract_remaining_time_formatted(c) for c in cal.symbols()
+        ]
+        assert contract_remaining_time_formatted("PH24072910") == "-"
+        assert cal.remaining_formatted(hours=[cal.hours[-1]])[0].startswith("02D")
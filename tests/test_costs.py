@@ -49,7 +49,15 @@ from eptr2.util.costs import (
     # Amount and cost calculation functions
     calculate_imbalance_amount,
     calculate_diff_costs,
+    # Regime table functions
+    get_dsg_tolerance,
+    get_regime_by_contract,
+    get_regime_by_contracts,
+    # Scenario functions
+    calculate_diff_costs_by_contract,
+    calculate_scenario_costs,
 )
+from eptr2.util.time import contract_to_floor_ceil_prices
 
 
 # ============================================================================
@@ -161,6 +169,65 @@ class TestKUPSTTolerance:
             get_kupst_tolerance("wind", "invalid_regulation")
 
 
+# ============================================================================
+# Regime Table Tests
+# ============================================================================
+
+
+class TestRegimeTable:
+    """Tests for the compiled regulation/tolerance/price limit table."""
+
+    @pytest.mark.parametrize(
+        "contract",
+        ["PH22090200", "PH24072914", "PH25123123", "PH26010100", "PH26040500"],
+    )
+    def test_scalar_matches_individual_functions(self, contract):
+        """Test regime rows agree with the individual lookup functions."""
+        d = get_regime_by_contract(contract)
+        period = get_regulation_period_by_contract(contract)
+        fc_d = contract_to_floor_ceil_prices(contract)
+
+        assert d["regulation_period"] == period
+        assert d["dsg_tolerance"] == get_dsg_tolerance(period)
+        for source in ["wind", "solar", "unlicensed", "other"]:
+            assert d[f"kupst_tolerance_{source}"] == get_kupst_tolerance(
+                source, regulation_period=period
+            )
+        for k in ["min", "max", "idm_min", "idm_max"]:
+            assert d[k] == fc_d[k]
+
+    def test_vectorized_matches_scalar(self):
+        """Test vectorized lookup returns the scalar rows in input order."""
+        contracts = ["PH26040400", "PH15010100", "PH23070323", "PH26010100"]
+        res = get_regime_by_contracts(contracts)
+
+        for i, contract in enumerate(contracts):
+            d = get_regime_by_contract(contract)
+            assert res["regulation_period"][i] == d["regulation_period"]
+            assert res["kupst_tolerance_wind"][i] == d["kupst_tolerance_wind"]
+            if d["max"] is None:
+                assert math.isnan(res["max"][i])
+            else:
+                assert res["max"][i] == d["max"]
+
+    def test_contract_before_first_period_raises(self):
+        """Test contracts before the first regulation period raise ValueError."""
+        with pytest.raises(ValueError):
+            get_regime_by_contract("PH14123123")
+        with pytest.raises(ValueError):
+            get_regime_by_contracts(["PH26010100", "PH14123123"])
+
+    @pytest.mark.parametrize(
+        "contract", ["XX", "PH2601", "garbage123", "PH26133100", "PH2601012A"]
+    )
+    def test_invalid_contract_raises(self, contract):
+        """Test malformed contracts raise instead of matching a neighbouring row."""
+        with pytest.raises(ValueError):
+            get_regime_by_contract(contract)
+        with pytest.raises(ValueError):
+            get_regime_by_contracts(["PH26010100", contract])
+
+
 # ============================================================================
 # KUPST Cost Tests
 # ============================================================================
@@ -807,6 +874,99 @@ class TestDifferenceCosts:
         assert "imb_cost" in result
 
 
+# ============================================================================
+# Scenario Cost Tests
+# ============================================================================
+
+
+class TestScenarioCosts:
+    """Tests for multi-scenario cost evaluation."""
+
+    @pytest.fixture
+    def scenario_data(self):
+        np = pytest.importorskip("numpy")
+        start = datetime(2025, 12, 31, 20)
+        contracts = [datetime_to_contract(start + timedelta(hours=h)) for h in range(8)]
+        rng = np.random.default_rng(1)
+        mcp = rng.uniform(1000, 3000, 8)
+        smp = rng.uniform(1000, 3000, 8)
+        actual = rng.uniform(0, 100, 8)
+        forecasts = actual + rng.normal(0, 20, (6, 8))
+        return contracts, mcp, smp, actual, forecasts
+
+    def test_docstring_example(self):
+        """Test the two-scenario example."""
+        pytest.importorskip("numpy")
+        res = calculate_scenario_costs(
+            forecasts=[[120, 100], [100, 100]],
+            actuals=[100, 100],
+            contracts=["PH26010100", "PH26010101"],
+            mcp=[2000, 2000],
+            smp=[2200, 2200],
+            production_source="wind",
+            max_workers=1,
+        )
+        assert res["total_cost"].tolist() == [6860.0, 0.0]
+        assert res["percentiles"]["total_cost"][50] == 3430.0
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_matches_scalar_function(self, scenario_data, max_workers):
+        """Test totals match calculate_diff_costs_by_contract across regulation periods."""
+        contracts, mcp, smp, actual, forecasts = scenario_data
+        sources = ["wind", "solar", "other"] * 2
+        res = calculate_scenario_costs(
+            forecasts,
+            actual,
+            contracts,
+            mcp,
+            smp,
+            production_source=sources,
+            max_workers=max_workers,
+            shard_size=2,
+        )
+
+        for s in range(len(forecasts)):
+            hourly = [
+                calculate_diff_costs_by_contract(
+                    forecast=forecasts[s, h],
+                    actual=actual[h],
+                    is_producer=True,
+                    contract=contracts[h],
+                    mcp=mcp[h],
+                    smp=smp[h],
+                    production_source=sources[s],
+                )
+                for h in range(len(contracts))
+            ]
+            assert res["imb_cost"][s] == pytest.approx(
+                sum(x["imb_cost"] for x in hourly)
+            )
+            assert res["total_cost"][s] == pytest.approx(
+                sum(x["total_cost"] for x in hourly)
+            )
+
+    def test_consumer_scenarios(self, scenario_data):
+        """Test consumers get only imbalance costs."""
+        contracts, mcp, smp, actual, forecasts = scenario_data
+        res = calculate_scenario_costs(
+            actual, forecasts, contracts, mcp, smp, is_producer=False, max_workers=2
+        )
+
+        assert "kupst_cost" not in res
+        assert res["total_cost"].tolist() == res["imb_cost"].tolist()
+        assert len(res["total_cost"]) == len(forecasts)
+
+    def test_invalid_shapes_raise(self, scenario_data):
+        """Test mismatched hours and missing production source raise errors."""
+        contracts, mcp, smp, actual, forecasts = scenario_data
+        with pytest.raises(ValueError):
+            calculate_scenario_costs(
+                forecasts[:, :4], actual, contracts, mcp, smp, production_source="wind"
+            )
+        with pytest.raises(Exception, match="production_source"):
+            calculate_scenario_costs(forecasts, actual, contracts, mcp, smp)
+
+
 # ============================================================================
 # Edge Cases and Validation Tests
 # ============================================================================
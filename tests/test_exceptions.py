@@ -0,0 +1,144 @@
+"""Offline tests for structured request errors, Retry-After and TGT re-login."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from eptr2.exceptions import (
+    AuthExpiredError,
+    BadRequestError,
+    EPTR2RequestError,
+    RequestTimeoutError,
+    ServerError,
+    ThrottledError,
+    get_error_class,
+)
+from eptr2.instrumentation import CallHook
+from eptr2.main import parse_retry_after
+from eptr2.testing import StandInServer
+
+
+class _RetryHook(CallHook):
+    def __init__(self):
+        self.retries = []
+
+    def on_retry(self, data):
+        self.retries.append(data)
+
+
+def _call(eptr, **kwargs):
+    return eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29", **kwargs)
+
+
+@pytest.mark.parametrize(
+    "status,error_class",
+    [
+        (400, BadRequestError),
+        (401, AuthExpiredError),
+        (404, BadRequestError),
+        (408, RequestTimeoutError),
+        (429, ThrottledError),
+        (500, ServerError),
+        (503, ServerError),
+        (504, RequestTimeoutError),
+    ],
+)
+def test_error_class_by_status(status, error_class):
+    assert get_error_class(status) is error_class
+
+
+def test_errors_carry_status_endpoint_and_elapsed():
+    with (
+        StandInServer(error_rate=1.0, error_status=400) as server,
+        pytest.raises(BadRequestError, match="400") as exc_info,
+    ):
+        _call(server.client())
+
+    e = exc_info.value
+    assert isinstance(e, EPTR2RequestError)
+    assert e.status == 400
+    assert e.endpoint == "mcp"
+    assert e.elapsed >= 0
+    assert "injected error" in e.body
+
+
+def test_retry_after_is_honored_for_throttling():
+    hook = _RetryHook()
+    with StandInServer(fail_first=1, error_status=429, retry_after=0.3) as server:
+        eptr = server.client(hooks=[hook])
+        start = time.perf_counter()
+        df = _call(eptr, retry_attempts=2)
+        elapsed = time.perf_counter() - start
+
+    assert len(df) == 24
+    assert elapsed >= 0.3
+    assert hook.retries[0]["sleep"] == 0.3
+
+
+def test_retry_after_is_honored_with_default_retry_attempts():
+    with StandInServer(fail_first=1, error_status=503, retry_after=0.1) as server:
+        df = _call(server.client())
+        assert server.error_count == 1
+
+    assert len(df) == 24
+
+    ## Only one extra attempt is made
+    with (
+        StandInServer(error_rate=1.0, error_status=429, retry_after=0.1) as server,
+        pytest.raises(ThrottledError),
+    ):
+        _call(server.client())
+
+    assert server.error_count == 2
+
+
+def test_long_retry_after_raises_throttled_error():
+    with (
+        StandInServer(error_rate=1.0, error_status=429, retry_after=120) as server,
+        pytest.raises(ThrottledError) as exc_info,
+    ):
+        _call(server.client(), retry_attempts=3)
+
+    assert exc_info.value.retry_after == 120
+    assert server.error_count == 1
+
+
+def test_server_error_without_retry_after_is_not_retried():
+    with (
+        StandInServer(error_rate=1.0, error_status=503) as server,
+        pytest.raises(ServerError),
+    ):
+        _call(server.client(), retry_attempts=3)
+
+    assert server.error_count == 1
+
+
+def test_client_timeout_raises_request_timeout_error():
+    with StandInServer(latency=0.5) as server:
+        eptr = server.client()
+        with pytest.raises(RequestTimeoutError):
+            _call(eptr, request_kwargs={"timeout": 0.1})
+
+
+def test_expired_tgt_is_renewed_once():
+    with StandInServer() as server:
+        eptr = server.client()
+        old_tgt = eptr.tgt
+        server.expire_tgts()
+
+        df = _call(eptr)
+
+        assert len(df) == 24
+        assert eptr.tgt != old_tgt
+        assert server.login_count == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("not a date") is None
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
@@ -0,0 +1,189 @@
+"""Offline tests for the dam and reservoir series bundle."""
+
+import pandas as pd
+import pytest
+
+from eptr2.composite.hydrology import (
+    HydrologyStore,
+    get_dam_catalog,
+    get_hydrology_data,
+    save_hydrology_parquet,
+)
+from eptr2.testing import StandInServer
+
+DAMS_PATH = "/electricity-service/v1/dams/data/"
+PAYLOADS = {
+    "basin-list": {"items": [{"basinName": "FIRAT"}, {"basinName": "SEYHAN"}]},
+    "dam-list": {"damList": [{"damName": "KEBAN"}, {"damName": "KARAKAYA"}]},
+}
+
+
+def _series_calls(server):
+    return {
+        k[len(DAMS_PATH) :]: v
+        for k, v in server.request_counts.items()
+        if k.startswith(DAMS_PATH) and not k.endswith("-list")
+    }
+
+
+def test_catalog_is_cached(tmp_path):
+    store = HydrologyStore(str(tmp_path))
+    with StandInServer(payloads=PAYLOADS) as server:
+        catalog = get_dam_catalog(eptr=server.client(), store=store)
+        assert get_dam_catalog(eptr=server.client(), store=store).equals(catalog)
+        assert server.request_counts[DAMS_PATH + "basin-list"] == 1
+        assert server.request_counts[DAMS_PATH + "dam-list"] == 2
+
+    assert catalog.values.tolist() == [
+        ["FIRAT", "KEBAN"],
+        ["FIRAT", "KARAKAYA"],
+        ["SEYHAN", "KEBAN"],
+        ["SEYHAN", "KARAKAYA"],
+    ]
+    assert HydrologyStore(str(tmp_path)).get_catalog().equals(catalog)
+
+
+def test_long_frame_and_incremental_refresh(tmp_path):
+    store = HydrologyStore(str(tmp_path))
+    series = ["daily_level", "active_fullness"]
+    with StandInServer(payloads=PAYLOADS) as server:
+        first = get_hydrology_data(
+            "2024-01-01",
+            "2024-01-10",
+            series=series,
+            basins=["FIRAT"],
+            eptr=server.client(),
+            store=store,
+        )
+        assert _series_calls(server) == {"daily-kot": 2, "active-fullness": 2}
+
+        server.reset_stats()
+        second = get_hydrology_data(
+            "2024-01-01",
+            "2024-01-15",
+            series=series,
+            basins=["FIRAT"],
+            eptr=server.client(),
+            store=HydrologyStore(str(tmp_path)),
+            max_days=3,
+        )
+        ## Only 2024-01-11 - 2024-01-15, in 3 day calls
+        assert _series_calls(server) == {"daily-kot": 4, "active-fullness": 4}
+
+    assert list(first.columns) == [
+        "date",
+        "basin_name",
+        "dam_name",
+        "series",
+        "field",
+        "value",
+    ]
+    assert first["date"].dtype == "datetime64[ns]"
+    assert first["dam_name"].dtype == "category"
+    assert first["value"].dtype == "float64"
+    assert len(first) == 2 * 2 * 10
+    assert len(second) == 2 * 2 * 15
+    assert set(first["field"]) == {"value"}
+
+    key = ["date", "dam_name", "series"]
+    merged = first.merge(second, on=key, suffixes=("", "_new"))
+    assert (merged["value"] == merged["value_new"]).all()
+
+
+def test_refresh_backfills_days_before_stored_ones():
+    store = HydrologyStore()
+    with StandInServer(payloads=PAYLOADS) as server:
+        get_hydrology_data(
+            "2024-01-05",
+            "2024-01-10",
+            series=["daily_level"],
+            dams=["KEBAN"],
+            basins=["FIRAT"],
+            eptr=server.client(),
+            store=store,
+        )
+        server.reset_stats()
+        df = get_hydrology_data(
+            "2024-01-01",
+            "2024-01-12",
+            series=["daily_level"],
+            dams=["KEBAN"],
+            basins=["FIRAT"],
+            eptr=server.client(),
+            store=store,
+        )
+        ## 2024-01-01 - 2024-01-04 and 2024-01-11 - 2024-01-12
+        assert _series_calls(server) == {"daily-kot": 2}
+
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == [
+        f"2024-01-{x:02d}" for x in range(1, 13)
+    ]
+    assert store.date_ranges("daily_level") == {
+        ("FIRAT", "KEBAN"): ("2024-01-01", "2024-01-12")
+    }
+
+
+def test_same_dam_name_in_other_basin_is_excluded():
+    store = HydrologyStore()
+    with StandInServer(payloads=PAYLOADS) as server:
+        get_hydrology_data(
+            "2024-01-01",
+            "2024-01-03",
+            series=["daily_level"],
+            eptr=server.client(),
+            store=store,
+        )
+        df = get_hydrology_data(
+            "2024-01-01",
+            "2024-01-03",
+            series=["daily_level"],
+            basins=["FIRAT"],
+            dams=["KEBAN"],
+            eptr=server.client(),
+            store=store,
+        )
+
+    assert set(df["basin_name"].astype(str)) == {"FIRAT"}
+    assert len(df) == 3
+
+
+def test_skip_errors():
+    store = HydrologyStore()
+    store.put_catalog(
+        pd.DataFrame({"basin_name": ["FIRAT", "FIRAT"], "dam_name": ["A", "B"]})
+    )
+    with StandInServer(fail_first=1, error_status=400) as server:
+        df = get_hydrology_data(
+            "2024-01-01",
+            "2024-01-02",
+            series=["daily_volume"],
+            eptr=server.client(),
+            store=store,
+            max_workers=1,
+            skip_errors=True,
+        )
+
+    ## The first dam's call failed
+    assert df["dam_name"].unique().tolist() == ["B"]
+    assert len(df) == 2
+
+
+def test_unknown_series():
+    with pytest.raises(ValueError):
+        get_hydrology_data("2024-01-01", "2024-01-02", series=["rainfall"])
+
+
+def test_parquet_partitions(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame(
+        {
+            "date": ["2024-01-01"],
+            "basin_name": ["FIRAT"],
+            "dam_name": ["KEBAN"],
+            "series": ["daily_level"],
+            "field": ["value"],
+            "value": [1.0],
+        }
+    )
+    save_hydrology_parquet(df, str(tmp_path / "hydrology"))
+    assert (tmp_path / "hydrology" / "series=daily_level" / "basin_name=FIRAT").exists()
@@ -0,0 +1,179 @@
+"""Offline tests for IDM order book reconstruction."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eptr2.composite.idm_order_book import (
+    get_idm_order_books,
+    replay_idm_order_books,
+)
+from eptr2.testing import StandInServer
+
+
+def _orders(rows):
+    return pd.DataFrame(
+        rows,
+        columns=["contractName", "orderId", "date", "direction", "price", "quantity"],
+    )
+
+
+ORDERS = _orders(
+    [
+        ["PH24072912", 1, "2024-07-29T10:00:10+03:00", "ASK", 2000.0, 10.0],
+        ["PH24072912", 2, "2024-07-29T10:00:20+03:00", "BID", 2100.0, 5.0],
+        ["PH24072912", 3, "2024-07-29T10:00:30+03:00", "ASK", 2050.0, 3.0],
+        ["PH24072912", 4, "2024-07-29T10:01:10+03:00", "BID", 2080.0, 7.0],
+        ## Order 3 is reduced, then order 2 is removed
+        ["PH24072912", 3, "2024-07-29T10:01:20+03:00", "ASK", 2050.0, 1.0],
+        ["PH24072912", 2, "2024-07-29T10:02:05+03:00", "BID", 2100.0, 0.0],
+        ## Order 1 moves to a new price
+        ["PH24072912", 1, "2024-07-29T10:02:30+03:00", "ASK", 2060.0, 10.0],
+        ["PH24072913", 9, "2024-07-29T10:00:40+03:00", "SATIŞ", 2200.0, 4.0],
+    ]
+)
+
+
+def _reference_books(df):
+    """Rebuilds the book from scratch after every event."""
+    rows = []
+    df = df.sort_values(["contractName", "date"], kind="stable")
+    for contract, g in df.groupby("contractName"):
+        state = {}
+        for r in g.itertuples():
+            state[r.orderId] = (r.direction, r.price, r.quantity)
+            bids = [p for s, p, q in state.values() if s in ["ASK"] and q > 0]
+            asks = [p for s, p, q in state.values() if s not in ["ASK"] and q > 0]
+            rows.append(
+                [
+                    contract,
+                    max(bids) if bids else np.nan,
+                    min(asks) if asks else np.nan,
+                    sum(q for s, p, q in state.values() if s == "ASK"),
+                ]
+            )
+    return rows
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_replay_every_event_matches_reference(max_workers):
+    df = replay_idm_order_books(ORDERS, interval=None, max_workers=max_workers)
+    expected = _reference_books(ORDERS)
+    assert df["contract"].tolist() == [x[0] for x in expected]
+    np.testing.assert_allclose(
+        df[["best_bid", "best_ask", "bid_depth"]].to_numpy(dtype=float),
+        np.array([x[1:] for x in expected], dtype=float),
+        equal_nan=True,
+    )
+    assert df["n_events"].tolist() == [1, 2, 3, 4, 5, 6, 7, 1]
+
+
+def test_interval_snapshots_with_levels_and_trades():
+    trades = pd.DataFrame(
+        {
+            "contractName": ["PH24072912", "PH24072912"],
+            "date": ["2024-07-29T10:00:50+03:00", "2024-07-29T10:01:40+03:00"],
+            "price": [2055.0, 2070.0],
+            "quantity": [2.0, 1.5],
+        }
+    )
+    df = replay_idm_order_books(
+        ORDERS, trades=trades, interval="1min", depth=2, max_workers=1
+    )
+    book = df[df["contract"] == "PH24072912"]
+
+    assert book["time"].dt.strftime("%H:%M").tolist() == [
+        "10:01",
+        "10:02",
+        "10:03",
+    ]
+    ## ASK orders are buy orders
+    assert book["best_bid"].tolist() == [2050.0, 2050.0, 2060.0]
+    assert book["best_ask"].tolist() == [2100.0, 2080.0, 2080.0]
+    assert book["best_ask_qty"].tolist() == [5.0, 7.0, 7.0]
+    assert book["spread"].tolist() == [50.0, 30.0, 20.0]
+    assert book[["bid_price_1", "bid_price_2"]].values.tolist()[-1] == [
+        2060.0,
+        2050.0,
+    ]
+    assert book[["bid_price_1", "bid_qty_1", "bid_price_2"]].values.tolist()[0] == [
+        2050.0,
+        3.0,
+        2000.0,
+    ]
+    assert book[["ask_price_1", "ask_price_2"]].values.tolist()[1] == [2080.0, 2100.0]
+    assert book["last_price"].tolist() == [2055.0, 2070.0, 2070.0]
+    assert book["traded_qty"].tolist() == [2.0, 3.5, 3.5]
+
+    other = df[df["contract"] == "PH24072913"]
+    assert other["best_ask"].tolist() == [2200.0]
+    assert np.isnan(other["last_price"]).all()
+
+
+def test_inactive_status_removes_order():
+    df = ORDERS.iloc[:2].copy()
+    df["status"] = ["ACTIVE", "CANCELLED"]
+    res = replay_idm_order_books(df, interval=None, max_workers=1)
+    assert np.isnan(res["best_ask"].iloc[-1])
+
+
+def test_remaining_quantity_is_preferred():
+    ## Order 1 is partially filled down to 4 of its original 10
+    df = ORDERS.iloc[:1].copy()
+    df = pd.concat([df, df.assign(date="2024-07-29T10:00:50+03:00")], ignore_index=True)
+    df["remainingQuantity"] = [10.0, 4.0]
+    res = replay_idm_order_books(df, interval=None, max_workers=1)
+    assert res["bid_depth"].tolist() == [10.0, 4.0]
+
+
+def test_missing_columns():
+    with pytest.raises(ValueError):
+        replay_idm_order_books(ORDERS.drop(columns=["direction"]))
+
+
+def test_random_books_match_reference():
+    rng = np.random.default_rng(3)
+    n = 2000
+    df = _orders(
+        {
+            "contractName": rng.choice(["PH1", "PH2", "PH3"], n),
+            "orderId": rng.integers(0, 60, n),
+            "date": pd.Timestamp("2024-07-29T10:00:00+03:00")
+            + pd.to_timedelta(np.arange(n), unit="s"),
+            "direction": rng.choice(["ASK", "BID"], n),
+            "price": rng.integers(1900, 2100, n).astype(float),
+            "quantity": rng.choice([0.0, 1.0, 2.5, 4.0], n),
+        }
+    )
+    res = replay_idm_order_books(df, interval=None, max_workers=2)
+    expected = np.array([x[1:] for x in _reference_books(df)], dtype=float)
+    np.testing.assert_allclose(
+        res[["best_bid", "best_ask", "bid_depth"]].to_numpy(dtype=float),
+        expected,
+        equal_nan=True,
+    )
+
+
+def test_fetch_order_books():
+    payloads = {
+        "idm-contract-list": {
+            "items": [{"id": 77, "contractName": "PH24072912"}],
+        },
+        "idm-order-history": {
+            "items": ORDERS[ORDERS["contractName"] == "PH24072912"]
+            .drop(columns=["contractName"])
+            .to_dict("records")
+        },
+    }
+    with StandInServer(payloads=payloads) as server:
+        df = get_idm_order_books(
+            "2024-07-29",
+            "2024-07-29",
+            eptr=server.client(),
+            interval="1min",
+            include_trades=False,
+            max_workers=1,
+        )
+
+    assert df["contract"].unique().tolist() == ["PH24072912"]
+    assert df["best_bid"].tolist() == [2050.0, 2050.0, 2060.0]
@@ -0,0 +1,117 @@
+"""Offline tests for EPTR2 call instrumentation hooks."""
+
+import logging
+
+import pytest
+
+from eptr2.instrumentation import (
+    CallHook,
+    LoggingHook,
+    MetricsHook,
+    MetricsRegistry,
+)
+from eptr2.testing import StandInServer
+
+
+class _RecordingHook(CallHook):
+    def __init__(self):
+        self.events = []
+
+    def on_event(self, event, data):
+        self.events.append((event, data))
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandInServer(seed=1) as s:
+        yield s
+
+
+def test_events_are_emitted_in_order(server):
+    hook = _RecordingHook()
+    eptr = server.client(hooks=[hook])
+    df = eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+    names = [e for e, _ in hook.events]
+    assert names[0] == "tgt_renewal"
+    assert names[1:] == [
+        "call_start",
+        "request_start",
+        "request_end",
+        "decode",
+        "postprocess",
+        "call_end",
+    ]
+
+    d = dict(hook.events)
+    assert len({x["call_id"] for e, x in hook.events if e != "tgt_renewal"}) == 1
+    assert d["tgt_renewal"]["success"] is True
+    assert d["request_end"]["status"] == 200
+    assert d["request_end"]["bytes"] == d["decode"]["bytes"] > 0
+    assert d["postprocess"]["rows"] == len(df) == 24
+    assert d["call_end"]["rows"] == 24
+    assert d["call_end"]["error"] is None
+
+
+def test_retries_and_errors_are_reported():
+    hook = _RecordingHook()
+    with StandInServer(error_rate=1.0, error_status=504) as s:
+        eptr = s.client(hooks=[hook])
+        with pytest.raises(Exception, match="504"):
+            eptr.call(
+                "mcp",
+                start_date="2024-07-29",
+                end_date="2024-07-29",
+                retry_attempts=2,
+                retry_backoff=0.01,
+            )
+
+    retries = [x for e, x in hook.events if e == "retry"]
+    assert len(retries) == 1
+    assert retries[0]["attempt"] == 1
+    assert retries[0]["reason"] == "status 504"
+    assert [x["attempt"] for e, x in hook.events if e == "request_end"] == [1, 2]
+    assert "504" in dict(hook.events)["call_end"]["error"]
+
+
+def test_metrics_hook_and_prometheus_export(server):
+    registry = MetricsRegistry()
+    eptr = server.client()
+    eptr.add_hook(MetricsHook(registry))
+    for _ in range(2):
+        eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+    assert registry.get_counter("eptr2_calls_total", key="mcp", outcome="ok") == 2
+    assert registry.get_counter("eptr2_rows_total", key="mcp") == 48
+    assert registry.get_histogram("eptr2_call_seconds", key="mcp")["count"] == 2
+
+    text = registry.render()
+    assert "# TYPE eptr2_calls_total counter" in text
+    assert 'eptr2_call_seconds_bucket{key="mcp",le="+Inf"} 2' in text
+
+
+def test_metrics_hook_skips_unknown_rows():
+    registry = MetricsRegistry()
+    hook = MetricsHook(registry)
+    hook.on_postprocess({"key": "mcp", "elapsed": 0.01, "rows": None})
+    hook.on_postprocess({"key": "mcp", "elapsed": 0.01, "rows": 24})
+
+    assert registry.get_histogram("eptr2_postprocess_seconds", key="mcp")["count"] == 2
+    assert registry.get_counter("eptr2_rows_total", key="mcp") == 24
+
+
+def test_failing_hook_does_not_break_call(server):
+    class _BrokenHook(CallHook):
+        def on_call_start(self, data):
+            raise RuntimeError("boom")
+
+    eptr = server.client()
+    broken = _BrokenHook()
+    eptr.add_hook(broken)
+    eptr.add_hook(LoggingHook(level=logging.INFO))
+
+    df = eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+    assert len(df) == 24
+
+    eptr.remove_hook(broken)
+    assert len(eptr.hooks) == 1
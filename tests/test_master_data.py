@@ -0,0 +1,196 @@
+"""Offline tests for the master data index."""
+
+import gzip
+import json
+
+import pytest
+
+from eptr2.composite.master_data import MasterDataIndex, normalize_name
+from eptr2.testing import StandInServer
+
+
+def _payloads(uevm_name="AYVACIK KARABURUN RES"):
+    return {
+        "pp-list": {
+            "items": [
+                {
+                    "id": 101,
+                    "name": "AYVACIK KARABURUN RES",
+                    "eic": "40W000000000001A",
+                    "shortName": "KARABURUN",
+                },
+                {
+                    "id": 102,
+                    "name": "İÇDAŞ BEKİRLİ TES",
+                    "eic": "40W000000000002B",
+                    "shortName": "BEKİRLİ",
+                },
+                {
+                    "id": 103,
+                    "name": "IĞDIR GES",
+                    "eic": "40W000000000003C",
+                    "shortName": None,
+                },
+            ]
+        },
+        "uevm-pp-list": {
+            "items": [
+                {"id": 201, "name": uevm_name, "eic": "40W000000000001A"},
+                {"id": 202, "name": "İçdaş Bekirli TES", "eic": None},
+                {"id": 204, "name": "SADECE UEVM HES", "eic": None},
+            ]
+        },
+        "gen-org": {
+            "items": [
+                {
+                    "organizationId": 11,
+                    "organizationName": "KARABURUN ENERJİ A.Ş.",
+                    "organizationShortName": "KARABURUN",
+                    "organizationEtsoCode": "40X000000000011Z",
+                    "organizationStatus": "ACTIVE",
+                },
+                {
+                    "organizationId": 12,
+                    "organizationName": "İÇDAŞ ELEKTRİK ENERJİ ÜRETİM VE YATIRIM A.Ş.",
+                    "organizationShortName": "ICDAS",
+                    "organizationEtsoCode": "40X000000000012Z",
+                    "organizationStatus": "ACTIVE",
+                },
+            ]
+        },
+        "uevcb-list-bulk": {
+            "items": [
+                {
+                    "id": 301,
+                    "orgId": 11,
+                    "name": "KARABURUN RES",
+                    "eic": "40W000000000001A",
+                },
+                {
+                    "id": 302,
+                    "orgId": 12,
+                    "name": "BEKİRLİ TES",
+                    "eic": "40W000000000002B",
+                },
+            ]
+        },
+        "lic-pp-list": {"items": [{"name": "IĞDIR GES", "capacity": 10.0}]},
+        "mms-pp-list": {
+            "items": [
+                {"id": 401, "name": "AYVACIK KARABURUN RES", "eic": "40W000000000001A"},
+                {"id": 403, "name": "Iğdır GES", "eic": None},
+            ]
+        },
+    }
+
+
+@pytest.fixture
+def synced_index(tmp_path):
+    with StandInServer(payloads=_payloads()) as server:
+        index = MasterDataIndex(str(tmp_path / "master_data.json.gz"))
+        res = index.sync(eptr=server.client(), date="2025-03-15")
+    assert res == {
+        "revision": 1,
+        "changed": [
+            "rt_plants",
+            "uevm_plants",
+            "orgs",
+            "lic_plants",
+            "mms_plants",
+            "uevcbs",
+        ],
+        "failed": {},
+    }
+    return index
+
+
+def test_normalize_name():
+    assert normalize_name("İÇDAŞ A.Ş.") == normalize_name("icdas a s") == "icdas a s"
+    assert normalize_name("IĞDIR") == normalize_name("Iğdır") == "igdir"
+    assert normalize_name(None) == ""
+
+
+def test_lookups(synced_index):
+    assert synced_index.get_rt_plant("101")["pp_name"] == "AYVACIK KARABURUN RES"
+    assert synced_index.get_org(12)["org_short_name"] == "ICDAS"
+    assert synced_index.get_uevcb(302)["org_id"] == 12
+    assert synced_index.get_mms_plant(999) is None
+    assert set(synced_index.get_by_eic("40W000000000001A")) == {
+        ("rt_plants", 101),
+        ("uevm_plants", 201),
+        ("uevcbs", 301),
+        ("mms_plants", 401),
+    }
+    assert synced_index.get_org_uevcbs(11)["uevcb_id"].tolist() == [301]
+
+
+def test_id_map(synced_index):
+    assert synced_index.map_id(101, "rt_id", "uevm_id") == 201
+    assert synced_index.map_id(101, "rt_id", "org_id") == 11
+    assert synced_index.map_id(201, "uevm_id", "mms_pp_id") == 401
+    ## Matched by normalized name without EIC
+    assert synced_index.map_id(102, "rt_id", "uevm_id") == 202
+    assert synced_index.map_id(103, "rt_id", "mms_pp_id") == 403
+    assert synced_index.map_id(103, "rt_id", "uevm_id") is None
+
+    df = synced_index.get_id_map()
+    assert df.set_index("rt_id")["match"].to_dict()[102] == "eic"
+    ## UEVM plant without a real-time plant is kept
+    assert df[df["uevm_id"] == 204]["rt_id"].isna().all()
+
+    with pytest.raises(ValueError):
+        synced_index.map_id(101, "org_id", "rt_id")
+
+
+def test_search(synced_index):
+    res = synced_index.search("ayvacık karaburun res", kind="rt_plants")
+    assert res.iloc[0].to_dict() == {
+        "table": "rt_plants",
+        "id": 101,
+        "name": "AYVACIK KARABURUN RES",
+        "match": "exact",
+    }
+    assert synced_index.search("icdas", kind="orgs")["id"].tolist() == [12]
+    res = synced_index.search("icdas bek", fuzzy=False)
+    assert res[["table", "id", "match"]].values.tolist() == [
+        ["rt_plants", 102, "prefix"],
+        ["uevm_plants", 202, "prefix"],
+    ]
+    res = synced_index.search("karab res", kind="rt_plants")
+    assert res["id"].tolist() == [101] and res["match"].tolist() == ["word"]
+    res = synced_index.search("bekirly tes", kind="uevcbs")
+    assert res["id"].tolist() == [302] and res["match"].tolist() == ["fuzzy"]
+    assert synced_index.search("ığdır", kind="lic_plants")["id"].tolist() == [0]
+    assert synced_index.search("xyz", fuzzy=False).empty
+
+
+def test_offline_load_and_revisions(synced_index, tmp_path):
+    path = str(tmp_path / "master_data.json.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert json.load(f)["version"] == 1
+
+    index = MasterDataIndex(path)
+    assert index.revision == 1
+    assert index.map_id(101, "rt_id", "uevm_id") == 201
+    assert not index.is_stale(3600)
+
+    with StandInServer(payloads=_payloads()) as server:
+        res = index.sync(eptr=server.client(), date="2025-03-15")
+    assert res["revision"] == 1 and res["changed"] == []
+
+    with StandInServer(payloads=_payloads(uevm_name="KARABURUN RES")) as server:
+        res = index.load_or_sync(path, eptr=server.client(), max_age=0)
+    assert res.revision == 2
+    assert MasterDataIndex(path).get_uevm_plant(201)["pp_name"] == "KARABURUN RES"
+
+
+def test_failed_source_keeps_previous_table(synced_index):
+    with StandInServer(payloads=_payloads(), fail_first=1, error_status=400) as server:
+        res = synced_index.sync(
+            eptr=server.client(),
+            date="2025-03-15",
+            sources=["pp-list"],
+            save=False,
+        )
+    assert res["changed"] == [] and list(res["failed"]) == ["pp-list"]
+    assert synced_index.get_rt_plant(101) is not None
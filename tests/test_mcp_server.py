@@ -1,11 +1,23 @@
 """Regression tests for eptr2 MCP server surface and call-key wiring."""
 
+import asyncio
+import json
+import threading
+import time
+
 import pytest
 
 from eptr2 import mcp as mcp_module
 from eptr2.mcp import server as mcp_server
 
 
+@pytest.fixture(autouse=True)
+def _clean_response_cache():
+    mcp_server.clear_response_cache()
+    yield
+    mcp_server.clear_response_cache()
+
+
 class _FakeClient:
     def __init__(self):
         self.calls = []
@@ -32,9 +44,9 @@ def test_mcp_tool_aliases(monkeypatch):
     fake = _FakeClient()
     monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
 
-    mcp_server.get_real_time_consumption.fn("2024-01-01", "2024-01-01")
-    mcp_server.get_real_time_generation.fn("2024-01-01", "2024-01-01")
-    mcp_server.get_imbalance_price.fn("2024-01-01", "2024-01-01")
+    asyncio.run(mcp_server.get_real_time_consumption.fn("2024-01-01", "2024-01-01"))
+    asyncio.run(mcp_server.get_real_time_generation.fn("2024-01-01", "2024-01-01"))
+    asyncio.run(mcp_server.get_imbalance_price.fn("2024-01-01", "2024-01-01"))
 
     assert fake.calls[0][0] == "rt-cons"
     assert fake.calls[1][0] == "rt-gen"
@@ -46,11 +58,13 @@ def test_call_eptr2_api_merges_additional_params(monkeypatch):
     fake = _FakeClient()
     monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
 
-    mcp_server.call_eptr2_api.fn(
-        "mcp",
-        start_date="2024-01-01",
-        end_date="2024-01-02",
-        additional_params={"org_id": 195},
+    asyncio.run(
+        mcp_server.call_eptr2_api.fn(
+            "mcp",
+            start_date="2024-01-01",
+            end_date="2024-01-02",
+            additional_params={"org_id": 195},
+        )
     )
 
     call_key, params = fake.calls[-1]
@@ -65,11 +79,262 @@ def test_call_eptr2_api_accepts_json_additional_params(monkeypatch):
     fake = _FakeClient()
     monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
 
-    mcp_server.call_eptr2_api.fn(
-        "load-plan",
-        additional_params='{"region_id": 34}',
+    asyncio.run(
+        mcp_server.call_eptr2_api.fn(
+            "load-plan",
+            additional_params='{"region_id": 34}',
+        )
     )
 
     call_key, params = fake.calls[-1]
     assert call_key == "load-plan"
     assert params["region_id"] == 34
+
+
+class _SlowClient(_FakeClient):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def call(self, call_key, **params):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return super().call(call_key, **params)
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_slow_tool_does_not_block_other_tools(monkeypatch):
+    slow = _SlowClient(delay=0.5)
+    fast = _FakeClient()
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: slow)
+
+    async def scenario():
+        slow_task = asyncio.create_task(mcp_server.call_eptr2_api.fn("idm-log"))
+        await asyncio.sleep(0.05)
+        monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fast)
+        start = time.time()
+        await mcp_server.get_market_clearing_price.fn("2024-01-01", "2024-01-01")
+        elapsed = time.time() - start
+        await slow_task
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.4
+    assert fast.calls[0][0] == "mcp"
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_client_is_created_off_the_event_loop(monkeypatch):
+    fake = _FakeClient()
+    threads = []
+
+    def get_client():
+        ## Client creation logs in and blocks
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return fake
+
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", get_client)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        await mcp_server.get_market_clearing_price.fn("2024-01-01", "2024-01-01")
+        await mcp_server.get_available_eptr2_calls.fn()
+        ticker_task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) > 10
+    assert threading.main_thread() not in threads
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_per_tool_concurrency_limit_and_cancellation(monkeypatch):
+    slow = _SlowClient(delay=0.2)
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: slow)
+    monkeypatch.setattr(mcp_server, "_tool_concurrency_limits", {"call_eptr2_api": 2})
+    mcp_server._tool_semaphores.clear()
+
+    async def scenario():
+        tasks = [
+            asyncio.create_task(
+                mcp_server.call_eptr2_api.fn("mcp", additional_params={"i": i})
+            )
+            for i in range(4)
+        ]
+        cancelled = asyncio.create_task(mcp_server.call_eptr2_api.fn("smp"))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+        await asyncio.gather(*tasks)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+    asyncio.run(scenario())
+    mcp_server._tool_semaphores.clear()
+
+    assert slow.max_active == 2
+    assert [k for k, _ in slow.calls] == ["mcp"] * 4
+
+
+class _FrameClient(_FakeClient):
+    def call(self, call_key, **params):
+        self.calls.append((call_key, params))
+        pd = pytest.importorskip("pandas")
+        dates = pd.date_range("2024-01-01", periods=48, freq="h")
+        return pd.DataFrame(
+            {
+                "date": dates.strftime("%Y-%m-%dT%H:%M:%S+03:00"),
+                "price": range(48),
+                "volume": [1.5] * 48,
+            }
+        )
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_tool_pagination_and_projection(monkeypatch):
+    fake = _FrameClient()
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
+
+    rows = []
+    cursor = None
+    while True:
+        page = json.loads(
+            asyncio.run(
+                mcp_server.get_market_clearing_price.fn(
+                    "2024-01-01",
+                    "2024-01-02",
+                    columns="date,price",
+                    page_size=20,
+                    cursor=cursor,
+                )
+            )
+        )
+        assert page["total_rows"] == 48
+        assert page["columns"] == ["date", "price"]
+        rows.extend(page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [x["price"] for x in rows] == list(range(48))
+    ## Further pages are served from the response cache
+    assert len(fake.calls) == 1
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_tool_compact_csv_and_summary(monkeypatch):
+    fake = _FrameClient()
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
+
+    csv_text = asyncio.run(
+        mcp_server.call_eptr2_api.fn("mcp", output_format="csv", columns=["price"])
+    )
+    assert csv_text.splitlines()[:2] == ["price", "0"]
+
+    compact = asyncio.run(mcp_server.call_eptr2_api.fn("mcp"))
+    assert "\n" not in compact
+
+    summary = json.loads(asyncio.run(mcp_server.call_eptr2_api.fn("mcp", summary=True)))
+    price_rows = [x for x in summary["summary"] if x["column"] == "price"]
+    assert [(x["day"], x["min"], x["max"]) for x in price_rows] == [
+        ("2024-01-01", 0, 23),
+        ("2024-01-02", 24, 47),
+    ]
+
+    with pytest.raises(ValueError):
+        asyncio.run(mcp_server.call_eptr2_api.fn("mcp", columns="missing"))
+    with pytest.raises(ValueError):
+        asyncio.run(mcp_server.call_eptr2_api.fn("mcp", cursor="not-a-cursor"))
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_response_cache_is_shared_between_tools(monkeypatch):
+    fake = _FrameClient()
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
+
+    first = asyncio.run(
+        mcp_server.get_market_clearing_price.fn("2024-01-01", "2024-01-02")
+    )
+    second = asyncio.run(
+        mcp_server.call_eptr2_api.fn(
+            "mcp", start_date="2024-01-01", end_date="2024-01-02"
+        )
+    )
+    asyncio.run(mcp_server.call_eptr2_api.fn("mcp", start_date="2024-01-01"))
+
+    assert first == second
+    assert len(fake.calls) == 2
+    assert mcp_server.get_response_cache_stats()["hits"] == 1
+
+
+def test_cache_ttl_follows_publication_times():
+    from datetime import datetime
+
+    import pytz
+
+    tz = pytz.timezone("Europe/Istanbul")
+    morning = tz.localize(datetime(2024, 7, 29, 13, 59, 30))
+    afternoon = tz.localize(datetime(2024, 7, 29, 14, 5))
+    tomorrow = {"start_date": "2024-07-30", "end_date": "2024-07-30"}
+    today = {"start_date": "2024-07-29", "end_date": "2024-07-29"}
+    yesterday = {"start_date": "2024-07-28", "end_date": "2024-07-28"}
+
+    assert mcp_server._get_cache_ttl("mcp", tomorrow, now=morning) == 30
+    assert (
+        mcp_server._get_cache_ttl("mcp", tomorrow, now=afternoon)
+        == mcp_server.FINAL_DATA_TTL
+    )
+    assert (
+        mcp_server._get_cache_ttl("rt-gen", today, now=afternoon)
+        == mcp_server.LIVE_DATA_TTL
+    )
+    assert (
+        mcp_server._get_cache_ttl("rt-gen", yesterday, now=afternoon)
+        == mcp_server.PAST_DATA_TTL
+    )
+
+
+def test_prefetch_fills_cache(monkeypatch):
+    fake = _FakeClient()
+    monkeypatch.setattr(mcp_server, "_get_eptr_client", lambda: fake)
+
+    status = mcp_server.prefetch_common_data()
+
+    assert set(status.values()) == {"ok"}
+    assert len(fake.calls) == sum(len(x) for x in mcp_server.PREFETCH_CALLS.values())
+    assert mcp_server.get_response_cache_stats()["size"] == len(fake.calls)
+
+
+@pytest.mark.skipif(not mcp_server.MCP_AVAILABLE, reason="fastmcp is not installed")
+def test_main_reads_prefetch_options_from_env(monkeypatch):
+    received = []
+
+    async def fake_run(**kwargs):
+        received.append(kwargs)
+
+    monkeypatch.setattr(mcp_server, "run_mcp_server", fake_run)
+    monkeypatch.delenv("EPTR2_MCP_PREFETCH", raising=False)
+    monkeypatch.delenv("EPTR2_MCP_PREFETCH_INTERVAL", raising=False)
+    mcp_server.main()
+
+    monkeypatch.setenv("EPTR2_MCP_PREFETCH", "true")
+    monkeypatch.setenv("EPTR2_MCP_PREFETCH_INTERVAL", "300")
+    mcp_server.main()
+
+    assert received == [
+        {"prefetch": False, "prefetch_interval": None},
+        {"prefetch": True, "prefetch_interval": 300.0},
+    ]
@@ -0,0 +1,142 @@
+"""Offline tests for the MMS parser, loss summaries and chunked fetching."""
+
+import pandas as pd
+import pytest
+
+from eptr2.composite.mms import (
+    get_mms_detail,
+    get_mms_loss_summary,
+    get_mms_loss_summary_range,
+    iter_mms_detail,
+    parse_mms_items,
+)
+from eptr2.testing import StandInServer
+from eptr2.util.time import iso_to_contract
+
+MMS_PATH = "/electricity-service/v1/markets/data/market-message-system"
+
+
+def _message(id, plant, fuel, hours, loss):
+    return {
+        "id": id,
+        "powerPlantName": plant,
+        "fuelType": fuel,
+        "caseStartDate": hours[0],
+        "caseEndDate": hours[-1],
+        "installedPower": 100,
+        "faultDetails": [
+            {
+                "hour": h,
+                "faultCausedPowerLoss": loss,
+                "faultCausedEnergyLoss": loss,
+            }
+            for h in hours
+        ],
+    }
+
+
+MESSAGES = [
+    _message(
+        1,
+        "A",
+        "GAS",
+        ["2024-07-29T22:00:00+03:00", "2024-07-29T23:00:00+03:00"],
+        10.0,
+    ),
+    _message(
+        2,
+        "B",
+        "COAL",
+        ["2024-07-29T23:00:00+03:00", "2024-07-30T00:00:00+03:00"],
+        5.5,
+    ),
+    {"id": 3, "powerPlantName": "C", "fuelType": "GAS", "faultDetails": []},
+]
+
+
+def _reference(messages):
+    """The previous explode/json_normalize expansion."""
+    df = pd.DataFrame(messages)
+    df = df[df["faultDetails"].str.len() > 0]
+    df = df.explode("faultDetails", ignore_index=True)
+    df = df.drop(columns=["faultDetails"]).join(
+        pd.json_normalize(df["faultDetails"], sep="_")
+    )
+    df["contract"] = df["hour"].apply(iso_to_contract)
+    return df
+
+
+def test_parse_matches_explode():
+    df = parse_mms_items({"items": MESSAGES})
+    ref = _reference(MESSAGES)
+
+    assert len(df) == 4
+    assert df["id"].dtype == "int64"
+    assert df["powerPlantName"].dtype == "category"
+    assert df["faultCausedPowerLoss"].dtype == "float64"
+    assert df["contract_hour"].dtype == "int64"
+    assert str(df["hour"].dt.tz) == "UTC+03:00"
+
+    for col in ["id", "powerPlantName", "fuelType", "faultCausedPowerLoss"]:
+        assert df[col].tolist() == ref[col].tolist()
+    assert (df["hour"] == pd.to_datetime(ref["hour"])).all()
+    assert parse_mms_items(pd.DataFrame(MESSAGES))["id"].tolist() == [1, 1, 2, 2]
+
+
+def test_summaries():
+    df = parse_mms_items(MESSAGES)
+
+    by_contract = get_mms_loss_summary(df)
+    assert by_contract["contract"].tolist() == [
+        "PH24072922",
+        "PH24072923",
+        "PH24073000",
+    ]
+    assert by_contract["faultCausedPowerLoss"].tolist() == [10.0, 15.5, 5.5]
+
+    by_fuel = get_mms_loss_summary(df, by=["contract", "fuel"])
+    assert by_fuel.columns.tolist() == [
+        "contract",
+        "fuel",
+        "faultCausedPowerLoss",
+        "faultCausedEnergyLoss",
+    ]
+    assert by_fuel.values.tolist()[1] == ["PH24072923", "COAL", 5.5, 5.5]
+
+    with pytest.raises(ValueError):
+        get_mms_loss_summary(df, by="region")
+
+
+def test_detail_and_chunked_range():
+    with StandInServer(payloads={"mms": {"items": MESSAGES}}) as server:
+        d = get_mms_detail(
+            "2024-07-29", "2024-07-30", eptr=server.client(), include_summary=True
+        )
+        assert d["detail"]["contract"].astype(str).tolist() == (
+            _reference(MESSAGES)["contract"].tolist()
+        )
+        assert d["summary"]["faultCausedEnergyLoss"].sum() == 31.0
+
+        ## Both days return the same messages, which are counted once
+        chunks = list(
+            iter_mms_detail(
+                "2024-07-29", "2024-07-30", eptr=server.client(), chunk_days=1
+            )
+        )
+        assert [len(x) for x in chunks] == [4]
+
+        summary = get_mms_loss_summary_range(
+            "2024-07-29",
+            "2024-07-30",
+            by=["plant", "contract"],
+            eptr=server.client(),
+            chunk_days=1,
+        )
+        assert server.request_counts[MMS_PATH] == 5
+
+    assert summary.values.tolist() == [
+        ["A", "PH24072922", 10.0, 10.0],
+        ["A", "PH24072923", 10.0, 10.0],
+        ["B", "PH24072923", 5.5, 5.5],
+        ["B", "PH24073000", 5.5, 5.5],
+    ]
@@ -0,0 +1,159 @@
+"""Offline tests for natural gas bulk fetching."""
+
+from datetime import datetime
+
+import pytest
+
+from eptr2.composite import natural_gas
+from eptr2.composite.natural_gas import (
+    NaturalGasStore,
+    get_ng_gas_day_table,
+    plan_ng_requests,
+)
+from eptr2.testing import StandInServer
+
+NG_PATH = "/natural-gas-service/v1/markets/sgp/data/"
+SETTLEMENT = {
+    "ng-latest-settlement-date": {"lastReconciliationDate": "2024-02-29T00:00:00+03:00"}
+}
+
+
+def test_plan_respects_max_span_and_periods():
+    specs = {
+        "short": {"key": "ng-spot-prices", "kind": "se", "max_days": 10},
+        "long": {"key": "ng-vgp-ggf-se", "kind": "se", "max_days": 62},
+        "monthly": {"key": "ng-imbalance-amount", "kind": "period"},
+    }
+    plans = plan_ng_requests("2024-01-15", "2024-04-02", specs)
+    by_source = {}
+    for x in plans:
+        by_source.setdefault(x["source"], []).append(
+            (x["request"].get("start_date"), x["request"].get("end_date"))
+        )
+
+    assert by_source["long"] == [
+        ("2024-01-15", "2024-02-29"),
+        ("2024-03-01", "2024-04-02"),
+    ]
+    short = by_source["short"]
+    assert short[0] == ("2024-01-15", "2024-01-24")
+    ## Month remainders are merged with the next month within the span
+    assert short[-2:] == [("2024-03-21", "2024-03-30"), ("2024-03-31", "2024-04-02")]
+    assert len(short) == 9
+    assert [x["request"]["period"] for x in plans if x["source"] == "monthly"] == [
+        "2024-01-01",
+        "2024-02-01",
+        "2024-03-01",
+        "2024-04-01",
+    ]
+
+    with pytest.raises(ValueError):
+        plan_ng_requests("2024-01-01", "2024-01-31", ["unknown"])
+
+
+def test_gas_day_table():
+    with StandInServer(n_items=None) as server:
+        df = get_ng_gas_day_table(
+            "2024-01-30",
+            "2024-02-02",
+            sources=["sgp_price", "vgp_matched_quantity"],
+            eptr=server.client(),
+        )
+
+    assert df.index.strftime("%Y-%m-%d").tolist() == [
+        "2024-01-30",
+        "2024-01-31",
+        "2024-02-01",
+        "2024-02-02",
+    ]
+    assert list(df.columns) == ["sgp_price_value", "vgp_matched_quantity_value"]
+    assert df.notna().all().all()
+
+
+def test_store_refreshes_only_unsettled_days(tmp_path):
+    sources = ["sgp_price", "physical_realization"]
+    with StandInServer(payloads=SETTLEMENT) as server:
+        store = NaturalGasStore(str(tmp_path))
+        first = get_ng_gas_day_table(
+            "2024-02-01",
+            "2024-03-31",
+            sources=sources,
+            eptr=server.client(),
+            store=store,
+        )
+        assert store.coverage("physical_realization") == {
+            "first_day": "2024-02-01",
+            "last_day": "2024-03-31",
+            "settled_through": "2024-02-29",
+        }
+
+        server.reset_stats()
+        store = NaturalGasStore(str(tmp_path))
+        second = get_ng_gas_day_table(
+            "2024-02-01",
+            "2024-04-05",
+            sources=sources,
+            eptr=server.client(),
+            store=store,
+        )
+        counts = dict(server.request_counts)
+
+    ## Prices: the last stored day and new days; realization: unsettled and new days
+    assert counts[NG_PATH + "sgp-price"] == 1
+    assert counts[NG_PATH + "physical-realization"] == 2
+    assert len(second) == 65
+    assert (
+        second.loc["2024-02-01":"2024-03-30", "sgp_price_value"]
+        == first.loc["2024-02-01":"2024-03-30", "sgp_price_value"]
+    ).all()
+    assert (
+        second.loc["2024-02-01":"2024-02-29", "physical_realization_value"]
+        == first.loc["2024-02-01":"2024-02-29", "physical_realization_value"]
+    ).all()
+    ## Unsettled days were fetched again
+    assert (
+        second.loc["2024-03-01":"2024-03-31", "physical_realization_value"]
+        != first.loc["2024-03-01":"2024-03-31", "physical_realization_value"]
+    ).any()
+    assert store.coverage("sgp_price")["last_day"] == "2024-04-05"
+
+
+def test_store_does_not_finalize_future_days(tmp_path, monkeypatch):
+    with StandInServer(n_items=None) as server:
+        store = NaturalGasStore(str(tmp_path))
+        monkeypatch.setattr(natural_gas, "get_utc3_now", lambda: datetime(2024, 6, 15))
+        get_ng_gas_day_table(
+            "2024-06-01",
+            "2024-06-30",
+            sources=["sgp_price"],
+            eptr=server.client(),
+            store=store,
+        )
+        assert store.coverage("sgp_price")["last_day"] == "2024-06-15"
+
+        ## Days after the first run are fetched even if only the last day is requested
+        monkeypatch.setattr(natural_gas, "get_utc3_now", lambda: datetime(2024, 6, 20))
+        get_ng_gas_day_table(
+            "2024-06-30",
+            "2024-06-30",
+            sources=["sgp_price"],
+            eptr=server.client(),
+            store=store,
+        )
+        assert store.coverage("sgp_price")["last_day"] == "2024-06-20"
+
+        ## Only future days: nothing is recorded as fetched
+        future = NaturalGasStore()
+        get_ng_gas_day_table(
+            "2024-06-25",
+            "2024-06-30",
+            sources=["sgp_price"],
+            eptr=server.client(),
+            store=future,
+        )
+        assert future.coverage("sgp_price") is None
+
+    stored = store.get("sgp_price")
+    assert sorted(stored["gas_day"].unique()) == [
+        f"2024-06-{x:02d}" for x in range(1, 31)
+    ]
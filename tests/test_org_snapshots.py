@@ -0,0 +1,169 @@
+"""Offline tests for period snapshots of generation organizations and UEVCBs."""
+
+import pandas as pd
+import pytest
+
+from eptr2.composite import periodic_orgs
+from eptr2.composite.periodic_orgs import (
+    OrgUevcbSnapshotStore,
+    diff_org_uevcb_snapshots,
+    get_aggregator_membership,
+    get_multiperiod_generation_org_and_uevcb_wrapper,
+)
+from eptr2.testing import StandInServer
+
+COLUMNS = [
+    "org_id",
+    "org_name",
+    "org_short_name",
+    "uevcb_id",
+    "uevcb_name",
+    "uevcb_eic",
+]
+
+## Monthly snapshots: UEVCB 302 moves to the aggregator in February, the aggregator is
+## renamed and UEVCB 303 is added in March
+SNAPSHOTS = {
+    "2024-01-01": [
+        [11, "ABC TOPLAYICI A.Ş.", "ABC", 301, "RES 1", "40W1"],
+        [12, "XYZ ENERJİ A.Ş.", "XYZ", 302, "GES 2", "40W2"],
+    ],
+    "2024-02-01": [
+        [11, "ABC TOPLAYICI A.Ş.", "ABC", 301, "RES 1", "40W1"],
+        [11, "ABC TOPLAYICI A.Ş.", "ABC", 302, "GES 2", "40W2"],
+        [12, "XYZ ENERJİ A.Ş.", "XYZ", None, None, None],
+    ],
+    "2024-03-01": [
+        [11, "ABC TOPLAYICI ELEKTRİK A.Ş.", "ABC", 301, "RES 1", "40W1"],
+        [11, "ABC TOPLAYICI ELEKTRİK A.Ş.", "ABC", 302, "GES 2", "40W2"],
+        [11, "ABC TOPLAYICI ELEKTRİK A.Ş.", "ABC", 303, "HES 3", "40W3"],
+        [12, "XYZ ENERJİ A.Ş.", "XYZ", None, None, None],
+    ],
+}
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def fake_wrapper(period, **kwargs):
+        calls.append(period)
+        df = pd.DataFrame(SNAPSHOTS[period], columns=COLUMNS)
+        df["period"] = period
+        return df
+
+    monkeypatch.setattr(
+        periodic_orgs, "get_generation_org_and_uevcb_wrapper", fake_wrapper
+    )
+    return calls
+
+
+def test_diff_org_uevcb_snapshots():
+    old = pd.DataFrame(SNAPSHOTS["2024-02-01"], columns=COLUMNS)
+    new = pd.DataFrame(SNAPSHOTS["2024-03-01"], columns=COLUMNS)
+    df = diff_org_uevcb_snapshots(old, new)
+    assert df.values.tolist() == [
+        [
+            "org_renamed",
+            11,
+            None,
+            "org_name",
+            "ABC TOPLAYICI A.Ş.",
+            "ABC TOPLAYICI ELEKTRİK A.Ş.",
+        ],
+        ["uevcb_added", 11, 303, None, None, None],
+    ]
+
+    df = diff_org_uevcb_snapshots(
+        pd.DataFrame(SNAPSHOTS["2024-01-01"], columns=COLUMNS), old
+    )
+    assert df.values.tolist() == [["uevcb_moved", 11, 302, "org_id", 12, 11]]
+    assert diff_org_uevcb_snapshots(old, old).empty
+
+
+def test_only_missing_periods_are_fetched(fetches, tmp_path):
+    store = OrgUevcbSnapshotStore(str(tmp_path))
+    fetched = store.sync("2024-01-01", "2024-02-15", eptr=object(), sleep=0)
+    assert fetched == fetches == ["2024-01-01", "2024-02-01"]
+
+    ## A new store on the same directory reads the stored periods
+    store = OrgUevcbSnapshotStore(str(tmp_path))
+    df = get_multiperiod_generation_org_and_uevcb_wrapper(
+        "2024-01-01", "2024-03-31", store=store, eptr=object(), sleep=0
+    )
+    assert fetches == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    assert store.periods() == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    assert df.groupby("period").size().tolist() == [2, 3, 4]
+    assert sorted(x.name for x in tmp_path.iterdir()) == [
+        "2024-01-01.json.gz",
+        "2024-02-01.json.gz",
+        "2024-03-01.json.gz",
+    ]
+
+
+def test_diffs_are_persisted_and_recomputed_on_change(fetches, tmp_path):
+    store = OrgUevcbSnapshotStore(str(tmp_path))
+    store.sync("2024-01-01", "2024-03-01", eptr=object(), sleep=0)
+
+    diffs = store.get_diffs("2024-01-01", "2024-03-01")
+    assert diffs["period"].tolist() == ["2024-02-01", "2024-03-01", "2024-03-01"]
+    assert (tmp_path / "2024-03-01.diff.json.gz").exists()
+    assert store.get_diff("2024-01-01") is None
+
+    ## Stored diffs are read back by a new store
+    assert (
+        OrgUevcbSnapshotStore(str(tmp_path))
+        .get_diffs("2024-01-01", "2024-03-01")
+        .equals(diffs)
+    )
+
+    df = store.get_snapshot("2024-03-01")
+    assert not store.put_snapshot("2024-03-01", df)
+    assert store.put_snapshot("2024-03-01", df[df["uevcb_id"].ne(303).fillna(True)])
+    assert store.get_diff("2024-03-01")["change"].tolist() == ["org_renamed"]
+
+
+def test_get_aggregator_membership(fetches):
+    store = OrgUevcbSnapshotStore()
+    res = get_aggregator_membership(
+        "2024-01-01", "2024-03-01", store=store, eptr=object(), sleep=0
+    )
+    assert res["members"].groupby("period")["uevcb_id"].apply(sorted).to_dict() == {
+        "2024-01-01": [301],
+        "2024-02-01": [301, 302],
+        "2024-03-01": [301, 302, 303],
+    }
+    assert res["changes"]["change"].tolist() == [
+        "uevcb_moved",
+        "org_renamed",
+        "uevcb_added",
+    ]
+
+    ## Second query is answered locally
+    get_aggregator_membership("2024-01-01", "2024-03-01", store=store, sleep=0)
+    assert len(fetches) == 3
+
+
+def test_sync_through_standin_server(tmp_path):
+    payloads = {
+        "gen-org": {
+            "items": [
+                {
+                    "organizationId": 11,
+                    "organizationName": "ABC TOPLAYICI A.Ş.",
+                    "organizationShortName": "ABC",
+                }
+            ]
+        },
+        "uevcb-list-bulk": {
+            "items": [{"id": 301, "orgId": 11, "name": "RES 1", "eic": "40W1"}]
+        },
+    }
+    with StandInServer(payloads=payloads) as server:
+        store = OrgUevcbSnapshotStore(str(tmp_path))
+        store.sync("2024-01-01", "2024-01-31", eptr=server.client())
+
+    df = store.get_snapshot("2024-01-01")
+    assert df[["org_id", "uevcb_id", "uevcb_name"]].values.tolist() == [
+        [11, 301, "RES 1"]
+    ]
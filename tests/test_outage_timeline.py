@@ -0,0 +1,178 @@
+"""Offline tests for the MMS outage timeline."""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eptr2.composite import outage_timeline
+from eptr2.composite.outage_timeline import (
+    OutageTimeline,
+    get_hourly_unavailability,
+    hourly_unavailability,
+    join_outage_timeline,
+    mms_outage_intervals,
+)
+from eptr2.testing import StandInServer
+
+MMS_PATH = "/electricity-service/v1/markets/data/market-message-system"
+
+
+def _message(id, fuel, start, end, installed=None, capacity=None, details=None):
+    return {
+        "id": id,
+        "powerPlantName": f"P{id}",
+        "fuelType": fuel,
+        "caseStartDate": start,
+        "caseEndDate": end,
+        "installedPower": installed,
+        "capacityAtCaseTime": capacity,
+        "faultDetails": details or [],
+    }
+
+
+MESSAGES = [
+    ## 100 MW from 10:00 to 13:00
+    _message(
+        1, "GAS", "2024-07-29T10:00:00+03:00", "2024-07-29T13:00:00+03:00", 300, 200
+    ),
+    ## 60 MW from 11:30 to 12:15, partial hours
+    _message(2, "GAS", "2024-07-29T11:30:00+03:00", "2024-07-29T12:15:00+03:00", 60, 0),
+    ## Loss from the fault details, until after the range
+    _message(
+        3,
+        "COAL",
+        "2024-07-30T22:00:00+03:00",
+        "2024-08-02T00:00:00+03:00",
+        details=[{"faultCausedPowerLoss": 40}, {"faultCausedPowerLoss": 50}],
+    ),
+    ## No loss
+    _message(
+        4, "HYDRO", "2024-07-29T00:00:00+03:00", "2024-07-29T05:00:00+03:00", 10, 10
+    ),
+]
+
+
+def _expanded(intervals, start_date, end_date):
+    """Per interval hour by hour expansion as the reference."""
+    hours = pd.date_range(
+        start_date + "T00:00:00+03:00", end_date + "T23:00:00+03:00", freq="h"
+    )
+    ref = {}
+    for s, e, loss, _, fuel, *_ in intervals.values():
+        col = ref.setdefault(fuel, np.zeros(len(hours)))
+        for i, h in enumerate(hours):
+            overlap = min(e, h.timestamp() + 3600) - max(s, h.timestamp())
+            col[i] += loss * max(overlap, 0) / 3600
+    return ref
+
+
+def test_sweep_matches_expansion():
+    intervals = mms_outage_intervals({"items": MESSAGES})
+    assert sorted(intervals) == ["1", "2", "3"]
+    assert intervals["3"][2] == 50.0
+
+    df = hourly_unavailability(intervals, "2024-07-29", "2024-07-31", by="fuel")
+    assert len(df) == 72
+    assert df.columns.tolist() == ["date", "contract_hour", "COAL", "GAS", "total"]
+    assert str(df["date"].iloc[0]) == "2024-07-29 00:00:00+03:00"
+
+    ref = _expanded(intervals, "2024-07-29", "2024-07-31")
+    for fuel in ["GAS", "COAL"]:
+        np.testing.assert_allclose(df[fuel], ref[fuel], atol=1e-6)
+    assert df["GAS"].iloc[10:14].tolist() == [100.0, 130.0, 115.0, 0.0]
+    np.testing.assert_allclose(df["total"], df["GAS"] + df["COAL"])
+
+    total = hourly_unavailability(intervals, "2024-07-31", "2024-07-31", by=None)
+    assert total.columns.tolist() == ["date", "contract_hour", "total"]
+    assert (total["total"] == 50.0).all()
+
+    with pytest.raises(ValueError):
+        hourly_unavailability(intervals, "2024-07-29", "2024-07-29", by="region")
+
+
+def test_join_with_hourly_frame():
+    intervals = mms_outage_intervals(MESSAGES)
+    timeline = hourly_unavailability(intervals, "2024-07-29", "2024-07-29")
+    rt = pd.DataFrame(
+        {
+            "date": ["2024-07-29T11:00:00+03:00", "2024-07-29T10:00:00+03:00"],
+            "total": [30000.0, 29000.0],
+        }
+    )
+    df = join_outage_timeline(rt, timeline)
+    assert df.columns.tolist() == [
+        "date",
+        "total",
+        "unavailable_COAL",
+        "unavailable_GAS",
+        "unavailable_total",
+    ]
+    assert df["unavailable_GAS"].tolist() == [130.0, 100.0]
+
+
+def test_incremental_update(tmp_path):
+    path = str(tmp_path / "outages.json.gz")
+    with StandInServer(payloads={"mms": {"items": MESSAGES}}) as server:
+        df = get_hourly_unavailability(
+            "2024-07-01", "2024-07-31", eptr=server.client(), chunk_days=10
+        )
+        assert server.request_counts[MMS_PATH] == 4
+
+        timeline = OutageTimeline(path)
+        timeline.update("2024-07-01", "2024-07-31", eptr=server.client())
+        server.reset_stats()
+
+        ## Only the last 7 fetched days and the new days: 2024-07-25 - 2024-08-03
+        timeline = OutageTimeline(path)
+        assert len(timeline) == 3
+        timeline.update("2024-07-01", "2024-08-03", eptr=server.client(), chunk_days=5)
+        assert server.request_counts[MMS_PATH] == 2
+        assert (timeline.first_day, timeline.last_day) == ("2024-07-01", "2024-08-03")
+
+    assert df["GAS"].sum() == pytest.approx(345.0)
+    assert timeline.hourly("2024-07-29", "2024-07-31").equals(
+        hourly_unavailability(
+            mms_outage_intervals(MESSAGES), "2024-07-29", "2024-07-31"
+        )
+    )
+
+
+class _RangeClient:
+    """Records the date ranges of the mms calls."""
+
+    def __init__(self):
+        self.ranges = []
+
+    def call_many(self, requests, max_workers=None):
+        self.ranges += [(x["start_date"], x["end_date"]) for x in requests]
+        return [{"items": []} for _ in requests]
+
+
+def test_update_fetches_gaps_and_future_days_again(monkeypatch):
+    monkeypatch.setattr(outage_timeline, "get_utc3_now", lambda: datetime(2024, 3, 20))
+    client = _RangeClient()
+    timeline = OutageTimeline()
+    timeline.update("2024-01-01", "2024-01-31", eptr=client, chunk_days=100)
+    timeline.update("2024-03-01", "2024-03-31", eptr=client, chunk_days=100)
+    ## February is fetched with March, nothing is left to fetch for it
+    assert client.ranges == [
+        ("2024-01-01", "2024-01-31"),
+        ("2024-01-25", "2024-03-31"),
+    ]
+    assert (timeline.first_day, timeline.last_day) == ("2024-01-01", "2024-03-20")
+
+    client.ranges = []
+    timeline.update("2024-02-01", "2024-02-29", eptr=client)
+    assert client.ranges == []
+
+    ## Days after the previous update are fetched again
+    monkeypatch.setattr(outage_timeline, "get_utc3_now", lambda: datetime(2024, 4, 10))
+    timeline.update("2024-03-31", "2024-03-31", eptr=client, chunk_days=100)
+    assert client.ranges == [("2024-03-14", "2024-03-31")]
+
+    ## Only future days: nothing is recorded as fetched
+    empty = OutageTimeline()
+    empty.update("2024-05-01", "2024-05-02", eptr=client)
+    assert (empty.first_day, empty.last_day) == (None, None)
@@ -0,0 +1,143 @@
+"""Offline tests for the call policy (timeouts, retry budget, circuit breaker)."""
+
+import pytest
+
+from eptr2.policy import (
+    BULK_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    CallPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    get_request_timeout_kwargs,
+)
+from eptr2.testing import StandInServer
+
+
+def test_timeouts_by_endpoint():
+    policy = CallPolicy(timeouts={"mcp": 3})
+    assert policy.get_timeout("mcp") == 3
+    assert policy.get_timeout("uevcb-list-bulk") == BULK_TIMEOUT
+    assert policy.get_timeout("smp") == DEFAULT_TIMEOUT
+
+
+def test_retry_budget_limits_retry_ratio():
+    budget = RetryBudget(ratio=0.1, min_retries=1, window=10)
+    for _ in range(20):
+        budget.record_request(now=0)
+
+    assert budget.try_spend(now=1)
+    assert budget.try_spend(now=1)
+    assert not budget.try_spend(now=1)
+    assert budget.stats()["denied"] == 1
+
+    ## Old requests and retries leave the window
+    assert budget.try_spend(now=20)
+    assert not budget.try_spend(now=20)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    cb = CircuitBreaker(failure_threshold=2, cooldown=10)
+    cb.record_failure("mcp", now=0)
+    cb.before_request("mcp", now=0)
+    cb.record_failure("mcp", now=0)
+    assert cb.get_state("mcp") == "open"
+
+    with pytest.raises(CircuitOpenError):
+        cb.before_request("mcp", now=5)
+    cb.before_request("smp", now=5)
+
+    ## Single probe after cooldown
+    cb.before_request("mcp", now=11)
+    assert cb.get_state("mcp") == "half_open"
+    with pytest.raises(CircuitOpenError):
+        cb.before_request("mcp", now=11)
+
+    cb.record_failure("mcp", now=11)
+    assert cb.get_state("mcp") == "open"
+    cb.before_request("mcp", now=22)
+    cb.record_success("mcp")
+    assert cb.get_state("mcp") == "closed"
+    assert cb.stats()["mcp"]["rejected"] == 2
+
+
+def test_unexpected_error_releases_probe():
+    policy = CallPolicy(circuit_breaker=CircuitBreaker(failure_threshold=1, cooldown=0))
+    with StandInServer() as server:
+        eptr = server.client(policy=policy)
+        policy.circuit_breaker.record_failure("mcp")
+
+        ## Invalid timeout raises ValueError during the half-open probe
+        with pytest.raises(ValueError):
+            eptr.call(
+                "mcp",
+                start_date="2024-07-29",
+                end_date="2024-07-29",
+                request_kwargs={"timeout": "x"},
+            )
+        eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+    assert policy.circuit_breaker.get_state("mcp") == "closed"
+
+
+def test_client_fails_fast_and_reports_stats():
+    policy = CallPolicy(circuit_breaker=CircuitBreaker(failure_threshold=3))
+    with StandInServer(error_rate=1.0, error_status=503) as server:
+        eptr = server.client(policy=policy)
+        for _ in range(3):
+            with pytest.raises(Exception, match="503"):
+                eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+        with pytest.raises(CircuitOpenError):
+            eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+        assert server.error_count == 3
+
+    stats = eptr.get_stats()
+    assert stats["requests"] == 3
+    assert stats["failures"] == 3
+    assert stats["circuits"]["mcp"]["state"] == "open"
+
+
+def test_retries_stop_when_budget_is_spent():
+    policy = CallPolicy(retry_budget=RetryBudget(ratio=0, min_retries=1))
+    with StandInServer(error_rate=1.0, error_status=504) as server:
+        eptr = server.client(policy=policy)
+        with pytest.raises(Exception, match="504"):
+            eptr.call(
+                "mcp",
+                start_date="2024-07-29",
+                end_date="2024-07-29",
+                retry_attempts=5,
+                retry_backoff=0,
+            )
+
+        assert server.error_count == 2
+
+    assert eptr.get_stats()["retry_budget"]["denied"] == 1
+
+
+def test_policy_is_opt_in():
+    with StandInServer() as server:
+        eptr = server.client()
+        eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+        assert eptr.policy is None
+        assert eptr.get_stats() == {}
+        assert server.client(policy=False).policy is None
+
+        eptr = server.client(policy=True)
+        eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+    assert isinstance(eptr.policy, CallPolicy)
+    assert eptr.get_stats()["requests"] == 1
+
+
+def test_composite_timeouts_defer_to_policy():
+    with StandInServer() as server:
+        eptr = server.client()
+        assert get_request_timeout_kwargs(eptr, 5) == {"request_kwargs": {"timeout": 5}}
+
+        eptr = server.client(policy=True)
+        assert get_request_timeout_kwargs(eptr, 5) == {}
+        assert get_request_timeout_kwargs(eptr, 5, 20) == {
+            "request_kwargs": {"timeout": 20}
+        }
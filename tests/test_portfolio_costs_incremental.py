@@ -0,0 +1,183 @@
+"""Offline tests for incremental portfolio cost recomputation."""
+
+import pandas as pd
+import pytest
+
+from eptr2.composite.plant_costs import calculate_portfolio_costs
+from eptr2.composite.price_and_cost import clear_market_price_cache
+
+
+class _FakePortfolioClient:
+    """Serves deterministic production and price data for any date range."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call(self, key, **params):
+        self.calls.append((key, params["start_date"], params["end_date"]))
+        dates = pd.date_range(
+            params["start_date"], params["end_date"] + " 23:00", freq="h"
+        )
+        date_strs = [x.strftime("%Y-%m-%dT%H:00:00+03:00") for x in dates]
+        hours = [x.strftime("%H:00") for x in dates]
+        base = params.get("uevcbId", params.get("powerPlantId", 0)) % 7
+
+        if key in ["kgup-v1", "kgup"]:
+            return pd.DataFrame(
+                {
+                    "date": date_strs,
+                    "time": hours,
+                    "toplam": [10.0 + base + x.hour % 5 for x in dates],
+                }
+            )
+        if key == "rt-gen":
+            return pd.DataFrame(
+                {
+                    "date": date_strs,
+                    "hour": hours,
+                    "total": [9.0 + base + x.hour % 3 for x in dates],
+                }
+            )
+        return pd.DataFrame(
+            {
+                "date": date_strs,
+                "time": hours,
+                "ptf": [2000.0 + 10 * x.hour for x in dates],
+                "smf": [2500.0 - 10 * x.hour for x in dates],
+                "positiveImbalance": 1940.0,
+                "negativeImbalance": 2650.0,
+                "systemStatus": "Enerji Açığı",
+            }
+        )
+
+
+class _PartialPriceClient(_FakePortfolioClient):
+    """Prices after 2026-02-02 11:00 are not published yet."""
+
+    def call(self, key, **params):
+        df = super().call(key, **params)
+        if "ptf" in df.columns:
+            df = df[df["date"] <= "2026-02-02T11:00:00+03:00"]
+        return df
+
+
+class TestIncrementalPortfolioCosts:
+    """Tests for previous_results support of calculate_portfolio_costs."""
+
+    @pytest.fixture(autouse=True)
+    def _clean_price_cache(self):
+        clear_market_price_cache()
+        yield
+        clear_market_price_cache()
+
+    @pytest.fixture
+    def id_df(self):
+        return pd.DataFrame(
+            {
+                "plant_name": ["Plant A", "Plant B"],
+                "org_id": [1, 2],
+                "uevcb_id": [11, 12],
+                "rt_id": [21, 22],
+                "uevm_id": [31, 32],
+                "source": ["wind", "solar"],
+            }
+        )
+
+    def _run(self, start_date, end_date, id_df, **kwargs):
+        return calculate_portfolio_costs(
+            start_date,
+            end_date,
+            id_df,
+            verbose=False,
+            skip_kgup_v1=False,
+            **kwargs,
+        )
+
+    def test_incremental_matches_full_recomputation(self, id_df):
+        prev = self._run("2026-02-01", "2026-02-02", id_df, eptr=_FakePortfolioClient())
+
+        fake = _FakePortfolioClient()
+        incremental = self._run(
+            "2026-02-01",
+            "2026-02-03",
+            id_df,
+            eptr=fake,
+            previous_results=prev,
+            revision_lookback_hours=24,
+        )
+        clear_market_price_cache()
+        full = self._run("2026-02-01", "2026-02-03", id_df, eptr=_FakePortfolioClient())
+
+        ## Only the lookback day and the new day are fetched
+        assert {x[1] for x in fake.calls} == {"2026-02-02"}
+
+        for k in ["costs_detail", "contract_summary", "final_summary"]:
+            pd.testing.assert_frame_equal(
+                incremental[k]
+                .sort_values(incremental[k].columns[0:2].tolist())
+                .reset_index(drop=True),
+                full[k]
+                .sort_values(full[k].columns[0:2].tolist())
+                .reset_index(drop=True),
+                check_dtype=False,
+            )
+
+    def test_missing_values_extend_refresh_window(self, id_df):
+        prev = self._run("2026-02-01", "2026-02-03", id_df, eptr=_FakePortfolioClient())
+        detail = prev["costs_detail"]
+        detail.loc[detail["contract"] == "PH26020105", "actual"] = float("nan")
+
+        fake = _FakePortfolioClient()
+        self._run(
+            "2026-02-01",
+            "2026-02-03",
+            id_df,
+            eptr=fake,
+            previous_results=prev,
+            revision_lookback_hours=24,
+        )
+
+        assert {x[1] for x in fake.calls} == {"2026-02-01"}
+
+    def test_default_lookback_covers_settlement_lag(self, id_df):
+        prev = self._run("2026-02-01", "2026-02-03", id_df, eptr=_FakePortfolioClient())
+
+        fake = _FakePortfolioClient()
+        self._run("2026-02-01", "2026-02-04", id_df, eptr=fake, previous_results=prev)
+
+        ## UEVM of all previous hours may still be revised
+        assert {x[1] for x in fake.calls} == {"2026-02-01"}
+
+    def test_changed_portfolio_recomputes_everything(self, id_df):
+        prev = self._run("2026-02-01", "2026-02-02", id_df, eptr=_FakePortfolioClient())
+
+        fake = _FakePortfolioClient()
+        res = self._run(
+            "2026-02-01",
+            "2026-02-03",
+            id_df.iloc[:1],
+            eptr=fake,
+            previous_results=prev,
+        )
+
+        assert {x[1] for x in fake.calls} == {"2026-02-01"}
+        assert res["costs_detail"]["uevcb_id"].unique().tolist() == [11]
+
+    def test_refresh_fetches_prices_published_later(self, id_df):
+        prev = self._run("2026-02-01", "2026-02-02", id_df, eptr=_PartialPriceClient())
+        assert prev["costs_detail"]["unit_kupst_cost"].isna().any()
+
+        refreshed = self._run(
+            "2026-02-01",
+            "2026-02-02",
+            id_df,
+            eptr=_FakePortfolioClient(),
+            previous_results=prev,
+        )
+        clear_market_price_cache()
+        full = self._run("2026-02-01", "2026-02-02", id_df, eptr=_FakePortfolioClient())
+
+        assert refreshed["costs_detail"]["unit_kupst_cost"].notna().all()
+        pd.testing.assert_frame_equal(
+            refreshed["final_summary"], full["final_summary"], check_dtype=False
+        )
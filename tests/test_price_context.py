@@ -0,0 +1,120 @@
+"""Offline tests for the memoized market price context."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from eptr2.composite.price_and_cost import (
+    clear_market_price_cache,
+    get_market_price_context,
+)
+from eptr2.util.time import get_utc3_now
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def call(self, key, **params):
+        self.calls.append((key, params))
+        dates = pd.date_range(
+            params["start_date"], params["end_date"] + " 23:00", freq="h"
+        )
+        return pd.DataFrame(
+            {
+                "date": [x.strftime("%Y-%m-%dT%H:00:00+03:00") for x in dates],
+                "time": [x.strftime("%H:00") for x in dates],
+                "ptf": 2000.0,
+                "smf": 2500.0,
+                "positiveImbalance": 1940.0,
+                "negativeImbalance": 2650.0,
+                "systemStatus": "Enerji Açığı",
+            }
+        )
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    clear_market_price_cache()
+    yield
+    clear_market_price_cache()
+
+
+def test_context_is_fetched_once_per_window():
+    fake = _FakeClient()
+
+    ctx1 = get_market_price_context("2026-02-01", "2026-02-02", eptr=fake)
+    ctx2 = get_market_price_context("2026-02-01", "2026-02-02", eptr=fake)
+
+    assert len(fake.calls) == 1
+    assert ctx1 is ctx2
+    assert len(ctx1.price_df) == 48
+    assert {"contract", "pos_imb_cost", "neg_imb_cost", "kupst_cost"} <= set(
+        ctx1.price_df.columns
+    )
+
+
+def test_context_is_sliced_for_covered_windows():
+    fake = _FakeClient()
+
+    get_market_price_context("2026-02-01", "2026-02-03", eptr=fake)
+    sub_ctx = get_market_price_context("2026-02-02", "2026-02-02", eptr=fake)
+
+    assert len(fake.calls) == 1
+    assert len(sub_ctx.price_df) == 24
+    assert sub_ctx.price_df["contract"].iloc[0] == "PH26020200"
+
+    cost_df = sub_ctx.get_cost_df(add_unit_prefix_to_cost_colnames=True)
+    assert "unit_kupst_cost" in cost_df.columns
+    assert "kupst_cost" not in cost_df.columns
+
+
+def test_context_cache_key_includes_kupst_params_and_bypass():
+    fake = _FakeClient()
+
+    get_market_price_context("2026-02-01", "2026-02-01", eptr=fake)
+    get_market_price_context(
+        "2026-02-01", "2026-02-01", eptr=fake, include_maintenance_penalty=True
+    )
+    get_market_price_context("2026-02-01", "2026-02-01", eptr=fake, use_cache=False)
+
+    assert len(fake.calls) == 3
+
+
+def test_windows_until_today_are_not_cached():
+    fake = _FakeClient()
+    today = get_utc3_now().strftime("%Y-%m-%d")
+
+    get_market_price_context("2026-02-01", today, eptr=fake)
+    get_market_price_context("2026-02-01", today, eptr=fake)
+
+    assert len(fake.calls) == 2
+
+
+def test_slow_window_does_not_block_other_windows():
+    release = threading.Event()
+
+    class _SlowClient(_FakeClient):
+        def call(self, key, **params):
+            if params["start_date"] == "2026-02-01":
+                assert release.wait(5)
+            return super().call(key, **params)
+
+    fake = _SlowClient()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        slow = [
+            executor.submit(
+                get_market_price_context, "2026-02-01", "2026-02-01", eptr=fake
+            )
+            for _ in range(2)
+        ]
+        ## Another window is fetched while the first one is in flight
+        other = get_market_price_context("2026-03-01", "2026-03-01", eptr=fake)
+        release.set()
+        contexts = [x.result() for x in slow]
+
+    assert len(other.price_df) == 24
+    assert contexts[0] is contexts[1]
+    assert len(fake.calls) == 2
@@ -0,0 +1,98 @@
+"""Offline tests for concurrent data gathering in production composites."""
+
+import threading
+import time
+
+import pandas as pd
+
+from eptr2.composite.production import (
+    get_hourly_production_plan_data,
+    wrapper_hourly_production_plan_and_realized,
+)
+
+DATES = ["2025-02-05T00:00:00+03:00", "2025-02-05T01:00:00+03:00"]
+
+
+class _FakeClient:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def call(self, key, **params):
+        with self._lock:
+            self.calls.append((key, params))
+        time.sleep(self.delay)
+        if key in ["kgup-v1", "kgup", "kudup"]:
+            return pd.DataFrame(
+                {"date": DATES, "time": ["00:00", "01:00"], "toplam": [1.0, 2.0]}
+            )
+        return pd.DataFrame(
+            {"date": DATES, "hour": ["00:00", "01:00"], "total": [1.5, 2.5]}
+        )
+
+
+def test_wrapper_dispatches_all_sources_concurrently():
+    fake = _FakeClient(delay=0.2)
+
+    start = time.time()
+    df = wrapper_hourly_production_plan_and_realized(
+        "2025-02-05",
+        "2025-02-05",
+        eptr=fake,
+        org_id=195,
+        uevcb_id=733,
+        rt_pp_id=641,
+        uevm_pp_id=142,
+    )
+    elapsed = time.time() - start
+
+    assert sorted(k for k, _ in fake.calls) == sorted(
+        ["kgup-v1", "kgup", "kudup", "rt-gen", "uevm"]
+    )
+    assert elapsed < 5 * 0.2
+    assert list(df.columns) == [
+        "dt",
+        "time",
+        "contract",
+        "toplam_kgup_v1",
+        "toplam_kgup",
+        "toplam_kudup",
+        "total_rt",
+        "total_uevm",
+    ]
+    assert df["contract"].tolist() == ["PH25020500", "PH25020501"]
+
+
+def test_wrapper_respects_skips_and_sequential_mode():
+    fake = _FakeClient()
+
+    df = wrapper_hourly_production_plan_and_realized(
+        "2025-02-05",
+        "2025-02-05",
+        eptr=fake,
+        rt_pp_id=641,
+        skip_kgup_v1=True,
+        skip_kudup=True,
+        max_workers=1,
+    )
+
+    assert [k for k, _ in fake.calls] == ["kgup", "rt-gen"]
+    assert "toplam_kgup" in df.columns
+    assert "total_rt" in df.columns
+    assert "total_uevm" not in df.columns
+
+
+def test_plan_data_skips_empty_sources():
+    class _EmptyKudupClient(_FakeClient):
+        def call(self, key, **params):
+            if key == "kudup":
+                return pd.DataFrame()
+            return super().call(key, **params)
+
+    df = get_hourly_production_plan_data(
+        "2025-02-05", "2025-02-05", eptr=_EmptyKudupClient(), org_id=195
+    )
+
+    assert "toplam_kgup" in df.columns
+    assert not any(x.endswith("_kudup") for x in df.columns)
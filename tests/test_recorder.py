@@ -0,0 +1,58 @@
+"""Offline tests for recording and replaying transparency calls."""
+
+import time
+
+import pytest
+
+from eptr2.testing import CallRecorder, StandInServer
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "calls.zip")
+    with StandInServer(seed=3, latency=0.05) as server:
+        with CallRecorder(path, mode="record") as recorder:
+            eptr = server.client(recorder=recorder)
+            mcp = eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+            smp = eptr.call("smp", start_date="2024-07-29", end_date="2024-07-30")
+        request_counts = dict(server.request_counts)
+    return path, mcp, smp, request_counts
+
+
+def test_replay_serves_recorded_responses_offline(archive):
+    path, mcp, smp, request_counts = archive
+    assert sum(request_counts.values()) == 2
+
+    recorder = CallRecorder(path, mode="replay")
+    assert len(recorder) == 2
+    assert {x["key"] for x in recorder.entries} == {"mcp", "smp"}
+
+    eptr = recorder.client()
+    assert eptr.tgt is None
+    assert eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29").equals(mcp)
+    assert eptr.call("smp", start_date="2024-07-29", end_date="2024-07-30").equals(smp)
+    ## Repeated requests get the last recorded response
+    assert eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29").equals(mcp)
+
+
+def test_replay_missing_request_raises(archive):
+    eptr = CallRecorder(archive[0], mode="replay").client()
+    with pytest.raises(LookupError, match="No recorded response"):
+        eptr.call("mcp", start_date="2024-08-01", end_date="2024-08-01")
+
+
+def test_replay_timing(archive):
+    eptr = CallRecorder(archive[0], mode="replay").client()
+    start = time.perf_counter()
+    eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+    assert time.perf_counter() - start < 0.05
+
+    eptr = CallRecorder(archive[0], mode="replay", replay_timing=True).client()
+    start = time.perf_counter()
+    eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        CallRecorder("calls.zip", mode="rewind")
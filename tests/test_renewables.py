@@ -0,0 +1,126 @@
+"""Offline tests for the renewables (YEKDEM) composite."""
+
+from datetime import datetime
+
+import pytest
+
+from eptr2.composite import renewables
+from eptr2.composite.renewables import (
+    RenewablesStore,
+    get_renewables_data,
+    get_yekdem_monthly,
+)
+from eptr2.testing import StandInServer
+from eptr2.util.time import get_utc3_now
+
+REN_PATH = "/electricity-service/v1/renewables/data/"
+
+
+def _calls(server):
+    return sum(v for k, v in server.request_counts.items() if k.startswith(REN_PATH))
+
+
+UNIT_COST = {
+    "items": [
+        {"date": "2024-01-01T00:00:00+03:00", "version": 2, "unitCost": 110.0},
+        {"date": "2024-01-01T00:00:00+03:00", "version": 1, "unitCost": 100.0},
+        {"date": "2024-02-01T00:00:00+03:00", "version": 1, "unitCost": 120.0},
+    ]
+}
+
+
+def test_hourly_table_aligns_monthly_sources():
+    with StandInServer(n_items=None, payloads={"ren-unit-cost": UNIT_COST}) as server:
+        df = get_renewables_data(
+            "2024-01-31",
+            "2024-02-01",
+            sources=["rt_gen", "unit_cost"],
+            eptr=server.client(),
+        )
+        ## One call per source and month
+        assert _calls(server) == 4
+
+    assert len(df) == 48
+    assert str(df.index[0]) == "2024-01-31 00:00:00+03:00"
+    assert list(df.columns) == [
+        "rt_gen_value",
+        "unit_cost_version",
+        "unit_cost_unitCost",
+    ]
+    assert (df.dtypes == "float64").all()
+    assert df["rt_gen_value"].notna().all()
+    ## Monthly values (the last version) are repeated on the hours of their month
+    assert set(df.loc["2024-01-31", "unit_cost_unitCost"]) == {110.0}
+    assert set(df.loc["2024-02-01", "unit_cost_unitCost"]) == {120.0}
+
+    with pytest.raises(ValueError):
+        get_renewables_data("2024-01-01", "2024-01-31", sources=["geothermal"])
+
+
+def test_versioned_monthly_sources_keep_the_last_version():
+    income = {
+        "items": [
+            {"date": "2024-01-01T00:00:00+03:00", "version": 2, "value": 15.0},
+            {"date": "2024-01-01T00:00:00+03:00", "version": 3, "value": 20.0},
+            {"date": "2024-01-01T00:00:00+03:00", "version": 1, "value": 10.0},
+        ]
+    }
+    payloads = {"ren-income": income, "ren-total-cost": income}
+    with StandInServer(payloads=payloads) as server:
+        df = get_yekdem_monthly(
+            "2024-01", sources=["income", "total_cost"], eptr=server.client()
+        )
+
+    assert df["income_value"].tolist() == [20.0]
+    assert df["total_cost_value"].tolist() == [20.0]
+
+
+def test_monthly_reconciliation_is_served_from_store(tmp_path, monkeypatch):
+    now = datetime(2024, 4, 10, tzinfo=get_utc3_now().tzinfo)
+    monkeypatch.setattr(renewables, "get_utc3_now", lambda: now)
+
+    with StandInServer(n_items=None) as server:
+        first = get_yekdem_monthly(
+            "2024-01",
+            "2024-03",
+            sources=["rt_gen", "total_cost"],
+            store=RenewablesStore(str(tmp_path)),
+            eptr=server.client(),
+        )
+        assert _calls(server) == 6
+
+        server.reset_stats()
+        store = RenewablesStore(str(tmp_path))
+        assert store.settled_months("rt_gen") == ["2024-01"]
+        second = get_yekdem_monthly(
+            "2024-01",
+            "2024-03",
+            sources=["rt_gen", "total_cost"],
+            store=store,
+            eptr=server.client(),
+        )
+        ## February and March are not settled yet and are fetched again
+        assert _calls(server) == 4
+
+        monkeypatch.setattr(renewables, "get_utc3_now", lambda: now.replace(month=7))
+        get_yekdem_monthly(
+            "2024-01",
+            "2024-03",
+            sources=["rt_gen", "total_cost"],
+            store=store,
+            eptr=server.client(),
+        )
+        server.reset_stats()
+        get_yekdem_monthly(
+            "2024-01",
+            "2024-03",
+            sources=["rt_gen", "total_cost"],
+            store=RenewablesStore(str(tmp_path)),
+            eptr=server.client(),
+        )
+        assert _calls(server) == 0
+
+    assert first.index.strftime("%Y-%m").tolist() == ["2024-01", "2024-02", "2024-03"]
+    assert list(first.columns) == ["rt_gen_value", "total_cost_value"]
+    assert first.loc["2024-01-01"].equals(second.loc["2024-01-01"])
+    assert (first.loc["2024-02-01"] != second.loc["2024-02-01"]).all()
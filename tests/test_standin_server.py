@@ -0,0 +1,47 @@
+"""Offline tests for the local EPIAS stand-in server."""
+
+import pytest
+
+from eptr2.testing import StandInServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandInServer(seed=1) as s:
+        yield s
+
+
+def test_client_logs_in_and_gets_synthetic_items(server):
+    eptr = server.client()
+    df = eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-30")
+
+    assert eptr.tgt.startswith("TGT-")
+    assert server.login_count >= 1
+    assert len(df) == 48
+    assert {"date", "hour", "price"} <= set(df.columns)
+    assert server.request_counts["/electricity-service/v1/markets/dam/data/mcp"] >= 1
+
+
+def test_recorded_payloads_are_served_as_is():
+    payload = {"items": [{"date": "2024-07-29T00:00:00+03:00", "price": 1.0}]}
+    with StandInServer(payloads={"mcp": payload}) as s:
+        df = s.client().call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+    assert df.to_dict(orient="records") == payload["items"]
+
+
+def test_error_injection():
+    with StandInServer(error_rate=1.0, error_status=503) as s:
+        eptr = s.client()
+        with pytest.raises(Exception, match="503"):
+            eptr.call("mcp", start_date="2024-07-29", end_date="2024-07-29")
+
+    assert s.error_count == 1
+
+
+def test_payload_size_options():
+    with StandInServer(n_items=5, extra_fields=3) as s:
+        df = s.client().call("rt-gen", start_date="2024-07-29", end_date="2024-07-29")
+
+    assert len(df) == 5
+    assert {"extra0", "extra1", "extra2"} <= set(df.columns)
@@ -0,0 +1,125 @@
+"""Offline tests for hourly supply-demand curves."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eptr2.composite.supply_demand import SupplyDemandCurves, get_supply_demand_curves
+from eptr2.testing import StandInServer
+
+SUPPLY_DEMAND_PATH = "/electricity-service/v1/markets/dam/data/supply-demand"
+
+
+def _curve(price, demand, supply):
+    return pd.DataFrame({"price": price, "demand": demand, "supply": supply})
+
+
+def _random_frames(n_hours, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for h in range(n_hours):
+        n = int(rng.integers(2, 40))
+        price = np.sort(rng.choice(np.arange(0, 3400, 5.0), size=n, replace=False))
+        demand = 45000 - np.cumsum(rng.uniform(0, 1500, n))
+        supply = 5000 + np.cumsum(rng.uniform(0, 3000, n))
+        ## Shuffled rows, curves are sorted by price when built
+        order = rng.permutation(n)
+        frames[f"h{h}"] = _curve(price[order], demand[order], supply[order])
+    return frames
+
+
+def _reference_clearing_price(df, demand_shift=0.0):
+    """Scans the price steps of a single curve."""
+    df = df.sort_values("price")
+    p = df["price"].to_numpy()
+    e = df["demand"].to_numpy() + demand_shift - df["supply"].to_numpy()
+    if e[0] <= 0:
+        return p[0]
+    for i in range(1, len(p)):
+        if e[i] <= 0:
+            return p[i - 1] + (p[i] - p[i - 1]) * e[i - 1] / (e[i - 1] - e[i])
+    return p[-1]
+
+
+def test_clearing_price_and_impact():
+    frames = {
+        "h0": _curve(
+            [3000, 0, 2000, 1000],
+            [25000, 40000, 30000, 35000],
+            [50000, 10000, 40000, 30000],
+        ),
+        "h1": None,
+        "h2": _curve([5.0], [1.0], [2.0]),
+    }
+    curves = SupplyDemandCurves.from_frames(frames)
+
+    assert curves.lengths.tolist() == [4, 0, 1]
+    assert curves.get_curve("h0")["price"].tolist() == [0, 1000, 2000, 3000]
+    np.testing.assert_allclose(curves.clearing_price(), [4000 / 3, np.nan, 5.0])
+
+    res = curves.price_impact(500, side="demand")
+    np.testing.assert_allclose(res["shifted_price"], [4100 / 3, np.nan, 5.0])
+    np.testing.assert_allclose(res["impact"].iloc[0], 100 / 3)
+
+    ## Demand above supply at every price clears at the highest price step
+    res = curves.price_impact([-40000, 0, 0], side="supply")
+    assert res["shifted_price"].iloc[0] == 3000
+
+    np.testing.assert_allclose(curves.quantity_at(1500), [32500, np.nan, 1.0])
+    np.testing.assert_allclose(
+        curves.quantity_at([-10, 0, 10], side="supply"), [10000, np.nan, 2.0]
+    )
+
+
+@pytest.mark.parametrize("shift", [0.0, 500.0, -2000.0])
+def test_clearing_price_matches_curve_scan(shift):
+    frames = _random_frames(200)
+    curves = SupplyDemandCurves.from_frames(frames)
+    expected = [_reference_clearing_price(df, shift) for df in frames.values()]
+    np.testing.assert_allclose(curves.clearing_price(demand_shift=shift), expected)
+
+
+def test_save_and_load(tmp_path):
+    curves = SupplyDemandCurves.from_frames(_random_frames(24))
+    path = str(tmp_path / "curves.npz")
+    curves.save(path)
+    loaded = SupplyDemandCurves.load(path)
+
+    assert loaded.hours.tolist() == curves.hours.tolist()
+    assert loaded.to_frame().equals(curves.to_frame())
+
+
+def test_fetch_concurrently():
+    payloads = {
+        "supply-demand": {
+            "items": [
+                {"price": 0, "demand": 40000, "supply": 10000},
+                {"price": 2000, "demand": 30000, "supply": 40000},
+            ]
+        }
+    }
+    with StandInServer(payloads=payloads, latency=0.01) as server:
+        curves = get_supply_demand_curves(
+            "2024-07-29", "2024-07-30", eptr=server.client()
+        )
+        assert server.request_counts[SUPPLY_DEMAND_PATH] == 48
+
+    assert len(curves) == 48
+    assert curves.hours[0] == "2024-07-29T00:00:00+03:00"
+    assert curves.hours[-1] == "2024-07-30T23:00:00+03:00"
+    np.testing.assert_allclose(curves.clearing_price(), 1500.0)
+
+
+def test_fetch_skip_errors():
+    payloads = {"supply-demand": {"items": [{"price": 0, "demand": 1, "supply": 2}]}}
+    with StandInServer(payloads=payloads, fail_first=1, error_status=400) as server:
+        curves = get_supply_demand_curves(
+            "2024-07-29",
+            "2024-07-29",
+            eptr=server.client(),
+            max_workers=1,
+            skip_errors=True,
+        )
+
+    assert curves.lengths.tolist() == [0] + [1] * 23
+    assert np.isnan(curves.clearing_price()[0])
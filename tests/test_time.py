@@ -0,0 +1,81 @@
+"""
+Unit tests for memoized contract helpers and the Contract value type in eptr2.util.time.
+"""
+
+import pytest
+
+from eptr2.util.time import (
+    Contract,
+    clear_contract_caches,
+    contract_close_time,
+    contract_open_time,
+    contract_to_datetime,
+    contract_to_floor_ceil_prices,
+    split_date_range,
+    time_to_contract_close,
+)
+
+
+class TestMemoizedContractHelpers:
+    def test_contract_to_datetime_is_memoized(self):
+        """Test repeated parses hit the LRU cache and return equal values."""
+        clear_contract_caches()
+        first = contract_to_datetime("PH24072914", timestamp=True)
+        second = contract_to_datetime("PH24072914", timestamp=True)
+
+        assert first == second == 1722250800.0
+        assert contract_to_datetime.cache_info().hits == 1
+
+    def test_floor_ceil_prices_returns_copies(self):
+        """Test cached price limits cannot be mutated by callers."""
+        d = contract_to_floor_ceil_prices("PH24072914")
+        d["max"] = -1
+
+        assert contract_to_floor_ceil_prices("PH24072914")["max"] == 3000.0
+
+    @pytest.mark.parametrize(
+        "c", ["PH240729", "PH24072914x", "PB24072914", "PH24023014", "PH24072924"]
+    )
+    def test_floor_ceil_prices_rejects_malformed_contracts(self, c):
+        with pytest.raises(ValueError):
+            contract_to_floor_ceil_prices(c)
+
+
+class TestContract:
+    def test_precomputed_timestamps(self):
+        """Test Contract timestamps match the string based helpers."""
+        c = Contract.from_symbol("PH24072914")
+
+        assert c.epoch == contract_to_datetime("PH24072914", timestamp=True)
+        assert c.open_ts == contract_open_time("PH24072914", to_timestamp=True)
+        assert c.close_ts == contract_close_time("PH24072914", to_timestamp=True)
+        assert c.time_to_close(ts_then=1722243600.0) == 3600.0
+        assert time_to_contract_close(c, ts_then=1722243600.0) == 3600.0
+        assert c.is_open(ts_then=1722243600.0)
+        assert not c.is_open(ts_then=c.close_ts)
+
+    def test_value_semantics(self):
+        """Test Contract objects are interned, comparable and immutable."""
+        c = Contract.from_symbol("PH24072914")
+
+        assert Contract.from_symbol("PH24072914") is c
+        assert Contract.from_symbol(c) is c
+        assert c == "PH24072914"
+        assert str(c) == "PH24072914"
+        assert min([Contract("PH24072915"), c]) is c
+        assert len({c, Contract("PH24072914")}) == 1
+
+        with pytest.raises(AttributeError):
+            c.symbol = "PH24072915"
+
+
+def test_split_date_range():
+    assert split_date_range("2024-02-27", "2024-03-03", 2) == [
+        ("2024-02-27", "2024-02-28"),
+        ("2024-02-29", "2024-03-01"),
+        ("2024-03-02", "2024-03-03"),
+    ]
+    assert split_date_range("2024-07-01", "2024-07-01", 7) == [
+        ("2024-07-01", "2024-07-01")
+    ]
+    assert split_date_range("2024-07-02", "2024-07-01", 7) == []
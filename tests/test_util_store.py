@@ -0,0 +1,43 @@
+"""Unit tests for the shared store helpers in eptr2.util.store."""
+
+from datetime import date
+
+import pytest
+
+from eptr2.util.store import (
+    read_json_gz,
+    select_sources,
+    split_months,
+    to_date,
+    write_json_gz,
+)
+
+
+def test_split_months():
+    assert split_months("2024-01-15", "2024-02-10") == [
+        (date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 10)),
+    ]
+    assert split_months("2024-01-15", "2024-02-10", full_months=True) == [
+        (date(2024, 1, 1), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+    ]
+    assert to_date("2024-07-29T00:00:00+03:00") == date(2024, 7, 29)
+
+
+def test_select_sources():
+    available = {"a": {"key": "x"}, "b": {"key": "y"}}
+    assert select_sources(None, available, "test") == available
+    assert select_sources(["b"], available, "test") == {"b": {"key": "y"}}
+    with pytest.raises(ValueError, match="Unknown test sources"):
+        select_sources(["c"], available, "test")
+
+
+def test_versioned_json_gz(tmp_path):
+    path = str(tmp_path / "store.json.gz")
+    write_json_gz(path, {"version": 1, "records": [1, 2]})
+
+    assert read_json_gz(path, 1, "test store")["records"] == [1, 2]
+    assert not (tmp_path / "store.json.gz.tmp").exists()
+    with pytest.raises(ValueError, match="Unsupported test store version 1"):
+        read_json_gz(path, 2, "test store")